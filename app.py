@@ -10,6 +10,10 @@ from flask import (
     send_file,
     current_app,
     Response,
+    g,
+    get_template_attribute,
+    has_request_context,
+    copy_current_request_context,
 )
 from flask_login import (
     login_user,
@@ -17,27 +21,44 @@ from flask_login import (
     logout_user,
     current_user,
 )
+from flask_wtf.csrf import generate_csrf
 from werkzeug.utils import secure_filename
 from werkzeug.exceptions import RequestEntityTooLarge
-import os, json, datetime, sqlite3, threading, re, uuid, random, string, copy, calendar, base64, shutil, time, math, ast, html, smtplib, builtins
+from werkzeug.routing import BuildError
+import os, json, datetime, sqlite3, threading, re, uuid, random, string, copy, calendar, base64, shutil, time, math, ast, html, hmac, smtplib, builtins, functools, operator
 from decimal import Decimal, InvalidOperation
 from datetime import datetime as datetime_cls, date
 import importlib.util
 import csv
+import click
 from email.message import EmailMessage
 from email.utils import formataddr
 from io import BytesIO, StringIO
 from collections import OrderedDict, Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from typing import Any, Dict, List, Optional
 
-from sqlalchemy import Integer, case, inspect, func, or_, and_, event, text
-from sqlalchemy.exc import OperationalError, SQLAlchemyError
-from sqlalchemy.orm import joinedload, subqueryload, load_only, object_session
+from sqlalchemy import Integer, case, inspect, func, or_, and_, event, exists, literal, select, text
+from sqlalchemy.exc import IntegrityError, OperationalError, SQLAlchemyError
+from sqlalchemy.orm import (
+    contains_eager,
+    joinedload,
+    load_only,
+    object_session,
+    selectinload,
+    subqueryload,
+)
 from sqlalchemy.engine.url import make_url
 
-from eleva_app import create_app, csrf, db, login_manager
-from eleva_app.common_import_utils import clean_str, parse_int_field, stringify_cell
+from eleva_app import create_app, csrf, db, login_manager, request_metrics, sql_profiler
+from eleva_app.common_import_utils import (
+    _coerce_date,
+    _coerce_float,
+    clean_str,
+    parse_int_field,
+    stringify_cell,
+)
 from eleva_app.section_guides import SECTION_GUIDE_CONTENTS, SECTION_GUIDE_TEMPLATE
 
 
@@ -88,6 +109,13 @@ if OPENPYXL_AVAILABLE:
 else:
     Workbook = load_workbook = Alignment = Font = None  # type: ignore[assignment]
 
+NUMPY_AVAILABLE = importlib.util.find_spec("numpy") is not None
+
+if NUMPY_AVAILABLE:
+    import numpy as np
+else:
+    np = None  # type: ignore[assignment]
+
 BASE_DIR = os.path.abspath(os.path.dirname(__file__))
 INDIA_TIMEZONE = datetime.timezone(datetime.timedelta(hours=5, minutes=30), name="IST")
 DEFAULT_MAX_UPLOAD_SIZE_MB = 45
@@ -387,7 +415,7 @@ def _primary_part_search_query(*, class_id=None, selected_part_id=None, term=Non
 
     if term:
         like = f"%{term.lower()}%"
-        query = query.filter(func.lower(Product.name).like(like))
+        query = query.filter(ci_key(Product.name).like(like))
 
     return query.order_by(Product.name.asc(), Product.id.asc())
 
@@ -540,6 +568,8 @@ def _validate_expression_ast(expr):
         ast.GtE,
     )
     for node in ast.walk(parsed):
+        if isinstance(node, allowed_ops):
+            continue
         if not isinstance(node, allowed_nodes):
             raise ValueError(f"Unsupported expression element: {node.__class__.__name__}")
         if isinstance(node, ast.BinOp) and not isinstance(node.op, allowed_ops):
@@ -560,360 +590,648 @@ def _validate_expression_ast(expr):
     return parsed
 
 
-def _safe_eval_expr(expr, variables):
-    parsed = _validate_expression_ast(expr)
+_BOM_BINARY_OPS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+}
+_BOM_UNARY_OPS = {
+    ast.UAdd: operator.pos,
+    ast.USub: operator.neg,
+    ast.Not: operator.not_,
+}
+_BOM_COMPARE_OPS = {
+    ast.Eq: operator.eq,
+    ast.NotEq: operator.ne,
+    ast.Lt: operator.lt,
+    ast.LtE: operator.le,
+    ast.Gt: operator.gt,
+    ast.GtE: operator.ge,
+}
+_BOM_ORDERING_OPS = (ast.Lt, ast.LtE, ast.Gt, ast.GtE)
+_BOM_EXPRESSION_FIELDS = (
+    "include_if_expr",
+    "qty_expr",
+    "override_if_expr",
+    "override_qty_expr",
+)
 
-    def _comparison_label(value):
-        if isinstance(value, bool):
-            return "boolean"
-        if isinstance(value, str):
-            return "text"
-        if isinstance(value, (int, float)):
-            return "number"
-        return "unknown"
-
-    def _ensure_comparable(left, right):
-        left_label = _comparison_label(left)
-        right_label = _comparison_label(right)
-        if left_label != right_label:
-            raise ValueError(f"Cannot compare {left_label} to {right_label}")
-        return left_label
-
-    def _eval(node):
-        if isinstance(node, ast.Expression):
-            return _eval(node.body)
-        if isinstance(node, ast.Constant):
-            return node.value
-        if isinstance(node, ast.Name):
-            lowered = node.id.lower()
-            if lowered in {"true", "false"}:
-                return lowered == "true"
-            if node.id in variables:
-                return variables[node.id]
-            raise ValueError(f"Unknown reference '{node.id}'.")
-        if isinstance(node, ast.BinOp):
-            left = _eval(node.left)
-            right = _eval(node.right)
-            if isinstance(node.op, ast.Add):
-                return left + right
-            if isinstance(node.op, ast.Sub):
-                return left - right
-            if isinstance(node.op, ast.Mult):
-                return left * right
-            if isinstance(node.op, ast.Div):
-                return left / right
-            raise ValueError("Unsupported arithmetic operator.")
-        if isinstance(node, ast.UnaryOp):
-            operand = _eval(node.operand)
-            if isinstance(node.op, ast.UAdd):
-                return +operand
-            if isinstance(node.op, ast.USub):
-                return -operand
-            if isinstance(node.op, ast.Not):
-                return not operand
-            raise ValueError("Unsupported unary operator.")
-        if isinstance(node, ast.BoolOp):
-            values = [_eval(value) for value in node.values]
-            if isinstance(node.op, ast.And):
-                return all(values)
-            if isinstance(node.op, ast.Or):
-                return any(values)
-            raise ValueError("Unsupported boolean operator.")
-        if isinstance(node, ast.Compare):
-            left = _eval(node.left)
-            for op, comparator in zip(node.ops, node.comparators):
-                right = _eval(comparator)
-                label = _ensure_comparable(left, right)
-                if isinstance(op, ast.Eq) and not (left == right):
-                    return False
-                if isinstance(op, ast.NotEq) and not (left != right):
+
+class _BomVectorFallback(Exception):
+    """Raised when an expression cannot be evaluated column-wise."""
+
+
+def _bom_comparison_label(value):
+    if isinstance(value, bool):
+        return "boolean"
+    if isinstance(value, str):
+        return "text"
+    if isinstance(value, (int, float)):
+        return "number"
+    return "unknown"
+
+
+def _bom_ensure_comparable(left, right):
+    left_label = _bom_comparison_label(left)
+    right_label = _bom_comparison_label(right)
+    if left_label != right_label:
+        raise ValueError(f"Cannot compare {left_label} to {right_label}")
+    return left_label
+
+
+def _compile_bom_scalar(node):
+    """Turn a validated expression node into a closure over ``variables``."""
+    if isinstance(node, ast.Expression):
+        return _compile_bom_scalar(node.body)
+    if isinstance(node, ast.Constant):
+        constant = node.value
+        return lambda variables: constant
+    if isinstance(node, ast.Name):
+        name = node.id
+        lowered = name.lower()
+        if lowered in {"true", "false"}:
+            flag = lowered == "true"
+            return lambda variables: flag
+
+        def _lookup(variables):
+            if name in variables:
+                return variables[name]
+            raise ValueError(f"Unknown reference '{name}'.")
+
+        return _lookup
+    if isinstance(node, ast.BinOp):
+        left = _compile_bom_scalar(node.left)
+        right = _compile_bom_scalar(node.right)
+        binary_op = _BOM_BINARY_OPS[type(node.op)]
+        return lambda variables: binary_op(left(variables), right(variables))
+    if isinstance(node, ast.UnaryOp):
+        operand = _compile_bom_scalar(node.operand)
+        unary_op = _BOM_UNARY_OPS[type(node.op)]
+        return lambda variables: unary_op(operand(variables))
+    if isinstance(node, ast.BoolOp):
+        operands = [_compile_bom_scalar(value) for value in node.values]
+        reducer = all if isinstance(node.op, ast.And) else any
+        return lambda variables: reducer([fn(variables) for fn in operands])
+    if isinstance(node, ast.Compare):
+        first = _compile_bom_scalar(node.left)
+        pairs = [
+            (type(op), _BOM_COMPARE_OPS[type(op)], _compile_bom_scalar(comparator))
+            for op, comparator in zip(node.ops, node.comparators)
+        ]
+
+        def _compare(variables):
+            left = first(variables)
+            for op_type, compare_op, comparator in pairs:
+                right = comparator(variables)
+                label = _bom_ensure_comparable(left, right)
+                if op_type in _BOM_ORDERING_OPS and label == "boolean":
+                    raise ValueError("Cannot compare boolean values.")
+                if not compare_op(left, right):
                     return False
-                if isinstance(op, ast.Lt):
-                    if label == "boolean":
-                        raise ValueError("Cannot compare boolean values.")
-                    if not (left < right):
-                        return False
-                if isinstance(op, ast.LtE):
-                    if label == "boolean":
-                        raise ValueError("Cannot compare boolean values.")
-                    if not (left <= right):
-                        return False
-                if isinstance(op, ast.Gt):
-                    if label == "boolean":
-                        raise ValueError("Cannot compare boolean values.")
-                    if not (left > right):
-                        return False
-                if isinstance(op, ast.GtE):
-                    if label == "boolean":
-                        raise ValueError("Cannot compare boolean values.")
-                    if not (left >= right):
-                        return False
                 left = right
             return True
-        if isinstance(node, ast.Call):
-            func_name = node.func.id
-            args = [_eval(arg) for arg in node.args]
+
+        return _compare
+    if isinstance(node, ast.Call):
+        func_name = node.func.id
+        arg_fns = [_compile_bom_scalar(arg) for arg in node.args]
+
+        def _call(variables):
+            args = [fn(variables) for fn in arg_fns]
             if func_name == "roundup":
                 if len(args) == 1:
                     return _roundup(args[0], 0)
                 if len(args) == 2:
                     return _roundup(args[0], args[1])
                 raise ValueError("roundup expects 1 or 2 arguments.")
-            if func_name == "min":
-                if len(args) < 2:
-                    raise ValueError("min expects at least 2 arguments.")
-                return min(args)
-            if func_name == "max":
-                if len(args) < 2:
-                    raise ValueError("max expects at least 2 arguments.")
-                return max(args)
-        raise ValueError("Unsupported expression.")
+            if len(args) < 2:
+                raise ValueError(f"{func_name} expects at least 2 arguments.")
+            return min(args) if func_name == "min" else max(args)
 
-    return _eval(parsed)
+        return _call
+    raise ValueError("Unsupported expression.")
 
 
-def _collect_expr_names(expr):
+def _bom_vector_constant(value):
+    if isinstance(value, bool):
+        return "boolean", np.asarray(float(value))
+    if isinstance(value, (int, float)):
+        return "number", np.asarray(float(value))
+    raise _BomVectorFallback()
+
+
+def _compile_bom_vector(node):
+    """Column-wise twin of ``_compile_bom_scalar`` backed by NumPy arrays.
+
+    Values are ``(kind, float64 array)`` pairs where kind is ``number`` or
+    ``boolean``.  Anything whose scalar result could differ (text, mixed-kind
+    comparisons, division by zero, non-constant roundup precision) raises
+    ``_BomVectorFallback`` so the caller re-runs those rows one at a time.
+    """
+    if isinstance(node, ast.Expression):
+        return _compile_bom_vector(node.body)
+    if isinstance(node, ast.Constant):
+        constant = node.value
+
+        def _constant(columns):
+            return _bom_vector_constant(constant)
+
+        return _constant
+    if isinstance(node, ast.Name):
+        name = node.id
+        lowered = name.lower()
+        if lowered in {"true", "false"}:
+            flag = lowered == "true"
+            return lambda columns: _bom_vector_constant(flag)
+
+        def _lookup(columns):
+            if name not in columns:
+                raise _BomVectorFallback()
+            return columns[name]
+
+        return _lookup
+    if isinstance(node, ast.BinOp):
+        left = _compile_bom_vector(node.left)
+        right = _compile_bom_vector(node.right)
+        binary_op = _BOM_BINARY_OPS[type(node.op)]
+        is_division = isinstance(node.op, ast.Div)
+
+        def _binary(columns):
+            left_values = left(columns)[1]
+            right_values = right(columns)[1]
+            if is_division and np.any(right_values == 0):
+                raise _BomVectorFallback()
+            return "number", binary_op(left_values, right_values)
+
+        return _binary
+    if isinstance(node, ast.UnaryOp):
+        operand = _compile_bom_vector(node.operand)
+        if isinstance(node.op, ast.Not):
+            return lambda columns: (
+                "boolean",
+                (operand(columns)[1] == 0).astype(float),
+            )
+        unary_op = _BOM_UNARY_OPS[type(node.op)]
+        return lambda columns: ("number", unary_op(operand(columns)[1]))
+    if isinstance(node, ast.BoolOp):
+        operands = [_compile_bom_vector(value) for value in node.values]
+        combine = np.logical_and if isinstance(node.op, ast.And) else np.logical_or
+
+        def _boolean(columns):
+            result = operands[0](columns)[1] != 0
+            for fn in operands[1:]:
+                result = combine(result, fn(columns)[1] != 0)
+            return "boolean", result.astype(float)
+
+        return _boolean
+    if isinstance(node, ast.Compare):
+        first = _compile_bom_vector(node.left)
+        pairs = [
+            (type(op), _BOM_COMPARE_OPS[type(op)], _compile_bom_vector(comparator))
+            for op, comparator in zip(node.ops, node.comparators)
+        ]
+
+        def _compare(columns):
+            left_kind, left_values = first(columns)
+            result = None
+            for op_type, compare_op, comparator in pairs:
+                right_kind, right_values = comparator(columns)
+                if left_kind != right_kind:
+                    raise _BomVectorFallback()
+                if op_type in _BOM_ORDERING_OPS and left_kind == "boolean":
+                    raise _BomVectorFallback()
+                step = compare_op(left_values, right_values)
+                result = step if result is None else np.logical_and(result, step)
+                left_kind, left_values = right_kind, right_values
+            return "boolean", result.astype(float)
+
+        return _compare
+    if isinstance(node, ast.Call):
+        func_name = node.func.id
+        arg_fns = [_compile_bom_vector(arg) for arg in node.args]
+
+        def _call(columns):
+            args = [fn(columns) for fn in arg_fns]
+            if func_name == "roundup":
+                if len(args) not in (1, 2):
+                    raise _BomVectorFallback()
+                values = args[0][1]
+                decimals = 0
+                if len(args) == 2:
+                    precision = np.ravel(args[1][1])
+                    decimals = float(precision[0])
+                    if decimals not in (0.0, 1.0) or np.any(precision != decimals):
+                        raise _BomVectorFallback()
+                if not np.all(np.isfinite(values)):
+                    raise _BomVectorFallback()
+                factor = 10 ** int(decimals)
+                return "number", np.ceil(values * factor) / factor
+            kinds = {kind for kind, _values in args}
+            if len(args) < 2 or len(kinds) != 1:
+                raise _BomVectorFallback()
+            reducer = np.minimum if func_name == "min" else np.maximum
+            result = args[0][1]
+            for _kind, values in args[1:]:
+                result = reducer(result, values)
+            return kinds.pop(), result
+
+        return _call
+    raise _BomVectorFallback()
+
+
+@dataclass(frozen=True)
+class _CompiledBomExpression:
+    text: str
+    names: frozenset
+    error: Optional[str]
+    scalar: Any = None
+    vector: Any = None
+
+    def evaluate(self, variables):
+        if self.error is not None:
+            raise ValueError(self.error)
+        return self.scalar(variables)
+
+    def evaluate_columns(self, columns, size):
+        if self.error is not None or self.vector is None:
+            raise _BomVectorFallback()
+        kind, values = self.vector(columns)
+        values = np.broadcast_to(np.asarray(values, dtype=float), (size,))
+        if not np.all(np.isfinite(values)):
+            raise _BomVectorFallback()
+        return kind, values
+
+
+@functools.lru_cache(maxsize=4096)
+def _compile_bom_expression(expr):
+    """Parse, validate and compile ``expr`` once; results are memoised by text."""
     try:
         parsed = ast.parse(expr, mode="eval")
-    except (SyntaxError, ValueError):
-        return set()
-    names = set()
-    for node in ast.walk(parsed):
-        if isinstance(node, ast.Name):
-            names.add(node.id)
-    return names
+    except (SyntaxError, ValueError) as exc:
+        return _CompiledBomExpression(expr, frozenset(), str(exc))
+    names = frozenset(
+        node.id for node in ast.walk(parsed) if isinstance(node, ast.Name)
+    )
+    try:
+        _validate_expression_ast(expr)
+        scalar = _compile_bom_scalar(parsed)
+    except (SyntaxError, ValueError) as exc:
+        return _CompiledBomExpression(expr, names, str(exc))
+    vector = _compile_bom_vector(parsed) if NUMPY_AVAILABLE else None
+    return _CompiledBomExpression(expr, names, None, scalar, vector)
 
 
-def evaluate_bom_template(template, input_values=None):
-    input_values = input_values or {}
-    results = []
-    errors = []
-    expression_errors = []
-    expression_error_counts = defaultdict(int)
-    input_map = {}
-    input_errors = {}
-    input_keys = []
-    line_contexts = {}
+def _safe_eval_expr(expr, variables):
+    return _compile_bom_expression(expr).evaluate(variables)
 
-    def _line_display_name(line):
-        candidates = [
-            line.specification_text,
-            line.part_class.name if line.part_class else None,
-            line.unit,
-        ]
-        for candidate in candidates:
-            if candidate is None:
-                continue
-            value = str(candidate).strip()
-            if value:
-                return value
-        return ""
 
-    def _record_expression_error(line_id, field_name, expr_text, message):
-        meta = line_contexts.get(line_id, {})
-        payload = {
-            "stage_id": meta.get("stage_id"),
-            "stage_name": meta.get("stage_name") or "",
-            "section_id": meta.get("section_id"),
-            "section_name": meta.get("section_name") or "",
-            "line_id": line_id,
-            "line_ref_key": meta.get("line_ref_key") or "",
-            "line_display_name": meta.get("line_display_name") or "",
-            "field_name": field_name,
-            "expression_text": expr_text or "",
-            "error_message": str(message),
-        }
-        expression_errors.append(payload)
-        section_id = meta.get("section_id")
-        if section_id is not None:
-            expression_error_counts[section_id] += 1
+def _collect_expr_names(expr):
+    return set(_compile_bom_expression(expr).names)
+
+
+_BOM_TEMPLATE_PLAN_CACHE = {}
+_BOM_TEMPLATE_PLAN_LOCK = threading.Lock()
+
+
+def _bom_line_display_name(line):
+    candidates = [
+        line.specification_text,
+        line.part_class.name if line.part_class else None,
+        line.unit,
+    ]
+    for candidate in candidates:
+        if candidate is None:
+            continue
+        value = str(candidate).strip()
+        if value:
+            return value
+    return ""
 
+
+def _build_bom_template_plan(template):
+    inputs = []
+    input_keys = []
     for template_input in template.inputs:
         key = (template_input.input_key or "").strip()
+        spec = {
+            "id": template_input.id,
+            "key": key,
+            "default_value": template_input.default_value,
+            "data_type": template_input.data_type or "number",
+            "required": bool(template_input.required),
+            "error": None,
+        }
         if not key:
-            input_errors[template_input.id] = "Input key is required."
-            continue
-        if key in input_map:
-            input_errors[template_input.id] = "Duplicate input key."
-            continue
-        input_keys.append(key)
-        raw_value = input_values.get(key, template_input.default_value)
-        parsed, error = _parse_bom_input_value(
-            raw_value,
-            template_input.data_type or "number",
-            required=bool(template_input.required),
-        )
-        if error:
-            input_errors[template_input.id] = error
-        input_map[key] = parsed
-
-    if input_errors:
-        for input_id, message in input_errors.items():
-            errors.append({"type": "input", "id": input_id, "message": message})
+            spec["error"] = "Input key is required."
+        elif key in input_keys:
+            spec["error"] = "Duplicate input key."
+        else:
+            input_keys.append(key)
+        inputs.append(spec)
 
-    section_includes = {}
+    sections = []
+    lines = {}
     for stage in sorted(template.stages, key=lambda st: (st.display_order or 0, st.id)):
         for section in sorted(stage.sections, key=lambda sec: (sec.display_order or 0, sec.id)):
             include_expr = (section.include_if_expr or "").strip()
-            include_errors = []
-            include = True
-            if include_expr:
-                names = _collect_expr_names(include_expr)
-                for name in names:
-                    if name in _BOM_ALLOWED_FUNCS:
-                        continue
-                    if name not in input_map:
-                        include_errors.append(f"Unknown reference '{name}'.")
-                if include_errors:
-                    include = False
-                else:
-                    try:
-                        include = bool(_safe_eval_expr(include_expr, input_map))
-                    except Exception as exc:
-                        include_errors.append(f"include_if_expr error: {exc}")
-                        include = False
-            section_includes[section.id] = {
-                "include": include,
-                "errors": include_errors,
-                "expr": include_expr,
-            }
-            if include_errors:
-                for message in include_errors:
-                    errors.append({"type": "section", "id": section.id, "message": message})
-
-    lines = []
-    for stage in sorted(template.stages, key=lambda st: (st.display_order or 0, st.id)):
-        for section in sorted(stage.sections, key=lambda sec: (sec.display_order or 0, sec.id)):
-            if not section_includes.get(section.id, {}).get("include", True):
-                continue
-            sorted_section_lines = sorted(section.lines, key=lambda ln: (ln.display_order or 0, ln.id))
-            for line in sorted_section_lines:
-                lines.append(line)
-                line_contexts[line.id] = {
+            line_ids = []
+            for line in sorted(section.lines, key=lambda ln: (ln.display_order or 0, ln.id)):
+                line_ids.append(line.id)
+                expressions = {}
+                for field_name in _BOM_EXPRESSION_FIELDS:
+                    expr_text = (getattr(line, field_name) or "").strip()
+                    expressions[field_name] = (
+                        _compile_bom_expression(expr_text) if expr_text else None
+                    )
+                lines[line.id] = {
+                    "ref_key": (line.ref_key or "").strip(),
+                    "display_name": _bom_line_display_name(line),
+                    "raw_exprs": {
+                        field_name: getattr(line, field_name)
+                        for field_name in _BOM_EXPRESSION_FIELDS
+                    },
+                    "exprs": expressions,
+                }
+            sections.append(
+                {
                     "stage_id": stage.id,
                     "stage_name": stage.stage_name,
                     "section_id": section.id,
                     "section_name": section.section_name,
-                    "line_ref_key": (line.ref_key or "").strip(),
-                    "line_display_name": _line_display_name(line),
+                    "include_expr": include_expr,
+                    "include": _compile_bom_expression(include_expr) if include_expr else None,
+                    "line_ids": line_ids,
                 }
+            )
+
+    return {
+        "inputs": inputs,
+        "input_keys": input_keys,
+        "sections": sections,
+        "lines": lines,
+        "layouts": {},
+    }
 
+
+def _bom_template_plan(template):
+    """Return the compiled evaluation plan for ``template``.
+
+    Plans are cached per template id and reused until ``updated_at`` moves,
+    which happens whenever the template or any of its inputs, stages,
+    sections or lines change, or a part class its lines use is renamed
+    (see ``_touch_bom_template``). A cached plan is shared between threads,
+    so its layouts are only ever replaced, never changed in place.
+    """
+    stamp = getattr(template, "updated_at", None)
+    if template.id is None or stamp is None:
+        return _build_bom_template_plan(template)
+    cached = _BOM_TEMPLATE_PLAN_CACHE.get(template.id)
+    if cached and cached[0] == stamp:
+        return cached[1]
+    plan = _build_bom_template_plan(template)
+    with _BOM_TEMPLATE_PLAN_LOCK:
+        _BOM_TEMPLATE_PLAN_CACHE[template.id] = (stamp, plan)
+    return plan
+
+
+def _bom_plan_layout(plan, included_section_ids):
+    """Resolve refs, dependencies and evaluation order for included sections.
+
+    Everything here depends only on which sections are included, so the
+    result is memoised on the plan and shared by every input set that
+    includes the same sections.
+    """
+    layout_key = tuple(included_section_ids)
+    layout = plan["layouts"].get(layout_key)
+    if layout is not None:
+        return layout
+
+    included = set(layout_key)
+    input_keys = set(plan["input_keys"])
+    line_ids = []
+    contexts = {}
+    for section in plan["sections"]:
+        if section["section_id"] not in included:
+            continue
+        for line_id in section["line_ids"]:
+            line_ids.append(line_id)
+            line_plan = plan["lines"][line_id]
+            contexts[line_id] = {
+                "stage_id": section["stage_id"],
+                "stage_name": section["stage_name"],
+                "section_id": section["section_id"],
+                "section_name": section["section_name"],
+                "line_ref_key": line_plan["ref_key"],
+                "line_display_name": line_plan["display_name"],
+            }
+
+    errors = []
     ref_map = {}
     ref_duplicates = set()
-    for line in lines:
-        ref_key = (line.ref_key or "").strip()
+    for line_id in line_ids:
+        ref_key = plan["lines"][line_id]["ref_key"]
         if not ref_key:
-            errors.append({"type": "line", "id": line.id, "message": "Missing ref_key."})
+            errors.append({"type": "line", "id": line_id, "message": "Missing ref_key."})
             continue
         if ref_key in ref_map:
             ref_duplicates.add(ref_key)
         else:
-            ref_map[ref_key] = line
+            ref_map[ref_key] = line_id
 
     for ref_key in ref_duplicates:
         errors.append({"type": "line", "ref_key": ref_key, "message": "Duplicate ref_key in template."})
 
-    if set(input_keys) & set(ref_map.keys()):
-        overlap = sorted(set(input_keys) & set(ref_map.keys()))
+    if input_keys & set(ref_map.keys()):
+        overlap = sorted(input_keys & set(ref_map.keys()))
         errors.append({"type": "template", "message": f"Input keys overlap with line ref_keys: {', '.join(overlap)}"})
 
     dependencies = {}
-    line_errors = {line.id: [] for line in lines}
-    for line in lines:
-        ref_key = (line.ref_key or "").strip()
+    line_errors = {line_id: [] for line_id in line_ids}
+    expression_errors = []
+    for line_id in line_ids:
+        line_plan = plan["lines"][line_id]
         deps = set()
-        expressions = [
-            ("include_if_expr", line.include_if_expr),
-            ("qty_expr", line.qty_expr),
-            ("override_if_expr", line.override_if_expr),
-            ("override_qty_expr", line.override_qty_expr),
-        ]
-        for field_name, expr in expressions:
+        for field_name in _BOM_EXPRESSION_FIELDS:
+            expr = line_plan["raw_exprs"][field_name]
             if not expr:
                 continue
-            names = _collect_expr_names(expr)
-            for name in names:
+            for name in _collect_expr_names(expr):
                 if name in _BOM_ALLOWED_FUNCS:
                     continue
-                if name in input_map:
+                if name in input_keys:
                     continue
                 if name in ref_map:
                     deps.add(name)
                 else:
                     message = f"Unknown reference '{name}'."
-                    line_errors[line.id].append(message)
-                    _record_expression_error(line.id, field_name, expr, message)
-        dependencies[ref_key] = deps
+                    line_errors[line_id].append(message)
+                    expression_errors.append(
+                        _bom_expression_error(contexts, line_id, field_name, expr, message)
+                    )
+        dependencies[line_plan["ref_key"]] = deps
 
-    sorted_lines = []
+    order = []
     visiting = set()
     visited = set()
 
-    def _visit(line_key, line_obj):
+    def _visit(line_key, line_id):
         if line_key in visited:
             return
         if line_key in visiting:
-            line_errors[line_obj.id].append("Circular dependency detected.")
+            line_errors[line_id].append("Circular dependency detected.")
             return
         visiting.add(line_key)
         for dep in dependencies.get(line_key, set()):
-            dep_line = ref_map.get(dep)
-            if dep_line:
-                _visit(dep, dep_line)
+            dep_line_id = ref_map.get(dep)
+            if dep_line_id:
+                _visit(dep, dep_line_id)
         visiting.remove(line_key)
         visited.add(line_key)
-        sorted_lines.append(line_obj)
+        order.append(line_id)
 
-    for line in lines:
-        ref_key = (line.ref_key or "").strip()
+    for line_id in line_ids:
+        ref_key = plan["lines"][line_id]["ref_key"]
         if ref_key:
-            _visit(ref_key, line)
+            _visit(ref_key, line_id)
+
+    for line_id in line_ids:
+        for message in line_errors[line_id]:
+            errors.append({"type": "line", "id": line_id, "message": message})
 
+    layout = {
+        "order": order,
+        "contexts": contexts,
+        "line_errors": line_errors,
+        "errors": errors,
+        "expression_errors": expression_errors,
+    }
+    with _BOM_TEMPLATE_PLAN_LOCK:
+        # Copy on write: other threads may be reading the cached plan's layouts.
+        plan["layouts"] = {**plan["layouts"], layout_key: layout}
+    return layout
+
+
+def _bom_expression_error(contexts, line_id, field_name, expr_text, message):
+    meta = contexts.get(line_id, {})
+    return {
+        "stage_id": meta.get("stage_id"),
+        "stage_name": meta.get("stage_name") or "",
+        "section_id": meta.get("section_id"),
+        "section_name": meta.get("section_name") or "",
+        "line_id": line_id,
+        "line_ref_key": meta.get("line_ref_key") or "",
+        "line_display_name": meta.get("line_display_name") or "",
+        "field_name": field_name,
+        "expression_text": expr_text or "",
+        "error_message": str(message),
+    }
+
+
+def _bom_plan_inputs(plan, input_values):
+    input_map = {}
+    input_errors = {}
+    for spec in plan["inputs"]:
+        if spec["error"]:
+            input_errors[spec["id"]] = spec["error"]
+            continue
+        raw_value = input_values.get(spec["key"], spec["default_value"])
+        parsed, error = _parse_bom_input_value(
+            raw_value,
+            spec["data_type"],
+            required=spec["required"],
+        )
+        if error:
+            input_errors[spec["id"]] = error
+        input_map[spec["key"]] = parsed
+    return input_map, input_errors
+
+
+def _bom_plan_section_includes(plan, input_map):
+    section_includes = {}
+    for section in plan["sections"]:
+        compiled = section["include"]
+        include_errors = []
+        include = True
+        if compiled is not None:
+            for name in compiled.names:
+                if name in _BOM_ALLOWED_FUNCS:
+                    continue
+                if name not in input_map:
+                    include_errors.append(f"Unknown reference '{name}'.")
+            if include_errors:
+                include = False
+            else:
+                try:
+                    include = bool(compiled.evaluate(input_map))
+                except Exception as exc:
+                    include_errors.append(f"include_if_expr error: {exc}")
+                    include = False
+        section_includes[section["section_id"]] = {
+            "include": include,
+            "errors": include_errors,
+            "expr": section["include_expr"],
+        }
+    return section_includes
+
+
+def _evaluate_bom_layout_row(plan, layout, input_map, line_objects):
+    """Evaluate line quantities for one input set, one line at a time."""
+    results = []
+    expression_errors = []
     values = {}
-    for line in sorted_lines:
-        ref_key = (line.ref_key or "").strip()
+
+    def _record(line_id, field_name, expr_text, message):
+        expression_errors.append(
+            _bom_expression_error(layout["contexts"], line_id, field_name, expr_text, message)
+        )
+
+    for line_id in layout["order"]:
+        line_plan = plan["lines"][line_id]
+        ref_key = line_plan["ref_key"]
         line_result = {
-            "id": line.id,
+            "id": line_id,
             "ref_key": ref_key,
-            "line": line,
+            "line": line_objects.get(line_id),
             "final_qty": 0,
             "errors": [],
         }
 
-        if line_errors.get(line.id):
-            line_result["errors"].extend(line_errors[line.id])
+        if layout["line_errors"].get(line_id):
+            line_result["errors"].extend(layout["line_errors"][line_id])
             results.append(line_result)
             values[ref_key] = 0
             continue
 
         context = {**input_map, **values}
-        include_expr = (line.include_if_expr or "").strip()
-        qty_expr = (line.qty_expr or "").strip()
-        override_if_expr = (line.override_if_expr or "").strip()
-        override_qty_expr = (line.override_qty_expr or "").strip()
+        exprs = line_plan["exprs"]
+        include_expr = exprs["include_if_expr"]
+        qty_expr = exprs["qty_expr"] or _compile_bom_expression("")
+        override_if_expr = exprs["override_if_expr"]
+        override_qty_expr = exprs["override_qty_expr"]
 
         try:
             include = True
             if include_expr:
-                include = bool(_safe_eval_expr(include_expr, context))
+                include = bool(include_expr.evaluate(context))
         except Exception as exc:
             message = f"include_if_expr error: {exc}"
             line_result["errors"].append(message)
-            _record_expression_error(line.id, "include_if_expr", include_expr, message)
+            _record(line_id, "include_if_expr", include_expr.text, message)
             include = False
 
         try:
-            qty_value = _safe_eval_expr(qty_expr, context)
+            qty_value = qty_expr.evaluate(context)
         except Exception as exc:
             message = f"qty_expr error: {exc}"
             line_result["errors"].append(message)
-            _record_expression_error(line.id, "qty_expr", qty_expr, message)
+            _record(line_id, "qty_expr", qty_expr.text, message)
             qty_value = 0
 
-        if qty_expr and not isinstance(qty_value, (int, float)):
+        if qty_expr.text and not isinstance(qty_value, (int, float)):
             message = "qty_expr did not return a number."
             line_result["errors"].append(message)
-            _record_expression_error(line.id, "qty_expr", qty_expr, message)
+            _record(line_id, "qty_expr", qty_expr.text, message)
             qty_value = 0
 
         if not include:
@@ -922,11 +1240,11 @@ def evaluate_bom_template(template, input_values=None):
         final_qty = qty_value
         if include and override_if_expr:
             try:
-                override = bool(_safe_eval_expr(override_if_expr, context))
+                override = bool(override_if_expr.evaluate(context))
             except Exception as exc:
                 message = f"override_if_expr error: {exc}"
                 line_result["errors"].append(message)
-                _record_expression_error(line.id, "override_if_expr", override_if_expr, message)
+                _record(line_id, "override_if_expr", override_if_expr.text, message)
                 override = False
 
             if override:
@@ -935,27 +1253,17 @@ def evaluate_bom_template(template, input_values=None):
                     final_qty = 0
                 else:
                     try:
-                        override_qty = _safe_eval_expr(override_qty_expr, context)
+                        override_qty = override_qty_expr.evaluate(context)
                     except Exception as exc:
                         message = f"override_qty_expr error: {exc}"
                         line_result["errors"].append(message)
-                        _record_expression_error(
-                            line.id,
-                            "override_qty_expr",
-                            override_qty_expr,
-                            message,
-                        )
+                        _record(line_id, "override_qty_expr", override_qty_expr.text, message)
                         override_qty = 0
 
                     if not isinstance(override_qty, (int, float)):
                         message = "override_qty_expr did not return a number."
                         line_result["errors"].append(message)
-                        _record_expression_error(
-                            line.id,
-                            "override_qty_expr",
-                            override_qty_expr,
-                            message,
-                        )
+                        _record(line_id, "override_qty_expr", override_qty_expr.text, message)
                         override_qty = 0
                     final_qty = override_qty
 
@@ -966,22 +1274,200 @@ def evaluate_bom_template(template, input_values=None):
         values[ref_key] = float(final_qty or 0)
         results.append(line_result)
 
-    for line in lines:
-        if line_errors.get(line.id):
-            for message in line_errors[line.id]:
-                errors.append({"type": "line", "id": line.id, "message": message})
+    return results, expression_errors
+
+
+def _evaluate_bom_layout_columns(plan, layout, input_columns, size):
+    """Evaluate line quantities for ``size`` input sets at once.
+
+    Returns ``{line_id: float64 array}``; raises ``_BomVectorFallback`` when
+    any row would need the scalar evaluator's error handling.
+    """
+    quantities = {}
+    values = {}
+    zeros = np.zeros(size)
+    for line_id in layout["order"]:
+        line_plan = plan["lines"][line_id]
+        ref_key = line_plan["ref_key"]
+        if layout["line_errors"].get(line_id):
+            quantities[line_id] = zeros
+            values[ref_key] = ("number", zeros)
+            continue
+
+        context = {**input_columns, **values}
+        exprs = line_plan["exprs"]
+        if exprs["qty_expr"] is None:
+            raise _BomVectorFallback()
+        include = np.ones(size, dtype=bool)
+        if exprs["include_if_expr"]:
+            include = exprs["include_if_expr"].evaluate_columns(context, size)[1] != 0
+        qty_values = np.where(include, exprs["qty_expr"].evaluate_columns(context, size)[1], 0.0)
+
+        final_qty = qty_values
+        if exprs["override_if_expr"]:
+            override = include & (
+                exprs["override_if_expr"].evaluate_columns(context, size)[1] != 0
+            )
+            if np.any(override):
+                if not exprs["override_qty_expr"]:
+                    raise _BomVectorFallback()
+                override_qty = exprs["override_qty_expr"].evaluate_columns(context, size)[1]
+                final_qty = np.where(override, override_qty, qty_values)
+
+        quantities[line_id] = final_qty
+        values[ref_key] = ("number", final_qty)
+    return quantities
+
+
+def _bom_evaluation_payload(
+    layout,
+    input_map,
+    input_errors,
+    section_includes,
+    line_results,
+    runtime_expression_errors,
+):
+    errors = [
+        {"type": "input", "id": input_id, "message": message}
+        for input_id, message in input_errors.items()
+    ]
+    for section_id, state in section_includes.items():
+        for message in state["errors"]:
+            errors.append({"type": "section", "id": section_id, "message": message})
+    errors.extend(dict(error) for error in layout["errors"])
+
+    expression_errors = [dict(error) for error in layout["expression_errors"]]
+    expression_errors.extend(runtime_expression_errors)
+    expression_error_counts = defaultdict(int)
+    for error in expression_errors:
+        if error.get("section_id") is not None:
+            expression_error_counts[error["section_id"]] += 1
 
     return {
         "inputs": input_map,
         "input_errors": input_errors,
         "section_includes": section_includes,
-        "lines": results,
+        "lines": line_results,
         "errors": errors,
         "expression_errors": expression_errors,
         "expression_error_counts": dict(expression_error_counts),
     }
 
 
+def _bom_template_line_objects(template):
+    return {
+        line.id: line
+        for stage in template.stages
+        for section in stage.sections
+        for line in section.lines
+    }
+
+
+def _bom_included_sections(section_includes):
+    return tuple(
+        section_id
+        for section_id, state in section_includes.items()
+        if state.get("include", True)
+    )
+
+
+def evaluate_bom_template(template, input_values=None):
+    plan = _bom_template_plan(template)
+    input_map, input_errors = _bom_plan_inputs(plan, input_values or {})
+    section_includes = _bom_plan_section_includes(plan, input_map)
+    layout = _bom_plan_layout(plan, _bom_included_sections(section_includes))
+    line_results, runtime_errors = _evaluate_bom_layout_row(
+        plan, layout, input_map, _bom_template_line_objects(template)
+    )
+    return _bom_evaluation_payload(
+        layout, input_map, input_errors, section_includes, line_results, runtime_errors
+    )
+
+
+def _bom_vectorizable_inputs(input_map, input_errors):
+    if input_errors:
+        return False
+    return all(
+        isinstance(value, (bool, int, float)) for value in input_map.values()
+    )
+
+
+def evaluate_bom_template_batch(template, input_sets):
+    """Evaluate ``template`` against many input sets in one pass.
+
+    Returns one payload per entry of ``input_sets``, identical to calling
+    ``evaluate_bom_template`` for each.  Input sets that include the same
+    sections share a layout and, when NumPy is available and every input is
+    numeric or boolean, their quantities are computed column-wise; anything
+    else falls back to the per-row evaluator.
+    """
+    plan = _bom_template_plan(template)
+    line_objects = _bom_template_line_objects(template)
+    rows = []
+    groups = OrderedDict()
+    for index, input_values in enumerate(input_sets):
+        input_map, input_errors = _bom_plan_inputs(plan, input_values or {})
+        section_includes = _bom_plan_section_includes(plan, input_map)
+        included = _bom_included_sections(section_includes)
+        rows.append((input_map, input_errors, section_includes))
+        vectorizable = NUMPY_AVAILABLE and _bom_vectorizable_inputs(input_map, input_errors)
+        groups.setdefault((included, vectorizable), []).append(index)
+
+    evaluations = [None] * len(rows)
+    for (included, vectorizable), indexes in groups.items():
+        layout = _bom_plan_layout(plan, included)
+        quantities = None
+        if vectorizable and len(indexes) > 1:
+            input_columns = {
+                key: (
+                    "boolean" if isinstance(rows[indexes[0]][0][key], bool) else "number",
+                    np.array([float(rows[index][0][key]) for index in indexes]),
+                )
+                for key in plan["input_keys"]
+            }
+            if all(
+                all(
+                    isinstance(rows[index][0][key], bool) == (kind == "boolean")
+                    for index in indexes
+                )
+                for key, (kind, _values) in input_columns.items()
+            ):
+                try:
+                    quantities = _evaluate_bom_layout_columns(
+                        plan, layout, input_columns, len(indexes)
+                    )
+                except _BomVectorFallback:
+                    quantities = None
+
+        for position, index in enumerate(indexes):
+            input_map, input_errors, section_includes = rows[index]
+            if quantities is None:
+                line_results, runtime_errors = _evaluate_bom_layout_row(
+                    plan, layout, input_map, line_objects
+                )
+            else:
+                runtime_errors = []
+                line_results = [
+                    {
+                        "id": line_id,
+                        "ref_key": plan["lines"][line_id]["ref_key"],
+                        "line": line_objects.get(line_id),
+                        "final_qty": float(quantities[line_id][position]),
+                        "errors": list(layout["line_errors"].get(line_id) or []),
+                    }
+                    for line_id in layout["order"]
+                ]
+            evaluations[index] = _bom_evaluation_payload(
+                layout,
+                input_map,
+                input_errors,
+                section_includes,
+                line_results,
+                runtime_errors,
+            )
+    return evaluations
+
+
 def _get_or_create_design_task_bom(task, *, bom_name="Task BOM"):
     bom = (
         BillOfMaterials.query.filter_by(design_task_id=task.id)
@@ -1533,26 +2019,6 @@ def build_customer_upload_workbook():
     return workbook
 
 
-def build_customer_export_workbook(customers):
-    _ensure_openpyxl()
-    workbook = Workbook()
-    data_sheet = workbook.active
-    data_sheet.title = CUSTOMER_UPLOAD_TEMPLATE_SHEET_NAME
-    data_sheet.append(CUSTOMER_UPLOAD_TEMPLATE_HEADERS)
-
-    for customer in customers:
-        data_sheet.append(_customer_upload_row(customer))
-
-    for idx, header in enumerate(CUSTOMER_UPLOAD_TEMPLATE_HEADERS, start=1):
-        cell = data_sheet.cell(row=1, column=idx)
-        cell.font = Font(bold=True)
-        cell.alignment = Alignment(wrap_text=True)
-        column_letter = data_sheet.cell(row=1, column=idx).column_letter
-        data_sheet.column_dimensions[column_letter].width = max(18, len(header) + 2)
-
-    return workbook
-
-
 def _lift_export_row(lift):
     preferred_days = ", ".join(day.title() for day in (lift.preferred_service_days or []))
     preferred_date = _format_date_iso(getattr(lift, "preferred_service_date", None))
@@ -1590,26 +2056,6 @@ def _lift_export_row(lift):
     ]
 
 
-def build_lift_export_workbook(lifts):
-    _ensure_openpyxl()
-    workbook = Workbook()
-    data_sheet = workbook.active
-    data_sheet.title = AMC_LIFT_TEMPLATE_SHEET_NAME
-    data_sheet.append(AMC_LIFT_TEMPLATE_HEADERS)
-
-    for lift in lifts:
-        data_sheet.append(_lift_export_row(lift))
-
-    for idx, header in enumerate(AMC_LIFT_TEMPLATE_HEADERS, start=1):
-        cell = data_sheet.cell(row=1, column=idx)
-        cell.font = Font(bold=True)
-        cell.alignment = Alignment(wrap_text=True)
-        column_letter = data_sheet.cell(row=1, column=idx).column_letter
-        data_sheet.column_dimensions[column_letter].width = max(18, len(header) + 2)
-
-    return workbook
-
-
 SERVICE_CONTRACT_EXPORT_HEADERS = [
     "Contract ID",
     "Type",
@@ -1714,26 +2160,6 @@ def build_sales_client_upload_workbook():
     return workbook
 
 
-def build_sales_client_export_workbook(clients):
-    _ensure_openpyxl()
-    workbook = Workbook()
-    data_sheet = workbook.active
-    data_sheet.title = SALES_CLIENT_TEMPLATE_SHEET_NAME
-    data_sheet.append(SALES_CLIENT_UPLOAD_HEADERS)
-
-    for client in clients:
-        data_sheet.append(_sales_client_upload_row(client))
-
-    for idx, header in enumerate(SALES_CLIENT_UPLOAD_HEADERS, start=1):
-        cell = data_sheet.cell(row=1, column=idx)
-        cell.font = Font(bold=True)
-        cell.alignment = Alignment(wrap_text=True)
-        column_letter = data_sheet.cell(row=1, column=idx).column_letter
-        data_sheet.column_dimensions[column_letter].width = max(18, len(header) + 2)
-
-    return workbook
-
-
 def _sales_lead_upload_row(lead):
     owner_email = ""
     if lead.owner and getattr(lead.owner, "email", None):
@@ -1877,34 +2303,14 @@ def build_sales_opportunity_upload_workbook(pipeline_key):
     return workbook
 
 
-def build_sales_opportunity_export_workbook(opportunities):
-    _ensure_openpyxl()
-    workbook = Workbook()
-    data_sheet = workbook.active
-    data_sheet.title = SALES_OPPORTUNITY_TEMPLATE_SHEET_NAME
-    data_sheet.append(SALES_OPPORTUNITY_UPLOAD_HEADERS)
-
-    for opportunity in opportunities:
-        data_sheet.append(_sales_opportunity_upload_row(opportunity))
-
-    for idx, header in enumerate(SALES_OPPORTUNITY_UPLOAD_HEADERS, start=1):
-        cell = data_sheet.cell(row=1, column=idx)
-        cell.font = Font(bold=True)
-        cell.alignment = Alignment(wrap_text=True)
-        column_letter = data_sheet.cell(row=1, column=idx).column_letter
-        data_sheet.column_dimensions[column_letter].width = max(18, len(header) + 2)
-
-    return workbook
-
-
 def _customer_query_for_export(search_query):
     query = Customer.query
     if search_query:
         like = f"%{search_query.lower()}%"
         query = query.filter(
             or_(
-                func.lower(Customer.customer_code).like(like),
-                func.lower(Customer.company_name).like(like),
+                ci_key(Customer.customer_code).like(like),
+                ci_key(Customer.company_name).like(like),
                 func.lower(Customer.contact_person).like(like),
                 func.lower(Customer.city).like(like),
                 func.lower(Customer.state).like(like),
@@ -1914,7 +2320,7 @@ def _customer_query_for_export(search_query):
                 func.lower(Customer.notes).like(like),
             )
         )
-    return query.order_by(func.lower(Customer.company_name))
+    return query.order_by(ci_key(Customer.company_name))
 
 
 def build_amc_lift_upload_workbook():
@@ -2740,20 +3146,31 @@ def get_dropdown_choices(field_key):
     definition = DROPDOWN_FIELD_DEFINITIONS.get(field_key)
     if not definition:
         return []
-    options = (
-        DropdownOption.query.filter_by(field_key=field_key)
-        .order_by(DropdownOption.order_index.asc(), DropdownOption.id.asc())
-        .all()
-    )
+    options = _cached_dropdown_choices().get(field_key)
     if not options:
         return [option.copy() for option in definition.get("default_options", [])]
-    return [option.as_choice() for option in options]
+    return options
+
+
+def _load_dropdown_choices():
+    grouped = {}
+    for option in DropdownOption.query.order_by(
+        DropdownOption.field_key, DropdownOption.order_index.asc(), DropdownOption.id.asc()
+    ):
+        grouped.setdefault(option.field_key, []).append(option.as_choice())
+    return grouped
+
+
+def _cached_dropdown_choices():
+    return reference_cache.get("dropdown_choices", ("dropdown_option",), _load_dropdown_choices)
 
 
 def get_dropdown_options_map():
+    grouped = _cached_dropdown_choices()
     return {
-        field_key: get_dropdown_choices(field_key)
-        for field_key in DROPDOWN_FIELD_DEFINITIONS.keys()
+        field_key: grouped.get(field_key)
+        or [option.copy() for option in definition.get("default_options", [])]
+        for field_key, definition in DROPDOWN_FIELD_DEFINITIONS.items()
     }
 
 
@@ -3073,13 +3490,20 @@ def _render_contract_html(template_html, mapping):
 
 
 def get_service_dropdown_options(category, active_only=True):
-    query = ServiceDropdownOption.query.filter_by(category=category)
-    if active_only:
-        query = query.filter_by(is_active=True)
-    return query.order_by(
-        ServiceDropdownOption.sort_order.asc(),
-        func.lower(ServiceDropdownOption.value).asc(),
-    ).all()
+    """Options of ``category`` as cached ``ReferenceRow`` snapshots."""
+    options = reference_cache.get(
+        "service_dropdown_options",
+        ("service_dropdown_option",),
+        lambda: snapshot(ServiceDropdownOption.query.all()),
+    )
+    return sorted(
+        (
+            option
+            for option in options
+            if option.category == category and (option.is_active or not active_only)
+        ),
+        key=lambda option: (option.sort_order or 0, (option.value or "").lower()),
+    )
 
 
 def _next_service_dropdown_sort_order(category):
@@ -3660,49 +4084,98 @@ CUSTOMER_SUPPORT_DEFAULT_TEAM = {
     "Customer Care Desk",
 }
 
-CUSTOMER_SUPPORT_TICKETS = []
+CUSTOMER_SUPPORT_CLOSED_STATUSES = ("Resolved", "Closed")
+CUSTOMER_SUPPORT_OTHER_DEPARTMENT_KEYS = ("other-dept", "other department")
 
-CUSTOMER_SUPPORT_CALL_LOGS = []
 
+def _support_ticket_excludes_other_department():
+    return or_(
+        SupportTicket.category_key.is_(None),
+        SupportTicket.category_key.notin_(CUSTOMER_SUPPORT_OTHER_DEPARTMENT_KEYS),
+    )
 
-def _load_customer_support_state():
-    if not os.path.exists(CUSTOMER_SUPPORT_DATA_PATH):
-        return
 
-    try:
-        with open(CUSTOMER_SUPPORT_DATA_PATH, "r", encoding="utf-8") as fp:
-            payload = json.load(fp)
-    except (OSError, json.JSONDecodeError):
-        app.logger.warning("Could not load customer support state; starting fresh.")
-        return
+def _customer_support_ticket_query(*, include_other_department=True, open_only=False):
+    query = SupportTicket.query.options(
+        selectinload(SupportTicket.comments),
+        selectinload(SupportTicket.linked_tasks),
+    )
+    if not include_other_department:
+        query = query.filter(_support_ticket_excludes_other_department())
+    if open_only:
+        query = query.filter(SupportTicket.status.notin_(CUSTOMER_SUPPORT_CLOSED_STATUSES))
+    return query
 
-    tickets = payload.get("tickets")
-    if isinstance(tickets, list):
-        CUSTOMER_SUPPORT_TICKETS[:] = [
-            _decode_special_types(ticket) for ticket in tickets if isinstance(ticket, dict)
-        ]
 
-    call_logs = payload.get("call_logs")
-    if isinstance(call_logs, list):
-        CUSTOMER_SUPPORT_CALL_LOGS[:] = [
-            _decode_special_types(call) for call in call_logs if isinstance(call, dict)
-        ]
+def _customer_support_tickets(*, include_other_department=True, open_only=False):
+    """Return tickets as plain dicts; mutate and pass to ``_save_customer_support_ticket``."""
+    query = _customer_support_ticket_query(
+        include_other_department=include_other_department, open_only=open_only
+    )
+    return [row.to_dict() for row in query.order_by(SupportTicket.id.asc()).all()]
 
 
-def _save_customer_support_state():
-    os.makedirs(os.path.dirname(CUSTOMER_SUPPORT_DATA_PATH), exist_ok=True)
-    payload = {
-        "tickets": [_encode_special_types(ticket) for ticket in CUSTOMER_SUPPORT_TICKETS],
-        "call_logs": [_encode_special_types(call) for call in CUSTOMER_SUPPORT_CALL_LOGS],
-    }
+def _save_customer_support_ticket(ticket, *, commit=True):
+    """Insert or update a single ticket dict (and its timeline/linked tasks)."""
+    ticket_id = (ticket or {}).get("id")
+    if not ticket_id:
+        return None
+    row = SupportTicket.query.filter_by(ticket_id=ticket_id).first()
+    if row is None:
+        row = SupportTicket()
+        db.session.add(row)
+    row.apply_dict(ticket)
+    if commit:
+        db.session.commit()
+    return row
+
+
+def _delete_customer_support_ticket(ticket_id):
+    row = SupportTicket.query.filter_by(ticket_id=ticket_id).first()
+    if row is None:
+        return False
+    db.session.delete(row)
+    db.session.commit()
+    return True
+
+
+def import_customer_support_json(path=None):
+    """One-shot import of the legacy ``customer_support_data.json`` file.
+
+    Tickets and call logs are upserted by their ids, so re-running the import
+    is harmless. Returns ``(tickets, call_logs)`` counts.
+    """
+    path = path or CUSTOMER_SUPPORT_DATA_PATH
+    if not os.path.exists(path):
+        return 0, 0
+
     try:
-        with open(CUSTOMER_SUPPORT_DATA_PATH, "w", encoding="utf-8") as fp:
-            json.dump(payload, fp, ensure_ascii=False, indent=2)
-    except OSError as exc:
-        app.logger.error("Failed to save customer support state: %s", exc)
+        with open(path, "r", encoding="utf-8") as fp:
+            payload = json.load(fp)
+    except (OSError, json.JSONDecodeError):
+        app.logger.warning("Could not read customer support data from %s.", path)
+        return 0, 0
 
+    imported_tickets = 0
+    for ticket in payload.get("tickets") or []:
+        if not isinstance(ticket, dict) or not ticket.get("id"):
+            continue
+        _save_customer_support_ticket(_decode_special_types(ticket), commit=False)
+        imported_tickets += 1
+
+    imported_calls = 0
+    for call in payload.get("call_logs") or []:
+        if not isinstance(call, dict):
+            continue
+        call = _decode_special_types(call)
+        call_id = call.get("call_id") or call.get("ticket_id")
+        if not call_id or SupportCallLog.query.filter_by(call_id=call_id).first():
+            continue
+        db.session.add(SupportCallLog.from_dict(call))
+        imported_calls += 1
 
-_load_customer_support_state()
+    db.session.commit()
+    return imported_tickets, imported_calls
 
 
 def _srt_task_db_id(task_id):
@@ -3817,7 +4290,12 @@ def _get_customer_support_ticket(ticket_id):
     if not ticket_id:
         return None
 
-    return next((ticket for ticket in CUSTOMER_SUPPORT_TICKETS if ticket["id"] == ticket_id), None)
+    row = (
+        _customer_support_ticket_query()
+        .filter(SupportTicket.ticket_id == ticket_id)
+        .first()
+    )
+    return row.to_dict() if row else None
 
 
 def _get_linked_ticket_for_opportunity(opportunity_id: int):
@@ -3826,15 +4304,17 @@ def _get_linked_ticket_for_opportunity(opportunity_id: int):
     """
     if not opportunity_id:
         return None
-    for ticket in CUSTOMER_SUPPORT_TICKETS:
-        linked = ticket.get("linked_sales_opportunity") or {}
-        try:
-            linked_id = int(linked.get("id"))
-        except (TypeError, ValueError):
-            continue
-        if linked_id == int(opportunity_id):
-            return ticket
-    return None
+    try:
+        opportunity_id = int(opportunity_id)
+    except (TypeError, ValueError):
+        return None
+    row = (
+        _customer_support_ticket_query()
+        .filter(SupportTicket.linked_sales_opportunity_id == opportunity_id)
+        .order_by(SupportTicket.id.asc())
+        .first()
+    )
+    return row.to_dict() if row else None
 
 
 def _ticket_has_open_linked_tasks(ticket):
@@ -3955,7 +4435,7 @@ def _format_customer_support_amc_site_from_lift(lift):
 def _customer_support_amc_site_options():
     lifts = (
         Lift.query.options(joinedload(Lift.customer))
-        .order_by(func.lower(Lift.lift_code))
+        .order_by(ci_key(Lift.lift_code))
         .all()
     )
 
@@ -3991,22 +4471,19 @@ def _resolve_customer_support_amc_site(site_id):
 
 
 def _generate_customer_support_ticket_id():
-    existing_numbers = []
-    for ticket in CUSTOMER_SUPPORT_TICKETS:
-        match = re.match(r"CS-(\d+)$", str(ticket.get("id") or ""))
-        if match:
-            try:
-                existing_numbers.append(int(match.group(1)))
-            except ValueError:
-                continue
-
-    next_number = (max(existing_numbers) + 1) if existing_numbers else 1001
-    while any(ticket.get("id") == f"CS-{next_number}" for ticket in CUSTOMER_SUPPORT_TICKETS):
+    highest = db.session.query(func.max(SupportTicket.ticket_number)).scalar()
+    next_number = (highest + 1) if highest else 1001
+    while (
+        db.session.query(SupportTicket.id)
+        .filter(SupportTicket.ticket_id == f"CS-{next_number}")
+        .first()
+        is not None
+    ):
         next_number += 1
     return f"CS-{next_number}"
 
 
-def _customer_support_summary():
+def _customer_support_summary(recent_limit=None):
     summary = {
         "Open": 0,
         "In Progress": 0,
@@ -4014,19 +4491,26 @@ def _customer_support_summary():
         "Closed": 0,
     }
 
-    for ticket in _filter_other_department_records(CUSTOMER_SUPPORT_TICKETS):
-        summary.setdefault(ticket["status"], 0)
-        summary[ticket["status"]] += 1
+    status_counts = (
+        db.session.query(SupportTicket.status, func.count(SupportTicket.id))
+        .filter(_support_ticket_excludes_other_department())
+        .group_by(SupportTicket.status)
+        .all()
+    )
+    for status_value, count in status_counts:
+        summary[status_value] = summary.get(status_value, 0) + count
 
     total = sum(summary.values())
+    recent_query = _customer_support_ticket_query().order_by(
+        func.coalesce(SupportTicket.updated_at, SupportTicket.created_at).desc()
+    )
+    if recent_limit:
+        recent_query = recent_query.limit(recent_limit)
+    recent_rows = recent_query.all()
     return {
         "counts": summary,
         "total": total,
-        "recent": sorted(
-            CUSTOMER_SUPPORT_TICKETS,
-            key=lambda item: item.get("updated_at") or item.get("created_at"),
-            reverse=True,
-        ),
+        "recent": [row.to_dict() for row in recent_rows],
     }
 
 
@@ -4054,14 +4538,12 @@ def _customer_support_team_members():
     for user in get_assignable_users_for_module("customer_support"):
         if user.is_active:
             members.add(user.display_name)
-    for ticket in CUSTOMER_SUPPORT_TICKETS:
-        assignee = ticket.get("assignee")
+    for (assignee,) in db.session.query(SupportTicket.assignee).distinct():
         if assignee:
             members.add(assignee)
-        for event in ticket.get("timeline", []):
-            actor = event.get("actor")
-            if actor:
-                members.add(actor)
+    for (actor,) in db.session.query(SupportTicketComment.actor).distinct():
+        if actor:
+            members.add(actor)
     if current_user.is_authenticated:
         members.add(current_user.display_name)
     members.add("Unassigned")
@@ -4098,7 +4580,7 @@ def _resolve_ticket_assignee_user(ticket, module_key="customer_support"):
             ticket["assignee"] = user.display_name
             return user
 
-    user = User.query.filter(func.lower(User.username) == lowered_name).first()
+    user = User.query.filter(ci_key(User.username) == lowered_name).first()
     if user and user.is_active:
         if not module_key or user.can_be_assigned_module(module_key):
             ticket["assignee_user_id"] = user.id
@@ -4138,7 +4620,7 @@ def _resolve_ticket_owner_user(ticket, module_key="customer_support"):
             ticket["owner"] = user.display_name
             return user
 
-    user = User.query.filter(func.lower(User.username) == lowered_name).first()
+    user = User.query.filter(ci_key(User.username) == lowered_name).first()
     if user and user.is_active:
         if not module_key or user.can_be_assigned_module(module_key):
             ticket["owner_user_id"] = user.id
@@ -4196,10 +4678,7 @@ def _service_complaint_tasks_from_support():
     service_user_ids = {user.id for user in service_users if user.is_active}
 
     complaint_tasks = []
-    for ticket in _filter_other_department_records(CUSTOMER_SUPPORT_TICKETS):
-        status_value = (ticket.get("status") or "").strip().lower()
-        if status_value in {"resolved", "closed"}:
-            continue
+    for ticket in _customer_support_tickets(include_other_department=False, open_only=True):
 
         assigned_user = _resolve_ticket_assignee_user(ticket)
         owner_user = _resolve_ticket_owner_user(ticket)
@@ -4397,47 +4876,102 @@ def _derive_customer_support_call_from_sarv_log(call):
     }
 
 
-def _customer_support_call_records():
+def _customer_support_call_records(category=None, status=None, search=None):
+    """Combine logged calls, SARV calls and ticket-derived calls.
+
+    The optional filters narrow each query where they map onto columns, so
+    only candidate rows are loaded; ``_customer_support_filter_calls`` applies the exact matching.
+    """
     combined = []
     seen_ids = set()
-
-    for call in CUSTOMER_SUPPORT_CALL_LOGS:
-        if not isinstance(call, dict):
-            continue
-
-        call_id = call.get("call_id") or call.get("ticket_id")
-        if not call_id:
-            continue
-
-        if call_id in seen_ids:
+    category_key = (category or "").lower()
+    status_key = (status or "").lower()
+    search_pattern = f"%{search.lower()}%" if search else None
+
+    call_query = SupportCallLog.query
+    if category_key:
+        call_query = call_query.filter(func.lower(SupportCallLog.category) == category_key)
+    if status_key:
+        call_query = call_query.filter(func.lower(SupportCallLog.status) == status_key)
+    if search_pattern:
+        call_query = call_query.filter(
+            or_(
+                func.lower(SupportCallLog.subject).like(search_pattern),
+                func.lower(SupportCallLog.caller).like(search_pattern),
+                func.lower(SupportCallLog.ticket_id).like(search_pattern),
+            )
+        )
+    for call in call_query.order_by(SupportCallLog.logged_at.desc()).all():
+        call_entry = call.to_dict()
+        call_id = call_entry.get("call_id") or call_entry.get("ticket_id")
+        if not call_id or call_id in seen_ids:
             continue
 
         seen_ids.add(call_id)
-        combined.append(call)
+        combined.append(call_entry)
 
-    try:
-        sarv_calls = (
-            CallLog.query
-            .order_by(
-                CallLog.ivr_start_time.desc().nullslast(),
-                CallLog.created_at.desc(),
+    if not category_key or category_key == "sarv":
+        sarv_query = CallLog.query
+        if status_key == "logged":
+            sarv_query = sarv_query.filter(
+                or_(
+                    CallLog.call_status.is_(None),
+                    CallLog.call_status == "",
+                    func.lower(CallLog.call_status) == status_key,
+                )
             )
-            .limit(250)
-            .all()
-        )
-    except (NameError, SQLAlchemyError):
-        sarv_calls = []
+        elif status_key:
+            sarv_query = sarv_query.filter(func.lower(CallLog.call_status) == status_key)
+        try:
+            sarv_calls = (
+                sarv_query
+                .order_by(
+                    CallLog.ivr_start_time.desc().nullslast(),
+                    CallLog.created_at.desc(),
+                )
+                .limit(250)
+                .all()
+            )
+        except (NameError, SQLAlchemyError):
+            sarv_calls = []
 
-    for call in sarv_calls:
-        call_entry = _derive_customer_support_call_from_sarv_log(call)
-        if not call_entry or call_entry.get("call_id") in seen_ids:
-            continue
+        for call in sarv_calls:
+            call_entry = _derive_customer_support_call_from_sarv_log(call)
+            if not call_entry or call_entry.get("call_id") in seen_ids:
+                continue
 
-        seen_ids.add(call_entry.get("call_id"))
-        combined.append(call_entry)
+            seen_ids.add(call_entry.get("call_id"))
+            combined.append(call_entry)
 
-    for ticket in CUSTOMER_SUPPORT_TICKETS:
-        call_entry = _derive_customer_support_call_from_ticket(ticket)
+    ticket_query = _customer_support_ticket_query()
+    if category_key == "uncategorised":
+        ticket_query = ticket_query.filter(
+            or_(
+                SupportTicket.category.is_(None),
+                SupportTicket.category == "",
+                func.lower(SupportTicket.category) == category_key,
+            )
+        )
+    elif category_key:
+        ticket_query = ticket_query.filter(func.lower(SupportTicket.category) == category_key)
+    if status_key:
+        ticket_query = ticket_query.filter(func.lower(SupportTicket.status) == status_key)
+    # Tickets without a subject/contact fall back to placeholder labels, so a
+    # term matching those placeholders cannot be narrowed down in SQL.
+    search_hits_placeholder = bool(search) and any(
+        search.lower() in placeholder for placeholder in ("support ticket", "unknown caller")
+    )
+    if search_pattern and not search_hits_placeholder:
+        ticket_query = ticket_query.filter(
+            or_(
+                func.lower(SupportTicket.subject).like(search_pattern),
+                func.lower(SupportTicket.contact_name).like(search_pattern),
+                func.lower(SupportTicket.customer).like(search_pattern),
+                func.lower(SupportTicket.ticket_id).like(search_pattern),
+            )
+        )
+    for row in ticket_query.order_by(SupportTicket.created_at.desc()).all():
+        call_entry = _derive_customer_support_call_from_ticket(row.to_dict())
         if not call_entry or call_entry.get("call_id") in seen_ids:
             continue
 
@@ -4448,7 +4982,9 @@ def _customer_support_call_records():
 
 
 def _customer_support_filter_calls(category=None, status=None, search=None):
-    records = _customer_support_call_records()
+    records = _customer_support_call_records(
+        category=category, status=status, search=search
+    )
 
     if category:
         category = category.lower()
@@ -5088,15 +5624,12 @@ def _handle_customer_support_ticket_creation():
     if created_opportunity or comments_added:
         db.session.commit()
 
-    CUSTOMER_SUPPORT_TICKETS.append(ticket_record)
     try:
         _create_service_visit_from_support_ticket(ticket_record)
     except Exception as exc:
         app.logger.exception("Error creating service visit from support ticket: %s", exc)
 
-    if any(isinstance(obj, Lift) for obj in db.session.dirty):
-        db.session.commit()
-    _save_customer_support_state()
+    _save_customer_support_ticket(ticket_record)
     if created_opportunity:
         flash("Sales enquiry created in the sales pipeline.", "success")
     flash(f"Ticket {ticket_id} created successfully.", "success")
@@ -6434,6 +6967,7 @@ def _handle_unauthorized_user():
     return redirect(url_for(login_manager.login_view, next=request.url))
 
 from integrations.sarv.routes import sarv_bp
+from integrations.sarv.utils import download_call_recording
 
 app.register_blueprint(sarv_bp)
 
@@ -6653,9 +7187,14 @@ def build_lift_payload(lift):
         route_value = lift.route.strip()
         route_record = None
         if route_value:
-            route_record = ServiceRoute.query.filter(
-                func.lower(ServiceRoute.state) == route_value.lower()
-            ).first()
+            route_record = next(
+                (
+                    route
+                    for route in _get_service_routes()
+                    if (route.state or "").lower() == route_value.lower()
+                ),
+                None,
+            )
         if route_record:
             route_display = route_record.display_name
         elif route_value:
@@ -7639,6 +8178,10 @@ from eleva_app.models import (
     InventoryItem,
     InventoryStock,
     StockAdjustment,
+    InventoryLedgerEntry,
+    BackgroundJob,
+    ReferenceDataVersion,
+    PushEvent,
     InventoryReceipt,
     InventoryReceiptItem,
     SalesActivity,
@@ -7662,6 +8205,11 @@ from eleva_app.models import (
     ServiceContractTemplate,
     ServiceRoute,
     ServiceTask,
+    ServiceVisit,
+    SupportCallLog,
+    SupportTicket,
+    SupportTicketComment,
+    SupportTicketLinkedTask,
     DeliveryOrder,
     DeliveryOrderItem,
     Product,
@@ -7677,6 +8225,7 @@ from eleva_app.models import (
     PurchaseOrder,
     PurchaseOrderStatusHistory,
     PurchaseOrderItem,
+    SchemaMigration,
     Submission,
     ClientRequirementForm,
     TaskTemplate,
@@ -7692,19 +8241,66 @@ from eleva_app.uploads import (
     _clear_pending_upload,
     _extract_tabular_upload,
     _extract_tabular_upload_from_path,
-    _execute_with_timeout,
+    UploadPlan,
+    apply_upload_plan,
     cleanup_old_pending_uploads,
+    discard_upload_plan,
+    load_upload_plan,
     process_customer_upload_file,
     process_lift_upload_file,
     save_pending_upload_file,
     UploadStageTimeoutError,
 )
+from eleva_app.bulk_upsert import BulkUpserter
+from eleva_app.exports import export_response, iter_export_rows
+from eleva_app.pagination import DEFAULT_PER_PAGE, keyset_paginate
+from eleva_app.jobs import (
+    JOB_HANDLERS,
+    JobFailed,
+    enqueue_job,
+    job_handler,
+    run_worker,
+)
+from eleva_app.indexing import (
+    advise_indexes,
+    ci_key,
+    default_advisor_paths,
+    ensure_case_insensitive_keys,
+    install_key_listeners,
+)
+from eleva_app.push import (
+    BOARD_CHANNELS,
+    PUSH_POLL_SECONDS,
+    event_stream,
+    events_after,
+    install_push_listeners,
+    latest_event_id,
+    publish_from_flush,
+    user_channel,
+)
+from eleva_app.refcache import MISSING, ReferenceRow, reference_cache, seed_reference_versions, snapshot
+from eleva_app.search import (
+    SEARCH_SOURCES,
+    create_search_index,
+    global_search,
+    install_search_listeners,
+    rebuild_search_index,
+)
+from eleva_app.synthetic import (
+    SYNTHETIC_PREFIX,
+    purge_synthetic_data,
+    seed_synthetic_data,
+)
 from eleva_app.drawing_history_import import (
     DrawingHistoryUploadResult,
     REQUIRED_HEADERS as DRAWING_REQUIRED_HEADERS,
     process_drawing_history_upload,
 )
 
+install_key_listeners()
+install_search_listeners()
+reference_cache.install()
+install_push_listeners()
 
 
 BOM_TYPE_LABELS = {
@@ -7993,14 +8589,21 @@ def _current_section_guide():
     if not section_key:
         return None
     try:
-        return SectionGuide.query.filter_by(
-            section_key=section_key,
-            is_active=True,
-        ).first()
+        return reference_cache.get(
+            ("section_guide", section_key),
+            ("section_guide",),
+            lambda: _load_section_guide(section_key),
+            ttl=_layout_cache_ttl(),
+        )
     except Exception:
         return None
 
 
+def _load_section_guide(section_key):
+    guides = snapshot(SectionGuide.query.filter_by(section_key=section_key, is_active=True).limit(1))
+    return guides[0] if guides else None
+
+
 def _normalize_bom_type(value, *, default=BOM_TYPE_MAIN):
     candidate = clean_str(value).lower()
     if candidate in BOM_TYPE_CHOICES:
@@ -8200,13 +8803,6 @@ def inject_workspace_modules():
     }
 
 
-@app.context_processor
-def inject_section_guide_helpers():
-    return {
-        "current_section_guide": _current_section_guide,
-    }
-
-
 @app.context_processor
 def eleva_permissions_context():
     if not current_user or not getattr(current_user, "is_authenticated", False):
@@ -8237,39 +8833,93 @@ def inject_service_form_options():
     }
 
 
-@app.context_processor
-def inject_switchable_users():
-    users = []
-    if current_user.is_authenticated:
-        try:
-            users = (
-                User.query.order_by(
-                    User.first_name.asc(),
-                    User.last_name.asc(),
-                    User.username.asc(),
-                ).all()
-            )
-        except Exception:
-            users = []
-    return {"switchable_users": users}
+def _layout_cache_ttl():
+    return app.config.get("LAYOUT_CACHE_TTL_SECONDS", 30)
 
 
-@app.context_processor
-def inject_notifications():
-    if not current_user or not getattr(current_user, "is_authenticated", False):
-        return {}
+def _load_switchable_users():
+    users = User.query.order_by(
+        User.first_name.asc(),
+        User.last_name.asc(),
+        User.username.asc(),
+    ).all()
+    return [ReferenceRow(id=user.id, display_name=user.display_name, role=user.role) for user in users]
+
+
+def _load_notification_summary(user_id):
     notifications = (
-        Notification.query.filter_by(user_id=current_user.id)
+        Notification.query.filter_by(user_id=user_id)
         .order_by(Notification.created_at.desc())
         .limit(10)
         .all()
     )
-    unread_count = (
-        Notification.query.filter_by(user_id=current_user.id, is_read=False).count()
-    )
+    unread_count = Notification.query.filter_by(user_id=user_id, is_read=False).count()
     return {
-        "recent_notifications": notifications,
-        "unread_notification_count": unread_count,
+        "recent": snapshot(notifications, properties=("created_display",)),
+        "unread": unread_count,
+    }
+
+
+class LayoutContext:
+    """Header data for ``base.html``, built lazily once per request.
+
+    Every piece comes from ``reference_cache`` (invalidated by writes to the
+    user, notification and section guide tables, plus a short TTL), so a
+    full page pays one version read and HTMX partials that never render the
+    header pay nothing.
+    """
+
+    def __init__(self, user_id):
+        self.user_id = user_id
+
+    @functools.cached_property
+    def switchable_users(self):
+        if self.user_id is None:
+            return []
+        try:
+            return reference_cache.get(
+                "switchable_users", ("user",), _load_switchable_users, ttl=_layout_cache_ttl()
+            )
+        except Exception:
+            return []
+
+    @functools.cached_property
+    def _notification_summary(self):
+        if self.user_id is None:
+            return {"recent": [], "unread": 0}
+        return reference_cache.get(
+            ("notifications", self.user_id),
+            ("notification",),
+            lambda: _load_notification_summary(self.user_id),
+            ttl=_layout_cache_ttl(),
+        )
+
+    @property
+    def recent_notifications(self):
+        return self._notification_summary["recent"]
+
+    @property
+    def unread_notification_count(self):
+        return self._notification_summary["unread"]
+
+    @functools.cached_property
+    def section_guide(self):
+        return _current_section_guide()
+
+
+def _layout_context():
+    layout = g.get("_layout_context")
+    if layout is None:
+        user_id = current_user.id if getattr(current_user, "is_authenticated", False) else None
+        layout = g._layout_context = LayoutContext(user_id)
+    return layout
+
+
+@app.context_processor
+def inject_layout_context():
+    return {
+        "layout": _layout_context(),
+        "push_poll_seconds": app.config.get("PUSH_POLL_SECONDS", PUSH_POLL_SECONDS),
     }
 
 
@@ -8455,11 +9105,9 @@ def _mark_design_task_inputs_received(task, *, had_drawings: bool) -> bool:
     return True
 
 
-def _get_design_board_payload():
-    statuses = _design_status_map()
-    tasks_by_status = {}
-    ordered_tasks = []
-    active_task_query = _design_default_filters(
+def _design_board_query():
+    """Open design tasks the current user may see (finalized design tasks drop off)."""
+    return _design_default_filters(
         DesignTask.query.filter(
             or_(
                 func.lower(func.trim(DesignTask.task_type)) != "design",
@@ -8467,14 +9115,48 @@ def _get_design_board_payload():
             )
         )
     )
-    for key in statuses:
-        tasks_by_status[key] = (
-            active_task_query
-            .filter(DesignTask.status == key)
-            .order_by(DesignTask.due_date.nullsfirst())
-            .all()
+
+
+def _design_board_scope():
+    """Cache key part for the tasks ``_design_default_filters`` lets this user see."""
+    if current_user.is_admin or "design" not in (current_user.role or "").lower():
+        return "all"
+    return f"user:{current_user.id}"
+
+
+def _load_design_board_tasks():
+    tasks = (
+        _design_board_query()
+        .options(joinedload(DesignTask.assigned_to), joinedload(DesignTask.project))
+        .order_by(DesignTask.due_date.nullsfirst(), DesignTask.id)
+        .all()
+    )
+    rows = snapshot(tasks, properties=("project_label",))
+    for row, task in zip(rows, tasks):
+        assignee = task.assigned_to
+        row.assigned_to = (
+            ReferenceRow(id=assignee.id, display_name=assignee.display_name) if assignee else None
         )
-        ordered_tasks.extend(tasks_by_status[key])
+    return rows
+
+
+def _design_board_tasks():
+    """Open design tasks for the board, loaded in one query and cached until a task changes."""
+    return reference_cache.get(
+        ("design_board", _design_board_scope()),
+        ("design_task", "project", "user"),
+        _load_design_board_tasks,
+    )
+
+
+def _get_design_board_payload():
+    statuses = _design_status_map()
+    tasks_by_status = {key: [] for key in statuses}
+    for task in _design_board_tasks():
+        bucket = tasks_by_status.get(task.status)
+        if bucket is not None:
+            bucket.append(task)
+    ordered_tasks = [task for key in statuses for task in tasks_by_status[key]]
     return statuses, tasks_by_status, ordered_tasks
 
 
@@ -8482,15 +9164,7 @@ def _get_design_board_payload():
 @login_required
 def design_overview():
     ensure_bootstrap()
-    base_query = _design_default_filters(
-        DesignTask.query.filter(
-            or_(
-                func.lower(func.trim(DesignTask.task_type)) != "design",
-                func.lower(func.trim(DesignTask.status)) != "finalized",
-            )
-        )
-    )
-    active_tasks = base_query.all()
+    active_tasks = _design_board_tasks()
     status_counts = {
         "pending_inputs": sum(1 for task in active_tasks if task.status in ["Drawing pending", "SRT input", "Sales input"]),
         "pending_drawings": sum(1 for task in active_tasks if task.status == "BOM pending"),
@@ -8512,19 +9186,90 @@ def design_metrics_legacy_redirect():
     return redirect(url_for("design_overview"), code=302)
 
 
+def _touch_bom_template(connection, template_id_clause, params):
+    connection.execute(
+        text(
+            "UPDATE bom_template SET updated_at = :now "
+            f"WHERE id IN ({template_id_clause})"
+        ),
+        {"now": datetime.datetime.utcnow(), **params},
+    )
+
+
+def _touch_bom_template_from_child(mapper, connection, target):
+    # Any edit below a template invalidates its cached evaluation plan
+    # (keyed by template id + updated_at, see _bom_template_plan).
+    if isinstance(target, (BomTemplateInput, BomTemplateStage)):
+        _touch_bom_template(connection, ":template_id", {"template_id": target.template_id})
+    elif isinstance(target, BomTemplateSection):
+        _touch_bom_template(
+            connection,
+            "SELECT template_id FROM bom_template_stage WHERE id = :stage_id",
+            {"stage_id": target.stage_id},
+        )
+    elif isinstance(target, BomTemplateLine):
+        _touch_bom_template(
+            connection,
+            "SELECT stage.template_id FROM bom_template_stage AS stage "
+            "JOIN bom_template_section AS section ON section.stage_id = stage.id "
+            "WHERE section.id = :section_id",
+            {"section_id": target.section_id},
+        )
+
+
+for _bom_child_model in (
+    BomTemplateInput,
+    BomTemplateStage,
+    BomTemplateSection,
+    BomTemplateLine,
+):
+    for _bom_child_event in ("after_insert", "after_update", "after_delete"):
+        event.listen(_bom_child_model, _bom_child_event, _touch_bom_template_from_child)
+
+
+@event.listens_for(PartClass, "after_update")
+def _touch_bom_templates_of_part_class(mapper, connection, target):
+    # Cached plans show the part class name for lines without a specification.
+    if not inspect(target).attrs.name.history.has_changes():
+        return
+    _touch_bom_template(
+        connection,
+        "SELECT stage.template_id FROM bom_template_stage AS stage "
+        "JOIN bom_template_section AS section ON section.stage_id = stage.id "
+        "JOIN bom_template_line AS line ON line.section_id = section.id "
+        "WHERE line.part_class_id = :part_class_id",
+        {"part_class_id": target.id},
+    )
+
+
+def _announce_flush_notifications(connection, target, payload):
+    """Publish notifications a mapper listener inserted directly on ``connection``."""
+    session = object_session(target)
+    if session is not None:
+        reference_cache.touch(session, {"notification"})
+    for row in payload:
+        publish_from_flush(
+            connection,
+            target,
+            user_channel(row["user_id"]),
+            "notification",
+            {"message": row["message"], "link_url": row["link_url"]},
+        )
+
+
 @event.listens_for(DesignTask, "after_insert")
 def _notify_design_task_assignee(mapper, connection, target):
     if not target.assigned_to_user_id:
         return
-    connection.execute(
-        Notification.__table__.insert().values(
-            user_id=target.assigned_to_user_id,
-            message=f"You have been assigned a new design task: {target.description or target.project_label}",
-            link_url=f"/design/tasks/{target.id}",
-            created_at=datetime.datetime.utcnow(),
-            is_read=False,
-        )
-    )
+    row = {
+        "user_id": target.assigned_to_user_id,
+        "message": f"You have been assigned a new design task: {target.description or target.project_label}",
+        "link_url": f"/design/tasks/{target.id}",
+        "created_at": datetime.datetime.utcnow(),
+        "is_read": False,
+    }
+    connection.execute(Notification.__table__.insert().values(**row))
+    _announce_flush_notifications(connection, target, [row])
 
 
 @event.listens_for(DesignTask, "after_update")
@@ -8562,6 +9307,25 @@ def _notify_design_task_reassignment(mapper, connection, target):
 
     if payload:
         connection.execute(Notification.__table__.insert(), payload)
+        _announce_flush_notifications(connection, target, payload)
+
+
+def _publish_board_card(board, card_id):
+    """Mapper listener publishing ``card`` events so open boards patch that card."""
+
+    def listener(mapper, connection, target):
+        publish_from_flush(connection, target, f"board:{board}", "card", {"board": board, "id": card_id(target)})
+
+    return listener
+
+
+for _board_model, _board_name, _card_id in (
+    (DesignTask, "design", lambda task: task.id),
+    (SRTTask, "srt", lambda task: f"SRT-{task.id}"),
+    (QCWork, "qc", lambda work: work.id),
+):
+    for _board_event in ("after_insert", "after_update", "after_delete"):
+        event.listen(_board_model, _board_event, _publish_board_card(_board_name, _card_id))
 
 
 @app.route("/design/tasks", methods=["GET", "POST"])
@@ -8616,27 +9380,47 @@ def design_tasks():
 
     projects = Project.query.order_by(Project.name).all()
     users = User.query.order_by(User.first_name, User.username).all()
-    statuses, _, ordered_tasks = _get_design_board_payload()
-    status_options_by_type = {
-        "general": DESIGN_GENERAL_STATUS_OPTIONS,
-        "design": DESIGN_TASK_STATUS_OPTIONS,
-        "site_visit": DESIGN_SITE_VISIT_STATUS_OPTIONS,
-        "default": DESIGN_GENERAL_STATUS_OPTIONS,
-    }
-
-    can_move_cards = current_user.is_admin or "design" in (current_user.role or "").lower()
-
+    _, _, ordered_tasks = _get_design_board_payload()
     return render_template(
         "design_tasks.html",
         ordered_tasks=ordered_tasks,
-        statuses=statuses,
-        status_options_by_type=status_options_by_type,
         users=users,
         projects=projects,
-        can_move_cards=can_move_cards,
+        **_design_card_context(),
     )
 
 
+def _design_card_context():
+    return {
+        "statuses": _design_status_map(),
+        "status_options_by_type": {
+            "general": DESIGN_GENERAL_STATUS_OPTIONS,
+            "design": DESIGN_TASK_STATUS_OPTIONS,
+            "site_visit": DESIGN_SITE_VISIT_STATUS_OPTIONS,
+            "default": DESIGN_GENERAL_STATUS_OPTIONS,
+        },
+        "can_move_cards": current_user.is_admin or "design" in (current_user.role or "").lower(),
+    }
+
+
+@app.route("/design/board/card")
+@login_required
+def design_board_card():
+    """One design board card for push updates; empty once the task leaves the board."""
+    task_id = _parse_optional_int(request.args.get("id"))
+    task = None
+    if task_id is not None:
+        task = (
+            _design_board_query()
+            .options(joinedload(DesignTask.assigned_to), joinedload(DesignTask.project))
+            .filter(DesignTask.id == task_id, DesignTask.status.in_(list(_design_status_map())))
+            .first()
+        )
+    if task is None:
+        return ""
+    return render_template("partials/design_task_card.html", task=task, **_design_card_context())
+
+
 def _extract_design_status_value():
     payload = request.get_json(silent=True) or {}
     status_value = payload.get("status")
@@ -9480,6 +10264,53 @@ def notifications_list():
     return render_template("notifications_list.html", notifications=notifications)
 
 
+@app.route("/notifications/menu")
+@login_required
+def notifications_menu():
+    """Header badge and list as out-of-band swaps, fetched after a push event."""
+    layout = _layout_context()
+    badge = get_template_attribute("partials/notification_menu.html", "notification_badge")
+    items = get_template_attribute("partials/notification_menu.html", "notification_list")
+    return f"{badge(layout, oob=True)}{items(layout, oob=True)}"
+
+
+def _push_channels():
+    """The caller's own channel plus the requested boards whose module they can view."""
+    channels = {user_channel(current_user.id)}
+    for channel in request.args.getlist("channel"):
+        module_key = BOARD_CHANNELS.get(channel)
+        if module_key and current_user.can_view_module(module_key):
+            channels.add(channel)
+    return channels
+
+
+@app.route("/events/stream")
+@login_required
+def push_event_stream():
+    channels = _push_channels()
+    last_id = _parse_optional_int(request.headers.get("Last-Event-ID") or request.args.get("after"))
+    if last_id is None:
+        last_id = latest_event_id()
+    db.session.remove()
+    return Response(
+        event_stream(current_app._get_current_object(), channels, last_id),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.route("/events/poll")
+@login_required
+def push_event_poll():
+    """Polling fallback: events after ``after`` (or just the current cursor)."""
+    channels = _push_channels()
+    after = _parse_optional_int(request.args.get("after"))
+    if after is None:
+        return jsonify({"events": [], "last_id": latest_event_id()})
+    events = events_after(after, channels)
+    return jsonify({"events": events, "last_id": events[-1]["id"] if events else after})
+
+
 @app.route("/notifications/mark-read", methods=["POST"])
 @login_required
 def mark_notifications_read():
@@ -10894,7 +11725,7 @@ def _resolve_primary_vendor_for_part(part, vendor_by_name):
     return vendor_by_name.get(vendor_name.casefold())
 
 
-def _resolve_bom_item_part(item, *, part_map=None):
+def _resolve_bom_item_part(item, *, part_map=None, class_part_map=None):
     if not item:
         return None, None, "no_part_resolved"
 
@@ -10904,7 +11735,10 @@ def _resolve_bom_item_part(item, *, part_map=None):
         resolved_part_id = int(item.part_class.primary_part_id)
         resolution_reason = "part_class_primary_part"
     if resolved_part_id is None and getattr(item, "part_class", None):
-        effective_part = _effective_primary_part_for_class(item.part_class)
+        if class_part_map is not None:
+            effective_part = class_part_map.get(item.part_class.id)
+        else:
+            effective_part = _effective_primary_part_for_class(item.part_class)
         if effective_part:
             return effective_part, effective_part.id, "part_class_effective_primary_part"
 
@@ -11006,7 +11840,7 @@ def _build_procurement_prefill_po_lines(project_id, vendor_id, bom_id):
 def _build_purchase_order_modal_context(*, selected_project_id=None, prefill_project_id=None, prefill_vendor_id=None, prefill_bom_id=None):
     purchase_settings = _load_purchase_settings()
     return {
-        "vendors": Vendor.query.order_by(Vendor.name).all(),
+        "vendors": _get_vendor_choices(),
         "projects": Project.query.order_by(Project.name).all(),
         "selected_project_id": selected_project_id,
         "bom_options": _build_purchase_bom_options(project_id=selected_project_id),
@@ -11019,61 +11853,124 @@ def _build_purchase_order_modal_context(*, selected_project_id=None, prefill_pro
     }
 
 
-def get_bom_procurement_plan(bom_id, package_id=None):
-    bom = BillOfMaterials.query.options(
-        joinedload(BillOfMaterials.project),
-        joinedload(BillOfMaterials.drawing_site).joinedload(DrawingSite.project),
-        joinedload(BillOfMaterials.packages),
-    ).get_or_404(bom_id)
-    resolved_project_id = _resolve_bom_project_id(bom)
-    packages_query = BOMPackage.query.filter(BOMPackage.bom_id == bom.id)
-    if package_id:
-        packages_query = packages_query.filter(BOMPackage.id == package_id)
-    packages = packages_query.order_by(BOMPackage.created_at.asc().nullslast(), BOMPackage.id.asc()).all()
-    package_ids = [pkg.id for pkg in packages]
+def _prefetch_bom_item_parts(bom_items):
+    """Load every part the BOM items may resolve to in two queries.
 
-    bom_items_query = BOMItem.query.options(
-        joinedload(BOMItem.part_class),
-    ).filter(BOMItem.bom_id == bom.id)
-    if package_ids:
-        bom_items_query = bom_items_query.filter(BOMItem.bom_package_id.in_(package_ids))
-    bom_items = bom_items_query.order_by(BOMItem.id.asc()).all()
+    Returns ``(part_map, class_part_map)`` for ``_resolve_bom_item_part``:
+    parts referenced by ``suggested_part_id``/``PartClass.primary_part_id``
+    and, for classes without a primary part, the latest mapped part.
+    """
+    part_ids = set()
+    fallback_class_ids = set()
+    for item in bom_items:
+        suggested_part_id = _parse_optional_int(getattr(item, "suggested_part_id", None))
+        if suggested_part_id is not None:
+            part_ids.add(suggested_part_id)
+        elif item.part_class and item.part_class.primary_part_id:
+            part_ids.add(int(item.part_class.primary_part_id))
+        elif item.part_class:
+            fallback_class_ids.add(item.part_class.id)
 
+    part_map = {}
+    if part_ids:
+        part_map = {
+            part.id: part
+            for part in Product.query.filter(Product.id.in_(sorted(part_ids))).all()
+        }
+    class_part_map = {}
+    if fallback_class_ids:
+        ranked = (
+            db.session.query(
+                Product.id.label("product_id"),
+                func.row_number()
+                .over(
+                    partition_by=Product.part_class_id,
+                    order_by=(Product.updated_at.desc(), Product.id.desc()),
+                )
+                .label("position"),
+            )
+            .filter(Product.part_class_id.in_(sorted(fallback_class_ids)))
+            .subquery()
+        )
+        latest_parts = (
+            Product.query.join(ranked, ranked.c.product_id == Product.id)
+            .filter(ranked.c.position == 1)
+            .all()
+        )
+        class_part_map = {part.part_class_id: part for part in latest_parts}
+    return part_map, class_part_map
+
+
+def _procurement_vendor_lookup():
+    return {
+        (vendor.name or "").strip().casefold(): vendor
+        for vendor in _get_vendor_choices()
+        if (vendor.name or "").strip()
+    }
+
+
+def _procurement_po_item_rows(project_id, part_ids):
+    if not (project_id and part_ids):
+        return []
+    part_ids = sorted(part_ids)
+    return (
+        db.session.query(PurchaseOrderItem, PurchaseOrder)
+        .join(PurchaseOrder, PurchaseOrder.id == PurchaseOrderItem.purchase_order_id)
+        .filter(PurchaseOrder.project_id == project_id)
+        .filter(or_(PurchaseOrderItem.part_id.in_(part_ids), PurchaseOrderItem.product_id.in_(part_ids)))
+        .all()
+    )
+
+
+def _sorted_bom_packages(packages):
+    return sorted(
+        packages,
+        key=lambda pkg: (pkg.created_at is None, pkg.created_at or datetime.datetime.min, pkg.id),
+    )
+
+
+def _build_bom_procurement_plan(
+    bom,
+    resolved_project_id,
+    packages,
+    bom_items,
+    *,
+    part_map,
+    class_part_map,
+    vendor_by_name,
+    po_item_rows,
+    project_pos,
+):
+    """Compute ordered/pending quantities for one BOM from preloaded rows.
+
+    ``po_item_rows`` and ``project_pos`` may cover the whole project; they
+    are narrowed to this BOM's parts and vendor groups here.
+    """
     line_resolved_parts = {}
     line_resolved_part_ids = {}
     line_resolution_reasons = {}
     resolved_part_ids = set()
     for item in bom_items:
-        part, resolved_part_id, resolution_reason = _resolve_bom_item_part(item)
+        part, resolved_part_id, resolution_reason = _resolve_bom_item_part(
+            item,
+            part_map=part_map,
+            class_part_map=class_part_map,
+        )
         line_resolved_parts[item.id] = part
         line_resolved_part_ids[item.id] = resolved_part_id
         line_resolution_reasons[item.id] = resolution_reason
         if resolved_part_id is not None:
             resolved_part_ids.add(resolved_part_id)
 
-    part_ids = sorted(resolved_part_ids)
-    part_map = {}
-    if part_ids:
-        part_map = {
-            part.id: part
-            for part in Product.query.filter(Product.id.in_(part_ids)).all()
-        }
-    vendor_by_name = {
-        (vendor.name or "").strip().casefold(): vendor
-        for vendor in Vendor.query.all()
-        if (vendor.name or "").strip()
-    }
-
     included_statuses = {"Draft", "Issued", "Closed"}
     po_items = []
-    if resolved_project_id and part_ids:
-        po_items = (
-            db.session.query(PurchaseOrderItem, PurchaseOrder)
-            .join(PurchaseOrder, PurchaseOrder.id == PurchaseOrderItem.purchase_order_id)
-            .filter(PurchaseOrder.project_id == resolved_project_id)
-            .filter(or_(PurchaseOrderItem.part_id.in_(part_ids), PurchaseOrderItem.product_id.in_(part_ids)))
-            .all()
-        )
+    if resolved_project_id and resolved_part_ids:
+        po_items = [
+            (po_item, po)
+            for po_item, po in po_item_rows
+            if po.project_id == resolved_project_id
+            and (po_item.part_id in resolved_part_ids or po_item.product_id in resolved_part_ids)
+        ]
 
     line_map = {item.id: item for item in bom_items}
     line_vendor_ids = {}
@@ -11244,12 +12141,9 @@ def get_bom_procurement_plan(bom_id, package_id=None):
             group["package_ids"].add(package.id)
 
     if vendor_groups and resolved_project_id:
-        po_rows = (
-            PurchaseOrder.query.filter(PurchaseOrder.project_id == resolved_project_id)
-            .filter(PurchaseOrder.vendor_id.in_(list(vendor_groups.keys())))
-            .all()
-        )
-        for po in po_rows:
+        for po in project_pos:
+            if po.project_id != resolved_project_id:
+                continue
             if _normalize_po_status(po.status) == "Cancelled":
                 continue
             if po.vendor_id in vendor_groups and (po.bom_id is None or po.bom_id == bom.id):
@@ -11292,10 +12186,72 @@ def get_bom_procurement_plan(bom_id, package_id=None):
     }
 
 
+def get_bom_procurement_plan(bom_id, package_id=None):
+    bom = BillOfMaterials.query.options(
+        joinedload(BillOfMaterials.project),
+        joinedload(BillOfMaterials.drawing_site).joinedload(DrawingSite.project),
+        joinedload(BillOfMaterials.packages),
+    ).get_or_404(bom_id)
+    resolved_project_id = _resolve_bom_project_id(bom)
+    packages_query = BOMPackage.query.filter(BOMPackage.bom_id == bom.id)
+    if package_id:
+        packages_query = packages_query.filter(BOMPackage.id == package_id)
+    packages = packages_query.order_by(BOMPackage.created_at.asc().nullslast(), BOMPackage.id.asc()).all()
+    package_ids = [pkg.id for pkg in packages]
+
+    bom_items_query = BOMItem.query.options(
+        joinedload(BOMItem.part_class),
+    ).filter(BOMItem.bom_id == bom.id)
+    if package_ids:
+        bom_items_query = bom_items_query.filter(BOMItem.bom_package_id.in_(package_ids))
+    bom_items = bom_items_query.order_by(BOMItem.id.asc()).all()
+
+    part_map, class_part_map = _prefetch_bom_item_parts(bom_items)
+    part_ids = set(part_map) | {part.id for part in class_part_map.values()}
+    project_pos = []
+    if resolved_project_id:
+        project_pos = PurchaseOrder.query.filter(
+            PurchaseOrder.project_id == resolved_project_id
+        ).all()
+    return _build_bom_procurement_plan(
+        bom,
+        resolved_project_id,
+        packages,
+        bom_items,
+        part_map=part_map,
+        class_part_map=class_part_map,
+        vendor_by_name=_procurement_vendor_lookup(),
+        po_item_rows=_procurement_po_item_rows(resolved_project_id, part_ids),
+        project_pos=project_pos,
+    )
+
+
 def get_project_procurement_plan(project_id):
+    """Procurement plan for every latest-revision BOM of a project.
+
+    BOMs, items, parts, vendors and PO rows are fetched once for the whole
+    project (a fixed number of queries regardless of BOM count) and each
+    BOM's plan is computed from those rows by ``_build_bom_procurement_plan``.
+    """
     project = Project.query.get_or_404(project_id)
-    boms = BillOfMaterials.query.options(joinedload(BillOfMaterials.packages)).all()
-    project_boms = [bom for bom in boms if _resolve_bom_project_id(bom) == project.id]
+    project_boms = (
+        BillOfMaterials.query.options(
+            joinedload(BillOfMaterials.packages),
+            joinedload(BillOfMaterials.project),
+            joinedload(BillOfMaterials.drawing_site).joinedload(DrawingSite.project),
+        )
+        .outerjoin(DrawingSite, DrawingSite.id == BillOfMaterials.drawing_site_id)
+        .filter(
+            or_(
+                BillOfMaterials.project_id == project.id,
+                and_(
+                    or_(BillOfMaterials.project_id.is_(None), BillOfMaterials.project_id == 0),
+                    DrawingSite.project_id == project.id,
+                ),
+            )
+        )
+        .all()
+    )
 
     # Project overview keeps package/BOM truth by showing only latest revision
     # per package identity, preventing older revisions from masking pending rows.
@@ -11323,10 +12279,50 @@ def get_project_procurement_plan(project_id):
         if not previous or rank > previous[0]:
             latest_by_group[key] = (rank, bom)
 
+    latest_boms = sorted(
+        (entry[1] for entry in latest_by_group.values()),
+        key=lambda entry: (entry.created_at or datetime.datetime.min, entry.id),
+        reverse=True,
+    )
+    items_by_bom = defaultdict(list)
+    if latest_boms:
+        for item in (
+            BOMItem.query.options(joinedload(BOMItem.part_class))
+            .filter(BOMItem.bom_id.in_([bom.id for bom in latest_boms]))
+            .order_by(BOMItem.id.asc())
+            .all()
+        ):
+            items_by_bom[item.bom_id].append(item)
+
+    all_items = [item for items in items_by_bom.values() for item in items]
+    part_map, class_part_map = _prefetch_bom_item_parts(all_items)
+    part_ids = set(part_map) | {part.id for part in class_part_map.values()}
+    vendor_by_name = _procurement_vendor_lookup()
+    po_item_rows = _procurement_po_item_rows(project.id, part_ids)
+    project_pos = (
+        PurchaseOrder.query.filter(PurchaseOrder.project_id == project.id).all()
+        if latest_boms
+        else []
+    )
+
     bom_entries = []
-    latest_boms = [entry[1] for entry in latest_by_group.values()]
-    for bom in sorted(latest_boms, key=lambda entry: (entry.created_at or datetime.datetime.min, entry.id), reverse=True):
-        plan = get_bom_procurement_plan(bom.id)
+    for bom in latest_boms:
+        packages = _sorted_bom_packages(bom.packages or [])
+        package_ids = {pkg.id for pkg in packages}
+        bom_items = items_by_bom.get(bom.id, [])
+        if package_ids:
+            bom_items = [item for item in bom_items if item.bom_package_id in package_ids]
+        plan = _build_bom_procurement_plan(
+            bom,
+            _resolve_bom_project_id(bom),
+            packages,
+            bom_items,
+            part_map=part_map,
+            class_part_map=class_part_map,
+            vendor_by_name=vendor_by_name,
+            po_item_rows=po_item_rows,
+            project_pos=project_pos,
+        )
         summary = plan["summary"]
         if summary["vendors_required"] == 0:
             status = "Not Started"
@@ -11799,7 +12795,7 @@ def purchase_orders():
 
             if not product_id and item_name:
                 matched_product = Product.query.filter(
-                    func.lower(Product.name) == item_name.lower()
+                    ci_key(Product.name) == item_name.lower()
                 ).first()
                 if matched_product:
                     vendor_link_valid = True
@@ -11917,17 +12913,27 @@ def purchase_orders():
     if prefill_project_id and prefill_vendor_id and prefill_bom_id and not prefill_po_lines:
         flash("No remaining quantities to create PO for this vendor.", "warning")
 
-    pos = (
-        PurchaseOrder.query.options(
-            joinedload(PurchaseOrder.vendor),
-            joinedload(PurchaseOrder.project),
-            joinedload(PurchaseOrder.bom),
-            subqueryload(PurchaseOrder.items),
-        )
-        .order_by(PurchaseOrder.id.desc())
-        .all()
+    search_query = (request.args.get("q") or "").strip()
+    po_query = PurchaseOrder.query.options(
+        joinedload(PurchaseOrder.vendor),
+        joinedload(PurchaseOrder.project),
+        joinedload(PurchaseOrder.bom),
+        selectinload(PurchaseOrder.items),
     )
-    bom_items = BOMItem.query.order_by(BOMItem.item_code).all()
+    if search_query:
+        like = f"%{search_query.lower()}%"
+        po_query = po_query.filter(
+            or_(
+                func.lower(PurchaseOrder.po_number).like(like),
+                func.lower(PurchaseOrder.notes).like(like),
+                PurchaseOrder.vendor.has(ci_key(Vendor.name).like(like)),
+                PurchaseOrder.project.has(func.lower(Project.name).like(like)),
+            )
+        )
+    page = _paginate_list(po_query, [(PurchaseOrder.id, True)], tiebreaker=PurchaseOrder.id)
+    if page.cursor and _is_htmx_request():
+        return render_template("_purchase_order_rows.html", page=page)
+
     selected_project_id = request.args.get("project_id", type=int)
     modal_context = _build_purchase_order_modal_context(
         selected_project_id=selected_project_id,
@@ -11938,8 +12944,8 @@ def purchase_orders():
 
     return render_template(
         "purchase_orders.html",
-        pos=pos,
-        bom_items=bom_items,
+        page=page,
+        search_query=search_query,
         **modal_context,
     )
 
@@ -12105,7 +13111,7 @@ def parts_search():
         return jsonify([])
 
     like = f"%{query.lower()}%"
-    parts_query = Product.query.filter(func.lower(Product.name).like(like))
+    parts_query = Product.query.filter(ci_key(Product.name).like(like))
     if vendor_id is not None:
         parts_query = (
             parts_query.join(
@@ -12151,7 +13157,7 @@ def parts_create():
     if not category:
         return jsonify({"error": "Category is required."}), 400
 
-    existing = Product.query.filter(func.lower(Product.name) == name.lower()).first()
+    existing = Product.query.filter(ci_key(Product.name) == name.lower()).first()
     if existing:
         sku = _ensure_product_sku(existing)
         db.session.commit()
@@ -12705,6 +13711,31 @@ def _send_purchase_order_email(po, recipient_email, pdf_bytes):
         server.send_message(msg)
 
 
+@job_handler("purchase_order_email", max_attempts=4, title="Purchase order e-mail")
+def _purchase_order_email_job(context):
+    po = db.session.get(PurchaseOrder, context.payload.get("po_id"))
+    if po is None:
+        raise JobFailed("Purchase order no longer exists.")
+    vendor_email, _ = _get_vendor_primary_email(po.vendor)
+    if not vendor_email:
+        raise JobFailed("No email in vendor profile added.")
+    context.progress(20, "Building PDF")
+    pdf_buffer = _build_po_pdf_bytes(po, _compute_po_line_receipts(po))
+    context.progress(60, f"Sending to {vendor_email}")
+    try:
+        _send_purchase_order_email(po, vendor_email, pdf_buffer.getvalue())
+    except RuntimeError as exc:
+        # Missing mail configuration; retrying will not help.
+        raise JobFailed(str(exc)) from exc
+    _issue_po_after_send(po, changed_by=context.payload.get("changed_by"))
+    db.session.commit()
+    return {
+        "message": f"Purchase Order emailed to {vendor_email}.",
+        "return_endpoint": "purchase_order_detail_view",
+        "return_args": {"po_id": po.id},
+    }
+
+
 def _issue_po_after_send(po, changed_by=None):
     current_status = _normalize_po_status(po.status)
     if current_status in {'Closed', 'Cancelled'}:
@@ -12869,16 +13900,17 @@ def purchase_order_detail_view(po_id: int):
                 flash("Download PDF copy and issue PO.", "info")
                 return redirect(url_for("purchase_order_detail_view", po_id=po.id))
 
-            try:
-                pdf_buffer = _build_po_pdf_bytes(po, _compute_po_line_receipts(po))
-                _send_purchase_order_email(po, vendor_email, pdf_buffer.getvalue())
-                _issue_po_after_send(po, changed_by=changed_by)
-                db.session.commit()
-                flash(f"Purchase Order emailed to {vendor_email}.", "success")
-            except Exception as exc:
-                db.session.rollback()
-                current_app.logger.exception("Failed to send purchase order email", exc_info=exc)
-                flash(f"Could not send PO email: {exc}", "danger")
+            job = enqueue_job(
+                "purchase_order_email",
+                {"po_id": po.id, "changed_by": changed_by},
+                user_id=current_user.id if current_user.is_authenticated else None,
+            )
+            if not job.is_finished:
+                flash(f"Purchase Order queued for e-mail to {vendor_email}.", "info")
+            elif job.status == "failed":
+                flash(f"Could not send PO email: {job.error}", "danger")
+            else:
+                flash(job.result["message"], "success")
 
             return redirect(url_for("purchase_order_detail_view", po_id=po.id))
 
@@ -13309,7 +14341,7 @@ def generate_po_from_bom(bom_id):
             product = None
             if item.item_code:
                 product = Product.query.filter(
-                    func.lower(Product.name) == (item.item_code or "").lower()
+                    ci_key(Product.name) == (item.item_code or "").lower()
                 ).first()
             unit_price = product.cost if product else None
             rows.append(
@@ -13518,58 +14550,105 @@ def purchase_orders_upload_odoo():
     if not _is_odoo_import_enabled():
         return render_template(
             "purchase_order_upload_result.html",
-            processed_rows=0,
-            created_count=0,
-            updated_count=0,
-            rows_with_errors=0,
-            row_errors=[],
-            fatal_error=(
-                "Odoo PO import is disabled. All new POs must be created directly in Eleva ERP."
+            **_purchase_order_upload_result(
+                fatal_error=(
+                    "Odoo PO import is disabled. All new POs must be created directly in Eleva ERP."
+                )
             ),
         )
 
-    def _render_result(
-        *,
-        processed_rows=0,
-        created_count=0,
-        updated_count=0,
-        rows_with_errors=0,
-        row_errors=None,
-        fatal_error=None,
-    ):
-        return render_template(
-            "purchase_order_upload_result.html",
-            processed_rows=processed_rows,
-            created_count=created_count,
-            updated_count=updated_count,
-            rows_with_errors=rows_with_errors,
-            row_errors=row_errors or [],
-            fatal_error=fatal_error,
-        )
-
     upload = request.files.get("purchase_order_upload_file")
     try:
-        _validate_upload_stream(
+        token, extension = save_pending_upload_file(
             upload,
             allowed_extensions={".xlsx", ".csv"},
             allow_office_processing=True,
         )
     except UploadValidationError as exc:
-        return _render_result(fatal_error=str(exc))
+        return render_template(
+            "purchase_order_upload_result.html",
+            **_purchase_order_upload_result(fatal_error=str(exc)),
+        )
+
+    job = enqueue_job(
+        "purchase_orders_odoo_upload",
+        {"token": token, "extension": extension, "filename": upload.filename},
+        user_id=current_user.id,
+    )
+    return redirect(url_for("background_job_detail", job_id=job.id))
+
+
+def _purchase_order_upload_result(
+    *,
+    processed_rows=0,
+    created_count=0,
+    updated_count=0,
+    rows_with_errors=0,
+    row_errors=None,
+    fatal_error=None,
+):
+    return {
+        "processed_rows": processed_rows,
+        "created_count": created_count,
+        "updated_count": updated_count,
+        "rows_with_errors": rows_with_errors,
+        "row_errors": row_errors or [],
+        "fatal_error": fatal_error,
+    }
+
+
+@job_handler(
+    "purchase_orders_odoo_upload",
+    title="Odoo purchase order upload",
+    result_template="purchase_order_upload_result.html",
+)
+def _purchase_orders_odoo_upload_job(context):
+    file_path = _staged_job_upload_path(context.payload)
+    result = _import_odoo_purchase_order_lines(file_path, progress=context.progress)
+    _remove_staged_upload(file_path)
+    return result
+
+
+PURCHASE_ORDER_LINE_IMPORT_COLUMNS = (
+    "order_ref",
+    "vendor_name",
+    "product_name",
+    "confirmation_date",
+    "billing_status",
+    "buyer",
+    "expected_arrival",
+    "priority",
+    "source_document",
+    "total_amount",
+    "is_active",
+)
+
+
+def _purchase_order_line_key(values):
+    return (
+        values["order_ref"],
+        values["vendor_name"],
+        values["product_name"],
+        values["confirmation_date"],
+    )
+
+
+def _import_odoo_purchase_order_lines(file_path, *, progress=None):
+    """Upsert ``PurchaseOrderLine`` rows from an Odoo PO export staged at ``file_path``."""
 
     try:
-        header_cells, data_rows = _extract_tabular_upload(upload)
+        header_cells, data_rows = _extract_tabular_upload_from_path(file_path)
     except MissingDependencyError:
-        return _render_result(fatal_error=OPENPYXL_MISSING_MESSAGE)
+        return _purchase_order_upload_result(fatal_error=OPENPYXL_MISSING_MESSAGE)
     except ValueError:
-        return _render_result(
+        return _purchase_order_upload_result(
             fatal_error="Upload a .xlsx or .csv file exported from Odoo purchase orders.",
         )
     except UploadStageTimeoutError as exc:
-        return _render_result(fatal_error=str(exc))
+        return _purchase_order_upload_result(fatal_error=str(exc))
     except Exception:
         current_app.logger.exception("Failed to read uploaded purchase order file")
-        return _render_result(
+        return _purchase_order_upload_result(
             fatal_error=(
                 "There was a problem reading this Purchase Order file. Please check that you’re using the correct Odoo export and try again."
             )
@@ -13595,13 +14674,16 @@ def purchase_orders_upload_odoo():
 
     missing_headers = [label for label in required_headers if label not in header_map]
     if missing_headers:
-        return _render_result(
+        return _purchase_order_upload_result(
             fatal_error=(
                 "The uploaded sheet is missing required columns: "
                 + ", ".join(sorted(missing_headers))
             )
         )
 
+    if progress:
+        progress(10, f"Importing {len(data_rows or [])} row(s)")
+
     processed_rows = 0
     created_count = 0
     updated_count = 0
@@ -13625,13 +14707,25 @@ def purchase_orders_upload_odoo():
             except (TypeError, ValueError):
                 return None, f"Invalid numeric {label}"
 
+    order_lines = BulkUpserter(
+        PurchaseOrderLine,
+        key=_purchase_order_line_key,
+        columns=PURCHASE_ORDER_LINE_IMPORT_COLUMNS,
+    )
+    vendor_ids = {}
+    for vendor_id, vendor_name in db.session.execute(
+        select(Vendor.id, Vendor.name).order_by(Vendor.id)
+    ):
+        vendor_ids.setdefault((vendor_name or "").lower(), vendor_id)
+    used_vendor_ids = set()
+
     def _parse_odoo_datetime(value, label):
         if value is None:
             return None, None
         if isinstance(value, datetime.datetime):
             return value, None
         if isinstance(value, datetime.date):
-            return datetime.datetime.combine(value, datetime.time())
+            return datetime.datetime.combine(value, datetime.time()), None
         text_value = stringify_cell(value)
         if text_value is None or text_value == "":
             return None, None
@@ -13701,55 +14795,44 @@ def purchase_orders_upload_odoo():
             row_errors.append(f"Row {row_index}: " + "; ".join(row_issue))
             continue
 
-        pol = (
-            PurchaseOrderLine.query.filter_by(
-                order_ref=order_ref,
-                vendor_name=vendor_name,
-                product_name=product_name,
-                confirmation_date=confirmation_date,
-            )
-            .with_for_update(read=True)
-            .first()
-        )
-        is_new = pol is None
-        if is_new:
-            pol = PurchaseOrderLine(
-                order_ref=order_ref,
-                vendor_name=vendor_name,
-                product_name=product_name,
-                confirmation_date=confirmation_date,
-            )
-            db.session.add(pol)
+        values = {
+            "order_ref": order_ref,
+            "vendor_name": vendor_name,
+            "product_name": product_name,
+            "confirmation_date": confirmation_date,
+            "billing_status": billing_status,
+            "buyer": buyer,
+            "expected_arrival": expected_arrival,
+            "priority": priority_value,
+            "source_document": source_document,
+            # Match the stored Numeric(12, 2) so unchanged totals are not rewritten.
+            "total_amount": Decimal(str(total_amount)).quantize(Decimal("0.01")),
+        }
+        current = order_lines.current(_purchase_order_line_key(values))
+        if current is None or current.get("is_active") is None:
+            values["is_active"] = True
+        if order_lines.upsert(values):
             created_count += 1
         else:
             updated_count += 1
-
-        pol.order_ref = order_ref
-        pol.vendor_name = vendor_name
-        pol.product_name = product_name
-        pol.confirmation_date = confirmation_date
-        pol.billing_status = billing_status
-        pol.buyer = buyer
-        pol.expected_arrival = expected_arrival
-        pol.priority = priority_value
-        pol.source_document = source_document
-        pol.total_amount = total_amount if total_amount is not None else 0
-        pol.is_active = True if pol.is_active is None else pol.is_active
-        if vendor_name:
-            vendor_record = Vendor.query.filter(
-                func.lower(Vendor.name) == vendor_name.lower()
-            ).first()
-            if vendor_record:
-                vendor_record.last_used_at = datetime.datetime.utcnow()
+        vendor_id = vendor_ids.get(vendor_name.lower())
+        if vendor_id is not None:
+            used_vendor_ids.add(vendor_id)
 
     try:
+        order_lines.flush()
+        if used_vendor_ids:
+            Vendor.query.filter(Vendor.id.in_(used_vendor_ids)).update(
+                {Vendor.last_used_at: datetime.datetime.utcnow()},
+                synchronize_session=False,
+            )
         db.session.commit()
     except Exception:
         db.session.rollback()
         current_app.logger.exception(
             "Failed to save purchase order line upload changes"
         )
-        return _render_result(
+        return _purchase_order_upload_result(
             processed_rows=processed_rows,
             created_count=created_count,
             updated_count=updated_count,
@@ -13758,7 +14841,7 @@ def purchase_orders_upload_odoo():
             fatal_error="Could not save purchase order lines due to a database error.",
         )
 
-    return _render_result(
+    return _purchase_order_upload_result(
         processed_rows=processed_rows,
         created_count=created_count,
         updated_count=updated_count,
@@ -14000,14 +15083,29 @@ def purchase_reports():
 @login_required
 def purchase_parts():
     ensure_bootstrap()
-    records = Product.query.order_by(Product.name).all()
-    vendors = Vendor.query.order_by(Vendor.name).all()
-    forecast_by_product = {product.id: _compute_product_forecast_qty(product) for product in records}
+    search_query = (request.args.get("q") or request.args.get("item_code") or "").strip()
+    query = Product.query
+    if search_query:
+        like = f"%{search_query}%"
+        query = query.filter(
+            or_(
+                Product.name.ilike(like),
+                Product.sku.ilike(like),
+                Product.uom.ilike(like),
+                Product.purchase_uom.ilike(like),
+            )
+        )
+    page = _paginate_list(query, [(Product.name, False)], tiebreaker=Product.id)
+    forecast_by_product = _compute_product_forecast_map(page.items)
+    if page.cursor and _is_htmx_request():
+        return render_template(
+            "_purchase_part_rows.html", page=page, forecast_by_product=forecast_by_product
+        )
 
     return render_template(
         "purchase_parts.html",
-        products=records,
-        vendors=vendors,
+        page=page,
+        search_query=search_query,
         forecast_by_product=forecast_by_product,
     )
 
@@ -14033,7 +15131,7 @@ def purchase_part_new():
         errors = []
         if not name:
             errors.append("Part name is required.")
-        elif Product.query.filter(func.lower(Product.name) == name.lower()).first():
+        elif Product.query.filter(ci_key(Product.name) == name.lower()).first():
             errors.append("Part name already exists.")
 
         part_class_id = None
@@ -14345,7 +15443,7 @@ def purchase_part_rate_update(product_id):
 
     primary_rate = None
     if product.primary_vendor:
-        primary_vendor = Vendor.query.filter(func.lower(Vendor.name) == product.primary_vendor.lower()).first()
+        primary_vendor = Vendor.query.filter(ci_key(Vendor.name) == product.primary_vendor.lower()).first()
         if primary_vendor:
             primary_rate_row = VendorProductRate.query.filter_by(
                 vendor_id=primary_vendor.id,
@@ -14371,46 +15469,106 @@ def purchase_part_rate_update(product_id):
 def products_upload():
     ensure_bootstrap()
 
-    def _render_result(
-        *,
-        processed_rows=0,
-        created_count=0,
-        updated_count=0,
-        row_errors=None,
-        fatal_error=None,
-    ):
-        return render_template(
-            "product_upload_result.html",
-            processed_rows=processed_rows,
-            created_count=created_count,
-            updated_count=updated_count,
-            row_errors=row_errors or [],
-            fatal_error=fatal_error,
-        )
-
     upload = request.files.get("product_upload_file")
     try:
-        _validate_upload_stream(
+        token, extension = save_pending_upload_file(
             upload,
             allowed_extensions={".xlsx", ".csv"},
             allow_office_processing=True,
         )
     except UploadValidationError as exc:
-        return _render_result(fatal_error=str(exc))
+        return render_template(
+            "product_upload_result.html",
+            **_product_upload_result(fatal_error=str(exc)),
+        )
+
+    job = enqueue_job(
+        "products_upload",
+        {"token": token, "extension": extension, "filename": upload.filename},
+        user_id=current_user.id,
+    )
+    return redirect(url_for("background_job_detail", job_id=job.id))
+
+
+def _product_upload_result(
+    *,
+    processed_rows=0,
+    created_count=0,
+    updated_count=0,
+    row_errors=None,
+    fatal_error=None,
+):
+    return {
+        "processed_rows": processed_rows,
+        "created_count": created_count,
+        "updated_count": updated_count,
+        "row_errors": row_errors or [],
+        "fatal_error": fatal_error,
+    }
+
+
+@job_handler(
+    "products_upload",
+    title="Product upload",
+    result_template="product_upload_result.html",
+)
+def _products_upload_job(context):
+    file_path = _staged_job_upload_path(context.payload)
+    result = _import_products_upload(file_path, progress=context.progress)
+    _remove_staged_upload(file_path)
+    return result
+
+
+PRODUCT_IMPORT_COLUMNS = (
+    "name",
+    "sale_price",
+    "cost",
+    "uom",
+    "purchase_uom",
+    "qty_on_hand",
+    "forecast_qty",
+    "is_favorite",
+    "is_active",
+)
+
+
+def _assign_imported_product_skus(mappings):
+    # Bulk inserts skip ``_assign_skus_to_new_products``.
+    for mapping, sku in zip(mappings, _generate_product_skus(len(mappings))):
+        mapping["sku"] = sku
+
+
+def _sync_imported_products_into_inventory(inserted_ids, updated):
+    # Bulk writes skip ``_sync_flushed_products_into_inventory``.
+    product_ids = set(inserted_ids)
+    stock_product_ids = set(inserted_ids)
+    for product_id, changes in updated.items():
+        changed = set(changes).intersection(INVENTORY_SYNC_PRODUCT_FIELDS)
+        if not changed:
+            continue
+        product_ids.add(product_id)
+        if changed & {"sku", "qty_on_hand"}:
+            stock_product_ids.add(product_id)
+    if product_ids:
+        _sync_inventory_rows(db.session.connection(), product_ids, stock_product_ids)
+
+
+def _import_products_upload(file_path, *, progress=None):
+    """Create/update products from an Odoo product export staged at ``file_path``."""
 
     try:
-        header_cells, data_rows = _extract_tabular_upload(upload)
+        header_cells, data_rows = _extract_tabular_upload_from_path(file_path)
     except MissingDependencyError:
-        return _render_result(fatal_error=OPENPYXL_MISSING_MESSAGE)
+        return _product_upload_result(fatal_error=OPENPYXL_MISSING_MESSAGE)
     except ValueError:
-        return _render_result(
+        return _product_upload_result(
             fatal_error="Upload a .xlsx or .csv file exported from Odoo products.",
         )
     except UploadStageTimeoutError as exc:
-        return _render_result(fatal_error=str(exc))
+        return _product_upload_result(fatal_error=str(exc))
     except Exception:
         current_app.logger.exception("Failed to read uploaded product file")
-        return _render_result(
+        return _product_upload_result(
             fatal_error=(
                 "There was a problem reading this file, please check the format and try again."
             )
@@ -14433,13 +15591,16 @@ def products_upload():
 
     missing_headers = [label for label in required_headers if label not in header_map]
     if missing_headers:
-        return _render_result(
+        return _product_upload_result(
             fatal_error=(
                 "The uploaded sheet is missing required columns: "
                 + ", ".join(sorted(missing_headers))
             )
         )
 
+    if progress:
+        progress(10, f"Importing {len(data_rows or [])} row(s)")
+
     processed_rows = 0
     created_count = 0
     updated_count = 0
@@ -14463,6 +15624,14 @@ def products_upload():
             except (TypeError, ValueError):
                 return None, f"Invalid numeric value in {label}"
 
+    products = BulkUpserter(
+        Product,
+        key=lambda values: (values["name"] or "").lower(),
+        columns=PRODUCT_IMPORT_COLUMNS,
+        before_insert=_assign_imported_product_skus,
+        after_write=_sync_imported_products_into_inventory,
+    )
+
     for row_index, row_values in enumerate(data_rows or [], start=2):
         if not row_values:
             continue
@@ -14504,37 +15673,31 @@ def products_upload():
             row_errors.append(f"Row {row_index}: " + "; ".join(row_issue))
             continue
 
-        product = (
-            Product.query.filter(func.lower(Product.name) == name.lower()).first()
-        )
-        is_new = product is None
-        if is_new:
-            product = Product(name=name)
-            db.session.add(product)
+        values = {
+            "name": name,
+            "sale_price": sale_price,
+            "cost": cost,
+            "uom": clean_str(row_data.get("Unit of Measure")) or None,
+            "purchase_uom": clean_str(row_data.get("Purchase Unit")) or None,
+            "qty_on_hand": qty_on_hand or 0,
+            "forecast_qty": forecast_qty or 0,
+            "is_favorite": _parse_boolean_cell(row_data.get("Favorite"), default=False),
+        }
+        current = products.current(name.lower())
+        if current is None or current.get("is_active") is None:
+            values["is_active"] = True
+        if products.upsert(values):
             created_count += 1
         else:
             updated_count += 1
 
-        product.name = name
-        product.sale_price = sale_price
-        product.cost = cost
-        product.uom = clean_str(row_data.get("Unit of Measure")) or None
-        product.purchase_uom = clean_str(row_data.get("Purchase Unit")) or None
-        product.qty_on_hand = qty_on_hand or 0
-        product.forecast_qty = forecast_qty or 0
-        product.is_favorite = _parse_boolean_cell(
-            row_data.get("Favorite"), default=False
-        )
-        product.is_active = (
-            product.is_active if product.is_active is not None else True
-        )
-
     try:
+        products.flush()
         db.session.commit()
     except Exception:
         db.session.rollback()
         current_app.logger.exception("Failed to save product upload changes")
-        return _render_result(
+        return _product_upload_result(
             processed_rows=processed_rows,
             created_count=created_count,
             updated_count=updated_count,
@@ -14542,9 +15705,7 @@ def products_upload():
             fatal_error="Could not save product records due to a database error.",
         )
 
-    _sync_inventory_with_products()
-
-    return _render_result(
+    return _product_upload_result(
         processed_rows=processed_rows,
         created_count=created_count,
         updated_count=updated_count,
@@ -14552,61 +15713,262 @@ def products_upload():
     )
 
 
-def _sync_inventory_with_products():
-    """Ensure imported products are reflected in the inventory list."""
+INVENTORY_SYNC_PRODUCT_FIELDS = ("sku", "name", "uom", "purchase_uom", "qty_on_hand")
+INVENTORY_SYNC_CHUNK_SIZE = 500
 
-    products = Product.query.order_by(Product.name).all()
-    updates_made = False
 
-    for product in products:
-        sku_before = product.sku
-        item_code = _ensure_product_sku(product)
-        if sku_before != product.sku:
-            updates_made = True
-        if not item_code:
-            continue
+def _sync_inventory_rows(connection, product_ids=None, stock_product_ids=None):
+    """Mirror products into ``inventory_item`` with set-based SQL.
 
-        inventory_item = (
-            InventoryItem.query.filter(
-                func.lower(InventoryItem.item_code) == item_code.lower()
-            ).first()
+    Inserts rows for products whose SKU has no inventory row yet and
+    refreshes description/unit from the product. ``current_stock`` is only
+    overwritten for ``stock_product_ids`` (products whose on-hand quantity or
+    SKU changed), so GRN/challan postings are not clobbered by unrelated
+    product edits. ``product_ids=None`` covers every product. Every
+    ``current_stock`` change (including the opening stock of new rows) is
+    posted to the inventory ledger as a ``product_sync`` entry.
+    """
+    product_table = Product.__table__
+    inventory_table = InventoryItem.__table__
+    product_sku = func.trim(product_table.c.sku)
+    preferred_unit = func.coalesce(
+        func.nullif(product_table.c.uom, ""),
+        func.nullif(product_table.c.purchase_uom, ""),
+    )
+    on_hand = func.coalesce(product_table.c.qty_on_hand, 0)
+
+    def _chunks(ids):
+        if ids is None:
+            yield None
+            return
+        ids = sorted(ids)
+        for start in range(0, len(ids), INVENTORY_SYNC_CHUNK_SIZE):
+            yield ids[start:start + INVENTORY_SYNC_CHUNK_SIZE]
+
+    def _product_filter(chunk):
+        conditions = [product_table.c.sku.isnot(None), product_sku != ""]
+        if chunk is not None:
+            conditions.append(product_table.c.id.in_(chunk))
+        return and_(*conditions)
+
+    def _matched(column, chunk):
+        return (
+            select(column)
+            .where(
+                _product_filter(chunk),
+                func.lower(product_sku) == func.lower(inventory_table.c.item_code),
+            )
+            .order_by(product_table.c.name.desc())
+            .limit(1)
+            .scalar_subquery()
         )
 
-        if not inventory_item:
-            inventory_item = InventoryItem(item_code=item_code)
-            db.session.add(inventory_item)
-            updates_made = True
+    stock_all = stock_product_ids is None and product_ids is None
+    inserted = 0
+    movements = []
+    for chunk in _chunks(product_ids):
+        new_rows = connection.execute(
+            select(product_table.c.id, product_sku, on_hand).where(
+                _product_filter(chunk),
+                ~exists().where(
+                    func.lower(inventory_table.c.item_code) == func.lower(product_sku)
+                ),
+            )
+        ).all()
+        result = connection.execute(
+            inventory_table.insert().from_select(
+                ["item_code", "description", "unit", "current_stock", "book_stock", "quarantined_stock"],
+                select(product_sku, product_table.c.name, preferred_unit, on_hand, on_hand, literal(0))
+                .where(
+                    _product_filter(chunk),
+                    ~exists().where(
+                        func.lower(inventory_table.c.item_code) == func.lower(product_sku)
+                    ),
+                ),
+            )
+        )
+        inserted += max(result.rowcount or 0, 0)
+        opening = {sku.lower(): (product_id, qty) for product_id, sku, qty in new_rows if qty}
+        if opening:
+            for item_id, item_code in connection.execute(
+                select(inventory_table.c.id, inventory_table.c.item_code).where(
+                    func.lower(inventory_table.c.item_code).in_(list(opening))
+                )
+            ):
+                product_id, qty = opening.pop(item_code.lower(), (None, 0))
+                if qty:
+                    movements.append((item_id, product_id, qty, qty, qty, qty))
+
+        has_match = exists().where(
+            _product_filter(chunk),
+            func.lower(product_sku) == func.lower(inventory_table.c.item_code),
+        )
+        connection.execute(
+            inventory_table.update()
+            .where(has_match)
+            .values(
+                description=_matched(product_table.c.name, chunk),
+                unit=func.coalesce(_matched(preferred_unit, chunk), inventory_table.c.unit),
+                book_stock=func.coalesce(inventory_table.c.book_stock, _matched(on_hand, chunk)),
+            )
+        )
 
-        preferred_unit = product.uom or product.purchase_uom
-        target_stock = product.qty_on_hand or 0
+    stock_chunks = _chunks(None) if stock_all else _chunks(stock_product_ids or ())
+    for chunk in stock_chunks:
+        has_match = exists().where(
+            _product_filter(chunk),
+            func.lower(product_sku) == func.lower(inventory_table.c.item_code),
+        )
+        before = connection.execute(
+            select(
+                inventory_table.c.id,
+                _matched(product_table.c.id, chunk),
+                inventory_table.c.current_stock,
+                inventory_table.c.book_stock,
+                _matched(on_hand, chunk),
+            ).where(has_match)
+        ).all()
+        connection.execute(
+            inventory_table.update()
+            .where(has_match)
+            .values(current_stock=_matched(on_hand, chunk))
+        )
+        for item_id, product_id, current, book, qty in before:
+            delta = float(qty or 0) - float(current or 0)
+            if delta:
+                balance = float(book) if book is not None else float(qty or 0)
+                movements.append((item_id, product_id, delta, 0, float(qty or 0), balance))
+    _post_inventory_sync_ledger(connection, movements)
+    return inserted
+
+
+def _post_inventory_sync_ledger(connection, movements):
+    """Record stock set from the parts master as ``product_sync`` ledger rows.
+
+    ``movements`` holds ``(item_id, product_id, physical_delta, book_delta,
+    physical_balance, book_balance)`` tuples. This runs on the flush
+    connection (inside ``after_flush``), so rows are written with Core
+    inserts rather than through ``_post_inventory_ledger``.
+    """
 
-        if inventory_item.book_stock is None:
-            inventory_item.book_stock = target_stock
-            updates_made = True
-        elif inventory_item.book_stock == 0 and target_stock and not inventory_item.id:
-            inventory_item.book_stock = target_stock
-            updates_made = True
+    if not movements:
+        return
+    ledger_table = InventoryLedgerEntry.__table__
+    posted_at = datetime.datetime.utcnow()
+    month_start = _month_start(posted_at)
+    item_ids = sorted({movement[0] for movement in movements})
+    opened = set()
+    for start in range(0, len(item_ids), INVENTORY_SYNC_CHUNK_SIZE):
+        opened.update(
+            item_id
+            for (item_id,) in connection.execute(
+                select(ledger_table.c.inventory_item_id)
+                .where(
+                    ledger_table.c.inventory_item_id.in_(
+                        item_ids[start:start + INVENTORY_SYNC_CHUNK_SIZE]
+                    ),
+                    ledger_table.c.posted_at >= month_start,
+                )
+                .distinct()
+            )
+        )
+    rows = []
+    for item_id, product_id, physical_delta, book_delta, physical, book in movements:
+        if item_id not in opened:
+            opened.add(item_id)
+            rows.append(
+                {
+                    "inventory_item_id": item_id,
+                    "posted_at": month_start,
+                    "entry_type": "checkpoint",
+                    "physical_delta": 0,
+                    "book_delta": 0,
+                    "physical_balance": physical - physical_delta,
+                    "book_balance": book - book_delta,
+                    "reference": None,
+                    "source_type": None,
+                    "source_id": None,
+                }
+            )
+        rows.append(
+            {
+                "inventory_item_id": item_id,
+                "posted_at": posted_at,
+                "entry_type": "product_sync",
+                "physical_delta": physical_delta,
+                "book_delta": book_delta,
+                "physical_balance": physical,
+                "book_balance": book,
+                "reference": "Parts master on-hand quantity",
+                "source_type": "product",
+                "source_id": product_id,
+            }
+        )
+    for start in range(0, len(rows), INVENTORY_SYNC_CHUNK_SIZE):
+        connection.execute(ledger_table.insert(), rows[start:start + INVENTORY_SYNC_CHUNK_SIZE])
 
-        if inventory_item.description != product.name:
-            inventory_item.description = product.name
-            updates_made = True
 
-        if preferred_unit and inventory_item.unit != preferred_unit:
-            inventory_item.unit = preferred_unit
-            updates_made = True
+def _sync_inventory_with_products():
+    """Rebuild inventory rows for every product (repairs; see ``flask rebuild-inventory``)."""
+    missing_sku_products = Product.query.filter(
+        or_(Product.sku.is_(None), func.trim(Product.sku) == "")
+    ).order_by(Product.name).all()
+    for product, sku in zip(
+        missing_sku_products, _generate_product_skus(len(missing_sku_products))
+    ):
+        product.sku = sku
+    db.session.flush()
+    inserted = _sync_inventory_rows(db.session.connection())
+    db.session.commit()
+    return len(missing_sku_products), inserted
 
-        if (inventory_item.current_stock or 0) != target_stock:
-            inventory_item.current_stock = target_stock
-            updates_made = True
 
-    if updates_made:
-        try:
-            db.session.commit()
-        except Exception:
-            db.session.rollback()
-            current_app.logger.exception(
-                "Failed to sync products into inventory records"
-            )
+@event.listens_for(db.session, "before_flush")
+def _assign_skus_to_new_products(session, flush_context, instances):
+    new_products = [
+        obj
+        for obj in session.new
+        if isinstance(obj, Product) and not (obj.sku or "").strip()
+    ]
+    if not new_products:
+        return
+    reserved = {
+        obj.sku.strip()
+        for obj in session.new
+        if isinstance(obj, Product) and (obj.sku or "").strip()
+    }
+    for product, sku in zip(
+        new_products, _generate_product_skus(len(new_products), reserved=reserved)
+    ):
+        product.sku = sku
+
+
+@event.listens_for(db.session, "after_flush")
+def _sync_flushed_products_into_inventory(session, flush_context):
+    # Products are mirrored into inventory when they are created, imported
+    # or edited, in the same transaction, so /store/inventory is a pure read.
+    product_ids = set()
+    stock_product_ids = set()
+    for obj in session.new:
+        if isinstance(obj, Product) and obj.id is not None:
+            product_ids.add(obj.id)
+            stock_product_ids.add(obj.id)
+    for obj in session.dirty:
+        if not isinstance(obj, Product) or obj.id is None:
+            continue
+        state = inspect(obj)
+        changed = {
+            field_name
+            for field_name in INVENTORY_SYNC_PRODUCT_FIELDS
+            if state.attrs[field_name].history.has_changes()
+        }
+        if not changed:
+            continue
+        product_ids.add(obj.id)
+        if changed & {"sku", "qty_on_hand"}:
+            stock_product_ids.add(obj.id)
+    if product_ids:
+        _sync_inventory_rows(session.connection(), product_ids, stock_product_ids)
 
 
 def _ensure_product_sku(product: Product) -> Optional[str]:
@@ -14621,24 +15983,38 @@ def _ensure_product_sku(product: Product) -> Optional[str]:
 
 
 def _next_generated_product_sku() -> str:
+    return _generate_product_skus(1)[0]
+
+
+def _generate_product_skus(count, *, reserved=()):
+    """Return ``count`` unused ELV-###### SKUs after the highest existing one."""
+    if count <= 0:
+        return []
     sku_pattern = re.compile(r"^ELV-(\d{6})$")
     max_suffix = 0
+    taken = set(reserved)
 
     sku_rows = db.session.query(Product.sku).filter(Product.sku.like("ELV-%")).all()
     for (raw_sku,) in sku_rows:
+        taken.add(raw_sku)
         normalized_sku = (raw_sku or "").strip().upper()
         match = sku_pattern.match(normalized_sku)
         if not match:
             continue
         max_suffix = max(max_suffix, int(match.group(1)))
+    for raw_sku in reserved:
+        match = sku_pattern.match((raw_sku or "").strip().upper())
+        if match:
+            max_suffix = max(max_suffix, int(match.group(1)))
 
+    skus = []
     next_suffix = max_suffix + 1
-    while True:
+    while len(skus) < count:
         candidate = f"ELV-{next_suffix:06d}"
-        conflict = Product.query.filter(Product.sku == candidate).first()
-        if not conflict:
-            return candidate
+        if candidate not in taken:
+            skus.append(candidate)
         next_suffix += 1
+    return skus
 
 
 def _resolve_product_by_inventory_identity(*, item_code=None, description=None, product_name=None):
@@ -14646,7 +16022,7 @@ def _resolve_product_by_inventory_identity(*, item_code=None, description=None,
 
     normalized_code = clean_str(item_code)
     if normalized_code:
-        product = Product.query.filter(func.lower(Product.sku) == normalized_code.lower()).first()
+        product = Product.query.filter(ci_key(Product.sku) == normalized_code.lower()).first()
         if product:
             return product
 
@@ -14654,7 +16030,7 @@ def _resolve_product_by_inventory_identity(*, item_code=None, description=None,
         normalized_name = clean_str(candidate)
         if not normalized_name:
             continue
-        product = Product.query.filter(func.lower(Product.name) == normalized_name.lower()).first()
+        product = Product.query.filter(ci_key(Product.name) == normalized_name.lower()).first()
         if product:
             return product
     return None
@@ -14678,9 +16054,29 @@ def _canonical_inventory_item_code(*, item_code=None, description=None, product_
 
 
 def _merge_legacy_inventory_item_keys():
-    """One-time safe merge of legacy inventory rows keyed by product name/description."""
+    """One-time safe merge of legacy inventory rows keyed by product name/description.
+
+    Products and inventory rows are each loaded once and matched in memory
+    (by lower-cased SKU, name and description) instead of one OR query per
+    product. A merged row is retired rather than deleted: its stock moves to
+    the surviving item through a pair of ``merge`` ledger entries, it keeps
+    its own ledger history, and its item code is freed for reuse.
+    """
 
     products = Product.query.filter(Product.sku.isnot(None), Product.sku != "").all()
+    inventory_rows = (
+        InventoryItem.query.filter(InventoryItem.merged_into_id.is_(None))
+        .order_by(InventoryItem.id.asc())
+        .all()
+    )
+    rows_by_code = defaultdict(list)
+    rows_by_description = defaultdict(list)
+    for row in inventory_rows:
+        rows_by_code[clean_str(row.item_code).lower()].append(row)
+        description_key = clean_str(row.description).lower()
+        if description_key:
+            rows_by_description[description_key].append(row)
+    retired_ids = set()
     merged_any = False
 
     for product in products:
@@ -14689,17 +16085,15 @@ def _merge_legacy_inventory_item_keys():
         if not sku or not name:
             continue
 
-        candidates = (
-            InventoryItem.query.filter(
-                or_(
-                    func.lower(InventoryItem.item_code) == sku.lower(),
-                    func.lower(InventoryItem.item_code) == name.lower(),
-                    func.lower(InventoryItem.description) == name.lower(),
-                )
-            )
-            .order_by(InventoryItem.id.asc())
-            .all()
-        )
+        candidate_map = {}
+        for row in (
+            rows_by_code.get(sku.lower(), [])
+            + rows_by_code.get(name.lower(), [])
+            + rows_by_description.get(name.lower(), [])
+        ):
+            if id(row) not in retired_ids:
+                candidate_map[id(row)] = row
+        candidates = sorted(candidate_map.values(), key=lambda row: row.id)
         if not candidates:
             continue
 
@@ -14721,6 +16115,8 @@ def _merge_legacy_inventory_item_keys():
             )
             db.session.add(canonical)
             db.session.flush()
+            rows_by_code[sku.lower()].append(canonical)
+            rows_by_description[name.lower()].append(canonical)
             merged_any = True
 
         if canonical.item_code != sku:
@@ -14728,6 +16124,7 @@ def _merge_legacy_inventory_item_keys():
             merged_any = True
         if not canonical.description:
             canonical.description = name
+            rows_by_description[name.lower()].append(canonical)
             merged_any = True
 
         for row in candidates:
@@ -14756,12 +16153,145 @@ def _merge_legacy_inventory_item_keys():
             if not canonical.description and row.description:
                 canonical.description = row.description
 
-            db.session.delete(row)
+            _post_inventory_ledger(
+                canonical,
+                "merge",
+                physical_delta=row.current_stock or 0,
+                book_delta=row.book_stock or 0,
+                reference=f"Merged {row.item_code}",
+            )
+            moved_physical = row.current_stock or 0
+            moved_book = row.book_stock or 0
+            row.current_stock = 0
+            row.book_stock = 0
+            row.quarantined_stock = 0
+            row.merged_into_id = canonical.id
+            _post_inventory_ledger(
+                row,
+                "merge",
+                physical_delta=-moved_physical,
+                book_delta=-moved_book,
+                reference=f"Merged into {sku}",
+            )
+            suffix = f" (merged #{row.id})"
+            row.item_code = clean_str(row.item_code)[: 120 - len(suffix)] + suffix
+            retired_ids.add(id(row))
             merged_any = True
 
     return merged_any
 
 
+INVENTORY_LEDGER_LABELS = {
+    "grn": "GRN",
+    "challan": "Delivery Challan",
+    "odoo_snapshot": "Odoo Snapshot",
+    "merge": "Legacy Item Merge",
+    "product_sync": "Parts Master Quantity",
+    "checkpoint": "Opening Balance",
+}
+
+
+def _month_start(value):
+    return datetime.datetime(value.year, value.month, 1)
+
+
+def _post_inventory_ledger(
+    inventory_item,
+    entry_type,
+    *,
+    physical_delta=0,
+    book_delta=0,
+    reference=None,
+    source_type=None,
+    source_id=None,
+    posted_at=None,
+):
+    """Append a ledger row for a stock change that has already been applied.
+
+    Balances are read from ``inventory_item`` after the change. The first
+    movement of an item in a calendar month is preceded by a checkpoint row
+    carrying the balance brought forward.
+    """
+
+    posted_at = posted_at or datetime.datetime.utcnow()
+    physical_delta = float(physical_delta or 0)
+    book_delta = float(book_delta or 0)
+    physical_balance = float(inventory_item.current_stock or 0)
+    book_balance = float(
+        inventory_item.book_stock
+        if inventory_item.book_stock is not None
+        else inventory_item.current_stock or 0
+    )
+    month_start = _month_start(posted_at)
+    has_month_rows = inventory_item.id is not None and (
+        db.session.query(InventoryLedgerEntry.id)
+        .filter(
+            InventoryLedgerEntry.inventory_item_id == inventory_item.id,
+            InventoryLedgerEntry.posted_at >= month_start,
+        )
+        .first()
+        is not None
+    )
+    if not has_month_rows:
+        db.session.add(
+            InventoryLedgerEntry(
+                inventory_item=inventory_item,
+                posted_at=month_start,
+                entry_type="checkpoint",
+                physical_balance=physical_balance - physical_delta,
+                book_balance=book_balance - book_delta,
+            )
+        )
+    entry = InventoryLedgerEntry(
+        inventory_item=inventory_item,
+        posted_at=posted_at,
+        entry_type=entry_type,
+        physical_delta=physical_delta,
+        book_delta=book_delta,
+        physical_balance=physical_balance,
+        book_balance=book_balance,
+        reference=(reference or None) and str(reference)[:255],
+        source_type=source_type,
+        source_id=source_id,
+    )
+    db.session.add(entry)
+    return entry
+
+
+def inventory_stock_as_of(as_of, item_ids=None):
+    """Return ``{item_id: (physical, book)}`` from the last ledger row at ``as_of``.
+
+    A date means "at the end of that day". Each item costs one probe of the
+    (item, posted_at) index; items without ledger rows before ``as_of`` are
+    left out.
+    """
+
+    if isinstance(as_of, datetime.date) and not isinstance(as_of, datetime.datetime):
+        as_of = datetime.datetime.combine(as_of, datetime.time.max)
+    latest_id = (
+        select(InventoryLedgerEntry.id)
+        .where(
+            InventoryLedgerEntry.inventory_item_id == InventoryItem.id,
+            InventoryLedgerEntry.posted_at <= as_of,
+        )
+        .order_by(InventoryLedgerEntry.posted_at.desc(), InventoryLedgerEntry.id.desc())
+        .limit(1)
+        .correlate(InventoryItem)
+        .scalar_subquery()
+    )
+    query = db.session.query(
+        InventoryItem.id,
+        InventoryLedgerEntry.physical_balance,
+        InventoryLedgerEntry.book_balance,
+    ).join(InventoryLedgerEntry, InventoryLedgerEntry.id == latest_id)
+    if item_ids is not None:
+        item_ids = list(item_ids)
+        if not item_ids:
+            return {}
+        query = query.filter(InventoryItem.id.in_(item_ids))
+    return {item_id: (physical, book) for item_id, physical, book in query}
+
+
 def _initialize_book_stock(inventory_item):
     updated = False
     physical = inventory_item.current_stock or 0
@@ -14887,7 +16417,7 @@ def _process_inventory_upload(upload, extension):
             continue
 
         product_in_master = Product.query.filter(
-            func.lower(Product.name) == product.lower()
+            ci_key(Product.name) == product.lower()
         ).first()
         if not product_in_master:
             message = (
@@ -14959,7 +16489,7 @@ def _process_inventory_upload(upload, extension):
     for item_code, total_qty in product_totals.items():
         product_ref = product_records.get(item_code)
         inventory_item = InventoryItem.query.filter(
-            func.lower(InventoryItem.item_code) == item_code.lower()
+            ci_key(InventoryItem.item_code) == item_code.lower()
         ).first()
         if not inventory_item:
             inventory_item = InventoryItem(
@@ -14973,8 +16503,23 @@ def _process_inventory_upload(upload, extension):
             if preferred_unit:
                 inventory_item.unit = preferred_unit
             inventory_item.description = product_ref.name or inventory_item.description
+        physical_delta = total_qty - (inventory_item.current_stock or 0)
+        book_delta = total_qty - (
+            inventory_item.book_stock
+            if inventory_item.book_stock is not None
+            else inventory_item.current_stock or 0
+        )
         inventory_item.current_stock = total_qty
         inventory_item.book_stock = total_qty
+        if physical_delta or book_delta or inventory_item.id is None:
+            _post_inventory_ledger(
+                inventory_item,
+                "odoo_snapshot",
+                physical_delta=physical_delta,
+                book_delta=book_delta,
+                reference="Odoo stock snapshot",
+                posted_at=now,
+            )
 
     try:
         db.session.commit()
@@ -15063,6 +16608,25 @@ def inventory_upload():
     return render_template("inventory_upload_result.html", **result)
 
 
+VENDOR_IMPORT_COLUMNS = (
+    "vendor_code",
+    "name",
+    "activities",
+    "city",
+    "country",
+    "email",
+    "phone",
+    "salesperson",
+    "gstin",
+    "address_line1",
+    "address_line2",
+    "pincode",
+    "state",
+    "address",
+    "is_active",
+)
+
+
 @app.route("/purchase/vendors/upload", methods=["POST"])
 @login_required
 def purchase_vendors_upload():
@@ -15143,6 +16707,11 @@ def purchase_vendors_upload():
     created_count = 0
     updated_count = 0
     row_errors = []
+    vendors = BulkUpserter(
+        Vendor,
+        key=lambda values: (values["name"] or "").lower(),
+        columns=VENDOR_IMPORT_COLUMNS,
+    )
 
     for row_index, row_values in enumerate(data_rows or [], start=2):
         if not row_values:
@@ -15193,40 +16762,37 @@ def purchase_vendors_upload():
             row_errors.append(f"Row {row_index}: " + "; ".join(row_issue))
             continue
 
-        vendor = (
-            Vendor.query.filter(func.lower(Vendor.name) == name.lower()).first()
-        )
-        is_new = vendor is None
-        if is_new:
-            vendor = Vendor(name=name)
-            db.session.add(vendor)
-            created_count += 1
-        else:
-            updated_count += 1
-
-        vendor.vendor_code = vendor_code or vendor.vendor_code
-        vendor.name = name
-        vendor.activities = activities
-        vendor.city = city
-        vendor.country = country
-        vendor.email = email_value
-        vendor.phone = phone_value
-        vendor.salesperson = salesperson
-        vendor.gstin = gstin
-        vendor.address_line1 = address_line1
-        vendor.address_line2 = address_line2
-        vendor.pincode = pincode
-        vendor.state = state
-        vendor.is_active = True if vendor.is_active is None else vendor.is_active
-
+        current = vendors.current(name.lower()) or {}
         address_parts = [
             part
             for part in [address_line1, address_line2, city, state, pincode, country]
             if part
         ]
-        vendor.address = ", ".join(address_parts) if address_parts else vendor.address
+        values = {
+            "vendor_code": vendor_code or current.get("vendor_code"),
+            "name": name,
+            "activities": activities,
+            "city": city,
+            "country": country,
+            "email": email_value,
+            "phone": phone_value,
+            "salesperson": salesperson,
+            "gstin": gstin,
+            "address_line1": address_line1,
+            "address_line2": address_line2,
+            "pincode": pincode,
+            "state": state,
+            "address": ", ".join(address_parts) if address_parts else current.get("address"),
+        }
+        if current.get("is_active") is None:
+            values["is_active"] = True
+        if vendors.upsert(values):
+            created_count += 1
+        else:
+            updated_count += 1
 
     try:
+        vendors.flush()
         db.session.commit()
     except Exception:
         db.session.rollback()
@@ -15462,6 +17028,58 @@ def _compute_product_forecast_qty(product: Product) -> float:
     return book_qty + pending_qty
 
 
+def _compute_product_forecast_map(products) -> dict:
+    """``_compute_product_forecast_qty`` for many products in one query."""
+
+    product_ids = [product.id for product in products]
+    if not product_ids:
+        return {}
+    item_rows = (
+        db.session.query(
+            PurchaseOrderItem.product_id,
+            PurchaseOrderItem.part_id,
+            func.coalesce(func.sum(PurchaseOrderItem.quantity_ordered), 0.0).label("ordered_qty"),
+            func.coalesce(
+                func.sum(
+                    case(
+                        (
+                            and_(
+                                InventoryReceipt.status == "Closed",
+                                InventoryReceiptItem.qc_status == "OK",
+                            ),
+                            InventoryReceiptItem.quantity_received,
+                        ),
+                        else_=0.0,
+                    )
+                ),
+                0.0,
+            ).label("received_qty"),
+        )
+        .join(PurchaseOrder, PurchaseOrder.id == PurchaseOrderItem.purchase_order_id)
+        .outerjoin(
+            InventoryReceiptItem,
+            InventoryReceiptItem.purchase_order_item_id == PurchaseOrderItem.id,
+        )
+        .outerjoin(
+            InventoryReceipt,
+            InventoryReceipt.id == InventoryReceiptItem.inventory_receipt_id,
+        )
+        .filter(
+            or_(PurchaseOrderItem.product_id.in_(product_ids), PurchaseOrderItem.part_id.in_(product_ids)),
+            func.lower(PurchaseOrder.status).in_(["issued", "closed"]),
+        )
+        .group_by(PurchaseOrderItem.id)
+        .all()
+    )
+    forecast = {product.id: float(product.qty_on_hand or 0) for product in products}
+    for row in item_rows:
+        pending = max(0.0, float(row.ordered_qty or 0) - float(row.received_qty or 0))
+        for product_id in {row.product_id, row.part_id}:
+            if product_id in forecast:
+                forecast[product_id] += pending
+    return forecast
+
+
 def _normalize_po_status(raw_status):
     cleaned = (raw_status or "").strip()
     lowered = cleaned.lower()
@@ -16999,14 +18617,18 @@ def store_assets():
     if location_filter:
         query = query.filter(OperationalAsset.current_location.ilike(f"%{location_filter}%"))
 
-    assets = query.order_by(OperationalAsset.asset_code.asc()).all()
-    status_counts = {
-        status: OperationalAsset.query.filter_by(status=status).count()
-        for status in ASSET_STATUSES
-    }
+    page = _paginate_list(query, [(OperationalAsset.asset_code, False)], tiebreaker=OperationalAsset.id)
+    if page.cursor and _is_htmx_request():
+        return render_template("_store_asset_rows.html", page=page)
+    counts_by_status = dict(
+        db.session.query(OperationalAsset.status, func.count(OperationalAsset.id))
+        .group_by(OperationalAsset.status)
+        .all()
+    )
+    status_counts = {status: counts_by_status.get(status, 0) for status in ASSET_STATUSES}
     return render_template(
         "store_assets.html",
-        assets=assets,
+        page=page,
         asset_classes=asset_classes,
         asset_types=asset_types,
         asset_locations=AssetLocation.query.filter_by(active=True).order_by(AssetLocation.name.asc()).all(),
@@ -17570,7 +19192,7 @@ def _parse_delivery_order_items(form):
         if not product_name:
             errors.append("Product name is required for each item.")
         else:
-            product_record = Product.query.filter(func.lower(Product.name) == product_name.lower()).first()
+            product_record = Product.query.filter(ci_key(Product.name) == product_name.lower()).first()
             if not product_record:
                 errors.append(f"Product '{product_name}' was not found in Parts master.")
 
@@ -18221,7 +19843,7 @@ def store_receipt_detail(receipt_id):
                             item.item_code = canonical_item_code
 
                         inv = InventoryItem.query.filter(
-                            func.lower(InventoryItem.item_code) == canonical_item_code.lower()
+                            ci_key(InventoryItem.item_code) == canonical_item_code.lower()
                         ).first()
                         if not inv:
                             poi = item.purchase_order_item
@@ -18240,9 +19862,18 @@ def store_receipt_detail(receipt_id):
                         else:
                             inv.quarantined_stock = (inv.quarantined_stock or 0) + qty
                         _initialize_book_stock(inv)
+                        if qc_status == "OK":
+                            _post_inventory_ledger(
+                                inv,
+                                "grn",
+                                physical_delta=qty,
+                                reference=receipt.receipt_number,
+                                source_type="inventory_receipt",
+                                source_id=receipt.id,
+                            )
 
                         book = BookInventory.query.filter(
-                            func.lower(BookInventory.item_code) == canonical_item_code.lower()
+                            ci_key(BookInventory.item_code) == canonical_item_code.lower()
                         ).first()
                         if book:
                             book.quantity_received_total = (book.quantity_received_total or 0) + qty
@@ -18349,104 +19980,57 @@ def store_receipt_detail(receipt_id):
     )
 
 
-def _build_inventory_movements(item):
-    movements = []
-    item_code = (item.item_code or "").lower()
+def _inventory_ledger_label(entry):
+    if entry.entry_type == "adjustment":
+        if entry.physical_delta and entry.book_delta:
+            kind = "both"
+        elif entry.book_delta:
+            kind = "book"
+        else:
+            kind = "physical"
+        return f"Stock Adjustment ({kind})"
+    return INVENTORY_LEDGER_LABELS.get(entry.entry_type, entry.entry_type)
 
-    receipts = (
-        db.session.query(InventoryReceiptItem, InventoryReceipt)
-        .join(InventoryReceipt, InventoryReceipt.id == InventoryReceiptItem.inventory_receipt_id)
-        .filter(func.lower(InventoryReceiptItem.item_code) == item_code)
-        .all()
-    )
-    for receipt_item, receipt in receipts:
-        qc_status = (receipt_item.qc_status or "").strip().lower()
-        if qc_status and qc_status != "ok":
-            continue
-        qty = receipt_item.quantity_received or 0
-        timestamp = receipt.received_date
-        if isinstance(timestamp, datetime.date) and not isinstance(timestamp, datetime.datetime):
-            timestamp = datetime.datetime.combine(
-                timestamp, datetime.datetime.min.time()
-            )
-        timestamp = timestamp or datetime.datetime.min
-        movements.append(
-            {
-                "timestamp": timestamp,
-                "movement_type": "GRN",
-                "physical_delta": qty,
-                "book_delta": 0,
-                "reference": receipt.receipt_number if receipt else None,
-                "source_url": url_for("store_receive"),
-            }
-        )
 
-    dispatches = (
-        db.session.query(DeliveryChallanItem, DeliveryChallan)
-        .join(DeliveryChallan, DeliveryChallan.id == DeliveryChallanItem.delivery_challan_id)
-        .filter(func.lower(DeliveryChallanItem.item_code) == item_code)
-        .filter(DeliveryChallan.is_completed.is_(True))
-        .all()
-    )
-    for dispatch_item, dispatch in dispatches:
-        qty = -(dispatch_item.qty_delivered or 0)
-        timestamp = (
-            dispatch.delivered_at
-            or dispatch.completed_at
-            or (
-                datetime.datetime.combine(
-                    dispatch.dispatch_date, datetime.datetime.min.time()
-                )
-                if dispatch.dispatch_date
-                else None
-            )
-            or dispatch.created_at
-            or datetime.datetime.min
-        )
-        book_delta = qty if not dispatch.delivery_order_id else 0
-        movements.append(
-            {
-                "timestamp": timestamp,
-                "movement_type": "Delivery Challan",
-                "physical_delta": qty,
-                "book_delta": book_delta,
-                "reference": dispatch.dc_number,
-                "source_url": url_for("store_dispatch"),
-            }
-        )
+def _inventory_ledger_source_url(entry):
+    if entry.source_type == "inventory_receipt" and entry.source_id:
+        return url_for("store_receipt_detail", receipt_id=entry.source_id)
+    if entry.source_type == "dispatch":
+        return url_for("store_dispatch")
+    return None
 
-    adjustments = (
-        StockAdjustment.query.filter_by(inventory_item_id=item.id)
-        .order_by(StockAdjustment.created_at)
-        .all()
+
+def _build_inventory_movements(item, start=None, end=None):
+    """Read an item's movements from the ledger, optionally within a date range."""
+
+    query = InventoryLedgerEntry.query.filter(
+        InventoryLedgerEntry.inventory_item_id == item.id,
+        InventoryLedgerEntry.entry_type != "checkpoint",
     )
-    for adjustment in adjustments:
-        physical_delta = (adjustment.new_physical_stock or 0) - (
-            adjustment.old_physical_stock or 0
-        )
-        book_delta = (adjustment.new_book_stock or 0) - (
-            adjustment.old_book_stock or 0
+    if start:
+        query = query.filter(
+            InventoryLedgerEntry.posted_at >= datetime.datetime.combine(start, datetime.time.min)
         )
-        movements.append(
-            {
-                "timestamp": adjustment.created_at or datetime.datetime.min,
-                "movement_type": f"Stock Adjustment ({adjustment.adjustment_type})",
-                "physical_delta": physical_delta,
-                "book_delta": book_delta,
-                "reference": adjustment.reason,
-                "source_url": None,
-            }
+    if end:
+        query = query.filter(
+            InventoryLedgerEntry.posted_at <= datetime.datetime.combine(end, datetime.time.max)
         )
-
-    movements.sort(key=lambda entry: entry["timestamp"])
-    running_physical = (item.current_stock or 0) - sum(
-        move.get("physical_delta", 0) for move in movements
-    )
-    for move in movements:
-        running_physical += move.get("physical_delta", 0)
-        move["updated_physical"] = running_physical
-
-    return movements
+    entries = query.order_by(
+        InventoryLedgerEntry.posted_at, InventoryLedgerEntry.id
+    ).all()
+    return [
+        {
+            "timestamp": entry.posted_at,
+            "movement_type": _inventory_ledger_label(entry),
+            "physical_delta": entry.physical_delta or 0,
+            "book_delta": entry.book_delta or 0,
+            "updated_physical": entry.physical_balance,
+            "updated_book": entry.book_balance,
+            "reference": entry.reference,
+            "source_url": _inventory_ledger_source_url(entry),
+        }
+        for entry in entries
+    ]
 
 
 @app.route("/store/inventory")
@@ -18454,19 +20038,14 @@ def _build_inventory_movements(item):
 def store_inventory():
     ensure_bootstrap()
     inventory_flags = _get_inventory_control()
-    _sync_inventory_with_products()
-    _merge_legacy_inventory_item_keys()
     items = (
         InventoryItem.query.join(
             Product,
-            func.lower(Product.sku) == func.lower(InventoryItem.item_code),
+            ci_key(Product.sku) == ci_key(InventoryItem.item_code),
         )
         .order_by(InventoryItem.item_code)
         .all()
     )
-    for item in items:
-        if item.book_stock is None:
-            item.book_stock = item.current_stock or 0
     total_items = len(items)
     quarantined_items = [item for item in items if (item.quarantined_stock or 0) > 0]
     quarantined_count = len(quarantined_items)
@@ -18552,9 +20131,22 @@ def adjust_inventory_item(item_id):
             created_at=datetime.datetime.utcnow(),
         )
         db.session.add(adjustment)
+        db.session.flush()
 
+        physical_delta = new_physical - (item.current_stock or 0)
+        book_delta = new_book - adjustment.old_book_stock
         item.current_stock = new_physical
         item.book_stock = new_book
+        _post_inventory_ledger(
+            item,
+            "adjustment",
+            physical_delta=physical_delta,
+            book_delta=book_delta,
+            reference=reason,
+            source_type="stock_adjustment",
+            source_id=adjustment.id,
+            posted_at=adjustment.created_at,
+        )
 
         try:
             db.session.commit()
@@ -18575,13 +20167,23 @@ def adjust_inventory_item(item_id):
 def inventory_item_movements(item_id):
     ensure_bootstrap()
     item = InventoryItem.query.filter_by(id=item_id).first_or_404()
-    movements = _build_inventory_movements(item)
+    start = parse_optional_date(request.args.get("start"))
+    end = parse_optional_date(request.args.get("end"))
+    as_of = parse_optional_date(request.args.get("as_of"))
+    movements = _build_inventory_movements(item, start=start, end=end)
+    stock_as_of = None
+    if as_of:
+        stock_as_of = inventory_stock_as_of(as_of, [item.id]).get(item.id)
     can_adjust = _current_role_key() in {"admin", "store"}
     return render_template(
         "inventory_movements.html",
         item=item,
         movements=movements,
         can_adjust=can_adjust,
+        start=start,
+        end=end,
+        as_of=as_of,
+        stock_as_of=stock_as_of,
     )
 
 
@@ -18594,9 +20196,50 @@ def inventory_snapshot():
             InventoryStock.product_name, InventoryStock.location
         ).all()
     )
+    snapshot_taken_at = max(
+        (record.last_updated for record in records if record.last_updated),
+        default=None,
+    )
+    odoo_totals = OrderedDict()
+    for record in records:
+        odoo_totals[record.product_name] = odoo_totals.get(record.product_name, 0) + (record.quantity or 0)
+    items_by_name = {}
+    if odoo_totals:
+        for inventory_item in InventoryItem.query.filter(
+            InventoryItem.description.in_(list(odoo_totals)),
+            InventoryItem.merged_into_id.is_(None),
+        ):
+            items_by_name.setdefault(inventory_item.description, inventory_item)
+    balances_at_snapshot = {}
+    if snapshot_taken_at and items_by_name:
+        balances_at_snapshot = inventory_stock_as_of(
+            snapshot_taken_at, [inventory_item.id for inventory_item in items_by_name.values()]
+        )
+    reconciliation = []
+    for product_name, odoo_qty in odoo_totals.items():
+        inventory_item = items_by_name.get(product_name)
+        at_snapshot = None
+        if inventory_item is not None:
+            at_snapshot = balances_at_snapshot.get(inventory_item.id, (None, None))[0]
+        current = (inventory_item.current_stock or 0) if inventory_item is not None else None
+        reconciliation.append(
+            {
+                "product_name": product_name,
+                "item": inventory_item,
+                "odoo_qty": odoo_qty,
+                "erp_at_snapshot": at_snapshot,
+                "variance": None if at_snapshot is None else at_snapshot - odoo_qty,
+                "erp_current": current,
+                "moved_since": (
+                    None if at_snapshot is None or current is None else current - at_snapshot
+                ),
+            }
+        )
     return render_template(
         "inventory_snapshot.html",
         records=records,
+        reconciliation=reconciliation,
+        snapshot_taken_at=snapshot_taken_at,
         inventory_flags=_get_inventory_control(),
     )
 
@@ -18612,7 +20255,11 @@ def store_dispatch():
         return redirect(url_for("store_dispatch"))
 
     projects = Project.query.order_by(Project.name).all()
-    inventory = InventoryItem.query.order_by(InventoryItem.item_code).all()
+    inventory = (
+        InventoryItem.query.filter(InventoryItem.merged_into_id.is_(None))
+        .order_by(InventoryItem.item_code)
+        .all()
+    )
 
     dispatches = (
         DeliveryChallan.query.options(
@@ -18720,7 +20367,7 @@ def _dispatch_stock_shortfalls(dispatch):
     shortfalls = []
     for item_code, required_qty in required_by_code.items():
         inv = InventoryItem.query.filter(
-            func.lower(InventoryItem.item_code) == item_code.lower()
+            ci_key(InventoryItem.item_code) == item_code.lower()
         ).first()
         available_qty = float((inv.current_stock if inv else 0) or 0)
         if required_qty > available_qty:
@@ -18777,16 +20424,26 @@ def complete_dispatch(dispatch_id):
             item.item_code = canonical_item_code
 
         inv = InventoryItem.query.filter(
-            func.lower(InventoryItem.item_code) == canonical_item_code.lower()
+            ci_key(InventoryItem.item_code) == canonical_item_code.lower()
         ).first()
         if not inv:
             continue
         if linked_product and linked_product.name:
             inv.description = linked_product.name
         _initialize_book_stock(inv)
+        old_book = inv.book_stock or 0
         inv.current_stock = (inv.current_stock or 0) - (item.qty_delivered or 0)
         if not dispatch.delivery_order_id:
             inv.book_stock = (inv.book_stock or inv.current_stock or 0) - (item.qty_delivered or 0)
+        _post_inventory_ledger(
+            inv,
+            "challan",
+            physical_delta=-(item.qty_delivered or 0),
+            book_delta=(inv.book_stock or 0) - old_book,
+            reference=dispatch.dc_number,
+            source_type="dispatch",
+            source_id=dispatch.id,
+        )
 
         if dispatch.delivery_order_id and item.delivery_order_item_id:
             doi = DeliveryOrderItem.query.filter_by(id=item.delivery_order_item_id).first()
@@ -19676,6 +21333,7 @@ def ensure_tables():
         Customer.__table__,
         CustomerComment.__table__,
         Lift.__table__,
+        ServiceVisit.__table__,
         LiftFile.__table__,
         LiftComment.__table__,
         DropdownOption.__table__,
@@ -19688,6 +21346,10 @@ def ensure_tables():
         SectionGuide.__table__,
         CallLog.__table__,
         CallRecording.__table__,
+        SupportTicket.__table__,
+        SupportTicketComment.__table__,
+        SupportTicketLinkedTask.__table__,
+        SupportCallLog.__table__,
         DesignTask.__table__,
         DesignTaskComment.__table__,
         DesignDrawing.__table__,
@@ -19721,6 +21383,10 @@ def ensure_tables():
         InventoryItem.__table__,
         InventoryStock.__table__,
         StockAdjustment.__table__,
+        InventoryLedgerEntry.__table__,
+        BackgroundJob.__table__,
+        ReferenceDataVersion.__table__,
+        PushEvent.__table__,
         AssetClass.__table__,
         AssetType.__table__,
         AssetLocation.__table__,
@@ -19879,6 +21545,7 @@ def ensure_bom_template_table():
             ("is_active", "INTEGER DEFAULT 1"),
             ("created_at", "DATETIME"),
             ("created_by_id", "INTEGER"),
+            ("updated_at", "DATETIME"),
         ],
     )
 
@@ -21550,10 +23217,37 @@ def ensure_procurement_stage_seed():
 
 
 def _get_active_procurement_stages(include_inactive=False):
-    query = ProcurementStage.query
-    if not include_inactive:
-        query = query.filter(ProcurementStage.is_active.is_(True))
-    return query.order_by(ProcurementStage.sequence.asc(), ProcurementStage.name.asc()).all()
+    stages = reference_cache.get(
+        "procurement_stages",
+        ("procurement_stage",),
+        lambda: snapshot(
+            ProcurementStage.query.order_by(ProcurementStage.sequence.asc(), ProcurementStage.name.asc())
+        ),
+    )
+    if include_inactive:
+        return stages
+    return [stage for stage in stages if stage.is_active]
+
+
+def _get_service_routes():
+    """Every service route (state, then branch) as cached snapshots."""
+    return reference_cache.get(
+        "service_routes",
+        ("service_route",),
+        lambda: snapshot(
+            ServiceRoute.query.order_by(ci_key(ServiceRoute.state), func.lower(ServiceRoute.branch)),
+            properties=("display_name", "route_name"),
+        ),
+    )
+
+
+def _get_vendor_choices():
+    """Every vendor ordered by name as cached snapshots (for pickers and lookups)."""
+    return reference_cache.get(
+        "vendors",
+        ("vendor",),
+        lambda: snapshot(Vendor.query.order_by(Vendor.name)),
+    )
 
 
 def _get_default_procurement_stage():
@@ -21629,7 +23323,7 @@ def ensure_workspace_module_permission_keys():
     return any_changed
 
 
-def bootstrap_db():
+def _schema_step_baseline_tables():
     ensure_tables()
     ensure_section_guide_table()
     ensure_inventory_item_columns()
@@ -21674,13 +23368,18 @@ def bootstrap_db():
     ensure_customer_columns()
     ensure_vendor_columns()
     ensure_product_columns()
-    _merge_legacy_inventory_item_keys()
+
+
+def _schema_step_bom_template_tables():
     ensure_part_class_table()
     ensure_bom_template_table()
     ensure_bom_template_input_table()
     ensure_bom_template_stage_table()
     ensure_bom_template_section_table()
     ensure_bom_template_line_table()
+
+
+def _schema_step_reference_data_seed():
     ensure_procurement_stage_seed()
     ensure_section_guides_seed()
     ensure_dropdown_options_seed()
@@ -21688,10 +23387,13 @@ def bootstrap_db():
     ensure_client_requirement_template_seed()
     seeded_org_structure = ensure_default_org_structure_seed()
     purge_legacy_demo_records()
+    db.session.commit()
+    if seeded_org_structure:
+        backup_org_structure()
 
-    migrate_plaintext_passwords()
 
-    admin_user = User.query.filter(func.lower(User.username) == "admin").first()
+def _schema_step_default_accounts_and_samples():
+    admin_user = User.query.filter(ci_key(User.username) == "admin").first()
     if User.query.count() == 0:
         admin_password = os.environ.get("DEFAULT_ADMIN_PASSWORD")
         generated_password = False
@@ -21753,9 +23455,6 @@ def bootstrap_db():
         )
         db.session.add(ni_template)
 
-    if SalesClient.query.count() == 0:
-        pass
-
     if ServiceRoute.query.count() == 0:
         default_routes = [
             ("Goa", "Goa"),
@@ -21766,16 +23465,340 @@ def bootstrap_db():
             db.session.add(ServiceRoute(state=state_name, branch=branch_name))
         db.session.flush()
 
-    if Customer.query.count() == 0:
-        pass
+    db.session.commit()
+    synchronize_dependency_links()
+
+
+def _schema_step_customer_support_tables():
+    for table in (
+        SupportTicket.__table__,
+        SupportTicketComment.__table__,
+        SupportTicketLinkedTask.__table__,
+        SupportCallLog.__table__,
+    ):
+        table.create(bind=db.engine, checkfirst=True)
+    imported_tickets, imported_calls = import_customer_support_json()
+    if imported_tickets or imported_calls:
+        print(
+            f"✅ Imported {imported_tickets} support ticket(s) and "
+            f"{imported_calls} call log(s) from {CUSTOMER_SUPPORT_DATA_PATH}"
+        )
 
-    if Lift.query.count() == 0:
-        pass
 
+def _schema_step_service_visit_table():
+    ServiceVisit.__table__.create(bind=db.engine, checkfirst=True)
+    lifts = (
+        Lift.query.filter(
+            Lift.service_schedule_json.isnot(None),
+            ~Lift.service_visits.any(),
+        )
+        .options(load_only(Lift.id, Lift.service_schedule_json))
+        .all()
+    )
+    migrated = 0
+    for lift in lifts:
+        try:
+            entries = json.loads(lift.service_schedule_json)
+        except (TypeError, ValueError):
+            continue
+        if not isinstance(entries, list):
+            continue
+        lift.service_schedule = entries
+        migrated += 1
+        if migrated % 500 == 0:
+            db.session.commit()
     db.session.commit()
-    if seeded_org_structure:
-        backup_org_structure()
-    synchronize_dependency_links()
+    if migrated:
+        print(f"✅ Moved service schedules of {migrated} lift(s) into service_visit")
+
+
+def _schema_step_bom_template_updated_at():
+    ensure_bom_template_table()
+    db.session.execute(
+        text(
+            "UPDATE bom_template SET updated_at = COALESCE(created_at, :now) "
+            "WHERE updated_at IS NULL"
+        ),
+        {"now": datetime.datetime.utcnow()},
+    )
+    db.session.commit()
+
+
+def _legacy_inventory_movements():
+    """Collect pre-ledger movements per inventory item id from their source tables."""
+
+    item_ids_by_code = {
+        clean_str(code).lower(): item_id
+        for item_id, code in db.session.query(InventoryItem.id, InventoryItem.item_code)
+    }
+    movements = defaultdict(list)
+
+    receipt_rows = (
+        db.session.query(InventoryReceiptItem, InventoryReceipt)
+        .join(InventoryReceipt, InventoryReceipt.id == InventoryReceiptItem.inventory_receipt_id)
+        .filter(
+            or_(
+                InventoryReceipt.inventory_posted_at.isnot(None),
+                InventoryReceipt.status == "Closed",
+            )
+        )
+    )
+    for receipt_item, receipt in receipt_rows:
+        item_id = item_ids_by_code.get(clean_str(receipt_item.item_code).lower())
+        qty = int(receipt_item.quantity_received or 0)
+        if item_id is None or qty <= 0:
+            continue
+        if clean_str(receipt_item.qc_status).upper() != "OK":
+            continue
+        posted_at = receipt.inventory_posted_at or receipt.closed_at or receipt.received_date
+        if isinstance(posted_at, datetime.date) and not isinstance(posted_at, datetime.datetime):
+            posted_at = datetime.datetime.combine(posted_at, datetime.time.min)
+        movements[item_id].append(
+            (posted_at or datetime.datetime(2000, 1, 1), "grn", qty, 0,
+             receipt.receipt_number, "inventory_receipt", receipt.id)
+        )
+
+    dispatch_rows = (
+        db.session.query(DeliveryChallanItem, DeliveryChallan)
+        .join(DeliveryChallan, DeliveryChallan.id == DeliveryChallanItem.delivery_challan_id)
+        .filter(DeliveryChallan.is_completed.is_(True))
+    )
+    for dispatch_item, dispatch in dispatch_rows:
+        item_id = item_ids_by_code.get(clean_str(dispatch_item.item_code).lower())
+        if item_id is None:
+            continue
+        qty = -(dispatch_item.qty_delivered or 0)
+        posted_at = (
+            dispatch.delivered_at
+            or dispatch.completed_at
+            or (
+                datetime.datetime.combine(dispatch.dispatch_date, datetime.time.min)
+                if dispatch.dispatch_date
+                else None
+            )
+            or dispatch.created_at
+            or datetime.datetime(2000, 1, 1)
+        )
+        book_delta = qty if not dispatch.delivery_order_id else 0
+        movements[item_id].append(
+            (posted_at, "challan", qty, book_delta, dispatch.dc_number, "dispatch", dispatch.id)
+        )
+
+    for adjustment in StockAdjustment.query:
+        physical_delta = (adjustment.new_physical_stock or 0) - (adjustment.old_physical_stock or 0)
+        book_delta = (adjustment.new_book_stock or 0) - (adjustment.old_book_stock or 0)
+        movements[adjustment.inventory_item_id].append(
+            (adjustment.created_at or datetime.datetime(2000, 1, 1), "adjustment",
+             physical_delta, book_delta, adjustment.reason, "stock_adjustment", adjustment.id)
+        )
+    return movements
+
+
+def _backfill_inventory_ledger():
+    """Seed ledger rows for items that have none, back-computing running balances."""
+
+    # Items whose only rows are legacy-key merges (step 0002 runs first) still
+    # need their GRN/challan history; the merge deltas are part of the balance.
+    ledgered = {
+        item_id
+        for (item_id,) in db.session.query(InventoryLedgerEntry.inventory_item_id)
+        .filter(InventoryLedgerEntry.entry_type.notin_(("merge", "checkpoint")))
+        .distinct()
+    }
+    merged_deltas = {
+        item_id: (physical or 0, book or 0)
+        for item_id, physical, book in db.session.query(
+            InventoryLedgerEntry.inventory_item_id,
+            func.sum(InventoryLedgerEntry.physical_delta),
+            func.sum(InventoryLedgerEntry.book_delta),
+        )
+        .filter(InventoryLedgerEntry.entry_type == "merge")
+        .group_by(InventoryLedgerEntry.inventory_item_id)
+    }
+    stock_by_id = {
+        item_id: (current or 0, book if book is not None else current or 0)
+        for item_id, current, book in db.session.query(
+            InventoryItem.id, InventoryItem.current_stock, InventoryItem.book_stock
+        )
+    }
+    rows = []
+    for item_id, movements in _legacy_inventory_movements().items():
+        if item_id in ledgered or item_id not in stock_by_id:
+            continue
+        movements.sort(key=lambda move: move[0])
+        physical, book = stock_by_id[item_id]
+        merged_physical, merged_book = merged_deltas.get(item_id, (0, 0))
+        physical -= sum(move[2] for move in movements) + merged_physical
+        book -= sum(move[3] for move in movements) + merged_book
+        current_month = None
+        for posted_at, entry_type, physical_delta, book_delta, reference, source_type, source_id in movements:
+            month_start = _month_start(posted_at)
+            if month_start != current_month:
+                current_month = month_start
+                rows.append(
+                    {
+                        "inventory_item_id": item_id,
+                        "posted_at": month_start,
+                        "entry_type": "checkpoint",
+                        "physical_delta": 0,
+                        "book_delta": 0,
+                        "physical_balance": physical,
+                        "book_balance": book,
+                        "reference": None,
+                        "source_type": None,
+                        "source_id": None,
+                    }
+                )
+            physical += physical_delta
+            book += book_delta
+            rows.append(
+                {
+                    "inventory_item_id": item_id,
+                    "posted_at": posted_at,
+                    "entry_type": entry_type,
+                    "physical_delta": physical_delta,
+                    "book_delta": book_delta,
+                    "physical_balance": physical,
+                    "book_balance": book,
+                    "reference": (reference or None) and str(reference)[:255],
+                    "source_type": source_type,
+                    "source_id": source_id,
+                }
+            )
+    for chunk_start in range(0, len(rows), 500):
+        db.session.execute(
+            InventoryLedgerEntry.__table__.insert(), rows[chunk_start:chunk_start + 500]
+        )
+    db.session.commit()
+    return len(rows)
+
+
+def _schema_step_inventory_ledger():
+    InventoryLedgerEntry.__table__.create(bind=db.engine, checkfirst=True)
+    seeded = _backfill_inventory_ledger()
+    if seeded:
+        print(f"✅ Seeded {seeded} inventory ledger row(s) from receipts, challans and adjustments")
+
+
+def _schema_step_background_job_table():
+    BackgroundJob.__table__.create(bind=db.engine, checkfirst=True)
+
+
+def _schema_step_search_index():
+    if not create_search_index(db.session.connection()):
+        db.session.rollback()
+        print("⚠️ Global search uses LIKE filters (database has no SQLite FTS5 support)")
+        return
+    counts = rebuild_search_index()
+    print(f"✅ Indexed {sum(counts.values())} record(s) for global search")
+
+
+def _schema_step_case_insensitive_keys():
+    created = ensure_case_insensitive_keys()
+    if created:
+        print(f"✅ Added {len(created)} case-insensitive lookup index(es)")
+
+
+def _schema_step_reference_data_versions():
+    ReferenceDataVersion.__table__.create(bind=db.engine, checkfirst=True)
+    seeded = seed_reference_versions()
+    if seeded:
+        print(f"✅ Tracking cache versions for {seeded} reference table(s)")
+
+
+def _schema_step_push_event_table():
+    PushEvent.__table__.create(bind=db.engine, checkfirst=True)
+
+
+def _schema_step_inventory_item_merged_into():
+    columns = {column["name"] for column in inspect(db.engine).get_columns("inventory_item")}
+    if "merged_into_id" not in columns:
+        db.session.execute(
+            text(
+                "ALTER TABLE inventory_item ADD COLUMN merged_into_id INTEGER "
+                "REFERENCES inventory_item(id)"
+            )
+        )
+        db.session.commit()
+
+
+def _schema_step_merge_legacy_inventory_item_keys():
+    # Legacy databases reach this step before step 16; the merge needs its column.
+    _schema_step_inventory_item_merged_into()
+    _merge_legacy_inventory_item_keys()
+
+
+# Numbered schema/data steps. Each step runs once per database and is recorded
+# in the ``schema_migration`` ledger; append new steps with the next version
+# number instead of adding calls to a startup sweep.
+SCHEMA_MIGRATIONS = [
+    (1, "baseline_tables_and_columns", _schema_step_baseline_tables),
+    (2, "merge_legacy_inventory_item_keys", _schema_step_merge_legacy_inventory_item_keys),
+    (3, "bom_template_tables", _schema_step_bom_template_tables),
+    (4, "reference_data_seed", _schema_step_reference_data_seed),
+    (5, "hash_plaintext_passwords", migrate_plaintext_passwords),
+    (6, "default_accounts_and_samples", _schema_step_default_accounts_and_samples),
+    (7, "customer_support_tables", _schema_step_customer_support_tables),
+    (8, "service_visit_table", _schema_step_service_visit_table),
+    (9, "bom_template_updated_at", _schema_step_bom_template_updated_at),
+    (10, "inventory_ledger", _schema_step_inventory_ledger),
+    (11, "background_job_table", _schema_step_background_job_table),
+    (12, "search_index", _schema_step_search_index),
+    (13, "case_insensitive_key_indexes", _schema_step_case_insensitive_keys),
+    (14, "reference_data_versions", _schema_step_reference_data_versions),
+    (15, "push_event_table", _schema_step_push_event_table),
+    (16, "inventory_item_merged_into", _schema_step_inventory_item_merged_into),
+]
+LATEST_SCHEMA_VERSION = max(version for version, _, _ in SCHEMA_MIGRATIONS)
+
+
+def get_schema_version():
+    """Return the highest applied migration version (0 for an unmanaged DB)."""
+    try:
+        version = db.session.query(func.max(SchemaMigration.version)).scalar()
+    except SQLAlchemyError:
+        db.session.rollback()
+        return 0
+    return version or 0
+
+
+def pending_schema_migrations():
+    try:
+        applied = {row[0] for row in db.session.query(SchemaMigration.version).all()}
+    except SQLAlchemyError:
+        db.session.rollback()
+        applied = set()
+    return [step for step in SCHEMA_MIGRATIONS if step[0] not in applied]
+
+
+def apply_schema_migrations():
+    """Run every pending migration step in order and record it in the ledger."""
+    SchemaMigration.__table__.create(bind=db.engine, checkfirst=True)
+    applied = []
+    for version, name, step in pending_schema_migrations():
+        started = time.perf_counter()
+        step()
+        duration_ms = int((time.perf_counter() - started) * 1000)
+        db.session.add(
+            SchemaMigration(version=version, name=name, duration_ms=duration_ms)
+        )
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # Another worker recorded the same step first; the steps are
+            # idempotent so there is nothing to undo.
+            db.session.rollback()
+            print(f"ℹ️ Schema migration {version:04d} {name} already applied by another process")
+            continue
+        print(f"✅ Applied schema migration {version:04d} {name} ({duration_ms} ms)")
+        applied.append((version, name))
+    return applied
+
+
+def bootstrap_db():
+    return apply_schema_migrations()
+
+
 # -----------------------------------------------------------------------
 
 
@@ -22173,7 +24196,7 @@ def settings_service_route_create():
         remark_value = remark_value[:255]
         flash("Remark exceeded 255 characters and was truncated.", "warning")
 
-    existing = ServiceRoute.query.filter(func.lower(ServiceRoute.state) == route_name.lower()).first()
+    existing = ServiceRoute.query.filter(ci_key(ServiceRoute.state) == route_name.lower()).first()
     if existing:
         flash("A route with that name already exists.", "error")
         return _service_settings_redirect()
@@ -22211,7 +24234,7 @@ def settings_service_route_update(route_id):
         flash("Remark exceeded 255 characters and was truncated.", "warning")
 
     duplicate = (
-        ServiceRoute.query.filter(func.lower(ServiceRoute.state) == route_name.lower(), ServiceRoute.id != route.id)
+        ServiceRoute.query.filter(ci_key(ServiceRoute.state) == route_name.lower(), ServiceRoute.id != route.id)
         .first()
     )
     if duplicate:
@@ -23378,15 +25401,30 @@ def sales_settings():
 @login_required
 def sales_clients():
     _module_visibility_required("sales")
-    clients = (
-        SalesClient.query
-        .order_by(SalesClient.display_name.asc())
-        .all()
+    search_query = (request.args.get("q") or "").strip()
+    query = SalesClient.query.options(
+        joinedload(SalesClient.owner),
+        selectinload(SalesClient.opportunities),
     )
+    if search_query:
+        like = f"%{search_query.lower()}%"
+        query = query.filter(
+            or_(
+                func.lower(SalesClient.display_name).like(like),
+                func.lower(SalesClient.company_name).like(like),
+                func.lower(SalesClient.email).like(like),
+                func.lower(SalesClient.phone).like(like),
+            )
+        )
+    page = _paginate_list(query, [(SalesClient.display_name, False)], tiebreaker=SalesClient.id)
+    if page.cursor and _is_htmx_request():
+        return render_template("sales/_client_rows.html", page=page)
+
     companies = SalesCompany.query.order_by(func.lower(SalesCompany.name)).all()
     return render_template(
         "sales/clients_list.html",
-        clients=clients,
+        page=page,
+        search_query=search_query,
         companies=companies,
         pipeline_map=SALES_PIPELINES,
         temperature_choices=SALES_TEMPERATURES,
@@ -23398,29 +25436,15 @@ def sales_clients():
 def sales_clients_export():
     _module_visibility_required("sales")
 
-    clients = SalesClient.query.order_by(SalesClient.display_name.asc()).all()
+    clients = SalesClient.query.options(joinedload(SalesClient.owner)).order_by(
+        SalesClient.display_name.asc()
+    )
     timestamp = datetime.datetime.utcnow().strftime("%Y%m%d")
-    filename = f"sales_clients_{timestamp}.xlsx"
-
-    if OPENPYXL_AVAILABLE:
-        workbook = build_sales_client_export_workbook(clients)
-        output = BytesIO()
-        workbook.save(output)
-        output.seek(0)
-        return send_file(
-            output,
-            as_attachment=True,
-            download_name=filename,
-            mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        )
-
-    csv_rows = [_sales_client_upload_row(client) for client in clients]
-    csv_output = _build_csv_output(SALES_CLIENT_UPLOAD_HEADERS, csv_rows)
-    return send_file(
-        csv_output,
-        as_attachment=True,
-        download_name=filename.replace(".xlsx", ".csv"),
-        mimetype="text/csv",
+    return export_response(
+        f"sales_clients_{timestamp}.xlsx",
+        SALES_CLIENT_UPLOAD_HEADERS,
+        iter_export_rows(clients, _sales_client_upload_row),
+        sheet_title=SALES_CLIENT_TEMPLATE_SHEET_NAME,
     )
 
 
@@ -24001,33 +26025,17 @@ def sales_opportunities_export(pipeline_key):
 
     opportunities = (
         SalesOpportunity.query
+        .options(joinedload(SalesOpportunity.owner), joinedload(SalesOpportunity.client))
         .filter(SalesOpportunity.pipeline == pipeline_key)
         .order_by(SalesOpportunity.stage.asc(), SalesOpportunity.updated_at.desc())
-        .all()
     )
 
     timestamp = datetime.datetime.utcnow().strftime("%Y%m%d")
-    filename = f"sales_opportunities_{pipeline_key}_{timestamp}.xlsx"
-
-    if OPENPYXL_AVAILABLE:
-        workbook = build_sales_opportunity_export_workbook(opportunities)
-        output = BytesIO()
-        workbook.save(output)
-        output.seek(0)
-        return send_file(
-            output,
-            as_attachment=True,
-            download_name=filename,
-            mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        )
-
-    csv_rows = [_sales_opportunity_upload_row(opp) for opp in opportunities]
-    csv_output = _build_csv_output(SALES_OPPORTUNITY_UPLOAD_HEADERS, csv_rows)
-    return send_file(
-        csv_output,
-        as_attachment=True,
-        download_name=filename.replace(".xlsx", ".csv"),
-        mimetype="text/csv",
+    return export_response(
+        f"sales_opportunities_{pipeline_key}_{timestamp}.xlsx",
+        SALES_OPPORTUNITY_UPLOAD_HEADERS,
+        iter_export_rows(opportunities, _sales_opportunity_upload_row),
+        sheet_title=SALES_OPPORTUNITY_TEMPLATE_SHEET_NAME,
     )
 
 
@@ -25900,7 +27908,7 @@ def sales_opportunity_close(opportunity_id):
                     **actor_info,
                 }
             )
-            _save_customer_support_state()
+            _save_customer_support_ticket(linked_ticket)
             ticket_closed = True
 
     if projects:
@@ -26284,6 +28292,228 @@ def admin_ui_audit():
     )
 
 
+def _perf_table(headers, rows, empty_message):
+    head = "".join(f"<th>{html.escape(header)}</th>" for header in headers)
+    if rows:
+        body = "\n".join(
+            "<tr>" + "".join(f"<td>{cell}</td>" for cell in row) + "</tr>" for row in rows
+        )
+    else:
+        body = f"<tr><td colspan=\"{len(headers)}\">{html.escape(empty_message)}</td></tr>"
+    return f"<table><thead><tr>{head}</tr></thead><tbody>{body}</tbody></table>"
+
+
+def _perf_repeated_markup(record):
+    if not record["repeated"]:
+        return "—"
+    return "<br>".join(
+        f"<span class=\"bad\">{item['count']}×</span> {item['db_ms']} ms "
+        f"<code>{html.escape(item['fingerprint'][:240])}</code>"
+        for item in record["repeated"]
+    )
+
+
+def _perf_request_rows(records):
+    return [
+        [
+            html.escape(record["method"]),
+            html.escape(record["path"]),
+            str(record["status"]),
+            f"{record['duration_ms']:.1f}",
+            str(record["query_count"]),
+            f"{record['db_ms']:.1f}",
+            "".join(f"<span class=\"bad\">{html.escape(flag)}</span> " for flag in record["flags"]) or "—",
+            _perf_repeated_markup(record),
+        ]
+        for record in records
+    ]
+
+
+@app.route("/admin/perf", methods=["GET", "POST"])
+@login_required
+def admin_perf():
+    _require_admin()
+    if request.method == "POST":
+        action = (request.form.get("action") or "").strip()
+        if action == "enable":
+            app.config["SQL_PROFILING_ENABLED"] = True
+        elif action == "disable":
+            app.config["SQL_PROFILING_ENABLED"] = False
+        elif action == "reset":
+            sql_profiler.reset()
+        return redirect(url_for("admin_perf"))
+
+    snapshot = sql_profiler.snapshot()
+    enabled = bool(app.config.get("SQL_PROFILING_ENABLED"))
+    request_headers = ["Method", "Path", "Status", "Total ms", "Queries", "DB ms", "Flags", "Repeated statements"]
+    route_rows = [
+        [
+            html.escape(stats["method"]),
+            html.escape(stats["route"]),
+            str(stats["requests"]),
+            str(stats["flagged"]),
+            str(stats["avg_queries"]),
+            str(stats["max_queries"]),
+            f"{stats['avg_db_ms']:.1f}",
+            f"{stats['max_duration_ms']:.1f}",
+        ]
+        for stats in snapshot["routes"]
+    ]
+    csrf_field = f"<input type=\"hidden\" name=\"csrf_token\" value=\"{html.escape(generate_csrf())}\">"
+    toggle_action = "disable" if enabled else "enable"
+    thresholds = (
+        f"Flags: more than {app.config['SQL_PROFILING_MAX_QUERIES']} queries, "
+        f"more than {app.config['SQL_PROFILING_MAX_DB_MS']} ms in the database, or one statement "
+        f"repeated {app.config['SQL_PROFILING_REPEAT_THRESHOLD']}+ times (n_plus_one)."
+    )
+    return (
+        "<!doctype html>"
+        "<html lang=\"en\">"
+        "<head>"
+        "<meta charset=\"utf-8\">"
+        "<meta name=\"viewport\" content=\"width=device-width, initial-scale=1\">"
+        "<title>SQL Profiler</title>"
+        "<style>"
+        "body{font-family:Inter,system-ui,-apple-system,Segoe UI,Roboto,Ubuntu,Arial,sans-serif;"
+        "background:#0f172a;color:#e2e8f0;margin:0;padding:24px;}"
+        "h1{font-size:20px;margin-bottom:16px;}"
+        "h2{font-size:16px;margin:24px 0 8px;}"
+        "table{width:100%;border-collapse:collapse;font-size:14px;}"
+        "th,td{border:1px solid rgba(148,163,184,0.3);padding:10px;vertical-align:top;}"
+        "th{background:rgba(15,23,42,0.8);text-align:left;}"
+        "tr:nth-child(even){background:rgba(15,23,42,0.5);}"
+        "code{font-size:12px;color:#cbd5e1;}"
+        "form{display:inline-block;margin-right:8px;}"
+        "button{background:#1e293b;color:#e2e8f0;border:1px solid rgba(148,163,184,0.4);padding:6px 12px;border-radius:6px;cursor:pointer;}"
+        ".bad{color:#fca5a5;font-weight:600;}"
+        "</style>"
+        "</head>"
+        "<body>"
+        "<h1>SQL Profiler</h1>"
+        f"<p>Profiling is <strong>{'on' if enabled else 'off'}</strong>. {html.escape(thresholds)}</p>"
+        f"<p>The toggle and the figures below cover only this server process (pid {os.getpid()}); "
+        "other workers keep their own setting and data. Set <code>SQL_PROFILING_ENABLED=1</code> "
+        "to profile every worker.</p>"
+        f"<form method=\"post\">{csrf_field}<input type=\"hidden\" name=\"action\" value=\"{toggle_action}\">"
+        f"<button type=\"submit\">{'Disable' if enabled else 'Enable'} profiling</button></form>"
+        f"<form method=\"post\">{csrf_field}<input type=\"hidden\" name=\"action\" value=\"reset\">"
+        "<button type=\"submit\">Reset</button></form>"
+        "<h2>Routes by total DB time</h2>"
+        + _perf_table(
+            ["Method", "Route", "Requests", "Flagged", "Avg queries", "Max queries", "Avg DB ms", "Max total ms"],
+            route_rows,
+            "No profiled requests yet.",
+        )
+        + "<h2>Recently flagged requests</h2>"
+        + _perf_table(request_headers, _perf_request_rows(snapshot["flagged"]), "No requests exceeded the thresholds.")
+        + "<h2>Slowest requests</h2>"
+        + _perf_table(request_headers, _perf_request_rows(snapshot["slowest"]), "No profiled requests yet.")
+        + "</body>"
+        "</html>"
+    )
+
+
+@app.route("/metrics")
+def prometheus_metrics():
+    """Prometheus scrape endpoint; disabled unless METRICS_TOKEN is configured."""
+
+    expected = app.config.get("METRICS_TOKEN") or ""
+    if not expected:
+        abort(404)
+    auth_header = request.headers.get("Authorization", "")
+    # Header only: a query-string token would end up in access and proxy logs.
+    supplied = auth_header[7:] if auth_header.startswith("Bearer ") else ""
+    if not hmac.compare_digest(supplied.encode(), expected.encode()):
+        abort(401)
+    return Response(
+        request_metrics.render_prometheus(),
+        mimetype="text/plain; version=0.0.4; charset=utf-8",
+    )
+
+
+def _staged_job_upload_path(payload):
+    """Resolve the pending-upload file a job payload points at."""
+
+    file_path = _build_pending_upload_path(payload.get("token"), payload.get("extension"))
+    if not file_path or not os.path.exists(file_path):
+        raise JobFailed("The uploaded file is no longer available. Please upload it again.")
+    return file_path
+
+
+def _remove_staged_upload(file_path):
+    try:
+        os.remove(file_path)
+    except OSError:
+        pass
+
+
+def _flash_job_result(result):
+    result = result or {}
+    if result.get("message"):
+        flash(result["message"], result.get("category") or "success")
+    errors = result.get("errors") or []
+    for message in errors[:25]:
+        flash(message, "error")
+    if len(errors) > 25:
+        flash(
+            f"Additional {len(errors) - 25} errors were omitted from the alert. Check the file and retry.",
+            "warning",
+        )
+
+
+def _get_visible_job_or_404(job_id):
+    job = db.session.get(BackgroundJob, job_id)
+    if job is None:
+        abort(404)
+    if job.created_by_id not in (None, current_user.id) and not current_user.is_admin:
+        abort(404)
+    return job
+
+
+def _job_return_url(job):
+    result = job.result if job.status == "succeeded" else None
+    if isinstance(result, dict) and result.get("return_endpoint"):
+        try:
+            return url_for(result["return_endpoint"], **(result.get("return_args") or {}))
+        except BuildError:
+            return None
+    return None
+
+
+@app.route("/jobs/<int:job_id>")
+@login_required
+def background_job_detail(job_id):
+    job = _get_visible_job_or_404(job_id)
+    spec = JOB_HANDLERS.get(job.kind)
+    if job.status == "succeeded" and spec and spec.result_template and isinstance(job.result, dict):
+        return render_template(spec.result_template, **job.result)
+    return render_template(
+        "background_job.html",
+        job=job,
+        job_title=spec.title if spec else job.kind,
+        return_url=_job_return_url(job),
+    )
+
+
+@app.route("/jobs/<int:job_id>/status")
+@login_required
+def background_job_status(job_id):
+    """HTMX partial polled by the job page until the job finishes."""
+
+    job = _get_visible_job_or_404(job_id)
+    spec = JOB_HANDLERS.get(job.kind)
+    if job.status == "succeeded" and spec and spec.result_template:
+        response = Response("", status=200)
+        response.headers["HX-Redirect"] = url_for("background_job_detail", job_id=job.id)
+        return response
+    return render_template(
+        "partials/job_status.html",
+        job=job,
+        job_title=spec.title if spec else job.kind,
+        return_url=_job_return_url(job),
+    )
+
+
 @app.route("/admin/departments/template")
 @login_required
 def admin_departments_template():
@@ -26335,7 +28565,7 @@ def admin_users_create():
         )
 
     existing = (
-        User.query.filter(func.lower(User.username) == username.lower()).first()
+        User.query.filter(ci_key(User.username) == username.lower()).first()
         if username
         else None
     )
@@ -26436,7 +28666,7 @@ def admin_users_update(user_id):
 
     if username.lower() != user.username.lower():
         existing = (
-            User.query.filter(func.lower(User.username) == username.lower(), User.id != user.id).first()
+            User.query.filter(ci_key(User.username) == username.lower(), User.id != user.id).first()
         )
         if existing:
             flash("Another user already uses that username.", "error")
@@ -26939,883 +29169,910 @@ def admin_positions_upload():
     return redirect(url_for("admin_users") + "#positions")
 
 
-def _build_task_overview(viewing_user: "User"):
-    def _describe_due_date(target_date, now):
-        if not target_date:
-            return None, None, "none"
-        if isinstance(target_date, datetime.date) and not isinstance(target_date, datetime.datetime):
-            target_dt = datetime.datetime.combine(target_date, datetime.time.min)
-        else:
-            target_dt = target_date
-        delta_days = (target_dt.date() - now.date()).days
-        display = target_dt.strftime("%d %b %Y")
-        if delta_days < 0:
-            days = abs(delta_days)
-            label = f"Overdue by {days} day{'s' if days != 1 else ''}"
-            variant = "overdue"
-        elif delta_days == 0:
-            label = "Due today"
-            variant = "today"
-        elif delta_days == 1:
-            label = "Due tomorrow"
-            variant = "upcoming"
-        else:
-            label = f"Due in {delta_days} days"
-            variant = "upcoming"
-        return label, display, variant
-
-    def _status_badge_class(key):
-        mapping = {
-            "open": "bg-amber-500/20 text-amber-100 border border-amber-500/40",
-            "in_progress": "bg-sky-500/20 text-sky-100 border border-sky-500/40",
-            "blocked": "bg-rose-500/20 text-rose-100 border border-rose-500/40",
-            "scheduled": "bg-sky-500/20 text-sky-100 border border-sky-500/40",
-            "overdue": "bg-rose-500/20 text-rose-100 border border-rose-500/40",
-        }
-        return mapping.get(key, "bg-slate-800/60 text-slate-200 border border-slate-700/60")
+DASHBOARD_SECTIONS = ("my", "created", "team")
+DASHBOARD_CACHE_TTL_SECONDS = 120
+DASHBOARD_MODULE_WORKERS = 4
 
-    def _due_badge_class(variant):
-        mapping = {
-            "overdue": "bg-rose-500/20 text-rose-100 border border-rose-500/40",
-            "today": "bg-amber-500/20 text-amber-100 border border-amber-500/40",
-            "upcoming": "bg-slate-800/60 text-slate-200 border border-slate-700/60",
-        }
-        return mapping.get(variant, "bg-slate-800/60 text-slate-200 border border-slate-700/60")
+# Tables each dashboard module reads. A write to any of them rebuilds that
+# module's cached items; everything else stays cached.
+DASHBOARD_MODULE_TABLES = {
+    "qc": ("qc_work", "qc_work_dependency", "form_schema", "project", "user"),
+    "sales": ("sales_opportunity_engagement", "sales_opportunity", "sales_task", "sales_client", "user"),
+    "support": ("customer_support_ticket", "user"),
+    "design": ("design_task", "project", "user"),
+    "srt": ("srt_tasks", "project", "user"),
+    "service": ("service_visit", "lift", "customer", "user"),
+}
 
-    def _ensure_module(modules_map, order, label, empty_message, description=None):
-        module = modules_map.get(label)
-        if module is None:
-            module = {
-                "module": label,
-                "items": [],
-                "empty_message": empty_message,
-                "description": description,
-            }
-            modules_map[label] = module
-            order.append(label)
-        else:
-            if description and not module.get("description"):
-                module["description"] = description
-        return module
 
-    def _status_key(status):
-        key = (status or "").strip().lower()
-        if key == "in progress":
-            return "in_progress"
-        if key == "blocked":
-            return "blocked"
-        if key == "closed":
-            return "closed"
-        if key == "overdue":
-            return "overdue"
-        if key == "scheduled":
-            return "scheduled"
-        return "open"
-
-    def _pending_support_tickets_for_users(user_ids, *, include_other_department=False):
-        if not user_ids:
-            return []
+def _dashboard_due_date(target_date, now):
+    if not target_date:
+        return None, None, "none"
+    if isinstance(target_date, datetime.date) and not isinstance(target_date, datetime.datetime):
+        target_dt = datetime.datetime.combine(target_date, datetime.time.min)
+    else:
+        target_dt = target_date
+    delta_days = (target_dt.date() - now.date()).days
+    display = target_dt.strftime("%d %b %Y")
+    if delta_days < 0:
+        days = abs(delta_days)
+        label = f"Overdue by {days} day{'s' if days != 1 else ''}"
+        variant = "overdue"
+    elif delta_days == 0:
+        label = "Due today"
+        variant = "today"
+    elif delta_days == 1:
+        label = "Due tomorrow"
+        variant = "upcoming"
+    else:
+        label = f"Due in {delta_days} days"
+        variant = "upcoming"
+    return label, display, variant
+
+
+def _dashboard_status_badge_class(key):
+    mapping = {
+        "open": "bg-amber-500/20 text-amber-100 border border-amber-500/40",
+        "in_progress": "bg-sky-500/20 text-sky-100 border border-sky-500/40",
+        "blocked": "bg-rose-500/20 text-rose-100 border border-rose-500/40",
+        "scheduled": "bg-sky-500/20 text-sky-100 border border-sky-500/40",
+        "overdue": "bg-rose-500/20 text-rose-100 border border-rose-500/40",
+    }
+    return mapping.get(key, "bg-slate-800/60 text-slate-200 border border-slate-700/60")
 
-        allowed_ids = {uid for uid in user_ids if uid}
-        allowed_users = {
-            user.id: user
-            for user in User.query.filter(User.id.in_(allowed_ids)).all()
-            if user and user.is_active
-        }
-        allowed_display_names = {
-            (user.display_name or "").strip().lower(): user
-            for user in allowed_users.values()
-            if (user.display_name or "").strip()
-        }
-        allowed_usernames = {
-            (user.username or "").strip().lower(): user
-            for user in allowed_users.values()
-            if (user.username or "").strip()
-        }
 
-        pending_tickets = []
-        for ticket in CUSTOMER_SUPPORT_TICKETS:
-            if _ticket_is_other_department(ticket) and not include_other_department:
-                continue
-            status_value = (ticket.get("status") or "").strip().lower()
-            if status_value in {"resolved", "closed"}:
-                continue
+def _dashboard_due_badge_class(variant):
+    mapping = {
+        "overdue": "bg-rose-500/20 text-rose-100 border border-rose-500/40",
+        "today": "bg-amber-500/20 text-amber-100 border border-amber-500/40",
+        "upcoming": "bg-slate-800/60 text-slate-200 border border-slate-700/60",
+    }
+    return mapping.get(variant, "bg-slate-800/60 text-slate-200 border border-slate-700/60")
+
+
+def _dashboard_status_key(status):
+    key = (status or "").strip().lower()
+    if key == "in progress":
+        return "in_progress"
+    if key == "blocked":
+        return "blocked"
+    if key == "closed":
+        return "closed"
+    if key == "overdue":
+        return "overdue"
+    if key == "scheduled":
+        return "scheduled"
+    return "open"
+
+
+def _pending_support_tickets_for_users(user_ids, *, include_other_department=False):
+    if not user_ids:
+        return []
 
-            # Always resolve the assignee without enforcing module assignment
-            # permissions so that tickets remain visible to the person they were
-            # assigned to, even if their permissions have been restricted.
-            assignee_user = _resolve_ticket_assignee_user(ticket, module_key=None)
-            if assignee_user and assignee_user.id in allowed_ids and assignee_user.is_active:
-                pending_tickets.append(ticket)
-                continue
+    allowed_ids = {uid for uid in user_ids if uid}
+    allowed_users = {
+        user.id: user
+        for user in User.query.filter(User.id.in_(allowed_ids)).all()
+        if user and user.is_active
+    }
+    allowed_display_names = {
+        (user.display_name or "").strip().lower(): user
+        for user in allowed_users.values()
+        if (user.display_name or "").strip()
+    }
+    allowed_usernames = {
+        (user.username or "").strip().lower(): user
+        for user in allowed_users.values()
+        if (user.username or "").strip()
+    }
 
-            assignee_name = (ticket.get("assignee") or "").strip().lower()
-            if not assignee_user and assignee_name:
-                matched_user = (
-                    allowed_display_names.get(assignee_name)
-                    or allowed_usernames.get(assignee_name)
-                )
-                if matched_user:
-                    ticket.setdefault("assignee_user_id", matched_user.id)
-                    if not ticket.get("assignee"):
-                        ticket["assignee"] = matched_user.display_name
-                    pending_tickets.append(ticket)
-
-        return pending_tickets
-
-    def _build_pending_modules(
-        viewing_user,
-        open_tasks,
-        now,
-        assignee_lookup=None,
-        sales_user_ids=None,
-        support_tickets=None,
-        *,
-        sales_filter_mode="owner_or_creator",
-        module_visibility_override=None,
-        include_sales_tasks=True,
+    pending_tickets = []
+    for ticket in _customer_support_tickets(
+        include_other_department=include_other_department, open_only=True
     ):
-        modules_map = OrderedDict()
-        module_order = []
-        pending_total = 0
+        # Always resolve the assignee without enforcing module assignment
+        # permissions so that tickets remain visible to the person they were
+        # assigned to, even if their permissions have been restricted.
+        assignee_user = _resolve_ticket_assignee_user(ticket, module_key=None)
+        if assignee_user and assignee_user.id in allowed_ids and assignee_user.is_active:
+            pending_tickets.append(ticket)
+            continue
 
-        module_visibility_override = module_visibility_override or {}
+        assignee_name = (ticket.get("assignee") or "").strip().lower()
+        if not assignee_user and assignee_name:
+            matched_user = (
+                allowed_display_names.get(assignee_name)
+                or allowed_usernames.get(assignee_name)
+            )
+            if matched_user:
+                ticket.setdefault("assignee_user_id", matched_user.id)
+                if not ticket.get("assignee"):
+                    ticket["assignee"] = matched_user.display_name
+                pending_tickets.append(ticket)
 
-        has_project_tasks = any(task.project for task in open_tasks)
-        has_qc_tasks = any(not task.project for task in open_tasks)
+    return pending_tickets
 
-        sales_filters = []
-        sales_user_id_set = set()
-        if sales_user_ids is None:
-            if viewing_user:
-                sales_user_id_set = {viewing_user.id}
-        else:
-            allowed_ids = {uid for uid in set(sales_user_ids) if uid}
-            if allowed_ids:
-                sales_user_id_set = allowed_ids
-
-        if sales_user_id_set:
-            sales_filter_mode = (sales_filter_mode or "owner_or_creator").strip().lower()
-            if sales_filter_mode == "owner_only":
-                sales_filters = [SalesOpportunity.owner_id.in_(sales_user_id_set)]
-            elif sales_filter_mode == "creator_only":
-                sales_filters = [SalesOpportunityEngagement.created_by_id.in_(sales_user_id_set)]
-            else:
-                sales_filters = [
-                    SalesOpportunity.owner_id.in_(sales_user_id_set),
-                    SalesOpportunityEngagement.created_by_id.in_(sales_user_id_set),
-                ]
 
-        task_owner_ids = set()
-        if assignee_lookup:
-            task_owner_ids = {uid for uid in assignee_lookup.keys() if uid}
-        elif viewing_user and getattr(viewing_user, "id", None):
-            task_owner_ids = {viewing_user.id}
-        sales_items = []
-        if sales_filters:
-            sales_items = (
-                SalesOpportunityEngagement.query
-                .join(SalesOpportunity, SalesOpportunity.id == SalesOpportunityEngagement.opportunity_id)
-                .filter(SalesOpportunityEngagement.scheduled_for.isnot(None))
-                .filter(or_(*sales_filters))
-                .filter(func.lower(SalesOpportunity.status) != "closed")
-                .order_by(
-                    SalesOpportunityEngagement.scheduled_for.asc(),
-                    SalesOpportunityEngagement.id.asc(),
-                )
-                .limit(50)
-                .all()
-            )
+# Module loaders. They take plain values only (ids, ``ReferenceRow`` user
+# snapshots) and return plain dicts, so they can run in worker threads and
+# their results can be cached.
 
-        sales_tasks = []
-        if include_sales_tasks and task_owner_ids:
-            sales_tasks = (
-                SalesTask.query
-                .options(
-                    joinedload(SalesTask.opportunity).joinedload(SalesOpportunity.client),
-                    joinedload(SalesTask.client),
-                    joinedload(SalesTask.owner),
-                    joinedload(SalesTask.assignees),
-                )
-                .filter(
-                    or_(
-                        SalesTask.assignees.any(User.id.in_(task_owner_ids)),
-                        and_(
-                            ~SalesTask.assignees.any(),
-                            SalesTask.owner_id.in_(task_owner_ids),
-                        ),
-                    )
-                )
-                .filter(SalesTask.due_date.isnot(None))
-                .filter(or_(SalesTask.status.is_(None), func.lower(SalesTask.status) != "completed"))
-                .order_by(SalesTask.due_date.asc(), SalesTask.id.asc())
-                .all()
-            )
 
-        design_tasks = []
-        srt_tasks = []
-        if task_owner_ids:
-            design_tasks = (
-                DesignTask.query.options(
-                    joinedload(DesignTask.project),
-                    joinedload(DesignTask.assigned_to),
-                )
-                .filter(DesignTask.assigned_to_user_id.in_(task_owner_ids))
-                .filter(~func.lower(func.trim(DesignTask.status)).in_(["complete", "finalized", "closed"]))
-                .order_by(DesignTask.due_date.asc(), DesignTask.id.asc())
-                .all()
-            )
-            srt_tasks = (
-                SRTTask.query.options(
-                    joinedload(SRTTask.project),
-                    joinedload(SRTTask.assignee),
-                )
-                .filter(SRTTask.assigned_to_id.in_(task_owner_ids))
-                .filter(~func.lower(func.trim(SRTTask.status)).in_(["closed", "completed", "cancelled"]))
-                .order_by(SRTTask.due_date.asc(), SRTTask.id.asc())
-                .all()
-            )
+def _dashboard_qc_items(scope, user_ids, viewer_id, assignee_rows, now):
+    """Open QC work as dashboard items, split into "Projects" and "Quality Control"."""
+    status_order = case(
+        (QCWork.status == "Pending Inspection", 0),
+        (QCWork.status == "Inspection Done", 1),
+        (QCWork.status == "Rectification Pending", 2),
+        (QCWork.status == "Closed", 3),
+        else_=4
+    )
+    query = QCWork.query
+    if scope == "created":
+        query = query.filter(QCWork.created_by == viewer_id).filter(QCWork.status != "Closed")
+    else:
+        query = query.filter(QCWork.assigned_to.in_(user_ids))
+    tasks = query.order_by(
+        status_order, QCWork.due_date.asc().nullslast(), QCWork.created_at.desc()
+    ).all()
+    if scope == "created":
+        tasks = [task for task in tasks if task.dependency_satisfied and task.assigned_to != viewer_id]
+    else:
+        tasks = [task for task in tasks if task.dependency_satisfied and task.status != "Closed"]
 
-        show_projects = (
-            viewing_user.can_view_module("operations") if viewing_user else True
-        ) or has_project_tasks
-        show_qc = (viewing_user.can_view_module("qc") if viewing_user else True) or has_qc_tasks
-        show_sales = (
-            viewing_user.can_view_module("sales") if viewing_user else True
-        ) or bool(sales_items) or bool(sales_tasks)
-        show_customer_support = (
-            viewing_user.can_view_module("customer_support") if viewing_user else True
-        ) or bool(support_tickets)
-        show_design = (
-            viewing_user.can_view_module("design") if viewing_user else True
-        ) or bool(design_tasks)
-        show_srt = (
-            viewing_user.can_view_module("srt") if viewing_user else True
-        ) or bool(srt_tasks)
-
-        if "Projects" in module_visibility_override:
-            show_projects = bool(module_visibility_override["Projects"])
-        if "Quality Control" in module_visibility_override:
-            show_qc = bool(module_visibility_override["Quality Control"])
-        if "Sales" in module_visibility_override:
-            show_sales = bool(module_visibility_override["Sales"])
-        if "Customer Support" in module_visibility_override:
-            show_customer_support = bool(module_visibility_override["Customer Support"])
-        if "Design" in module_visibility_override:
-            show_design = bool(module_visibility_override["Design"])
-        if "SRT" in module_visibility_override:
-            show_srt = bool(module_visibility_override["SRT"])
-
-        if show_projects:
-            _ensure_module(
-                modules_map,
-                module_order,
-                "Projects",
-                "No pending project tasks.",
-                "Tasks from active projects assigned to you.",
-            )
-        if show_sales:
-            _ensure_module(
-                modules_map,
-                module_order,
-                "Sales",
-                "No pending sales activities.",
-                "Upcoming and overdue sales engagements and tasks on your opportunities.",
-            )
-        if show_customer_support:
-            _ensure_module(
-                modules_map,
-                module_order,
-                "Customer Support",
-                "No open support tickets.",
-                "Support tickets assigned to you.",
-            )
-        if show_design:
-            _ensure_module(
-                modules_map,
-                module_order,
-                "Design",
-                "No pending design tasks.",
-                "Drawing, BOM and approval tasks assigned to you.",
-            )
-        if show_srt:
-            _ensure_module(
-                modules_map,
-                module_order,
-                "SRT",
-                "No pending SRT tasks.",
-                "Site readiness tasks assigned to you.",
-            )
-
-        for task in open_tasks:
-            module_label = "Projects" if task.project else "Quality Control"
-            if module_label == "Projects" and not show_projects:
-                continue
-            if module_label == "Quality Control" and not show_qc:
-                continue
-            module_description = (
-                "Project execution tasks awaiting your action."
-                if module_label == "Projects"
-                else "Quality inspections and tasks that still need attention."
-            )
-            module = _ensure_module(
-                modules_map,
-                module_order,
-                module_label,
-                "No pending QC tasks." if module_label == "Quality Control" else "No pending project tasks.",
-                module_description,
-            )
-
-            due_label, due_display, due_variant = _describe_due_date(task.due_date, now)
-            metadata = []
-            if task.stage:
-                metadata.append(task.stage)
-            if task.lift_type:
-                metadata.append(task.lift_type)
-            if task.template and task.template.name:
-                metadata.append(f"Form: {task.template.name}")
-            if task.project and task.project.name:
-                metadata.append(f"Project: {task.project.name}")
-
-            creator_user = getattr(task, "creator", None)
-            if creator_user and (not viewing_user or creator_user.id != viewing_user.id):
-                owner_label = creator_user.display_name or creator_user.username
-                if owner_label:
-                    metadata.append(f"Owner: {owner_label}")
+    grouped = {"Projects": [], "Quality Control": []}
+    for task in tasks:
+        due_label, due_display, due_variant = _dashboard_due_date(task.due_date, now)
+        metadata = []
+        if task.stage:
+            metadata.append(task.stage)
+        if task.lift_type:
+            metadata.append(task.lift_type)
+        if task.template and task.template.name:
+            metadata.append(f"Form: {task.template.name}")
+        if task.project and task.project.name:
+            metadata.append(f"Project: {task.project.name}")
+
+        creator_user = getattr(task, "creator", None)
+        if creator_user and creator_user.id != viewer_id:
+            owner_label = creator_user.display_name or creator_user.username
+            if owner_label:
+                metadata.append(f"Owner: {owner_label}")
+
+        assignee_user = assignee_rows.get(task.assigned_to)
+        if assignee_user and assignee_user.id != viewer_id:
+            metadata.append(f"Assignee: {assignee_user.display_name or assignee_user.username}")
+
+        grouped["Projects" if task.project else "Quality Control"].append(
+            {
+                "title": task.display_title,
+                "subtitle": task.client_name or task.site_name,
+                "description": task.description,
+                "identifier": f"#{task.id}",
+                "status": task.status or "Open",
+                "status_class": _dashboard_status_badge_class(_dashboard_status_key(task.status)),
+                "due_description": due_label,
+                "due_display": due_display,
+                "due_class": _dashboard_due_badge_class(due_variant),
+                "due_variant": due_variant,
+                "url": url_for("qc_work_detail", work_id=task.id),
+                "secondary_url": url_for("forms_fill", form_id=task.template_id, work_id=task.id)
+                if task.template_id
+                else None,
+                "secondary_label": "New Submission" if task.template_id else None,
+                "metadata": metadata,
+            }
+        )
+    return grouped
 
-            assignee_user = None
-            if assignee_lookup:
-                assignee_user = assignee_lookup.get(getattr(task, "assigned_to", None))
 
-            module["items"].append(
+def _dashboard_sales_items(sales_user_ids, sales_filter_mode, task_owner_ids, include_sales_tasks, assignee_rows, now):
+    """Scheduled engagements and open sales tasks as dashboard items."""
+    sales_filters = []
+    if sales_user_ids:
+        if sales_filter_mode == "owner_only":
+            sales_filters = [SalesOpportunity.owner_id.in_(sales_user_ids)]
+        elif sales_filter_mode == "creator_only":
+            sales_filters = [SalesOpportunityEngagement.created_by_id.in_(sales_user_ids)]
+        else:
+            sales_filters = [
+                SalesOpportunity.owner_id.in_(sales_user_ids),
+                SalesOpportunityEngagement.created_by_id.in_(sales_user_ids),
+            ]
+
+    items = []
+    if sales_filters:
+        activities = (
+            SalesOpportunityEngagement.query
+            .options(
+                joinedload(SalesOpportunityEngagement.opportunity).joinedload(SalesOpportunity.client)
+            )
+            .join(SalesOpportunity, SalesOpportunity.id == SalesOpportunityEngagement.opportunity_id)
+            .filter(SalesOpportunityEngagement.scheduled_for.isnot(None))
+            .filter(or_(*sales_filters))
+            .filter(func.lower(SalesOpportunity.status) != "closed")
+            .order_by(
+                SalesOpportunityEngagement.scheduled_for.asc(),
+                SalesOpportunityEngagement.id.asc(),
+            )
+            .limit(50)
+            .all()
+        )
+        for activity in activities:
+            opportunity = activity.opportunity
+            due_label, due_display, due_variant = _dashboard_due_date(activity.scheduled_for, now)
+            status_key = "overdue" if due_variant == "overdue" else "scheduled"
+            metadata = [activity.display_activity_type]
+            subtitle = None
+            if opportunity:
+                subtitle = opportunity.title
+                if opportunity.stage:
+                    metadata.append(opportunity.stage)
+                if opportunity.client and opportunity.client.display_name:
+                    metadata.append(f"Client: {opportunity.client.display_name}")
+
+            if assignee_rows:
+                owner_user = None
+                if opportunity and opportunity.owner_id:
+                    owner_user = assignee_rows.get(opportunity.owner_id)
+                if owner_user and owner_user.display_name:
+                    owner_label = f"Owner: {owner_user.display_name}"
+                    if owner_label not in metadata:
+                        metadata.append(owner_label)
+                planner_user = None
+                if activity.created_by_id:
+                    planner_user = assignee_rows.get(activity.created_by_id)
+                if planner_user and planner_user.display_name:
+                    planner_label = f"Planner: {planner_user.display_name}"
+                    if planner_label not in metadata:
+                        metadata.append(planner_label)
+
+            items.append(
                 {
-                    "title": task.display_title,
-                    "subtitle": task.client_name or task.site_name,
-                    "description": task.description,
-                    "identifier": f"#{task.id}",
-                    "status": task.status or "Open",
-                    "status_class": _status_badge_class(_status_key(task.status)),
+                    "title": activity.subject or activity.display_activity_type,
+                    "subtitle": subtitle,
+                    "description": activity.notes,
+                    "identifier": f"Activity #{activity.id}",
+                    "status": "Overdue" if status_key == "overdue" else "Scheduled",
+                    "status_class": _dashboard_status_badge_class(status_key),
                     "due_description": due_label,
                     "due_display": due_display,
-                    "due_class": _due_badge_class(due_variant),
+                    "due_class": _dashboard_due_badge_class(due_variant),
                     "due_variant": due_variant,
-                    "url": url_for("qc_work_detail", work_id=task.id),
-                    "secondary_url": url_for("forms_fill", form_id=task.template_id, work_id=task.id)
-                    if task.template_id
+                    "url": url_for("sales_opportunity_detail", opportunity_id=opportunity.id)
+                    if opportunity
                     else None,
-                    "secondary_label": "New Submission" if task.template_id else None,
-                    "metadata": metadata
-                    + (
-                        []
-                        if not assignee_user
-                        or (viewing_user and assignee_user.id == viewing_user.id)
-                        else [
-                            f"Assignee: {assignee_user.display_name}"
-                            if assignee_user.display_name
-                            else f"Assignee: {assignee_user.username}"
-                        ]
-                    ),
+                    "secondary_url": None,
+                    "secondary_label": None,
+                    "metadata": metadata,
                 }
-                )
+            )
 
-        if show_sales:
-            sales_module = modules_map.get("Sales")
-            for activity in sales_items:
-                opportunity = activity.opportunity
-                due_label, due_display, due_variant = _describe_due_date(activity.scheduled_for, now)
-                status_key = "overdue" if due_variant == "overdue" else "scheduled"
-                metadata = [activity.display_activity_type]
-                subtitle = None
-                if opportunity:
-                    subtitle = opportunity.title
-                    if opportunity.stage:
-                        metadata.append(opportunity.stage)
-                    if opportunity.client and opportunity.client.display_name:
-                        metadata.append(f"Client: {opportunity.client.display_name}")
-
-                if assignee_lookup:
-                    owner_user = None
-                    if opportunity and opportunity.owner_id:
-                        owner_user = assignee_lookup.get(opportunity.owner_id)
-                    if owner_user and owner_user.display_name:
-                        owner_label = f"Owner: {owner_user.display_name}"
-                        if owner_label not in metadata:
-                            metadata.append(owner_label)
-                    planner_user = None
-                    if activity.created_by_id:
-                        planner_user = assignee_lookup.get(activity.created_by_id)
-                    if planner_user and planner_user.display_name:
-                        planner_label = f"Planner: {planner_user.display_name}"
-                        if planner_label not in metadata:
-                            metadata.append(planner_label)
-
-                sales_module["items"].append(
-                    {
-                        "title": activity.subject or activity.display_activity_type,
-                        "subtitle": subtitle,
-                        "description": activity.notes,
-                        "identifier": f"Activity #{activity.id}",
-                        "status": "Overdue" if status_key == "overdue" else "Scheduled",
-                        "status_class": _status_badge_class(status_key),
-                        "due_description": due_label,
-                        "due_display": due_display,
-                        "due_class": _due_badge_class(due_variant),
-                        "due_variant": due_variant,
-                        "url": url_for("sales_opportunity_detail", opportunity_id=opportunity.id)
-                        if opportunity
-                        else None,
-                        "secondary_url": None,
-                        "secondary_label": None,
-                        "metadata": metadata,
-                    }
-                )
+    if not (include_sales_tasks and task_owner_ids):
+        return items
 
-            for task in sales_tasks:
-                due_label, due_display, due_variant = _describe_due_date(task.due_date, now)
-                status_key = (task.status or "Pending").strip().lower()
-                status_class = _status_badge_class(status_key)
-                due_class = _due_badge_class(due_variant)
-
-                related_bits = []
-                if task.client:
-                    related_bits.append(
-                        task.client.display_name
-                        or task.client.company_name
-                        or task.client.code
-                    )
-                if task.opportunity:
-                    related_bits.append(task.opportunity.title)
-                subtitle = " · ".join(related_bits) or "Sales Task"
+    sales_tasks = (
+        SalesTask.query
+        .options(
+            joinedload(SalesTask.opportunity).joinedload(SalesOpportunity.client),
+            joinedload(SalesTask.client),
+            joinedload(SalesTask.owner),
+            joinedload(SalesTask.assignees),
+        )
+        .filter(
+            or_(
+                SalesTask.assignees.any(User.id.in_(task_owner_ids)),
+                and_(
+                    ~SalesTask.assignees.any(),
+                    SalesTask.owner_id.in_(task_owner_ids),
+                ),
+            )
+        )
+        .filter(SalesTask.due_date.isnot(None))
+        .filter(or_(SalesTask.status.is_(None), func.lower(SalesTask.status) != "completed"))
+        .order_by(SalesTask.due_date.asc(), SalesTask.id.asc())
+        .all()
+    )
+    for task in sales_tasks:
+        due_label, due_display, due_variant = _dashboard_due_date(task.due_date, now)
+        status_key = (task.status or "Pending").strip().lower()
+
+        related_bits = []
+        if task.client:
+            related_bits.append(
+                task.client.display_name
+                or task.client.company_name
+                or task.client.code
+            )
+        if task.opportunity:
+            related_bits.append(task.opportunity.title)
+        subtitle = " · ".join(related_bits) or "Sales Task"
+
+        metadata = []
+        if task.category:
+            metadata.append({"label": "Category", "value": task.category})
+        if task.related_type:
+            metadata.append({"label": "Type", "value": task.related_type})
+
+        owner_user = assignee_rows.get(task.owner_id) if task.owner_id else None
+        if owner_user and owner_user.display_name:
+            metadata.append({"label": "Owner", "value": owner_user.display_name})
+        elif task.owner and task.owner.display_name:
+            metadata.append({"label": "Owner", "value": task.owner.display_name})
+
+        assignee_labels = []
+        potential_assignees = list(task.assignees or [])
+        if task.assignee and task.assignee not in potential_assignees:
+            potential_assignees.append(task.assignee)
+
+        for user in potential_assignees:
+            if not user:
+                continue
+            display_user = assignee_rows.get(user.id) or user
+            if display_user.display_name:
+                assignee_labels.append(display_user.display_name)
+            elif display_user.username:
+                assignee_labels.append(display_user.username)
 
-                metadata = []
-                if task.category:
-                    metadata.append({"label": "Category", "value": task.category})
-                if task.related_type:
-                    metadata.append({"label": "Type", "value": task.related_type})
+        if not assignee_labels and task.owner and task.owner.display_name:
+            assignee_labels.append(task.owner.display_name)
 
-                owner_user = None
-                if assignee_lookup and task.owner_id:
-                    owner_user = assignee_lookup.get(task.owner_id)
+        if assignee_labels:
+            metadata.append({"label": "Assigned", "value": ", ".join(assignee_labels)})
 
-                if owner_user and owner_user.display_name:
-                    metadata.append({"label": "Owner", "value": owner_user.display_name})
-                elif task.owner and task.owner.display_name:
-                    metadata.append({"label": "Owner", "value": task.owner.display_name})
+        items.append(
+            {
+                "title": task.title,
+                "subtitle": subtitle,
+                "description": task.description or "",
+                "status": task.status or "Pending",
+                "status_class": _dashboard_status_badge_class(status_key),
+                "due_description": due_label,
+                "due_display": due_display,
+                "due_class": _dashboard_due_badge_class(due_variant),
+                "due_variant": due_variant,
+                "identifier": f"Sales Task · {task.id}",
+                "url": url_for("sales_task_detail", task_id=task.id),
+                "secondary_url": None,
+                "secondary_label": None,
+                "metadata": metadata,
+            }
+        )
+    return items
 
-                assignee_labels = []
-                potential_assignees = list(task.assignees or [])
-                if task.assignee and task.assignee not in potential_assignees:
-                    potential_assignees.append(task.assignee)
 
-                for user in potential_assignees:
-                    if not user:
-                        continue
-                    lookup_user = assignee_lookup.get(user.id) if assignee_lookup else None
-                    display_user = lookup_user or user
-                    if display_user.display_name:
-                        assignee_labels.append(display_user.display_name)
-                    elif display_user.username:
-                        assignee_labels.append(display_user.username)
+def _dashboard_support_items(user_ids, include_other_department, viewer_id, assignee_rows, now):
+    """Open support tickets assigned to ``user_ids`` as dashboard items."""
+    items = []
+    for ticket in _pending_support_tickets_for_users(
+        user_ids, include_other_department=include_other_department
+    ):
+        assignee_user = _resolve_ticket_assignee_user(ticket, module_key="customer_support")
+        if assignee_user:
+            assignee_user = assignee_rows.get(assignee_user.id, assignee_user)
 
-                if not assignee_labels and task.owner and task.owner.display_name:
-                    assignee_labels.append(task.owner.display_name)
+        due_at = ticket.get("due_at") or _calculate_ticket_sla_due(ticket)
+        if isinstance(due_at, datetime.datetime):
+            due_label, due_display, due_variant = _dashboard_due_date(due_at, now)
+        else:
+            due_label, due_display, due_variant = None, None, "none"
 
-                if assignee_labels:
-                    metadata.append({"label": "Assigned", "value": ", ".join(assignee_labels)})
+        metadata = []
+        if ticket.get("category"):
+            metadata.append(ticket.get("category"))
+        if ticket.get("channel"):
+            metadata.append(ticket.get("channel"))
+        if ticket.get("priority"):
+            metadata.append(f"Priority: {ticket.get('priority')}")
 
-                sales_module["items"].append(
-                    {
-                        "title": task.title,
-                        "subtitle": subtitle,
-                        "description": task.description or "",
-                        "status": task.status or "Pending",
-                        "status_class": status_class,
-                        "due_description": due_label,
-                        "due_display": due_display,
-                        "due_class": due_class,
-                        "due_variant": due_variant,
-                        "identifier": f"Sales Task · {task.id}",
-                        "url": url_for("sales_task_detail", task_id=task.id),
-                        "secondary_url": None,
-                        "secondary_label": None,
-                        "metadata": metadata,
-                    }
-                )
+        if assignee_user and assignee_user.id != viewer_id:
+            owner_label = assignee_user.display_name or assignee_user.username
+            metadata.append(f"Owner: {owner_label}")
 
-        if show_customer_support:
-            for ticket in support_tickets or []:
-                assignee_user = _resolve_ticket_assignee_user(
-                    ticket, module_key="customer_support"
-                )
-                if assignee_lookup and assignee_user:
-                    assignee_user = assignee_lookup.get(assignee_user.id, assignee_user)
+        items.append(
+            {
+                "title": ticket.get("subject") or "Support ticket",
+                "subtitle": ticket.get("customer")
+                or ticket.get("location")
+                or ticket.get("contact_name"),
+                "description": ticket.get("remarks"),
+                "identifier": ticket.get("id"),
+                "status": ticket.get("status") or "Open",
+                "status_class": _dashboard_status_badge_class(_dashboard_status_key(ticket.get("status"))),
+                "due_description": due_label,
+                "due_display": due_display,
+                "due_class": _dashboard_due_badge_class(due_variant),
+                "due_variant": due_variant,
+                "url": url_for("customer_support_tasks", ticket=ticket.get("id")),
+                "secondary_url": None,
+                "secondary_label": None,
+                "metadata": metadata,
+            }
+        )
+    return items
 
-                due_at = ticket.get("due_at") or _calculate_ticket_sla_due(ticket)
-                if isinstance(due_at, datetime.datetime):
-                    due_label, due_display, due_variant = _describe_due_date(due_at, now)
-                else:
-                    due_label, due_display, due_variant = None, None, "none"
-
-                metadata = []
-                if ticket.get("category"):
-                    metadata.append(ticket.get("category"))
-                if ticket.get("channel"):
-                    metadata.append(ticket.get("channel"))
-                if ticket.get("priority"):
-                    metadata.append(f"Priority: {ticket.get('priority')}")
-
-                if assignee_user and viewing_user and assignee_user.id != viewing_user.id:
-                    owner_label = assignee_user.display_name or assignee_user.username
-                    metadata.append(f"Owner: {owner_label}")
-
-                support_module = modules_map.get("Customer Support")
-                support_module["items"].append(
-                    {
-                        "title": ticket.get("subject") or "Support ticket",
-                        "subtitle": ticket.get("customer")
-                        or ticket.get("location")
-                        or ticket.get("contact_name"),
-                        "description": ticket.get("remarks"),
-                        "identifier": ticket.get("id"),
-                        "status": ticket.get("status") or "Open",
-                        "status_class": _status_badge_class(_status_key(ticket.get("status"))),
-                        "due_description": due_label,
-                        "due_display": due_display,
-                        "due_class": _due_badge_class(due_variant),
-                        "due_variant": due_variant,
-                        "url": url_for("customer_support_tasks", ticket=ticket.get("id")),
-                        "secondary_url": None,
-                        "secondary_label": None,
-                        "metadata": metadata,
-                    }
-                )
 
-        if show_design:
-            design_module = modules_map.get("Design")
-            for task in design_tasks:
-                due_label, due_display, due_variant = _describe_due_date(task.due_date, now)
-                metadata = []
-                if task.task_type:
-                    metadata.append({"label": "Type", "value": task.task_type})
-                if task.priority:
-                    metadata.append({"label": "Priority", "value": task.priority.title()})
-                if task.project_label:
-                    metadata.append({"label": "Project", "value": task.project_label})
-                if task.assigned_to and task.assigned_to.display_name:
-                    metadata.append({"label": "Assigned", "value": task.assigned_to.display_name})
-
-                design_module["items"].append(
-                    {
-                        "title": task.task_name or task.subtype or task.task_type or "Design task",
-                        "subtitle": task.project_label,
-                        "description": task.description or task.notes,
-                        "identifier": f"Design Task #{task.id}",
-                        "status": task.status or "Open",
-                        "status_class": _status_badge_class(_status_key(task.status)),
-                        "due_description": due_label,
-                        "due_display": due_display,
-                        "due_class": _due_badge_class(due_variant),
-                        "due_variant": due_variant,
-                        "url": url_for("design_task_detail", task_id=task.id),
-                        "secondary_url": None,
-                        "secondary_label": None,
-                        "metadata": metadata,
-                    }
-                )
+def _dashboard_design_items(task_owner_ids, now):
+    """Open design tasks assigned to ``task_owner_ids`` as dashboard items."""
+    design_tasks = (
+        DesignTask.query.options(
+            joinedload(DesignTask.project),
+            joinedload(DesignTask.assigned_to),
+        )
+        .filter(DesignTask.assigned_to_user_id.in_(task_owner_ids))
+        .filter(~func.lower(func.trim(DesignTask.status)).in_(["complete", "finalized", "closed"]))
+        .order_by(DesignTask.due_date.asc(), DesignTask.id.asc())
+        .all()
+    )
+    items = []
+    for task in design_tasks:
+        due_label, due_display, due_variant = _dashboard_due_date(task.due_date, now)
+        metadata = []
+        if task.task_type:
+            metadata.append({"label": "Type", "value": task.task_type})
+        if task.priority:
+            metadata.append({"label": "Priority", "value": task.priority.title()})
+        if task.project_label:
+            metadata.append({"label": "Project", "value": task.project_label})
+        if task.assigned_to and task.assigned_to.display_name:
+            metadata.append({"label": "Assigned", "value": task.assigned_to.display_name})
+
+        items.append(
+            {
+                "title": task.task_name or task.subtype or task.task_type or "Design task",
+                "subtitle": task.project_label,
+                "description": task.description or task.notes,
+                "identifier": f"Design Task #{task.id}",
+                "status": task.status or "Open",
+                "status_class": _dashboard_status_badge_class(_dashboard_status_key(task.status)),
+                "due_description": due_label,
+                "due_display": due_display,
+                "due_class": _dashboard_due_badge_class(due_variant),
+                "due_variant": due_variant,
+                "url": url_for("design_task_detail", task_id=task.id),
+                "secondary_url": None,
+                "secondary_label": None,
+                "metadata": metadata,
+            }
+        )
+    return items
+
+
+def _dashboard_srt_items(task_owner_ids, now):
+    """Open SRT tasks assigned to ``task_owner_ids`` as dashboard items."""
+    srt_tasks = (
+        SRTTask.query.options(
+            joinedload(SRTTask.project),
+            joinedload(SRTTask.assignee),
+        )
+        .filter(SRTTask.assigned_to_id.in_(task_owner_ids))
+        .filter(~func.lower(func.trim(SRTTask.status)).in_(["closed", "completed", "cancelled"]))
+        .order_by(SRTTask.due_date.asc(), SRTTask.id.asc())
+        .all()
+    )
+    items = []
+    for task in srt_tasks:
+        due_label, due_display, due_variant = _dashboard_due_date(task.due_date, now)
+        metadata = []
+        if task.priority:
+            metadata.append({"label": "Priority", "value": task.priority})
+        if task.assignee and task.assignee.display_name:
+            metadata.append({"label": "Owner", "value": task.assignee.display_name})
+        if task.project and task.project.name:
+            metadata.append({"label": "Project", "value": task.project.name})
+
+        items.append(
+            {
+                "title": task.summary,
+                "subtitle": task.site_name or (task.project.name if task.project else None),
+                "description": task.description,
+                "identifier": f"SRT-{task.id}",
+                "status": task.status or SRT_STATUS_OPTIONS[0],
+                "status_class": _dashboard_status_badge_class(_dashboard_status_key(task.status)),
+                "due_description": due_label,
+                "due_display": due_display,
+                "due_class": _dashboard_due_badge_class(due_variant),
+                "due_variant": due_variant,
+                "url": url_for("srt_overview"),
+                "secondary_url": None,
+                "secondary_label": None,
+                "metadata": metadata,
+            }
+        )
+    return items
+
+
+def _dashboard_service_items(technician_names, now):
+    """AMC / breakdown visits for ``technician_names`` as items plus due counts."""
+    schedule = get_service_schedule_snapshot(exclude_statuses=SERVICE_VISIT_CLOSED_STATUSES)
+    items = []
+    summary = {"overdue": 0, "today": 0, "upcoming": 0}
+
+    for entry in schedule["entries"]:
+        visit_date = entry.get("date")
+        if not visit_date:
+            continue
 
-        if show_srt:
-            srt_module = modules_map.get("SRT")
-            for task in srt_tasks:
-                due_label, due_display, due_variant = _describe_due_date(task.due_date, now)
-                metadata = []
-                if task.priority:
-                    metadata.append({"label": "Priority", "value": task.priority})
-                if task.assignee and task.assignee.display_name:
-                    metadata.append({"label": "Owner", "value": task.assignee.display_name})
-                if task.project and task.project.name:
-                    metadata.append({"label": "Project", "value": task.project.name})
-
-                srt_module["items"].append(
+        status_key = (entry.get("status") or "scheduled").strip().lower()
+        if status_key in {"completed", "cancelled"}:
+            continue
+
+        technician = (entry.get("technician") or "").strip().lower()
+        if technician and technician not in technician_names:
+            continue
+
+        # Only consider dates that are not in the far past with no status
+        due_label, due_display, due_variant = _dashboard_due_date(visit_date, now)
+        if due_variant == "none":
+            continue
+        summary[due_variant if due_variant in summary else "upcoming"] += 1
+
+        lift = entry["lift"]
+        lift_name = lift.lift_code or "Lift"
+
+        # Build a site description using customer, city, route
+        site_bits = []
+        customer = getattr(lift, "customer", None)
+        company_name = getattr(customer, "company_name", None) if customer else None
+        if company_name:
+            site_bits.append(company_name)
+        elif getattr(lift, "customer_code", None):
+            site_bits.append(lift.customer_code)
+        if getattr(lift, "city", None):
+            site_bits.append(lift.city)
+        if getattr(lift, "route", None):
+            site_bits.append(lift.route)
+
+        description = " · ".join(site_bits) if site_bits else "Service site not specified"
+        checklist = entry.get("checklist") or ""
+
+        items.append(
+            {
+                "title": lift_name,
+                "subtitle": checklist or "Scheduled service visit",
+                "description": description,
+                "status": "Overdue" if due_variant == "overdue" else "Scheduled",
+                "status_class": _dashboard_status_badge_class(
+                    "overdue" if due_variant == "overdue" else "scheduled"
+                ),
+                "due_description": due_label,
+                "due_display": due_display,
+                "due_class": _dashboard_due_badge_class(due_variant),
+                "due_variant": due_variant,
+                "identifier": f"Service visit · {visit_date:%d %b %Y} · {lift_name}",
+                "url": url_for("service_lift_detail", lift_id=lift.id),
+                "secondary_url": None,
+                "secondary_label": None,
+                "metadata": [
                     {
-                        "title": task.summary,
-                        "subtitle": task.site_name or (task.project.name if task.project else None),
-                        "description": task.description,
-                        "identifier": f"SRT-{task.id}",
-                        "status": task.status or SRT_STATUS_OPTIONS[0],
-                        "status_class": _status_badge_class(_status_key(task.status)),
-                        "due_description": due_label,
-                        "due_display": due_display,
-                        "due_class": _due_badge_class(due_variant),
-                        "due_variant": due_variant,
-                        "url": url_for("srt_overview"),
-                        "secondary_url": None,
-                        "secondary_label": None,
-                        "metadata": metadata,
+                        "label": "Technician",
+                        "value": entry.get("technician") or "Unassigned",
                     }
-                )
+                ],
+            }
+        )
+    return {"items": items, "summary": summary}
 
-        # --- Service module: AMC + breakdown visits assigned to user(s) ---
-        # Only if the viewing user is allowed to see the Service module
-        show_service = viewing_user.can_view_module("service") if viewing_user else False
-        if "Service" in module_visibility_override:
-            show_service = bool(module_visibility_override["Service"])
 
-        if show_service:
-            # Build set of allowed technician names depending on personal vs team view
-            allowed_technician_names = set()
+def _run_dashboard_loaders(loaders):
+    """Call each loader, concurrently when more than one has to run."""
+    workers = min(len(loaders), app.config.get("DASHBOARD_MODULE_WORKERS", DASHBOARD_MODULE_WORKERS))
+    if workers <= 1 or not has_request_context():
+        return {name: loader() for name, loader in loaders.items()}
+    # Each worker pushes a copy of the request context, so it gets its own
+    # app context and therefore its own database session.
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="dashboard") as executor:
+        futures = {
+            name: executor.submit(copy_current_request_context(loader))
+            for name, loader in loaders.items()
+        }
+        return {name: future.result() for name, future in futures.items()}
 
-            if assignee_lookup:
-                # Team Dash: visits assigned to any user in the team
-                for user in assignee_lookup.values():
-                    if not user or not user.is_active:
-                        continue
-                    for value in (user.display_name, user.username):
-                        if value:
-                            allowed_technician_names.add(value.strip().lower())
-            else:
-                # My Dash: visits assigned to the viewing user
-                if viewing_user and viewing_user.is_active:
-                    for value in (viewing_user.display_name, viewing_user.username):
-                        if value:
-                            allowed_technician_names.add(value.strip().lower())
-
-            if allowed_technician_names:
-                snapshot = get_service_schedule_snapshot()
-
-                service_module = None
-                overdue_count = 0
-                today_count = 0
-                upcoming_count = 0
-
-                for entry in snapshot["entries"]:
-                    visit_date = entry.get("date")
-                    if not visit_date:
-                        continue
 
-                    status_key = (entry.get("status") or "scheduled").strip().lower()
-                    if status_key in {"completed", "cancelled"}:
-                        continue
+def _dashboard_module_items(specs):
+    """Items for each module in ``specs`` (name -> ``(key, loader)``).
 
-                    technician = (entry.get("technician") or "").strip().lower()
-                    if technician and allowed_technician_names and technician not in allowed_technician_names:
-                        continue
+    Entries whose ``DASHBOARD_MODULE_TABLES`` have not changed since they were
+    built come from the cache; the stale ones are rebuilt together. The date
+    is part of every key, so "Due today" labels roll over at midnight.
+    """
+    ttl = app.config.get("DASHBOARD_CACHE_TTL_SECONDS", DASHBOARD_CACHE_TTL_SECONDS)
+    results, stale = {}, {}
+    for name, (key, loader) in specs.items():
+        cache_key = ("dashboard", name, datetime.date.today().isoformat()) + key
+        stamp, value = reference_cache.lookup(cache_key, DASHBOARD_MODULE_TABLES[name], ttl=ttl)
+        if value is MISSING:
+            stale[name] = (cache_key, stamp, loader)
+        else:
+            results[name] = value
+    loaded = _run_dashboard_loaders({name: loader for name, (_, _, loader) in stale.items()})
+    for name, value in loaded.items():
+        cache_key, stamp, _ = stale[name]
+        results[name] = reference_cache.store(cache_key, stamp, value)
+    return results
 
-                    # Only consider dates that are not in the far past with no status
-                    due_label, due_display, due_variant = _describe_due_date(visit_date, now)
-                    if due_variant == "none":
-                        continue
 
-                    if due_variant == "overdue":
-                        overdue_count += 1
-                    elif due_variant == "today":
-                        today_count += 1
-                    else:
-                        upcoming_count += 1
-
-                    # Lazily create the Service module once we know at least one item qualifies
-                    if service_module is None:
-                        service_module = _ensure_module(
-                            modules_map,
-                            module_order,
-                            "Service",
-                            "No upcoming service visits assigned.",
-                            "Overdue and upcoming AMC / breakdown visits assigned to you or your team.",
-                        )
+def _id_key(ids):
+    return tuple(sorted(uid for uid in ids or () if uid))
 
-                    lift = entry["lift"]
-                    lift_name = lift.lift_code or "Lift"
-
-                    # Build a site description using customer, city, route
-                    site_bits = []
-                    customer = getattr(lift, "customer", None)
-                    company_name = getattr(customer, "company_name", None) if customer else None
-                    if company_name:
-                        site_bits.append(company_name)
-                    elif getattr(lift, "customer_code", None):
-                        site_bits.append(lift.customer_code)
-                    if getattr(lift, "city", None):
-                        site_bits.append(lift.city)
-                    if getattr(lift, "route", None):
-                        site_bits.append(lift.route)
-
-                    description = " · ".join(site_bits) if site_bits else "Service site not specified"
-                    checklist = entry.get("checklist") or ""
-                    subtitle = checklist or "Scheduled service visit"
-
-                    status_label = "Overdue" if due_variant == "overdue" else "Scheduled"
-                    status_class = _status_badge_class("overdue" if due_variant == "overdue" else "scheduled")
-                    due_class = _due_badge_class(due_variant)
-
-                    service_module["items"].append(
-                        {
-                            "title": lift_name,
-                            "subtitle": subtitle,
-                            "description": description,
-                            "status": status_label,
-                            "status_class": status_class,
-                            "due_description": due_label,
-                            "due_display": due_display,
-                            "due_class": due_class,
-                            "due_variant": due_variant,
-                            "identifier": f"Service visit · {visit_date:%d %b %Y} · {lift_name}",
-                            "url": url_for("service_lift_detail", lift_id=lift.id),
-                            "secondary_url": None,
-                            "secondary_label": None,
-                            "metadata": [
-                                {
-                                    "label": "Technician",
-                                    "value": entry.get("technician") or "Unassigned",
-                                }
-                            ],
-                        }
-                    )
 
-                if service_module is not None:
-                    service_module["summary"] = {
-                        "overdue": overdue_count,
-                        "today": today_count,
-                        "upcoming": upcoming_count,
-                    }
-                    pending_total += len(service_module["items"])
+def _build_pending_modules(
+    viewing_user,
+    now,
+    *,
+    qc_scope="assigned",
+    qc_user_ids=None,
+    assignee_lookup=None,
+    sales_user_ids=None,
+    support_user_ids=None,
+    include_other_department=False,
+    sales_filter_mode="owner_or_creator",
+    module_visibility_override=None,
+    include_sales_tasks=True,
+):
+    modules_map = OrderedDict()
+    module_order = []
+    module_visibility_override = module_visibility_override or {}
 
-        pending_modules = [modules_map[label] for label in module_order]
-        pending_total = sum(len(module["items"]) for module in pending_modules)
-        return pending_modules, pending_total
+    def _ensure_module(label, empty_message, description=None):
+        module = modules_map.get(label)
+        if module is None:
+            module = {
+                "module": label,
+                "items": [],
+                "empty_message": empty_message,
+                "description": description,
+            }
+            modules_map[label] = module
+            module_order.append(label)
+        elif description and not module.get("description"):
+            module["description"] = description
+        return module
 
-    def _team_members_for(user):
-        if not user:
-            return []
+    def _hidden(label):
+        return label in module_visibility_override and not module_visibility_override[label]
+
+    viewer_id = viewing_user.id
+    sales_user_id_set = {viewer_id} if sales_user_ids is None else {uid for uid in sales_user_ids if uid}
+    sales_filter_mode = (sales_filter_mode or "owner_or_creator").strip().lower()
+    task_owner_ids = {uid for uid in (assignee_lookup or {}) if uid} or {viewer_id}
+    assignee_rows = (
+        {row.id: row for row in snapshot(assignee_lookup.values(), properties=("display_name",))}
+        if assignee_lookup
+        else {}
+    )
+    assignee_key = _id_key(assignee_rows)
+
+    technician_names = set()
+    show_service = viewing_user.can_view_module("service")
+    if "Service" in module_visibility_override:
+        show_service = bool(module_visibility_override["Service"])
+    if show_service:
+        # Team Dash: visits assigned to any user in the team; My Dash: the viewing user.
+        for user in assignee_lookup.values() if assignee_lookup else [viewing_user]:
+            if not user or not user.is_active:
+                continue
+            for value in (user.display_name, user.username):
+                if value:
+                    technician_names.add(value.strip().lower())
+
+    specs = {}
+    if not (_hidden("Projects") and _hidden("Quality Control")):
+        specs["qc"] = (
+            (qc_scope, _id_key(qc_user_ids), viewer_id, assignee_key),
+            functools.partial(_dashboard_qc_items, qc_scope, _id_key(qc_user_ids), viewer_id, assignee_rows, now),
+        )
+    if not _hidden("Sales") and sales_user_id_set:
+        specs["sales"] = (
+            (_id_key(sales_user_id_set), sales_filter_mode, _id_key(task_owner_ids), include_sales_tasks, assignee_key),
+            functools.partial(
+                _dashboard_sales_items,
+                _id_key(sales_user_id_set),
+                sales_filter_mode,
+                _id_key(task_owner_ids),
+                include_sales_tasks,
+                assignee_rows,
+                now,
+            ),
+        )
+    if not _hidden("Customer Support") and support_user_ids:
+        specs["support"] = (
+            (_id_key(support_user_ids), include_other_department, viewer_id, assignee_key),
+            functools.partial(
+                _dashboard_support_items,
+                _id_key(support_user_ids),
+                include_other_department,
+                viewer_id,
+                assignee_rows,
+                now,
+            ),
+        )
+    if not _hidden("Design"):
+        specs["design"] = (
+            (_id_key(task_owner_ids),),
+            functools.partial(_dashboard_design_items, _id_key(task_owner_ids), now),
+        )
+    if not _hidden("SRT"):
+        specs["srt"] = (
+            (_id_key(task_owner_ids),),
+            functools.partial(_dashboard_srt_items, _id_key(task_owner_ids), now),
+        )
+    if technician_names:
+        specs["service"] = (
+            (tuple(sorted(technician_names)),),
+            functools.partial(_dashboard_service_items, frozenset(technician_names), now),
+        )
+
+    loaded = _dashboard_module_items(specs)
+    qc_items = loaded.get("qc") or {"Projects": [], "Quality Control": []}
+    sales_items = loaded.get("sales") or []
+    support_items = loaded.get("support") or []
+    design_items = loaded.get("design") or []
+    srt_items = loaded.get("srt") or []
+
+    show_projects = viewing_user.can_view_module("operations") or bool(qc_items["Projects"])
+    show_qc = viewing_user.can_view_module("qc") or bool(qc_items["Quality Control"])
+    show_sales = viewing_user.can_view_module("sales") or bool(sales_items)
+    show_customer_support = viewing_user.can_view_module("customer_support") or bool(support_items)
+    show_design = viewing_user.can_view_module("design") or bool(design_items)
+    show_srt = viewing_user.can_view_module("srt") or bool(srt_items)
+
+    if "Projects" in module_visibility_override:
+        show_projects = bool(module_visibility_override["Projects"])
+    if "Quality Control" in module_visibility_override:
+        show_qc = bool(module_visibility_override["Quality Control"])
+    if "Sales" in module_visibility_override:
+        show_sales = bool(module_visibility_override["Sales"])
+    if "Customer Support" in module_visibility_override:
+        show_customer_support = bool(module_visibility_override["Customer Support"])
+    if "Design" in module_visibility_override:
+        show_design = bool(module_visibility_override["Design"])
+    if "SRT" in module_visibility_override:
+        show_srt = bool(module_visibility_override["SRT"])
+
+    if show_projects:
+        _ensure_module(
+            "Projects",
+            "No pending project tasks.",
+            "Tasks from active projects assigned to you.",
+        )
+    if show_sales:
+        _ensure_module(
+            "Sales",
+            "No pending sales activities.",
+            "Upcoming and overdue sales engagements and tasks on your opportunities.",
+        )["items"].extend(sales_items)
+    if show_customer_support:
+        _ensure_module(
+            "Customer Support",
+            "No open support tickets.",
+            "Support tickets assigned to you.",
+        )["items"].extend(support_items)
+    if show_design:
+        _ensure_module(
+            "Design",
+            "No pending design tasks.",
+            "Drawing, BOM and approval tasks assigned to you.",
+        )["items"].extend(design_items)
+    if show_srt:
+        _ensure_module(
+            "SRT",
+            "No pending SRT tasks.",
+            "Site readiness tasks assigned to you.",
+        )["items"].extend(srt_items)
+
+    if show_projects and qc_items["Projects"]:
+        _ensure_module(
+            "Projects",
+            "No pending project tasks.",
+            "Project execution tasks awaiting your action.",
+        )["items"].extend(qc_items["Projects"])
+    if show_qc and qc_items["Quality Control"]:
+        _ensure_module(
+            "Quality Control",
+            "No pending QC tasks.",
+            "Quality inspections and tasks that still need attention.",
+        )["items"].extend(qc_items["Quality Control"])
+
+    service = loaded.get("service")
+    if service and service["items"]:
+        # Only shown once at least one visit qualifies.
+        service_module = _ensure_module(
+            "Service",
+            "No upcoming service visits assigned.",
+            "Overdue and upcoming AMC / breakdown visits assigned to you or your team.",
+        )
+        service_module["items"].extend(service["items"])
+        service_module["summary"] = service["summary"]
+
+    pending_modules = [modules_map[label] for label in module_order]
+    pending_total = sum(len(module["items"]) for module in pending_modules)
+    return pending_modules, pending_total
+
+
+def _team_members_for(user):
+    if not user:
+        return []
 
-        members = []
-        seen_positions = set()
-        stack = []
-
-        position = getattr(user, "position", None)
-        if position and getattr(position, "direct_reports", None):
-            stack.extend(list(position.direct_reports))
-
-        if not stack and user.is_admin:
-            query = User.query.filter(User.id != user.id)
-            query = query.filter(User.active.is_(True))
-            ordered = query.order_by(
-                User.first_name.asc(),
-                User.last_name.asc(),
-                User.username.asc(),
-            ).all()
-            return ordered
+    members = []
+    seen_positions = set()
+    stack = []
 
-        while stack:
-            pos = stack.pop()
-            if not pos:
+    position = getattr(user, "position", None)
+    if position and getattr(position, "direct_reports", None):
+        stack.extend(list(position.direct_reports))
+
+    if not stack and user.is_admin:
+        query = User.query.filter(User.id != user.id)
+        query = query.filter(User.active.is_(True))
+        ordered = query.order_by(
+            User.first_name.asc(),
+            User.last_name.asc(),
+            User.username.asc(),
+        ).all()
+        return ordered
+
+    while stack:
+        pos = stack.pop()
+        if not pos:
+            continue
+        pos_id = getattr(pos, "id", None)
+        if pos_id in seen_positions:
+            continue
+        seen_positions.add(pos_id)
+        direct_reports = list(getattr(pos, "direct_reports", []) or [])
+        if direct_reports:
+            stack.extend(direct_reports)
+        if not getattr(pos, "active", True):
+            continue
+        for member in list(getattr(pos, "users", []) or []):
+            if not member or getattr(member, "id", None) is None:
                 continue
-            pos_id = getattr(pos, "id", None)
-            if pos_id in seen_positions:
+            if member.id == user.id:
                 continue
-            seen_positions.add(pos_id)
-            direct_reports = list(getattr(pos, "direct_reports", []) or [])
-            if direct_reports:
-                stack.extend(direct_reports)
-            if not getattr(pos, "active", True):
+            if not member.is_active:
                 continue
-            for member in list(getattr(pos, "users", []) or []):
-                if not member or getattr(member, "id", None) is None:
-                    continue
-                if member.id == user.id:
-                    continue
-                if not member.is_active:
-                    continue
-                members.append(member)
+            members.append(member)
 
-        unique_members = []
-        seen_member_ids = set()
-        for member in members:
-            if member.id in seen_member_ids:
-                continue
-            seen_member_ids.add(member.id)
-            unique_members.append(member)
-        return unique_members
+    unique_members = []
+    seen_member_ids = set()
+    for member in members:
+        if member.id in seen_member_ids:
+            continue
+        seen_member_ids.add(member.id)
+        unique_members.append(member)
+    return unique_members
 
-    status_order = case(
-        (QCWork.status == "Pending Inspection", 0),
-        (QCWork.status == "Inspection Done", 1),
-        (QCWork.status == "Rectification Pending", 2),
-        (QCWork.status == "Closed", 3),
-        else_=4
-    )
-    now = datetime.datetime.utcnow()
-    tasks = (
-        QCWork.query
-        .filter(QCWork.assigned_to == viewing_user.id)
-        .order_by(status_order, QCWork.due_date.asc().nullslast(), QCWork.created_at.desc())
-        .all()
-    )
-    actionable_tasks = [task for task in tasks if task.dependency_satisfied]
-    blocked_tasks = [task for task in tasks if not task.dependency_satisfied and task.status != "Closed"]
-    open_tasks = [task for task in actionable_tasks if task.status != "Closed"]
-    closed_tasks = [task for task in tasks if task.status == "Closed"]
 
-    open_count = sum(1 for task in open_tasks if (task.status or "").lower() != "closed")
-    in_progress_count = sum(1 for task in open_tasks if (task.status or "").lower() == "inspection done")
-    overdue_count = sum(
-        1
-        for task in open_tasks
-        if task.due_date and task.due_date < now and (task.status or "").lower() != "closed"
-    )
+def _build_task_overview(viewing_user: "User", sections=DASHBOARD_SECTIONS):
+    """Pending work for the dashboard panels named in ``sections``.
 
-    team_load = []
-    if current_user.is_admin:
-        users = User.query.order_by(User.username.asc()).all()
-        assignments = {user.id: [] for user in users}
-        for task in QCWork.query.filter(QCWork.assigned_to.isnot(None)).all():
-            assignments.setdefault(task.assigned_to, []).append(task)
-
-        for member in users:
-            member_tasks = assignments.get(member.id, [])
-            actionable = [task for task in member_tasks if task.dependency_satisfied]
-            open_items = [task for task in actionable if task.status != "Closed"]
-            team_load.append({
-                "user": member,
-                "total": len(actionable),
-                "open": sum(1 for task in open_items if (task.status or "").lower() in {"open", "blocked"}),
-                "in_progress": sum(1 for task in open_items if (task.status or "").lower() == "in progress"),
-                "overdue": sum(
-                    1 for task in open_items if task.due_date and task.due_date < now
-                )
-            })
+    "my" is work assigned to ``viewing_user``, "created" work they assigned
+    to others and "team" their reports' work. Module items are cached per
+    set of users (see ``_dashboard_module_items``).
+    """
+    now = datetime.datetime.utcnow()
+    overview = {}
 
-    support_tickets = _pending_support_tickets_for_users(
-        {getattr(viewing_user, "id", None)}, include_other_department=True
-    )
-    pending_modules, pending_total = _build_pending_modules(
-        viewing_user,
-        open_tasks,
-        now,
-        support_tickets=support_tickets,
-        sales_filter_mode="owner_only",
-    )
-
-    created_by_modules = []
-    created_by_total = 0
-    if viewing_user and getattr(viewing_user, "id", None):
-        created_by_tasks = (
-            QCWork.query
-            .filter(QCWork.created_by == viewing_user.id)
-            .filter(QCWork.status != "Closed")
-            .order_by(status_order, QCWork.due_date.asc().nullslast(), QCWork.created_at.desc())
-            .all()
+    if "my" in sections:
+        overview["pending_modules"], overview["pending_total"] = _build_pending_modules(
+            viewing_user,
+            now,
+            qc_user_ids={viewing_user.id},
+            support_user_ids={viewing_user.id},
+            include_other_department=True,
+            sales_filter_mode="owner_only",
         )
-        created_actionable_tasks = [
-            task
-            for task in created_by_tasks
-            if task.dependency_satisfied and task.assigned_to != viewing_user.id
-        ]
+
+    if "created" in sections:
         assignee_lookup = {
             user.id: user for user in get_assignable_users_for_module("qc", order_by="username")
         }
-        created_by_modules, created_by_total = _build_pending_modules(
+        overview["created_by_modules"], overview["created_by_total"] = _build_pending_modules(
             viewing_user,
-            created_actionable_tasks,
             now,
+            qc_scope="created",
+            qc_user_ids={viewing_user.id},
             assignee_lookup=assignee_lookup,
             sales_user_ids={viewing_user.id},
             sales_filter_mode="creator_only",
@@ -27828,111 +30085,134 @@ def _build_task_overview(viewing_user: "User"):
             include_sales_tasks=False,
         )
 
-    team_members = _team_members_for(viewing_user)
-    team_user_ids = sorted(
-        {member.id for member in team_members if getattr(member, "id", None)}
-    )
-    team_pending_modules = []
-    team_pending_total = 0
-    if team_user_ids:
-        team_tasks = (
-            QCWork.query
-            .filter(QCWork.assigned_to.in_(team_user_ids))
-            .order_by(status_order, QCWork.due_date.asc().nullslast(), QCWork.created_at.desc())
-            .all()
-        )
-        team_actionable_tasks = [task for task in team_tasks if task.dependency_satisfied]
-        team_open_tasks = [task for task in team_actionable_tasks if task.status != "Closed"]
-        assignment_lookup = {member.id: member for member in team_members}
-        team_support_tickets = _pending_support_tickets_for_users(team_user_ids)
-        team_pending_modules, team_pending_total = _build_pending_modules(
-            viewing_user,
-            team_open_tasks,
-            now,
-            assignee_lookup=assignment_lookup,
-            sales_user_ids=team_user_ids,
-            support_tickets=team_support_tickets,
-            sales_filter_mode="owner_only",
+    if "team" in sections:
+        team_members = _team_members_for(viewing_user)
+        team_user_ids = {member.id for member in team_members if getattr(member, "id", None)}
+        team_pending_modules, team_pending_total = [], 0
+        if team_user_ids:
+            team_pending_modules, team_pending_total = _build_pending_modules(
+                viewing_user,
+                now,
+                qc_user_ids=team_user_ids,
+                assignee_lookup={member.id: member for member in team_members},
+                sales_user_ids=team_user_ids,
+                support_user_ids=team_user_ids,
+                sales_filter_mode="owner_only",
+            )
+        overview.update(
+            team_members=team_members,
+            team_pending_modules=team_pending_modules,
+            team_pending_total=team_pending_total,
         )
 
-    return {
-        "open_tasks": open_tasks,
-        "closed_tasks": closed_tasks,
-        "open_count": open_count,
-        "in_progress_count": in_progress_count,
-        "overdue_count": overdue_count,
-        "blocked_tasks": blocked_tasks,
-        "team_load": team_load,
-        "pending_modules": pending_modules,
-        "pending_total": pending_total,
-        "created_by_modules": created_by_modules,
-        "created_by_total": created_by_total,
-        "team_pending_modules": team_pending_modules,
-        "team_pending_total": team_pending_total,
-        "team_members": team_members,
-    }
+    return overview
 
 
-@app.route("/dashboard")
-@login_required
-def dashboard():
+# Empty message and overview keys per dashboard panel.
+DASHBOARD_PANELS = {
+    "my": ("Nothing pending — time for a coffee? ☕", "pending_modules", "pending_total"),
+    "created": ("No items assigned by you are pending.", "created_by_modules", "created_by_total"),
+    "team": ("Your team has no pending work right now. 🎉", "team_pending_modules", "team_pending_total"),
+}
+PROJECT_DASHBOARD_MODULES = {"Projects", "Quality Control"}
+
+
+def _dashboard_viewing_user():
     viewing_user = current_user
     selected_user_id = request.args.get("user_id", type=int)
     if selected_user_id and current_user.is_admin:
         candidate = db.session.get(User, selected_user_id)
         if candidate:
             viewing_user = candidate
+    return viewing_user
 
-    context = _build_task_overview(viewing_user)
-    context.update({
-        "viewing_user": viewing_user,
-        "category_label": None,
-        "page_mode": "dashboard",
-        "switch_user_endpoint": "dashboard",
-    })
 
-    return render_template("dashboard.html", **context)
+def _render_dashboard_shell(page_mode, endpoint, **context):
+    """The dashboard page; each panel loads itself from ``dashboard_section``."""
+    viewing_user = _dashboard_viewing_user()
+    sections = [section for section in DASHBOARD_SECTIONS if page_mode != "projects" or section != "created"]
+    section_urls = {
+        section: url_for(
+            "dashboard_section",
+            section=section,
+            mode=page_mode,
+            user_id=viewing_user.id if viewing_user.id != current_user.id else None,
+        )
+        for section in sections
+    }
+    return render_template(
+        "dashboard.html",
+        viewing_user=viewing_user,
+        page_mode=page_mode,
+        switch_user_endpoint=endpoint,
+        section_urls=section_urls,
+        **context,
+    )
 
 
-@app.route("/projects/pending")
+@app.route("/dashboard")
 @login_required
-def projects_pending():
-    _module_visibility_required("operations")
-    viewing_user = current_user
-    selected_user_id = request.args.get("user_id", type=int)
-    if selected_user_id and current_user.is_admin:
-        candidate = db.session.get(User, selected_user_id)
-        if candidate:
-            viewing_user = candidate
+def dashboard():
+    return _render_dashboard_shell("dashboard", "dashboard", category_label=None)
 
-    context = _build_task_overview(viewing_user)
-    context.update({
-        "viewing_user": viewing_user,
-        "category_label": "Projects",
-        "category_url": url_for("projects_pending"),
-        "page_mode": "projects",
-        "switch_user_endpoint": "projects_pending",
-    })
 
-    project_modules = [
-        module
-        for module in context.get("pending_modules", [])
-        if module.get("module") in {"Projects", "Quality Control"}
-    ]
-    context["pending_modules"] = project_modules
-    context["pending_total"] = sum(len(module.get("items", [])) for module in project_modules)
+@app.route("/dashboard/section/<section>")
+@login_required
+def dashboard_section(section):
+    """One dashboard panel, loaded over HTMX so a slow panel does not hold up the others."""
+    if section not in DASHBOARD_PANELS:
+        abort(404)
+    page_mode = request.args.get("mode") or "dashboard"
+    if page_mode == "projects":
+        _module_visibility_required("operations")
+    viewing_user = _dashboard_viewing_user()
+    overview = _build_task_overview(viewing_user, sections=(section,))
+    empty_text, modules_key, total_key = DASHBOARD_PANELS[section]
+    modules = overview[modules_key]
+    if page_mode == "projects":
+        modules = [module for module in modules if module.get("module") in PROJECT_DASHBOARD_MODULES]
+    return render_template(
+        "partials/dashboard_panel.html",
+        section=section,
+        modules=modules,
+        total=sum(len(module.get("items", [])) for module in modules),
+        empty_text=empty_text,
+        team_members=overview.get("team_members"),
+    )
 
-    team_project_modules = [
-        module
-        for module in context.get("team_pending_modules", [])
-        if module.get("module") in {"Projects", "Quality Control"}
-    ]
-    context["team_pending_modules"] = team_project_modules
-    context["team_pending_total"] = sum(
-        len(module.get("items", [])) for module in team_project_modules
+
+@app.route("/search")
+@login_required
+def global_search_view():
+    ensure_bootstrap()
+    search_query = (request.args.get("q") or "").strip()
+    visible_kinds = {
+        source.kind for source in SEARCH_SOURCES if current_user.can_view_module(source.module)
+    }
+    selected_kind = (request.args.get("kind") or "").strip()
+    kinds = {selected_kind} & visible_kinds if selected_kind else visible_kinds
+    groups = global_search(search_query, kinds=kinds) if search_query else []
+    if _is_htmx_request():
+        return render_template("partials/search_results.html", groups=groups, search_query=search_query)
+    return render_template(
+        "search.html",
+        groups=groups,
+        search_query=search_query,
+        selected_kind=selected_kind,
+        sources=[source for source in SEARCH_SOURCES if source.kind in visible_kinds],
     )
 
-    return render_template("dashboard.html", **context)
+
+@app.route("/projects/pending")
+@login_required
+def projects_pending():
+    _module_visibility_required("operations")
+    return _render_dashboard_shell(
+        "projects",
+        "projects_pending",
+        category_label="Projects",
+        category_url=url_for("projects_pending"),
+    )
 
 
 # ---------------------- FORMS (TEMPLATES) ----------------------
@@ -29734,10 +32014,10 @@ def project_template_task_reorder(template_id):
 @login_required
 def customer_support_home():
     _module_visibility_required("customer_support")
-    summary = _customer_support_summary()
+    summary = _customer_support_summary(recent_limit=5)
     counts = summary["counts"]
     recent_tickets = []
-    for ticket in summary["recent"][:5]:
+    for ticket in summary["recent"]:
         recent_tickets.append(
             {
                 **ticket,
@@ -29808,7 +32088,9 @@ def customer_support_tasks():
         add_ticket_form_data["owner"] = str(current_user.id)
     now = datetime.datetime.utcnow()
     tickets = []
-    for ticket in CUSTOMER_SUPPORT_TICKETS:
+    tickets_by_id = {}
+    for ticket in _customer_support_tickets():
+        tickets_by_id[ticket.get("id")] = ticket
         _resolve_ticket_assignee_user(ticket)
         _resolve_ticket_owner_user(ticket)
         if not ticket.get("owner"):
@@ -29826,6 +32108,8 @@ def customer_support_tasks():
     ticket_open_task_map = {
         ticket.get("id"): _ticket_has_open_linked_tasks(ticket) for ticket in tickets
     }
+    if selected_ticket:
+        selected_ticket = tickets_by_id.get(selected_ticket.get("id"), selected_ticket)
     selected_ticket = selected_ticket or _get_customer_support_ticket(ticket_id)
 
     timeline = []
@@ -30072,9 +32356,7 @@ def customer_support_create_linked_task():
         }
 
     ticket.setdefault("linked_tasks", []).append(new_task)
-    if created_enquiry:
-        db.session.commit()
-    _save_customer_support_state()
+    _save_customer_support_ticket(ticket)
     flash("Linked task created successfully.", "success")
     return redirect(url_for("customer_support_tasks", ticket=ticket_id))
 
@@ -30226,7 +32508,7 @@ def customer_support_update_ticket(ticket_id):
             }
         )
 
-    _save_customer_support_state()
+    _save_customer_support_ticket(ticket)
     flash("Ticket details updated successfully.", "success")
     return redirect(url_for("customer_support_tasks", ticket=ticket_id))
 
@@ -30281,7 +32563,7 @@ def customer_support_mark_ticket_resolved(ticket_id):
             }
         )
 
-    _save_customer_support_state()
+    _save_customer_support_ticket(ticket)
     flash(f"Ticket {ticket_id} marked as resolved.", "success")
     return redirect(url_for("customer_support_tasks"))
 
@@ -30299,8 +32581,7 @@ def customer_support_delete_ticket(ticket_id):
         flash("The requested ticket could not be found.", "error")
         return redirect(url_for("customer_support_tasks"))
 
-    CUSTOMER_SUPPORT_TICKETS[:] = [item for item in CUSTOMER_SUPPORT_TICKETS if item.get("id") != ticket_id]
-    _save_customer_support_state()
+    _delete_customer_support_ticket(ticket_id)
     flash(f"Ticket {ticket_id} deleted successfully.", "success")
     return redirect(url_for("customer_support_tasks"))
 
@@ -30352,7 +32633,7 @@ def customer_support_post_update(ticket_id):
     ticket.setdefault("timeline", []).append(timeline_entry)
     ticket["updated_at"] = datetime.datetime.utcnow()
 
-    _save_customer_support_state()
+    _save_customer_support_ticket(ticket)
     flash("Ticket update posted successfully.", "success")
     return redirect(url_for("customer_support_tasks", ticket=ticket_id))
 
@@ -30439,7 +32720,7 @@ def service_settings():
     sort_query_args.pop("tab", None)
 
     route_sort_columns = {
-        "route": func.lower(ServiceRoute.state),
+        "route": ci_key(ServiceRoute.state),
         "branch": func.lower(ServiceRoute.branch),
         "remark": func.lower(ServiceRoute.remark),
         "created": ServiceRoute.created_at,
@@ -30449,7 +32730,7 @@ def service_settings():
     if route_column is not None:
         route_query = route_query.order_by(route_column.desc() if sort_order == "desc" else route_column.asc())
     else:
-        route_query = route_query.order_by(func.lower(ServiceRoute.state), func.lower(ServiceRoute.branch))
+        route_query = route_query.order_by(ci_key(ServiceRoute.state), func.lower(ServiceRoute.branch))
 
     service_routes = route_query.all()
     service_dropdown_groups = {
@@ -30718,11 +32999,21 @@ def service_contract_price_export():
         ServiceContractPrice.contract_type.asc(),
         ServiceContractPrice.duration_years.asc(),
         ServiceContractPrice.frequency_per_year.asc(),
-    ).all()
+    )
 
-    output = StringIO()
-    writer = csv.writer(output)
-    writer.writerow(
+    def _price_row(row):
+        return [
+            row.lift_type_key,
+            row.floors_value,
+            row.contract_type,
+            row.duration_years,
+            row.frequency_per_year,
+            row.price,
+            1 if row.is_active else 0,
+        ]
+
+    return export_response(
+        "service_contract_prices_export.csv",
         [
             "lift_type_key",
             "floors_value",
@@ -30731,28 +33022,10 @@ def service_contract_price_export():
             "frequency_per_year",
             "price",
             "is_active",
-        ]
-    )
-    for row in rows:
-        writer.writerow(
-            [
-                row.lift_type_key,
-                row.floors_value,
-                row.contract_type,
-                row.duration_years,
-                row.frequency_per_year,
-                row.price,
-                1 if row.is_active else 0,
-            ]
-        )
-
-    buffer = BytesIO(output.getvalue().encode("utf-8"))
-    buffer.seek(0)
-    return send_file(
-        buffer,
-        mimetype="text/csv; charset=utf-8",
-        as_attachment=True,
-        download_name="service_contract_prices_export.csv",
+        ],
+        iter_export_rows(rows, _price_row),
+        fmt="csv",
+        csv_bom=False,
     )
 
 
@@ -31375,105 +33648,13 @@ def service_settings_dropdown_reorder():
     return jsonify({"ok": True})
 
 
-def _coerce_date(value):
-    if isinstance(value, datetime.datetime):
-        return value.date()
-    if isinstance(value, datetime.date):
-        return value
-    if isinstance(value, str):
-        cleaned = value.strip()
-        if not cleaned:
-            return None
-        for fmt in (
-            "%Y-%m-%d",
-            "%Y/%m/%d",
-            "%d-%m-%Y",
-            "%d/%m/%Y",
-            "%Y-%m-%dT%H:%M:%S",
-            "%Y-%m-%dT%H:%M:%S.%f",
-        ):
-            try:
-                return datetime.datetime.strptime(cleaned, fmt).date()
-            except ValueError:
-                continue
-    return None
-
-
-def _coerce_bool(value):
-    if isinstance(value, bool):
-        return value
-    if isinstance(value, str):
-        lowered = value.strip().lower()
-        if lowered in {"yes", "true", "1"}:
-            return True
-        if lowered in {"no", "false", "0"}:
-            return False
-    return None
-
-
-def _coerce_float(value):
-    if isinstance(value, (int, float)):
-        return float(value)
-    if isinstance(value, str):
-        cleaned = value.strip()
-        if not cleaned:
-            return None
-        try:
-            return float(cleaned)
-        except ValueError:
-            return None
-    return None
-
-
-def _coerce_minutes(value):
-    if value in (None, ""):
-        return None
-    if isinstance(value, (int, float)):
-        return float(value)
-    if isinstance(value, str):
-        cleaned = value.strip().lower()
-        if not cleaned:
-            return None
-        time_match = re.match(r"^(-?\d+):(\d{1,2})$", cleaned)
-        if time_match:
-            hours_part = float(time_match.group(1))
-            minutes_part = float(time_match.group(2))
-            return hours_part * 60 + minutes_part
-        hour_match = re.search(r"(-?\d+(?:\.\d+)?)\s*h", cleaned)
-        minute_match = re.search(r"(-?\d+(?:\.\d+)?)\s*m", cleaned)
-        total_minutes = 0.0
-        matched = False
-        if hour_match:
-            total_minutes += float(hour_match.group(1)) * 60
-            matched = True
-        if minute_match:
-            total_minutes += float(minute_match.group(1))
-            matched = True
-        if matched:
-            return total_minutes
-        for suffix in ("minutes", "minute", "mins", "min", "m"):
-            if cleaned.endswith(suffix):
-                cleaned = cleaned[: -len(suffix)].strip()
-                break
-        if cleaned.endswith("h"):
-            try:
-                return float(cleaned[:-1].strip()) * 60
-            except ValueError:
-                return None
-        try:
-            return float(cleaned)
-        except ValueError:
-            return None
-    return None
-
-
 def _create_service_visit_from_support_ticket(ticket: dict) -> None:
     """
     Create a service visit entry on the relevant Lift based on a newly created
     Customer Support ticket (typically breakdown / AMC complaints).
 
     Assumptions:
-    - ticket is a dict from CUSTOMER_SUPPORT_TICKETS.
+    - ticket is a customer support ticket dict (see SupportTicket.to_dict).
     - ticket["lift_id"] (or similar) links to a Lift row.
     - We do NOT commit outside this function; the caller will commit.
     """
@@ -31609,32 +33790,64 @@ def _format_delta_label(delta_days):
     return f"{abs(delta_days)} days ago"
 
 
-def get_service_schedule_snapshot():
-    today = datetime.date.today()
-    lifts = (
-        Lift.query.options(
-            load_only(
-                Lift.id,
-                Lift.lift_code,
-                Lift.customer_code,
-                Lift.route,
-                Lift.city,
-                Lift.service_schedule_json,
-                Lift.next_service_due,
-            ),
-            joinedload(Lift.customer),
-        )
-        .filter(
-            or_(
-                Lift.service_schedule_json.isnot(None),
-                Lift.next_service_due.isnot(None),
-            )
-        )
-        .order_by(func.lower(Lift.lift_code))
-        .all()
+SERVICE_VISIT_CLOSED_STATUSES = ("completed",)
+
+
+def _service_visit_query():
+    return ServiceVisit.query.join(ServiceVisit.lift).options(
+        contains_eager(ServiceVisit.lift).joinedload(Lift.customer)
     )
+
+
+def _service_visit_entry(visit):
+    lift = visit.lift
+    return {
+        "lift": lift,
+        "date": visit.visit_date,
+        "status": visit.status or "scheduled",
+        "route": clean_str(visit.route) or clean_str(lift.route),
+        "technician": clean_str(visit.technician),
+        "first_time_fix": visit.first_time_fix,
+        "on_time": visit.on_time,
+        "travel_minutes": visit.travel_minutes,
+        "repair_minutes": visit.repair_minutes,
+        "rating": visit.rating,
+        "checklist": clean_str(visit.checklist),
+        "complaint_summary": clean_str(visit.complaint_summary),
+        "support_ticket_ref": visit.support_ticket_ref,
+    }
+
+
+def count_open_service_visits(start=None, end=None):
+    """Count visits that are not completed with ``start <= date < end``."""
+    query = db.session.query(func.count(ServiceVisit.id)).filter(
+        ServiceVisit.status.notin_(SERVICE_VISIT_CLOSED_STATUSES)
+    )
+    if start is not None:
+        query = query.filter(ServiceVisit.visit_date >= start)
+    if end is not None:
+        query = query.filter(ServiceVisit.visit_date < end)
+    return query.scalar() or 0
+
+
+def get_service_schedule_snapshot(*, exclude_statuses=()):
+    today = datetime.date.today()
+    query = _service_visit_query()
+    if exclude_statuses:
+        query = query.filter(ServiceVisit.status.notin_(exclude_statuses))
+    visits = query.order_by(
+        ci_key(Lift.lift_code), ServiceVisit.lift_id, ServiceVisit.position
+    ).all()
+
     entries = []
-    lifts_with_schedule = 0
+    lifts = []
+    seen_lift_ids = set()
+    for visit in visits:
+        entries.append(_service_visit_entry(visit))
+        if visit.lift_id not in seen_lift_ids:
+            seen_lift_ids.add(visit.lift_id)
+            lifts.append(visit.lift)
+
     branches = set()
     for (raw_branch,) in (
         db.session.query(Lift.route)
@@ -31646,49 +33859,9 @@ def get_service_schedule_snapshot():
         if cleaned_branch:
             branches.add(cleaned_branch)
 
-    for lift in lifts:
-        branch_value = clean_str(lift.route)
-        if branch_value:
-            branches.add(branch_value)
-        schedule = lift.service_schedule or []
-        if schedule:
-            lifts_with_schedule += 1
-        for raw_entry in schedule:
-            visit_date = _coerce_date(raw_entry.get("date"))
-            status_value = clean_str(raw_entry.get("status")) or "scheduled"
-            status_key = status_value.lower()
-            if status_key not in SERVICE_VISIT_STATUS_LABELS:
-                status_key = "scheduled"
-            route_value = clean_str(raw_entry.get("route")) or clean_str(lift.route)
-            technician = clean_str(raw_entry.get("technician"))
-            complaint_summary = clean_str(raw_entry.get("complaint_summary")) or ""
-            ticket_ref = raw_entry.get("support_ticket_ref")
-            entries.append(
-                {
-                    "lift": lift,
-                    "date": visit_date,
-                    "status": status_key,
-                    "route": route_value,
-                    "technician": technician,
-                    "first_time_fix": _coerce_bool(raw_entry.get("first_time_fix")),
-                    "on_time": _coerce_bool(
-                        raw_entry.get("on_time")
-                        or raw_entry.get("on_time_completion")
-                    ),
-                    "travel_minutes": _coerce_minutes(
-                        raw_entry.get("travel_minutes")
-                        or raw_entry.get("travel_time")
-                    ),
-                    "repair_minutes": _coerce_minutes(
-                        raw_entry.get("repair_minutes")
-                        or raw_entry.get("duration_minutes")
-                    ),
-                    "rating": _coerce_float(raw_entry.get("rating")),
-                    "checklist": clean_str(raw_entry.get("checklist")),
-                    "complaint_summary": complaint_summary,
-                    "support_ticket_ref": ticket_ref,
-                }
-            )
+    lifts_with_schedule = (
+        db.session.query(func.count(func.distinct(ServiceVisit.lift_id))).scalar() or 0
+    )
 
     return {
         "today": today,
@@ -32006,9 +34179,14 @@ def build_service_overview_payload():
     }
 
     category_counts = Counter()
-    for ticket in _filter_other_department_records(CUSTOMER_SUPPORT_TICKETS):
-        category_value = clean_str(ticket.get("category")) or "Uncategorised"
-        category_counts[category_value] += 1
+    category_rows = (
+        db.session.query(SupportTicket.category, func.count(SupportTicket.id))
+        .filter(_support_ticket_excludes_other_department())
+        .group_by(SupportTicket.category)
+        .all()
+    )
+    for category_value, count in category_rows:
+        category_counts[clean_str(category_value) or "Uncategorised"] += count
     if category_counts:
         chart_sets["complaints_by_category"] = [
             {"label": label, "value": count}
@@ -32230,9 +34408,9 @@ def service_tasks():
     return render_template(
         "service/tasks.html",
         tasks=[_service_task_payload(task) for task in tasks],
-        customers=Customer.query.order_by(func.lower(Customer.company_name)).all(),
-        lifts=Lift.query.order_by(func.lower(Lift.lift_code)).limit(200).all(),
-        users=User.query.filter(User.active.is_(True)).order_by(func.lower(User.username)).all(),
+        customers=Customer.query.order_by(ci_key(Customer.company_name)).all(),
+        lifts=Lift.query.order_by(ci_key(Lift.lift_code)).limit(200).all(),
+        users=User.query.filter(User.active.is_(True)).order_by(ci_key(User.username)).all(),
         call_types=SERVICE_TASK_CALL_TYPE_OPTIONS,
         priority_options=SERVICE_TASK_PRIORITY_OPTIONS,
         current_sort=sort_col,
@@ -32373,16 +34551,22 @@ def service_customers():
     search_query = (request.args.get("q") or "").strip()
 
     query = _customer_query_for_export(search_query)
-    query = query.options(joinedload(Customer.lifts))
+    query = query.options(selectinload(Customer.lifts))
 
-    customers = query.all()
-    for customer in customers:
+    page = _paginate_list(
+        query,
+        [(ci_key(Customer.company_name), False)],
+        tiebreaker=Customer.id,
+    )
+    for customer in page.items:
         open_lifts = [lift for lift in customer.lifts if is_lift_open(lift)]
         customer.open_lifts = open_lifts
+    if page.cursor and _is_htmx_request():
+        return render_template("service/_customer_rows.html", page=page)
     next_customer_code = generate_next_customer_code()
     return render_template(
         "service/customers.html",
-        customers=customers,
+        page=page,
         search_query=search_query,
         next_customer_code=next_customer_code,
     )
@@ -32396,30 +34580,14 @@ def service_customers_export():
         abort(403)
 
     search_query = (request.args.get("q") or "").strip()
-    customers = _customer_query_for_export(search_query).all()
+    customers = _customer_query_for_export(search_query)
 
     timestamp = datetime.datetime.utcnow().strftime("%Y%m%d")
-    filename = f"customers_export_{timestamp}.xlsx"
-
-    if OPENPYXL_AVAILABLE:
-        workbook = build_customer_export_workbook(customers)
-        output = BytesIO()
-        workbook.save(output)
-        output.seek(0)
-        return send_file(
-            output,
-            as_attachment=True,
-            download_name=filename,
-            mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        )
-
-    csv_rows = [_customer_upload_row(customer) for customer in customers]
-    csv_output = _build_csv_output(CUSTOMER_UPLOAD_TEMPLATE_HEADERS, csv_rows)
-    return send_file(
-        csv_output,
-        as_attachment=True,
-        download_name=filename.replace(".xlsx", ".csv"),
-        mimetype="text/csv",
+    return export_response(
+        f"customers_export_{timestamp}.xlsx",
+        CUSTOMER_UPLOAD_TEMPLATE_HEADERS,
+        iter_export_rows(customers, _customer_upload_row),
+        sheet_title=CUSTOMER_UPLOAD_TEMPLATE_SHEET_NAME,
     )
 
 
@@ -32437,41 +34605,25 @@ def service_lifts_export():
         like = f"%{search_query.lower()}%"
         query = query.filter(
             or_(
-                func.lower(Lift.lift_code).like(like),
-                func.lower(Lift.customer_code).like(like),
+                ci_key(Lift.lift_code).like(like),
+                ci_key(Lift.customer_code).like(like),
                 func.lower(Lift.city).like(like),
                 func.lower(Lift.state).like(like),
-                func.lower(Lift.route).like(like),
+                ci_key(Lift.route).like(like),
                 func.lower(Lift.lift_type).like(like),
                 func.lower(Lift.lift_brand).like(like),
                 func.lower(Lift.status).like(like),
             )
         )
 
-    lifts = query.order_by(func.lower(Lift.lift_code)).all()
+    lifts = query.order_by(ci_key(Lift.lift_code))
 
     timestamp = datetime.datetime.utcnow().strftime("%Y%m%d")
-    filename = f"lifts_export_{timestamp}.xlsx"
-
-    if OPENPYXL_AVAILABLE:
-        workbook = build_lift_export_workbook(lifts)
-        output = BytesIO()
-        workbook.save(output)
-        output.seek(0)
-        return send_file(
-            output,
-            as_attachment=True,
-            download_name=filename,
-            mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        )
-
-    csv_rows = [_lift_export_row(lift) for lift in lifts]
-    csv_output = _build_csv_output(AMC_LIFT_TEMPLATE_HEADERS, csv_rows)
-    return send_file(
-        csv_output,
-        as_attachment=True,
-        download_name=filename.replace(".xlsx", ".csv"),
-        mimetype="text/csv",
+    return export_response(
+        f"lifts_export_{timestamp}.xlsx",
+        AMC_LIFT_TEMPLATE_HEADERS,
+        iter_export_rows(lifts, _lift_export_row),
+        sheet_title=AMC_LIFT_TEMPLATE_SHEET_NAME,
     )
 
 
@@ -32494,7 +34646,7 @@ def service_customers_create():
         flash("Company name is required.", "error")
         return redirect(redirect_url)
 
-    existing = Customer.query.filter(func.lower(Customer.customer_code) == customer_code.lower()).first()
+    existing = Customer.query.filter(ci_key(Customer.customer_code) == customer_code.lower()).first()
     if existing:
         flash("Another customer already uses that customer code. Please try again.", "error")
         return redirect(redirect_url)
@@ -32543,7 +34695,7 @@ def service_customer_detail(customer_id):
 
     lifts = (
         Lift.query.filter_by(customer_code=customer.customer_code)
-        .order_by(func.lower(Lift.lift_code))
+        .order_by(ci_key(Lift.lift_code))
         .options(joinedload(Lift.customer))
         .all()
     )
@@ -33030,6 +35182,7 @@ def service_customers_upload():
             pending_uploads.pop(pending_token, None)
             session["pending_uploads"] = pending_uploads
             session.modified = True
+            discard_upload_plan(pending_token)
             try:
                 os.remove(file_path)
             except OSError:
@@ -33042,12 +35195,20 @@ def service_customers_upload():
             return redirect(url_for("service_customers"))
 
         try:
-            outcome = process_customer_upload_file(
-                file_path,
-                apply_changes=True,
+            outcome = apply_upload_plan(
+                pending_token, "customer", file_path, user_id=current_user.id
             )
+            if outcome is None:
+                outcome = process_customer_upload_file(
+                    file_path,
+                    apply_changes=True,
+                )
         except UploadStageTimeoutError as exc:
             flash(str(exc), "error")
+            if exc.partial_upload_message:
+                # Merging the same file again would add the saved rows twice.
+                _clear_pending_upload(pending_token, remove_file=True)
+                flash(exc.partial_upload_message, "warning")
             return redirect(url_for("service_customers"))
 
         pending_uploads.pop(pending_token, None)
@@ -33093,6 +35254,7 @@ def service_customers_upload():
     saved_token = None
     saved_extension = None
     saved_path = None
+    plan = UploadPlan("customer")
     try:
         saved_token, saved_extension = save_pending_upload_file(
             upload,
@@ -33103,6 +35265,7 @@ def service_customers_upload():
         outcome = process_customer_upload_file(
             saved_path,
             apply_changes=False,
+            plan=plan,
         )
     except MissingDependencyError:
         file_path = saved_path or _build_pending_upload_path(saved_token, saved_extension)
@@ -33178,6 +35341,7 @@ def service_customers_upload():
         return redirect(url_for("service_customers"))
 
     pending_token = uuid.uuid4().hex
+    plan.save(pending_token, outcome, saved_path)
     pending_uploads = session.get("pending_uploads", {})
     pending_uploads[pending_token] = {
         "type": "service_customers",
@@ -33196,6 +35360,48 @@ def service_customers_upload():
         )
     )
 
+@job_handler("lift_upload_apply", title="AMC lift upload")
+def _lift_upload_apply_job(context):
+    file_path = context.payload.get("path")
+    if not file_path or not os.path.exists(file_path):
+        raise JobFailed("The staged upload file was not found. Please try uploading again.")
+    try:
+        outcome = apply_upload_plan(
+            context.payload.get("plan_token"),
+            "lift",
+            file_path,
+            user_id=context.job.created_by_id,
+        )
+        if outcome is None:
+            outcome = process_lift_upload_file(
+                file_path,
+                apply_changes=True,
+                user_id=context.job.created_by_id,
+            )
+    except UploadStageTimeoutError as exc:
+        if exc.partial_upload_message:
+            _remove_staged_upload(file_path)
+            raise JobFailed(f"{exc} {exc.partial_upload_message}") from exc
+        raise JobFailed(str(exc)) from exc
+    _remove_staged_upload(file_path)
+
+    if outcome.created_count or outcome.updated_count:
+        message = (
+            f"AMC lift upload complete: {outcome.created_count} added, {outcome.updated_count} updated."
+        )
+        category = "success"
+    elif outcome.processed_rows and not outcome.row_errors:
+        message, category = "No changes were detected in the uploaded workbook.", "info"
+    else:
+        message, category = "No rows were imported from the uploaded workbook.", "info"
+    return {
+        "message": message,
+        "category": category,
+        "errors": outcome.row_errors,
+        "return_endpoint": "service_lifts",
+    }
+
+
 @app.route("/service/lifts/upload", methods=["POST"])
 @login_required
 def service_lifts_upload():
@@ -33227,6 +35433,7 @@ def service_lifts_upload():
             pending_uploads.pop(pending_token, None)
             session["pending_uploads"] = pending_uploads
             session.modified = True
+            discard_upload_plan(pending_token)
             try:
                 os.remove(file_path)
             except OSError:
@@ -33238,42 +35445,22 @@ def service_lifts_upload():
             flash("Select a valid action for the upload.", "error")
             return redirect(url_for("service_lifts"))
 
-        try:
-            outcome = process_lift_upload_file(
-                file_path,
-                apply_changes=True,
-            )
-        except UploadStageTimeoutError as exc:
-            flash(str(exc), "error")
-            return redirect(url_for("service_lifts"))
-
         pending_uploads.pop(pending_token, None)
         session["pending_uploads"] = pending_uploads
         session.modified = True
 
-        try:
-            os.remove(file_path)
-        except OSError:
-            pass
-
-        if outcome.created_count or outcome.updated_count:
-            flash(
-                f"AMC lift upload complete: {outcome.created_count} added, {outcome.updated_count} updated.",
-                "success",
-            )
-        elif outcome.processed_rows and not outcome.row_errors:
-            flash("No changes were detected in the uploaded workbook.", "info")
+        job = enqueue_job(
+            "lift_upload_apply",
+            {"path": file_path, "plan_token": pending_token},
+            user_id=current_user.id,
+        )
+        if not job.is_finished:
+            flash("Lift upload queued.", "info")
+            return redirect(url_for("background_job_detail", job_id=job.id))
+        if job.status == "failed":
+            flash(job.error or "Lift upload failed.", "error")
         else:
-            flash("No rows were imported from the uploaded workbook.", "info")
-
-        for message in outcome.row_errors[:25]:
-            flash(message, "error")
-        if len(outcome.row_errors) > 25:
-            flash(
-                f"Additional {len(outcome.row_errors) - 25} errors were omitted from the alert. Check the file and retry.",
-                "warning",
-            )
-
+            _flash_job_result(job.result)
         return redirect(url_for("service_lifts"))
 
     upload = request.files.get("amc_lift_file")
@@ -33290,6 +35477,7 @@ def service_lifts_upload():
     saved_token = None
     saved_extension = None
     saved_path = None
+    plan = UploadPlan("lift")
     try:
         saved_token, saved_extension = save_pending_upload_file(
             upload,
@@ -33300,6 +35488,7 @@ def service_lifts_upload():
         outcome = process_lift_upload_file(
             saved_path,
             apply_changes=False,
+            plan=plan,
         )
     except MissingDependencyError:
         file_path = saved_path or _build_pending_upload_path(saved_token, saved_extension)
@@ -33382,6 +35571,7 @@ def service_lifts_upload():
         return redirect(url_for("service_lifts"))
 
     pending_token = uuid.uuid4().hex
+    plan.save(pending_token, outcome, saved_path)
     pending_uploads = session.get("pending_uploads", {})
     pending_uploads[pending_token] = {
         "type": "service_lifts",
@@ -33410,6 +35600,7 @@ def service_upload_review(upload_type, pending_token):
     config_map = {
         "customers": {
             "session_type": "service_customers",
+            "plan_kind": "customer",
             "processor": process_customer_upload_file,
             "redirect_endpoint": "service_customers",
             "confirm_endpoint": "service_customers_upload",
@@ -33423,6 +35614,7 @@ def service_upload_review(upload_type, pending_token):
         },
         "lifts": {
             "session_type": "service_lifts",
+            "plan_kind": "lift",
             "processor": process_lift_upload_file,
             "redirect_endpoint": "service_lifts",
             "confirm_endpoint": "service_lifts_upload",
@@ -33456,8 +35648,12 @@ def service_upload_review(upload_type, pending_token):
         flash("The staged upload file was not found. Please try uploading again.", "error")
         return redirect(url_for(config["redirect_endpoint"]))
 
+    outcome = load_upload_plan(pending_token, config["plan_kind"], file_path)
     try:
-        outcome = config["processor"](file_path, apply_changes=False)
+        if outcome is None:
+            plan = UploadPlan(config["plan_kind"])
+            outcome = config["processor"](file_path, apply_changes=False, plan=plan)
+            plan.save(pending_token, outcome, file_path)
     except MissingDependencyError:
         _clear_pending_upload(pending_token, remove_file=True)
         flash(OPENPYXL_MISSING_MESSAGE, "error")
@@ -33491,6 +35687,27 @@ def service_upload_review(upload_type, pending_token):
     )
 
 
+def _is_htmx_request():
+    return request.headers.get("HX-Request") == "true"
+
+
+def _paginate_list(query, order_by, *, tiebreaker):
+    """Keyset-paginate a list page from the ``cursor``/``per_page`` query args."""
+
+    page = keyset_paginate(
+        query,
+        order_by,
+        tiebreaker=tiebreaker,
+        cursor=request.args.get("cursor"),
+        per_page=request.args.get("per_page", type=int) or DEFAULT_PER_PAGE,
+    )
+    if page.has_more:
+        args = request.args.to_dict(flat=True)
+        args["cursor"] = page.next_cursor
+        page.next_url = url_for(request.endpoint, **(request.view_args or {}), **args)
+    return page
+
+
 @app.route("/service/lifts")
 @login_required
 def service_lifts():
@@ -33502,22 +35719,22 @@ def service_lifts():
     sort_query_args = request.args.to_dict(flat=True)
     sort_query_args.pop("sort", None)
     sort_query_args.pop("order", None)
+    sort_query_args.pop("cursor", None)
 
     query = Lift.query.options(
         joinedload(Lift.customer),
-        subqueryload(Lift.attachments),
-        subqueryload(Lift.comments),
+        selectinload(Lift.service_visits),
     )
 
     if search_query:
         like = f"%{search_query.lower()}%"
         query = query.filter(
             or_(
-                func.lower(Lift.lift_code).like(like),
-                func.lower(Lift.customer_code).like(like),
+                ci_key(Lift.lift_code).like(like),
+                ci_key(Lift.customer_code).like(like),
                 func.lower(Lift.city).like(like),
                 func.lower(Lift.state).like(like),
-                func.lower(Lift.route).like(like),
+                ci_key(Lift.route).like(like),
                 func.lower(Lift.lift_type).like(like),
                 func.lower(Lift.lift_brand).like(like),
                 func.lower(Lift.status).like(like),
@@ -33525,11 +35742,11 @@ def service_lifts():
         )
 
     allowed_sort_columns = {
-        "lift_code": func.lower(Lift.lift_code),
-        "customer": func.lower(Lift.customer_code),
+        "lift_code": ci_key(Lift.lift_code),
+        "customer": ci_key(Lift.customer_code),
         "type": func.lower(Lift.lift_type),
         "brand": func.lower(Lift.lift_brand),
-        "route": func.lower(Lift.route),
+        "route": ci_key(Lift.route),
         "city": func.lower(Lift.city),
         "status": func.lower(Lift.status),
         "amc_status": func.lower(Lift.amc_status),
@@ -33537,15 +35754,20 @@ def service_lifts():
     }
     column = allowed_sort_columns.get(sort_col)
     if column is not None:
-        query = query.order_by(column.desc() if sort_order == "desc" else column.asc())
+        order_by = [(column, sort_order == "desc")]
     else:
-        query = query.order_by(func.lower(Lift.lift_code))
+        order_by = [(ci_key(Lift.lift_code), False)]
 
-    lifts = query.all()
-    customers = Customer.query.order_by(func.lower(Customer.company_name)).all()
-    service_routes = ServiceRoute.query.order_by(
-        func.lower(ServiceRoute.state), func.lower(ServiceRoute.branch)
-    ).all()
+    page = _paginate_list(query, order_by, tiebreaker=Lift.id)
+    if page.cursor and _is_htmx_request():
+        return render_template("service/_lift_rows.html", page=page)
+
+    customers = (
+        db.session.query(Customer.customer_code, Customer.company_name)
+        .order_by(ci_key(Customer.company_name))
+        .all()
+    )
+    service_routes = _get_service_routes()
     next_lift_code = generate_next_lift_code()
     next_customer_code = generate_next_customer_code()
     dropdown_options = get_dropdown_options_map()
@@ -33554,7 +35776,7 @@ def service_lifts():
 
     return render_template(
         "service/lifts.html",
-        lifts=lifts,
+        page=page,
         customers=customers,
         service_routes=service_routes,
         search_query=search_query,
@@ -33596,7 +35818,7 @@ def service_lifts_create():
 
     route_value = clean_str(request.form.get("route"))
     if route_value:
-        valid_route = ServiceRoute.query.filter(func.lower(ServiceRoute.state) == route_value.lower()).first()
+        valid_route = ServiceRoute.query.filter(ci_key(ServiceRoute.state) == route_value.lower()).first()
         if not valid_route:
             flash("Select a valid service route from the dropdown.", "error")
             return redirect(redirect_url)
@@ -33777,10 +35999,8 @@ def service_lift_detail(lift_id):
         .all()
     )
 
-    customers = Customer.query.order_by(func.lower(Customer.company_name)).all()
-    service_routes = ServiceRoute.query.order_by(
-        func.lower(ServiceRoute.state), func.lower(ServiceRoute.branch)
-    ).all()
+    customers = Customer.query.order_by(ci_key(Customer.company_name)).all()
+    service_routes = _get_service_routes()
     dropdown_options = get_dropdown_options_map()
     service_team_users = get_assignable_users_for_module("service")
 
@@ -34057,10 +36277,8 @@ def service_lift_edit(lift_id):
         flash("Lift not found.", "error")
         return redirect(url_for("service_lifts"))
 
-    customers = Customer.query.order_by(func.lower(Customer.company_name)).all()
-    service_routes = ServiceRoute.query.order_by(
-        func.lower(ServiceRoute.state), func.lower(ServiceRoute.branch)
-    ).all()
+    customers = Customer.query.order_by(ci_key(Customer.company_name)).all()
+    service_routes = _get_service_routes()
     attachments = (
         LiftFile.query.filter_by(lift_id=lift.id)
         .order_by(LiftFile.created_at.desc())
@@ -34115,7 +36333,7 @@ def service_lift_update(lift_id):
         if customer_code_input:
             new_customer_code = customer_code_input.upper()
             customer = Customer.query.filter(
-                func.lower(Customer.customer_code) == new_customer_code.lower()
+                ci_key(Customer.customer_code) == new_customer_code.lower()
             ).first()
             if not customer:
                 flash("Select a valid customer from the list or create a new customer.", "error")
@@ -34229,7 +36447,7 @@ def service_lift_update(lift_id):
         route_value = clean_str(request.form.get("route"))
         if route_value:
             valid_route = ServiceRoute.query.filter(
-                func.lower(ServiceRoute.state) == route_value.lower()
+                ci_key(ServiceRoute.state) == route_value.lower()
             ).first()
             if not valid_route:
                 flash("Select a valid service route from the dropdown.", "error")
@@ -34355,7 +36573,7 @@ def service_lift_update(lift_id):
             normalized_route = None
             if route_value:
                 valid_route = ServiceRoute.query.filter(
-                    func.lower(ServiceRoute.state) == route_value.lower()
+                    ci_key(ServiceRoute.state) == route_value.lower()
                 ).first()
                 if not valid_route:
                     flash(f"Select a valid service route for row {idx + 1}.", "error")
@@ -34506,7 +36724,7 @@ def service_lift_update(lift_id):
     customer_code_input = clean_str(request.form.get("customer_code"))
     if customer_code_input:
         new_customer_code = customer_code_input.upper()
-        customer = Customer.query.filter(func.lower(Customer.customer_code) == new_customer_code.lower()).first()
+        customer = Customer.query.filter(ci_key(Customer.customer_code) == new_customer_code.lower()).first()
         if not customer:
             flash("Select a valid customer from the list or create a new customer.", "error")
             return redirect(redirect_url)
@@ -34516,7 +36734,7 @@ def service_lift_update(lift_id):
 
     route_value = clean_str(request.form.get("route"))
     if route_value:
-        valid_route = ServiceRoute.query.filter(func.lower(ServiceRoute.state) == route_value.lower()).first()
+        valid_route = ServiceRoute.query.filter(ci_key(ServiceRoute.state) == route_value.lower()).first()
         if not valid_route:
             flash("Select a valid service route from the dropdown.", "error")
             return redirect(redirect_url)
@@ -35291,17 +37509,18 @@ def service_parts_materials():
 def _count_unscheduled_amc_lifts():
     base_query = Lift.query.filter(Lift.next_service_due.is_(None))
     total_without_due = base_query.count()
-    lifts_with_schedule = (
-        base_query.filter(Lift.service_schedule_json.isnot(None))
-        .options(load_only(Lift.id, Lift.service_schedule_json))
-        .all()
-    )
-    scheduled_via_json = sum(
-        1
-        for lift in lifts_with_schedule
-        if isinstance(lift.next_amc_date, datetime.date)
+    scheduled_via_visits = (
+        db.session.query(func.count(func.distinct(ServiceVisit.lift_id)))
+        .join(Lift, Lift.id == ServiceVisit.lift_id)
+        .filter(
+            Lift.next_service_due.is_(None),
+            ServiceVisit.status.notin_(SERVICE_VISIT_CLOSED_STATUSES),
+            ServiceVisit.visit_date >= datetime.date.today(),
+        )
+        .scalar()
+        or 0
     )
-    return total_without_due - scheduled_via_json
+    return total_without_due - scheduled_via_visits
 
 
 @app.route("/service/preventive-maintenance")
@@ -35314,7 +37533,9 @@ def service_preventive_maintenance():
     sort_query_args.pop("sort", None)
     sort_query_args.pop("order", None)
 
-    snapshot = get_service_schedule_snapshot()
+    snapshot = get_service_schedule_snapshot(
+        exclude_statuses=SERVICE_VISIT_CLOSED_STATUSES
+    )
     today = snapshot["today"]
 
     def preference_warning(lift_obj, visit_date=None):
@@ -35355,8 +37576,6 @@ def service_preventive_maintenance():
         visit_date = entry.get("date")
         if not isinstance(visit_date, datetime.date):
             continue
-        if entry.get("status") == "completed":
-            continue
         lift = entry.get("lift")
         site_name = (
             (lift.customer.company_name if lift and lift.customer else None)
@@ -35410,10 +37629,11 @@ def service_preventive_maintenance():
         for item in collection:
             item.pop("_sort_date", None)
 
-    checklist_counts = Counter(
-        entry.get("checklist")
-        for entry in snapshot["entries"]
-        if entry.get("checklist")
+    checklist_counts = dict(
+        db.session.query(ServiceVisit.checklist, func.count(ServiceVisit.id))
+        .filter(ServiceVisit.checklist.isnot(None), ServiceVisit.checklist != "")
+        .group_by(ServiceVisit.checklist)
+        .all()
     )
     checklists = [
         {
@@ -35424,29 +37644,15 @@ def service_preventive_maintenance():
         for name, count in sorted(checklist_counts.items())
     ]
 
-    overdue_count = 0
-    today_count = 0
-    week_count = 0
-    upcoming_count = 0
-
-    for entry in snapshot["entries"]:
-        visit_date = entry.get("date")
-        if not isinstance(visit_date, datetime.date):
-            continue
-        status_key = (entry.get("status") or "scheduled").strip().lower()
-        if status_key in {"completed", "cancelled"}:
-            continue
-
-        if visit_date < today:
-            overdue_count += 1
-        elif visit_date == today:
-            today_count += 1
-            upcoming_count += 1
-        else:
-            upcoming_count += 1
-            delta_days = (visit_date - today).days
-            if delta_days <= 7:
-                week_count += 1
+    overdue_count = count_open_service_visits(end=today)
+    today_count = count_open_service_visits(
+        start=today, end=today + datetime.timedelta(days=1)
+    )
+    week_count = count_open_service_visits(
+        start=today + datetime.timedelta(days=1),
+        end=today + datetime.timedelta(days=8),
+    )
+    upcoming_count = count_open_service_visits(start=today)
 
     unscheduled_count = _count_unscheduled_amc_lifts()
 
@@ -35487,6 +37693,33 @@ def service_automations():
 
 
 # ---------------------- SRT MODULE ----------------------
+SRT_STATUS_FILTER_KEYS = {
+    "scheduled": "scheduled",
+    "site-visited": "site visited",
+    "site_visited": "site visited",
+    "pending-civil": "pending civil work",
+    "pending_civil": "pending civil work",
+    "ready": "ready for installation",
+    "closed": "closed",
+}
+
+
+def _srt_overview_row(task, today):
+    due_date = task.get("due_date")
+    return {
+        **task,
+        "due_in": (due_date - today).days if due_date else None,
+        "due_date_display": due_date.strftime("%d %b %Y") if due_date else "",
+        "due_date_iso": due_date.isoformat() if due_date else "",
+    }
+
+
+def _srt_task_matches_filter(task, status_filter):
+    if status_filter in SRT_STATUS_FILTER_KEYS:
+        return task["status"].lower() == SRT_STATUS_FILTER_KEYS[status_filter]
+    return task["status"].lower() != "closed"
+
+
 @app.route("/srt")
 @login_required
 def srt_overview():
@@ -35494,37 +37727,8 @@ def srt_overview():
     status_filter = request.args.get("status", "all").lower()
     today = datetime.date.today()
 
-    tasks = []
-    for task in _get_srt_board_tasks():
-        due_date = task.get("due_date")
-        due_in = (due_date - today).days if due_date else None
-        due_date_display = due_date.strftime("%d %b %Y") if due_date else ""
-        due_date_iso = due_date.isoformat() if due_date else ""
-        tasks.append(
-            {
-                **task,
-                "due_in": due_in,
-                "due_date_display": due_date_display,
-                "due_date_iso": due_date_iso,
-            }
-        )
-
-    status_key_map = {
-        "scheduled": "scheduled",
-        "site-visited": "site visited",
-        "site_visited": "site visited",
-        "pending-civil": "pending civil work",
-        "pending_civil": "pending civil work",
-        "ready": "ready for installation",
-        "closed": "closed",
-    }
-    if status_filter in status_key_map:
-        status_value = status_key_map[status_filter]
-        filtered_tasks = [task for task in tasks if task["status"].lower() == status_value]
-    elif status_filter in {"pending", "open"}:
-        filtered_tasks = [task for task in tasks if task["status"].lower() != "closed"]
-    else:
-        filtered_tasks = [task for task in tasks if task["status"].lower() != "closed"]
+    tasks = [_srt_overview_row(task, today) for task in _get_srt_board_tasks()]
+    filtered_tasks = [task for task in tasks if _srt_task_matches_filter(task, status_filter)]
 
     summary = {
         "total_pending": sum(1 for task in tasks if task["status"].lower() != "closed"),
@@ -35560,6 +37764,21 @@ def srt_overview():
     )
 
 
+@app.route("/srt/board/row")
+@login_required
+def srt_board_row():
+    """One SRT board row for push updates; empty once it no longer matches the filter."""
+    _module_visibility_required("srt")
+    task = _get_srt_task(request.args.get("id") or "")
+    status_filter = request.args.get("status", "all").lower()
+    if not task:
+        return ""
+    row = _srt_overview_row(task, datetime.date.today())
+    if not _srt_task_matches_filter(row, status_filter):
+        return ""
+    return render_template("partials/srt_task_row.html", task=row)
+
+
 @app.route("/srt/settings", methods=["GET", "POST"])
 @app.route("/srt/form-templates", methods=["GET", "POST"], endpoint="srt_form_templates")
 @login_required
@@ -36035,6 +38254,81 @@ def qc_overview():
     )
 
 
+def _qc_completion_percentage(submission):
+    if not submission:
+        return 0
+    try:
+        data = json.loads(submission.data_json or "{}")
+    except Exception:
+        return 0
+
+    total = 0
+    filled = 0
+
+    def visit(value):
+        nonlocal total, filled
+        if isinstance(value, dict):
+            for v in value.values():
+                visit(v)
+        elif isinstance(value, list):
+            for item in value:
+                visit(item)
+        else:
+            total += 1
+            if value is None:
+                return
+            if isinstance(value, str):
+                if value.strip():
+                    filled += 1
+            elif value:
+                filled += 1
+
+    visit(data)
+    if total == 0:
+        return 0
+    return round((filled / total) * 100)
+
+
+def _attach_qc_completion(work_items):
+    """Set ``completion_percent`` from each item's latest submission."""
+    work_ids = [item.id for item in work_items if item.id]
+    submission_map = {}
+    if work_ids:
+        submissions = (
+            Submission.query
+            .filter(Submission.work_id.in_(work_ids))
+            .order_by(Submission.created_at.desc())
+            .all()
+        )
+        for sub in submissions:
+            if sub.work_id not in submission_map:
+                submission_map[sub.work_id] = sub
+
+    for item in work_items:
+        item.completion_percent = _qc_completion_percentage(submission_map.get(item.id))
+
+
+def _qc_work_matches_filter(work, status_filter):
+    if status_filter == "open":
+        return work.status != "Closed"
+    if status_filter == "closed":
+        return work.status == "Closed"
+    return True
+
+
+@app.route("/qc/board/row")
+@login_required
+def qc_board_row():
+    """One QC task row for push updates; empty once it no longer matches the filter."""
+    _module_visibility_required("qc")
+    work_id = _parse_optional_int(request.args.get("id"))
+    work = db.session.get(QCWork, work_id) if work_id is not None else None
+    if work is None or not _qc_work_matches_filter(work, request.args.get("status", "open")):
+        return ""
+    _attach_qc_completion([work])
+    return render_template("partials/qc_work_row.html", w=work)
+
+
 @app.route("/qc/tasks")
 @login_required
 def qc_home():
@@ -36063,58 +38357,7 @@ def qc_home():
     ).all()
     users = get_assignable_users_for_module("qc", order_by="username")
     projects = Project.query.order_by(Project.name.asc()).all()
-    work_ids = [item.id for item in work_items if item.id]
-
-    def calculate_completion_percentage(submission):
-        if not submission:
-            return 0
-        try:
-            data = json.loads(submission.data_json or "{}")
-        except Exception:
-            return 0
-
-        total = 0
-        filled = 0
-
-        def visit(value):
-            nonlocal total, filled
-            if isinstance(value, dict):
-                for v in value.values():
-                    visit(v)
-            elif isinstance(value, list):
-                for item in value:
-                    visit(item)
-            else:
-                total += 1
-                if value is None:
-                    return
-                if isinstance(value, str):
-                    if value.strip():
-                        filled += 1
-                elif value:
-                    filled += 1
-
-        visit(data)
-        if total == 0:
-            return 0
-        return round((filled / total) * 100)
-
-    submission_map = {}
-    if work_ids:
-        submissions = (
-            Submission.query
-            .filter(Submission.work_id.in_(work_ids))
-            .order_by(Submission.created_at.desc())
-            .all()
-        )
-        for sub in submissions:
-            if sub.work_id not in submission_map:
-                submission_map[sub.work_id] = sub
-
-    for item in work_items:
-        item.completion_percent = calculate_completion_percentage(
-            submission_map.get(item.id)
-        )
+    _attach_qc_completion(work_items)
 
     return render_template(
         "qc.html",
@@ -36600,18 +38843,14 @@ def customer_support_sarv_update_records():
         if not local_missing and recording.download_status == "success":
             continue
 
-        try:
-            download_call_recording(recording)
+        if download_call_recording(recording, commit=False) is None:
             updated += 1
-        except Exception as exc:  # pragma: no cover - defensive logging
-            db.session.rollback()
-            recording.download_status = "failed"
-            recording.download_error = str(exc)[:250]
-            db.session.commit()
+        else:
             errors.append(
                 f"Recording {recording.id} ({recording.sarv_file_path}) failed: {recording.download_error}"
             )
 
+    db.session.commit()
     status = "ok" if not errors else "error"
     return jsonify({"checked": checked, "updated": updated, "errors": errors, "status": status})
 
@@ -36623,11 +38862,115 @@ def initdb():
     print("Database initialized with default users and sample form.")
 
 
+@app.cli.command("db-upgrade")
+@click.option("--dry-run", is_flag=True, help="List pending steps without applying them.")
+def db_upgrade(dry_run):
+    """Apply pending schema/data migration steps."""
+    pending = pending_schema_migrations()
+    if not pending:
+        print(f"Database is up to date (version {get_schema_version()}).")
+        return
+    if dry_run:
+        for version, name, _ in pending:
+            print(f"Pending: {version:04d} {name}")
+        return
+    applied = apply_schema_migrations()
+    print(f"Applied {len(applied)} migration step(s); now at version {get_schema_version()}.")
+
+
+@app.cli.command("import-customer-support")
+@click.option("--path", "json_path", default=None, help="Legacy customer support JSON file.")
+def import_customer_support(json_path):
+    """Import tickets and call logs from the legacy JSON store."""
+    imported_tickets, imported_calls = import_customer_support_json(json_path)
+    print(f"Imported {imported_tickets} ticket(s) and {imported_calls} call log(s).")
+
+
+@app.cli.command("rebuild-inventory")
+def rebuild_inventory():
+    """Re-sync every product into inventory and merge legacy name-keyed rows."""
+    assigned, inserted = _sync_inventory_with_products()
+    merged = _merge_legacy_inventory_item_keys()
+    db.session.commit()
+    print(
+        f"Assigned {assigned} SKU(s), created {inserted} inventory row(s)"
+        + ("; merged legacy inventory rows." if merged else ".")
+    )
+
+
+@app.cli.command("seed-synthetic")
+@click.option("--scale", type=click.IntRange(min=1), default=1, show_default=True, help="Multiplier for the base data volumes.")
+@click.option("--seed", type=int, default=42, show_default=True, help="Random seed for reproducible data.")
+@click.option("--purge", is_flag=True, help="Only remove previously generated synthetic rows.")
+def seed_synthetic(scale, seed, purge):
+    """Generate benchmark data (customers, lifts, BOMs, POs, tickets, ...) through the models."""
+    ensure_bootstrap()
+    if purge:
+        purge_synthetic_data()
+        print(f"Removed synthetic rows prefixed {SYNTHETIC_PREFIX}.")
+        return
+    started = time.perf_counter()
+    counts = seed_synthetic_data(scale, seed=seed)
+    elapsed = time.perf_counter() - started
+    summary = ", ".join(f"{count} {name.replace('_', ' ')}" for name, count in counts.items())
+    print(f"✅ Seeded scale {scale} in {elapsed:.1f}s: {summary}")
+
+
+@app.cli.command("reindex-search")
+def reindex_search():
+    """Rebuild the global search index from customers, lifts, parts, vendors, opportunities and tickets."""
+    ensure_bootstrap()
+    started = time.perf_counter()
+    counts = rebuild_search_index()
+    if counts is None:
+        print("⚠️ This database has no SQLite FTS5 support; /search uses LIKE filters instead.")
+        return
+    summary = ", ".join(f"{count} {kind}(s)" for kind, count in counts.items())
+    print(f"✅ Rebuilt search index in {time.perf_counter() - started:.1f}s: {summary}")
+
+
+@app.cli.command("index-advisor")
+@click.option("--all", "show_all", is_flag=True, help="Also list predicates an index already serves.")
+def index_advisor(show_all):
+    """List lower()/LIKE predicates in the code that no database index supports."""
+    ensure_bootstrap()
+    findings = advise_indexes(default_advisor_paths(BASE_DIR))
+    shown = [finding for finding in findings if show_all or not finding.supported]
+    for finding in shown:
+        if finding.supported:
+            note = "indexed"
+        elif finding.leading_wildcard:
+            note = "leading wildcard: no index helps, use /search"
+        elif finding.kind == "lower":
+            note = "add to CASE_INSENSITIVE_KEYS"
+        else:
+            note = "no index on column"
+        print(
+            f"{finding.table + '.' + finding.column:<45} {finding.kind:<6} x{len(finding.locations):<3} "
+            f"{note:<46} {', '.join(finding.locations[:3])}{' …' if len(finding.locations) > 3 else ''}"
+        )
+    unsupported = sum(1 for finding in findings if not finding.supported)
+    print(f"{unsupported} of {len(findings)} case-insensitive/LIKE predicate(s) have no supporting index.")
+
+
+@app.cli.command("worker")
+@click.option("--concurrency", type=click.IntRange(min=1), default=2, show_default=True, help="Worker threads.")
+@click.option("--poll-interval", type=float, default=2.0, show_default=True, help="Seconds between queue polls when idle.")
+@click.option("--burst", is_flag=True, help="Exit once no queued job is due.")
+def job_worker(concurrency, poll_interval, burst):
+    """Run queued background jobs (uploads, PO e-mails, call recordings)."""
+    ensure_bootstrap()
+    print(f"🚀 Job worker started with {concurrency} thread(s); handlers: {', '.join(sorted(JOB_HANDLERS))}")
+    processed = run_worker(app, concurrency=concurrency, poll_interval=poll_interval, burst=burst)
+    print(f"✅ Processed {processed} job(s).")
+
+
 _bootstrap_lock = threading.Lock()
 _bootstrapped = False
 
 
 def ensure_bootstrap():
+    """Make sure the schema is current; a single version lookup once per process."""
     global _bootstrapped
     if _bootstrapped:
         return
@@ -36635,7 +38978,16 @@ def ensure_bootstrap():
         if _bootstrapped:
             return
         try:
-            bootstrap_db()
+            # Check the ledger for every step rather than MAX(version), so a
+            # missing lower step (failed run, hand-edited ledger) still runs.
+            pending = pending_schema_migrations()
+            if pending:
+                app.logger.warning(
+                    "Database schema missing step(s) %s; applying pending "
+                    "steps (run `flask db-upgrade` during deploys to avoid this).",
+                    ", ".join(f"{version:04d}" for version, _, _ in pending),
+                )
+                bootstrap_db()
             _bootstrapped = True
         except Exception as exc:
             app.logger.exception("Database bootstrap failed: %s", exc)
@@ -4,6 +4,8 @@ from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager
 
+from eleva_app.perf import RequestMetrics, SqlProfiler
+
 try:
     from flask_wtf.csrf import CSRFProtect
 except ImportError as exc:  # pragma: no cover - startup dependency guard
@@ -18,6 +20,8 @@ except ImportError as exc:  # pragma: no cover - startup dependency guard
 db = SQLAlchemy()
 login_manager = LoginManager()
 csrf = CSRFProtect()
+sql_profiler = SqlProfiler()
+request_metrics = RequestMetrics()
 
 
 def create_app():
@@ -58,6 +62,7 @@ def create_app():
         str(os.environ.get("PURCHASE_ODOO_IMPORT_ENABLED", "true")).strip().lower()
         in {"1", "true", "yes", "y", "on"}
     )
+    app.config["METRICS_TOKEN"] = os.environ.get("METRICS_TOKEN", "")
     go_live_raw = os.environ.get("ERP_PO_GO_LIVE_DATE")
     try:
         app.config["ERP_PO_GO_LIVE_DATE"] = (
@@ -73,10 +78,78 @@ def create_app():
         "CALL_RECORDINGS_DIR", "static/call_recordings"
     )
     app.config["SARV_RECORDING_TOKEN"] = os.environ.get("SARV_RECORDING_TOKEN", "")
+    for name, default in (
+        ("SARV_DOWNLOAD_CONCURRENCY", 2),
+        ("SARV_DOWNLOAD_QUEUE_LIMIT", 200),
+        ("SARV_DOWNLOAD_ATTEMPTS", 4),
+        ("SARV_DOWNLOAD_BACKOFF_SECONDS", 5),
+    ):
+        try:
+            app.config[name] = max(1, int(os.environ.get(name, str(default))))
+        except ValueError:
+            app.config[name] = default
+    app.config["JOB_WORKER_ENABLED"] = (
+        str(os.environ.get("JOB_WORKER_ENABLED", "false")).strip().lower()
+        in {"1", "true", "yes", "y", "on"}
+    )
+    app.config["SQL_PROFILING_ENABLED"] = (
+        str(os.environ.get("SQL_PROFILING_ENABLED", "false")).strip().lower()
+        in {"1", "true", "yes", "y", "on"}
+    )
+
+    push_transport = str(os.environ.get("PUSH_TRANSPORT", "sse")).strip().lower()
+    app.config["PUSH_TRANSPORT"] = push_transport if push_transport in {"sse", "poll"} else "sse"
+    try:
+        app.config["LAYOUT_CACHE_TTL_SECONDS"] = max(
+            0, int(os.environ.get("LAYOUT_CACHE_TTL_SECONDS", "30"))
+        )
+    except ValueError:
+        app.config["LAYOUT_CACHE_TTL_SECONDS"] = 30
+    try:
+        app.config["DASHBOARD_CACHE_TTL_SECONDS"] = max(
+            0, int(os.environ.get("DASHBOARD_CACHE_TTL_SECONDS", "120"))
+        )
+    except ValueError:
+        app.config["DASHBOARD_CACHE_TTL_SECONDS"] = 120
+    try:
+        app.config["DASHBOARD_MODULE_WORKERS"] = max(
+            1, int(os.environ.get("DASHBOARD_MODULE_WORKERS", "4"))
+        )
+    except ValueError:
+        app.config["DASHBOARD_MODULE_WORKERS"] = 4
+    try:
+        app.config["EXPORT_BATCH_SIZE"] = max(
+            1, int(os.environ.get("EXPORT_BATCH_SIZE", "500"))
+        )
+    except ValueError:
+        app.config["EXPORT_BATCH_SIZE"] = 500
+    try:
+        app.config["UPLOAD_COMMIT_CHUNK_SIZE"] = max(
+            1, int(os.environ.get("UPLOAD_COMMIT_CHUNK_SIZE", "500"))
+        )
+    except ValueError:
+        app.config["UPLOAD_COMMIT_CHUNK_SIZE"] = 500
+    # Parse processes are started from a forkserver, not forked from this
+    # process: it runs threads by now (job worker, download pool, SSE broker),
+    # and a plain fork could inherit one of their locks and deadlock.
+    try:
+        app.config["UPLOAD_VALIDATION_WORKERS"] = max(
+            1, int(os.environ.get("UPLOAD_VALIDATION_WORKERS", str(min(4, os.cpu_count() or 1))))
+        )
+    except ValueError:
+        app.config["UPLOAD_VALIDATION_WORKERS"] = min(4, os.cpu_count() or 1)
+    try:
+        app.config["UPLOAD_PARALLEL_MIN_ROWS"] = max(
+            1, int(os.environ.get("UPLOAD_PARALLEL_MIN_ROWS", "5000"))
+        )
+    except ValueError:
+        app.config["UPLOAD_PARALLEL_MIN_ROWS"] = 5000
 
     db.init_app(app)
     login_manager.init_app(app)
     csrf.init_app(app)
+    sql_profiler.init_app(app)
+    request_metrics.init_app(app)
     app.jinja_env.filters["to_india_time"] = _to_india_time
     app.jinja_env.filters["format_india_datetime"] = _format_india_datetime
 
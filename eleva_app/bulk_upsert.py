@@ -0,0 +1,151 @@
+"""Batched inserts and updates for the spreadsheet imports.
+
+``BulkUpserter`` loads the key and the imported columns of every existing
+row of a model in one query, then stages each imported row as an insert or
+an update against that map. Every ``BULK_UPSERT_BATCH_SIZE`` staged rows it
+writes the inserts with one executemany ``insert()`` (``RETURNING`` the new
+ids) and the updates with one executemany ``update()`` by primary key.
+Updates carry only the columns whose value changed, and rows that changed
+nothing are not written at all, so re-importing an unchanged export costs
+one SELECT.
+
+A failed automatic batch is not raised from ``upsert``: it is held and
+raised by the caller's final ``flush()``, so the one try/except that rolls
+back around that call covers every batch of the import.
+
+The statements go through the ORM session, so reference-cache versions are
+bumped as usual, but mapper and flush listeners do not fire. Search
+documents and persisted key columns are refreshed here for each batch; any
+other per-model follow-up belongs in ``before_insert``/``after_write``.
+"""
+
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+from sqlalchemy import insert, select, update
+
+from eleva_app import db
+from eleva_app.indexing import refresh_key_columns
+from eleva_app.search import reindex_records
+
+BULK_UPSERT_BATCH_SIZE = 1000
+
+
+class BulkUpserter:
+    """Stage imported rows of ``model`` and write them in executemany batches.
+
+    ``key`` maps a dict of column values (an existing row or an imported
+    one) to the identity used to match them, e.g. a lower-cased name.
+    ``columns`` are the columns imports may set; they are loaded for every
+    existing row so ``current`` can answer merge questions ("keep the old
+    vendor code when the sheet leaves it blank") without a query per row.
+
+    ``before_insert(mappings)`` may fill in columns of a batch of new rows
+    before they are written; ``after_write(inserted_ids, updated)`` runs
+    after each batch with ``updated`` mapping row ids to their changed
+    columns.
+    """
+
+    def __init__(
+        self,
+        model,
+        *,
+        key: Callable[[Dict[str, Any]], Hashable],
+        columns: Iterable[str],
+        batch_size: Optional[int] = None,
+        before_insert: Optional[Callable[[List[Dict[str, Any]]], None]] = None,
+        after_write: Optional[Callable[[List[int], Dict[int, Dict[str, Any]]], None]] = None,
+    ):
+        self.model = model
+        self.key = key
+        self.columns = tuple(columns)
+        self.batch_size = max(1, int(batch_size or BULK_UPSERT_BATCH_SIZE))
+        self.before_insert = before_insert
+        self.after_write = after_write
+        self.inserted_count = 0
+        self.updated_count = 0
+        self._current: Dict[Hashable, Dict[str, Any]] = {}
+        self._inserts: List[Dict[str, Any]] = []
+        # Row id -> (live record, values as stored) for rows the import touched.
+        self._updates: Dict[int, Tuple[Dict[str, Any], Dict[str, Any]]] = {}
+        self._error: Optional[Exception] = None
+
+        statement = select(model.id, *(getattr(model, name) for name in self.columns)).order_by(model.id)
+        for row in db.session.execute(statement).mappings():
+            record = dict(row)
+            self._current.setdefault(key(record), record)
+
+    def current(self, key_value) -> Optional[Dict[str, Any]]:
+        """Column values of the existing or already-staged row for ``key_value``."""
+
+        return self._current.get(key_value)
+
+    def upsert(self, values: Dict[str, Any]) -> bool:
+        """Stage ``values``; returns True when they create a new row."""
+
+        key_value = self.key(values)
+        record = self._current.get(key_value)
+        if record is None:
+            record = {"id": None, **values}
+            self._current[key_value] = record
+            self._inserts.append(record)
+            created = True
+        else:
+            if record["id"] is not None and record["id"] not in self._updates:
+                self._updates[record["id"]] = (record, dict(record))
+            record.update(values)
+            created = False
+        if self._error is None and len(self._inserts) + len(self._updates) >= self.batch_size:
+            try:
+                self.flush()
+            except Exception as exc:
+                # Stop writing; the caller's flush() raises it under its rollback handler.
+                self._error = exc
+        return created
+
+    def flush(self):
+        """Write the staged inserts and updates.
+
+        Raises the error of an earlier automatic batch, if one failed.
+        """
+
+        if self._error is not None:
+            raise self._error
+        inserted_ids: List[int] = []
+        if self._inserts:
+            mappings = [
+                {name: value for name, value in record.items() if name != "id"}
+                for record in self._inserts
+            ]
+            if self.before_insert is not None:
+                self.before_insert(mappings)
+            inserted_ids = list(
+                db.session.execute(
+                    insert(self.model).returning(self.model.id, sort_by_parameter_order=True),
+                    mappings,
+                ).scalars()
+            )
+            for record, mapping, new_id in zip(self._inserts, mappings, inserted_ids):
+                record.update(mapping)
+                record["id"] = new_id
+            self.inserted_count += len(inserted_ids)
+            self._inserts = []
+
+        updated = {}
+        for row_id, (record, stored) in self._updates.items():
+            changes = {name: value for name, value in record.items() if stored.get(name) != value}
+            if changes:
+                updated[row_id] = changes
+        self._updates = {}
+        if updated:
+            db.session.execute(
+                update(self.model),
+                [{"id": row_id, **changes} for row_id, changes in updated.items()],
+            )
+            self.updated_count += len(updated)
+
+        written = inserted_ids + list(updated)
+        if written:
+            refresh_key_columns(db.session.connection(), self.model, written)
+            reindex_records(self.model, written)
+            if self.after_write is not None:
+                self.after_write(inserted_ids, updated)
@@ -1,4 +1,5 @@
 import datetime
+import re
 
 def clean_str(value):
     """
@@ -43,3 +44,95 @@ def stringify_cell(value):
     if isinstance(value, float) and value.is_integer():
         value = int(value)
     return str(value).strip()
+
+
+def _coerce_date(value):
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    if isinstance(value, datetime.date):
+        return value
+    if isinstance(value, str):
+        cleaned = value.strip()
+        if not cleaned:
+            return None
+        for fmt in (
+            "%Y-%m-%d",
+            "%Y/%m/%d",
+            "%d-%m-%Y",
+            "%d/%m/%Y",
+            "%Y-%m-%dT%H:%M:%S",
+            "%Y-%m-%dT%H:%M:%S.%f",
+        ):
+            try:
+                return datetime.datetime.strptime(cleaned, fmt).date()
+            except ValueError:
+                continue
+    return None
+
+
+def _coerce_bool(value):
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str):
+        lowered = value.strip().lower()
+        if lowered in {"yes", "true", "1"}:
+            return True
+        if lowered in {"no", "false", "0"}:
+            return False
+    return None
+
+
+def _coerce_float(value):
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        cleaned = value.strip()
+        if not cleaned:
+            return None
+        try:
+            return float(cleaned)
+        except ValueError:
+            return None
+    return None
+
+
+def _coerce_minutes(value):
+    if value in (None, ""):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        cleaned = value.strip().lower()
+        if not cleaned:
+            return None
+        time_match = re.match(r"^(-?\d+):(\d{1,2})$", cleaned)
+        if time_match:
+            hours_part = float(time_match.group(1))
+            minutes_part = float(time_match.group(2))
+            return hours_part * 60 + minutes_part
+        hour_match = re.search(r"(-?\d+(?:\.\d+)?)\s*h", cleaned)
+        minute_match = re.search(r"(-?\d+(?:\.\d+)?)\s*m", cleaned)
+        total_minutes = 0.0
+        matched = False
+        if hour_match:
+            total_minutes += float(hour_match.group(1)) * 60
+            matched = True
+        if minute_match:
+            total_minutes += float(minute_match.group(1))
+            matched = True
+        if matched:
+            return total_minutes
+        for suffix in ("minutes", "minute", "mins", "min", "m"):
+            if cleaned.endswith(suffix):
+                cleaned = cleaned[: -len(suffix)].strip()
+                break
+        if cleaned.endswith("h"):
+            try:
+                return float(cleaned[:-1].strip()) * 60
+            except ValueError:
+                return None
+        try:
+            return float(cleaned)
+        except ValueError:
+            return None
+    return None
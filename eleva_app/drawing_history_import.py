@@ -3,12 +3,12 @@ from dataclasses import dataclass, field
 from typing import List, Optional
 
 from flask import current_app
+from sqlalchemy.exc import SQLAlchemyError
 
 from eleva_app import db
 from eleva_app.models import DrawingHistory, DrawingSite, DrawingVersion
 from eleva_app.common_import_utils import clean_str, parse_int_field, stringify_cell
-from eleva_app.uploads import UploadStageTimeoutError, _extract_tabular_upload
-from utils.excel_utils import iter_rows_from_xlsx
+from eleva_app.uploads import UploadStageTimeoutError, _ChunkedCommitter, open_tabular_rows
 
 
 REQUIRED_HEADERS = {
@@ -123,17 +123,7 @@ def _parse_int(value, label):
 
 
 def _extract_drawing_history_upload(upload):
-    filename = (upload.filename or "").lower()
-    if filename.endswith(".xlsx"):
-        upload.stream.seek(0)
-        headers, row_dicts = iter_rows_from_xlsx(upload.stream)
-        data_rows = [
-            [row_dict.get(header) for header in headers]
-            for row_dict in row_dicts
-        ]
-        return headers, data_rows
-
-    return _extract_tabular_upload(upload)
+    return open_tabular_rows(upload.stream, filename=upload.filename)
 
 
 def _find_or_create_site(
@@ -170,9 +160,26 @@ def _apply_latest_version(site: DrawingSite):
     site.apply_latest_version()
 
 
+def _finalize_sites(touched_sites):
+    for site in touched_sites.values():
+        _apply_latest_version(site)
+        _sync_site_history(site)
+        if site.versions and not site.last_updated:
+            latest = sorted(
+                site.versions,
+                key=lambda v: (v.created_at or datetime.datetime.min, v.id or 0),
+                reverse=True,
+            )
+            site.last_updated = (
+                latest[0].created_at if latest and latest[0].created_at else datetime.datetime.utcnow()
+            )
+    touched_sites.clear()
+
+
 def process_drawing_history_upload(upload) -> DrawingHistoryUploadResult:
     result = DrawingHistoryUploadResult()
-    touched_sites = []
+    touched_sites = {}
+    committer = _ChunkedCommitter(before_commit=lambda: _finalize_sites(touched_sites))
 
     try:
         header_cells, data_rows = _extract_drawing_history_upload(upload)
@@ -296,20 +303,17 @@ def process_drawing_history_upload(upload) -> DrawingHistoryUploadResult:
 
         _apply_latest_version(site)
         site.last_updated = datetime.datetime.utcnow()
-        touched_sites.append(site)
+        touched_sites[site.id] = site
 
-    for site in {s for s in touched_sites if s}:
-        _apply_latest_version(site)
-        _sync_site_history(site)
-        if site.versions and not site.last_updated:
-            latest = sorted(
-                site.versions,
-                key=lambda v: (v.created_at or datetime.datetime.min, v.id or 0),
-                reverse=True,
-            )
-            site.last_updated = (
-                latest[0].created_at if latest and latest[0].created_at else datetime.datetime.utcnow()
-            )
+        try:
+            committer.row_done()
+        except SQLAlchemyError:
+            db.session.rollback()
+            current_app.logger.exception("Failed to save drawing history upload changes")
+            result.fatal_error = "Could not save drawing history records due to a database error."
+            return result
+
+    _finalize_sites(touched_sites)
 
     try:
         db.session.commit()
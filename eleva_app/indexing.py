@@ -0,0 +1,367 @@
+"""Indexes for case-insensitive lookups, plus an index advisor.
+
+Codes, names and usernames are matched with ``lower(column) = :value`` all
+over the app, which no plain column index can serve. On SQLite and
+PostgreSQL ``ensure_case_insensitive_keys`` adds an expression index on
+``lower(column)`` for every entry in ``CASE_INSENSITIVE_KEYS``; the existing
+queries pick it up unchanged. Databases without expression indexes (MySQL
+5.7) get a persisted ``<column>_key`` column holding the lowercased value,
+indexed and kept in step by mapper listeners; ``ci_key(Model.column)``
+returns whichever expression the current database can index, so query code
+stays the same everywhere.
+
+``advise_indexes`` scans the source for ``func.lower(...)`` and
+``.like()``/``.ilike()`` predicates and reports the columns no index covers.
+"""
+
+import ast
+import os
+from dataclasses import dataclass, field
+from typing import List
+
+from sqlalchemy import bindparam, event, func, inspect, literal_column, text
+
+from eleva_app import db
+from eleva_app import models
+
+EXPRESSION_INDEX_DIALECTS = {"sqlite", "postgresql"}
+
+# (table, column) pairs looked up or joined case-insensitively on hot paths.
+CASE_INSENSITIVE_KEYS = [
+    ("product", "name"),
+    ("product", "sku"),
+    ("inventory_item", "item_code"),
+    ("book_inventory", "item_code"),
+    ("service_route", "state"),
+    ("customer", "customer_code"),
+    ("customer", "company_name"),
+    ("customer", "external_customer_id"),
+    ("lift", "lift_code"),
+    ("lift", "external_lift_id"),
+    ("lift", "customer_code"),
+    ("lift", "route"),
+    ("user", "username"),
+    ("vendor", "name"),
+]
+_KEYED = set(CASE_INSENSITIVE_KEYS)
+
+
+def key_index_name(table, column):
+    return f"ix_{table}_{column}_lower"
+
+
+def key_column_name(column):
+    return f"{column}_key"
+
+
+def _uses_key_columns(dialect_name):
+    return dialect_name not in EXPRESSION_INDEX_DIALECTS
+
+
+def ci_key(column):
+    """Case-insensitive key expression for ``column`` (e.g. ``Product.name``).
+
+    ``lower(column)`` where an expression index serves it, otherwise the
+    persisted ``<column>_key`` column. Compare it with ``value.lower()``.
+    """
+
+    table = column.table.name
+    if (table, column.key) in _KEYED and _uses_key_columns(db.engine.dialect.name):
+        return literal_column(f"{table}.{key_column_name(column.key)}", type_=column.type)
+    return func.lower(column)
+
+
+def _index_names(connection, table):
+    if connection.dialect.name == "sqlite":
+        return set(
+            connection.execute(
+                text("SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = :table"),
+                {"table": table},
+            ).scalars()
+        )
+    return {index["name"] for index in inspect(connection).get_indexes(table)}
+
+
+def ensure_case_insensitive_keys():
+    """Create the missing expression indexes (or key columns); returns what was added."""
+
+    engine = db.engine
+    quote = engine.dialect.identifier_preparer.quote
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    created = []
+    with engine.begin() as connection:
+        for table, column in CASE_INSENSITIVE_KEYS:
+            if table not in existing_tables:
+                continue
+            index_name = key_index_name(table, column)
+            if index_name in _index_names(connection, table):
+                continue
+            if _uses_key_columns(engine.dialect.name):
+                key_column = key_column_name(column)
+                column_type = next(
+                    (info["type"] for info in inspector.get_columns(table) if info["name"] == column), None
+                )
+                if key_column not in {info["name"] for info in inspector.get_columns(table)}:
+                    connection.execute(
+                        text(
+                            f"ALTER TABLE {quote(table)} ADD COLUMN {quote(key_column)} "
+                            f"{column_type.compile(dialect=engine.dialect)} NULL"
+                        )
+                    )
+                connection.execute(
+                    text(f"UPDATE {quote(table)} SET {quote(key_column)} = LOWER({quote(column)})")
+                )
+                connection.execute(
+                    text(f"CREATE INDEX {quote(index_name)} ON {quote(table)} ({quote(key_column)})")
+                )
+            else:
+                connection.execute(
+                    text(
+                        f"CREATE INDEX IF NOT EXISTS {quote(index_name)} "
+                        f"ON {quote(table)} (lower({quote(column)}))"
+                    )
+                )
+            created.append(index_name)
+    return created
+
+
+def _sync_key_columns(mapper, connection, target):
+    if not _uses_key_columns(connection.dialect.name):
+        return
+    table = mapper.local_table.name
+    columns = [column for keyed_table, column in CASE_INSENSITIVE_KEYS if keyed_table == table]
+    state = inspect(target)
+    changed = [column for column in columns if state.attrs[column].history.has_changes()]
+    if not changed:
+        return
+    quote = connection.dialect.identifier_preparer.quote
+    assignments = ", ".join(f"{quote(key_column_name(column))} = LOWER({quote(column)})" for column in changed)
+    connection.execute(
+        text(f"UPDATE {quote(table)} SET {assignments} WHERE id = :id"),
+        {"id": target.id},
+    )
+
+
+def refresh_key_columns(connection, model, ids):
+    """Recompute the persisted key columns of ``model`` rows ``ids``.
+
+    For bulk ``insert()``/``update()`` statements, which skip
+    ``_sync_key_columns`` (no-op on SQLite/PostgreSQL).
+    """
+
+    if not ids or not _uses_key_columns(connection.dialect.name):
+        return
+    table = model.__table__.name
+    columns = [column for keyed_table, column in CASE_INSENSITIVE_KEYS if keyed_table == table]
+    if not columns:
+        return
+    quote = connection.dialect.identifier_preparer.quote
+    assignments = ", ".join(f"{quote(key_column_name(column))} = LOWER({quote(column)})" for column in columns)
+    statement = text(f"UPDATE {quote(table)} SET {assignments} WHERE id IN :ids").bindparams(
+        bindparam("ids", expanding=True)
+    )
+    connection.execute(statement, {"ids": list(ids)})
+
+
+def install_key_listeners():
+    """Keep persisted key columns in step with ORM writes (no-op on SQLite/PostgreSQL)."""
+
+    keyed_tables = {table for table, _ in CASE_INSENSITIVE_KEYS}
+    for mapper in db.Model.registry.mappers:
+        if mapper.local_table is None or mapper.local_table.name not in keyed_tables:
+            continue
+        for name in ("after_insert", "after_update"):
+            if not event.contains(mapper.class_, name, _sync_key_columns):
+                event.listen(mapper.class_, name, _sync_key_columns)
+
+
+# ---------------------------------------------------------------------------
+# Index advisor
+
+@dataclass
+class PredicateFinding:
+    table: str
+    column: str
+    kind: str
+    locations: List[str] = field(default_factory=list)
+    leading_wildcard: bool = False
+    supported: bool = False
+
+
+class _Findings(dict):
+    def __missing__(self, key):
+        (table, column), kind = key
+        value = PredicateFinding(table=table, column=column, kind=kind)
+        self[key] = value
+        return value
+
+
+def _model_columns():
+    columns = {}
+    for mapper in db.Model.registry.mappers:
+        if mapper.local_table is None:
+            continue
+        for attr in mapper.column_attrs:
+            if len(attr.columns) == 1 and attr.columns[0].table is mapper.local_table:
+                columns[(mapper.class_.__name__, attr.key)] = (mapper.local_table.name, attr.columns[0].name)
+    return columns
+
+
+def _column_ref(node, known):
+    if isinstance(node, ast.Attribute) and isinstance(node.value, ast.Name):
+        return known.get((node.value.id, node.attr))
+    return None
+
+
+def _starts_with_wildcard(node):
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return node.value.startswith("%")
+    if isinstance(node, ast.JoinedStr) and node.values:
+        first = node.values[0]
+        return isinstance(first, ast.Constant) and str(first.value).startswith("%")
+    return False
+
+
+def _is_lower_call(node):
+    """``func.lower(...)`` or ``ci_key(...)``."""
+
+    if isinstance(node.func, ast.Name):
+        return node.func.id == "ci_key"
+    return (
+        isinstance(node.func, ast.Attribute)
+        and node.func.attr == "lower"
+        and isinstance(node.func.value, ast.Name)
+        and node.func.value.id == "func"
+    )
+
+
+def _scan_source(path, known, findings):
+    with open(path, "r", encoding="utf-8") as handle:
+        tree = ast.parse(handle.read(), filename=path)
+    # ``like = f"%{term}%"`` followed by ``.like(like)`` is the common shape, so
+    # remember which local names were bound to a leading-wildcard pattern.
+    wildcard_names = {
+        target.id
+        for node in ast.walk(tree)
+        if isinstance(node, ast.Assign) and _starts_with_wildcard(node.value)
+        for target in node.targets
+        if isinstance(target, ast.Name)
+    }
+    relative = os.path.relpath(path)
+    for node in ast.walk(tree):
+        if not isinstance(node, ast.Call):
+            continue
+        if _is_lower_call(node):
+            if node.args and (ref := _column_ref(node.args[0], known)):
+                findings[(ref, "lower")].locations.append(f"{relative}:{node.lineno}")
+        elif isinstance(node.func, ast.Attribute) and node.func.attr in {"like", "ilike"}:
+            target = node.func.value
+            if isinstance(target, ast.Call) and _is_lower_call(target):
+                target = target.args[0] if target.args else None
+            ref = _column_ref(target, known)
+            if ref:
+                finding = findings[(ref, node.func.attr)]
+                finding.locations.append(f"{relative}:{node.lineno}")
+                pattern = node.args[0] if node.args else None
+                if _starts_with_wildcard(pattern) or (
+                    isinstance(pattern, ast.Name) and pattern.id in wildcard_names
+                ):
+                    finding.leading_wildcard = True
+
+
+def _normalize_index_expression(expression):
+    cleaned = expression.replace('"', "").replace("`", "").replace("[", "").replace("]", "")
+    cleaned = " ".join(cleaned.split()).lower()
+    for suffix in (" asc", " desc"):
+        if cleaned.endswith(suffix):
+            cleaned = cleaned[: -len(suffix)]
+    return cleaned.replace("lower (", "lower(")
+
+
+def _sqlite_index_leads(connection, table):
+    # SQLAlchemy cannot reflect SQLite expression indexes, so read the
+    # leading column (or expression) of each index from the PRAGMAs and the
+    # stored CREATE INDEX statement.
+    quote = connection.dialect.identifier_preparer.quote
+    leads = set()
+    for index in connection.execute(text(f"PRAGMA index_list({quote(table)})")).mappings():
+        first = connection.execute(text(f"PRAGMA index_info({quote(index['name'])})")).first()
+        if first is not None and first[2]:
+            leads.add(first[2].lower())
+            continue
+        sql = connection.execute(
+            text("SELECT sql FROM sqlite_master WHERE type = 'index' AND name = :name"),
+            {"name": index["name"]},
+        ).scalar()
+        if sql and "(" in sql:
+            body = sql[sql.index("(", sql.lower().index(" on ")) + 1 : sql.rindex(")")]
+            leads.add(_normalize_index_expression(body.split(",")[0]))
+    return leads
+
+
+def _index_leads(connection, table):
+    """Leading column names / ``lower(col)`` expressions of ``table``'s indexes."""
+
+    if connection.dialect.name == "sqlite":
+        leads = _sqlite_index_leads(connection, table)
+    else:
+        leads = set()
+        inspector = inspect(connection)
+        for index in inspector.get_indexes(table):
+            names = index.get("column_names") or []
+            expressions = index.get("expressions") or []
+            if names and names[0]:
+                leads.add(names[0].lower())
+            elif expressions and expressions[0]:
+                leads.add(_normalize_index_expression(expressions[0]))
+        for constraint in inspector.get_unique_constraints(table):
+            if constraint.get("column_names"):
+                leads.add(constraint["column_names"][0].lower())
+    primary = inspect(connection).get_pk_constraint(table).get("constrained_columns") or []
+    if primary:
+        leads.add(primary[0].lower())
+    return leads
+
+
+def advise_indexes(paths):
+    """Return ``PredicateFinding``s for lower()/LIKE predicates in ``paths``.
+
+    A lower() predicate is supported by an expression index on ``lower(col)``
+    or a key column; a LIKE needs an index on the column itself (and only
+    helps when the pattern has no leading wildcard).
+    """
+
+    known = _model_columns()
+    collected = _Findings()
+    for path in paths:
+        _scan_source(path, known, collected)
+
+    covered = {}
+    with db.engine.connect() as connection:
+        tables = set(inspect(connection).get_table_names())
+        for table in {finding.table for finding in collected.values()} & tables:
+            covered[table] = _index_leads(connection, table)
+    for finding in collected.values():
+        indexed = covered.get(finding.table, set())
+        lowered = f"lower({finding.column})"
+        if finding.kind == "lower":
+            finding.supported = lowered in indexed or (
+                (finding.table, finding.column) in _KEYED and key_column_name(finding.column) in indexed
+            )
+        else:
+            finding.supported = not finding.leading_wildcard and (
+                finding.column in indexed or lowered in indexed
+            )
+    return sorted(collected.values(), key=lambda item: (item.supported, -len(item.locations), item.table, item.column))
+
+
+def default_advisor_paths(base_dir):
+    paths = [os.path.join(base_dir, "app.py")]
+    package_dir = os.path.dirname(models.__file__)
+    paths.extend(
+        os.path.join(package_dir, name)
+        for name in sorted(os.listdir(package_dir))
+        if name.endswith(".py")
+    )
+    return paths
@@ -0,0 +1,315 @@
+"""SQLite-backed background jobs.
+
+Handlers register with ``@job_handler("kind")`` and receive a ``JobContext``.
+``enqueue_job`` stores a ``background_job`` row; ``flask worker`` claims
+queued rows with a conditional UPDATE (so two workers never run the same job),
+retries failed attempts with exponential backoff and records progress that
+the job status partial polls. Progress updates double as a heartbeat, and the
+worker periodically requeues running jobs whose heartbeat has gone stale. Until ``JOB_WORKER_ENABLED`` is set, jobs run
+inline inside ``enqueue_job`` so a deployment without a worker keeps working.
+"""
+
+import datetime
+import logging
+import os
+import socket
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from flask import current_app
+from sqlalchemy import func, select
+
+from eleva_app import db
+from eleva_app.models import BackgroundJob
+
+logger = logging.getLogger(__name__)
+
+JOB_RETRY_BASE_SECONDS = 30
+JOB_RETRY_MAX_SECONDS = 3600
+JOB_LOCK_TIMEOUT_SECONDS = 1800
+JOB_STALE_SWEEP_SECONDS = 60
+
+
+class JobFailed(Exception):
+    """Raised by a handler for errors that retrying will not fix."""
+
+
+@dataclass
+class JobSpec:
+    kind: str
+    handler: Callable
+    max_attempts: int = 3
+    title: str = ""
+    result_template: Optional[str] = None
+
+
+JOB_HANDLERS = {}
+
+
+def job_handler(kind, *, max_attempts=3, title=None, result_template=None):
+    """Register ``func(context)`` as the handler for jobs of ``kind``.
+
+    The handler's return value (JSON-serialisable) is stored as the job
+    result. With ``result_template`` the status page renders that template
+    with the result as keyword arguments once the job has succeeded.
+    """
+
+    def decorator(func):
+        JOB_HANDLERS[kind] = JobSpec(
+            kind=kind,
+            handler=func,
+            max_attempts=max_attempts,
+            title=title or kind.replace("_", " ").capitalize(),
+            result_template=result_template,
+        )
+        return func
+
+    return decorator
+
+
+class JobContext:
+    """What a handler sees: the payload, the attempt number and a progress hook."""
+
+    def __init__(self, job):
+        self.job = job
+        self.payload = job.payload
+
+    @property
+    def attempt(self):
+        return self.job.attempts
+
+    def progress(self, percent, message=None):
+        """Record progress for the status partial and refresh the job's lock.
+
+        Commits the session, so call it between units of work. A job that
+        reports progress more often than ``JOB_LOCK_TIMEOUT_SECONDS`` is never
+        taken for abandoned, however long it runs.
+        """
+
+        self.job.locked_at = _utcnow()
+        self.job.progress = max(0, min(100, int(percent)))
+        if message is not None:
+            self.job.progress_message = str(message)[:255]
+        db.session.commit()
+
+
+def _utcnow():
+    return datetime.datetime.utcnow()
+
+
+def retry_delay(attempt):
+    """Seconds to wait before retrying after failed attempt number ``attempt``."""
+
+    base = current_app.config.get("JOB_RETRY_BASE_SECONDS", JOB_RETRY_BASE_SECONDS)
+    cap = current_app.config.get("JOB_RETRY_MAX_SECONDS", JOB_RETRY_MAX_SECONDS)
+    return min(cap, base * (2 ** max(attempt - 1, 0)))
+
+
+def enqueue_job(kind, payload=None, *, user_id=None, max_attempts=None, delay_seconds=0):
+    """Queue a job of ``kind`` and return its ``BackgroundJob`` row.
+
+    Commits the current session. Runs the job before returning when no
+    worker is configured (``JOB_WORKER_ENABLED`` off).
+    """
+
+    spec = JOB_HANDLERS.get(kind)
+    if spec is None:
+        raise KeyError(f"No background job handler registered for {kind!r}")
+    now = _utcnow()
+    job = BackgroundJob(
+        kind=kind,
+        max_attempts=max_attempts or spec.max_attempts,
+        run_after=now + datetime.timedelta(seconds=delay_seconds),
+        created_by_id=user_id,
+        created_at=now,
+    )
+    job.payload = payload or {}
+    inline = not current_app.config.get("JOB_WORKER_ENABLED")
+    if inline:
+        job.status = "running"
+        job.attempts = 1
+        job.locked_by = "inline"
+        job.locked_at = now
+        job.started_at = now
+    db.session.add(job)
+    db.session.commit()
+    if inline:
+        run_job(job, allow_retry=False)
+    return job
+
+
+def claim_next_job(worker_name):
+    """Atomically move the oldest due job to ``running`` and return it (or None)."""
+
+    table = BackgroundJob.__table__
+    while True:
+        now = _utcnow()
+        candidate = db.session.execute(
+            select(table.c.id)
+            .where(table.c.status == "queued", table.c.run_after <= now)
+            .order_by(table.c.run_after, table.c.id)
+            .limit(1)
+        ).scalar()
+        if candidate is None:
+            db.session.commit()
+            return None
+        claimed = db.session.execute(
+            table.update()
+            .where(table.c.id == candidate, table.c.status == "queued")
+            .values(
+                status="running",
+                locked_by=worker_name,
+                locked_at=now,
+                started_at=now,
+                attempts=table.c.attempts + 1,
+            )
+        )
+        db.session.commit()
+        if claimed.rowcount == 1:
+            return db.session.get(BackgroundJob, candidate)
+
+
+def run_job(job, *, allow_retry=True):
+    """Run a claimed job's handler and record the outcome."""
+
+    spec = JOB_HANDLERS.get(job.kind)
+    if spec is None:
+        _finish_failed(job, f"No handler registered for job kind {job.kind!r}.")
+        return job
+
+    try:
+        result = spec.handler(JobContext(job))
+    except JobFailed as exc:
+        db.session.rollback()
+        _finish_failed(job, str(exc))
+    except Exception as exc:
+        db.session.rollback()
+        logger.exception("Background job %s (%s) failed on attempt %s", job.id, job.kind, job.attempts)
+        message = f"{type(exc).__name__}: {exc}"
+        if allow_retry and job.attempts < job.max_attempts:
+            job.status = "queued"
+            job.error = message
+            job.locked_by = None
+            job.locked_at = None
+            job.run_after = _utcnow() + datetime.timedelta(seconds=retry_delay(job.attempts))
+            job.progress_message = f"Retrying (attempt {job.attempts + 1} of {job.max_attempts})"
+            db.session.commit()
+        else:
+            _finish_failed(job, message)
+    else:
+        job.status = "succeeded"
+        job.result = result
+        job.error = None
+        job.progress = 100
+        job.finished_at = _utcnow()
+        job.locked_by = None
+        job.locked_at = None
+        db.session.commit()
+    return job
+
+
+def _finish_failed(job, message):
+    job.status = "failed"
+    job.error = message
+    job.finished_at = _utcnow()
+    job.locked_by = None
+    job.locked_at = None
+    db.session.commit()
+
+
+def requeue_stale_jobs(timeout_seconds=None):
+    """Return abandoned ``running`` jobs (worker died) to the queue; returns the count.
+
+    Uses conditional UPDATEs, so a job that finishes or sends a heartbeat
+    while the sweep runs is left alone.
+    """
+
+    timeout_seconds = timeout_seconds or current_app.config.get(
+        "JOB_LOCK_TIMEOUT_SECONDS", JOB_LOCK_TIMEOUT_SECONDS
+    )
+    now = _utcnow()
+    cutoff = now - datetime.timedelta(seconds=timeout_seconds)
+    table = BackgroundJob.__table__
+    stale = (
+        table.c.status == "running",
+        table.c.locked_by != "inline",
+        table.c.locked_at < cutoff,
+    )
+    requeued = db.session.execute(
+        table.update()
+        .where(*stale, table.c.attempts < table.c.max_attempts)
+        .values(status="queued", locked_by=None, locked_at=None, run_after=now)
+    ).rowcount
+    failed = db.session.execute(
+        table.update()
+        .where(*stale)
+        .values(
+            status="failed",
+            locked_by=None,
+            locked_at=None,
+            error=func.coalesce(table.c.error, "Worker stopped before the job finished."),
+            finished_at=now,
+        )
+    ).rowcount
+    db.session.commit()
+    return requeued + failed
+
+
+def run_worker(app, *, concurrency=2, poll_interval=2.0, burst=False, stop_event=None):
+    """Process jobs with ``concurrency`` threads until stopped.
+
+    With ``burst`` the worker exits once the queue has nothing due. Returns
+    the number of jobs processed. Stale jobs are requeued at start-up and
+    then every ``JOB_STALE_SWEEP_SECONDS`` by whichever thread is free.
+    """
+
+    stop_event = stop_event or threading.Event()
+    base_name = f"{socket.gethostname()}:{os.getpid()}"
+    processed = []
+    lock = threading.Lock()
+    sweep_interval = app.config.get("JOB_STALE_SWEEP_SECONDS", JOB_STALE_SWEEP_SECONDS)
+    next_sweep = [0.0]
+
+    def _sweep_due():
+        with lock:
+            if time.monotonic() < next_sweep[0]:
+                return False
+            next_sweep[0] = time.monotonic() + sweep_interval
+            return True
+
+    def _loop(index):
+        worker_name = f"{base_name}:{index}"
+        with app.app_context():
+            try:
+                while not stop_event.is_set():
+                    if _sweep_due():
+                        requeue_stale_jobs()
+                    job = claim_next_job(worker_name)
+                    if job is None:
+                        if burst:
+                            break
+                        stop_event.wait(poll_interval)
+                        continue
+                    run_job(job)
+                    with lock:
+                        processed.append(job.id)
+            finally:
+                db.session.remove()
+
+    threads = [
+        threading.Thread(target=_loop, args=(index,), name=f"job-worker-{index}", daemon=True)
+        for index in range(max(1, concurrency))
+    ]
+    for thread in threads:
+        thread.start()
+    try:
+        for thread in threads:
+            while thread.is_alive():
+                thread.join(timeout=0.5)
+    except KeyboardInterrupt:
+        stop_event.set()
+        for thread in threads:
+            thread.join()
+    return len(processed)
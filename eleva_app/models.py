@@ -7,6 +7,7 @@ from flask_login import UserMixin
 from werkzeug.security import check_password_hash, generate_password_hash
 
 from eleva_app import db
+from eleva_app.common_import_utils import _coerce_bool, _coerce_minutes
 
 from app import (
     DEPARTMENT_BRANCHES,
@@ -17,6 +18,10 @@ from app import (
     SALES_LEAD_STATUS_LABELS,
     SALES_TASK_CATEGORY_LABELS,
     SERVICE_VISIT_STATUS_LABELS,
+    _coerce_date,
+    _coerce_float,
+    _decode_special_types,
+    _encode_special_types,
     _is_password_hashed,
     apply_actor_context,
     clean_str,
@@ -1665,6 +1670,12 @@ class Lift(db.Model):
         back_populates="lift",
         cascade="all, delete-orphan",
     )
+    service_visits = db.relationship(
+        "ServiceVisit",
+        back_populates="lift",
+        cascade="all, delete-orphan",
+        order_by="ServiceVisit.position",
+    )
 
     def set_capacity_display(self):
         if self.capacity_persons and self.capacity_kg:
@@ -1825,118 +1836,26 @@ class Lift(db.Model):
 
     @property
     def service_schedule(self):
-        if not self.service_schedule_json:
-            return []
-        try:
-            data = json.loads(self.service_schedule_json)
-        except (TypeError, ValueError):
-            return []
-        if not isinstance(data, list):
-            return []
-        schedule = []
-        for item in data:
-            if not isinstance(item, dict):
-                continue
-            raw_date = item.get("date")
-            visit_date = None
-            if isinstance(raw_date, datetime.datetime):
-                visit_date = raw_date.date()
-            elif isinstance(raw_date, datetime.date):
-                visit_date = raw_date
-            elif isinstance(raw_date, str):
-                try:
-                    visit_date = datetime.datetime.strptime(raw_date, "%Y-%m-%d").date()
-                except ValueError:
-                    visit_date = None
-            route_value = clean_str(item.get("route"))
-            technician = clean_str(item.get("technician"))
-            status_value = clean_str(item.get("status"))
-            status_key = (
-                status_value.lower()
-                if status_value and status_value.lower() in SERVICE_VISIT_STATUS_LABELS
-                else None
-            )
-            slip_url = clean_str(item.get("slip_url") or item.get("slip"))
-            slip_label = clean_str(item.get("slip_label") or item.get("label"))
-            schedule.append(
-                {
-                    "date": visit_date,
-                    "route": route_value,
-                    "technician": technician,
-                    "status": status_key,
-                    "slip_url": slip_url,
-                    "slip_label": slip_label,
-                    "service_type": clean_str(item.get("service_type")),
-                    "details_json": clean_str(item.get("details_json") or item.get("service_details")),
-                    "source": clean_str(item.get("source")),
-                    "support_ticket_ref": clean_str(item.get("support_ticket_ref")),
-                    "complaint_summary": clean_str(item.get("complaint_summary")),
-                    "checklist": clean_str(item.get("checklist")),
-                    "created_at": clean_str(item.get("created_at")),
-                }
-            )
-        return schedule
+        """Compatibility view of ``service_visits`` as a list of plain dicts."""
+        return [visit.to_entry() for visit in self.service_visits]
 
     @service_schedule.setter
     def service_schedule(self, values):
-        if not values:
-            self.service_schedule_json = None
-            return
-        cleaned = []
-        for item in values:
+        visits = []
+        for item in values or []:
             if not isinstance(item, dict):
                 continue
-            raw_date = item.get("date")
-            iso_date = None
-            if isinstance(raw_date, datetime.datetime):
-                iso_date = raw_date.date().isoformat()
-            elif isinstance(raw_date, datetime.date):
-                iso_date = raw_date.isoformat()
-            else:
-                date_str = clean_str(raw_date)
-                if date_str:
-                    try:
-                        iso_date = datetime.datetime.strptime(date_str, "%Y-%m-%d").date().isoformat()
-                    except ValueError:
-                        continue
-            if not iso_date:
+            visit = ServiceVisit.from_entry(item)
+            if visit is None:
                 continue
-            status_value = clean_str(item.get("status"))
-            status_key = (
-                status_value.lower()
-                if status_value and status_value.lower() in SERVICE_VISIT_STATUS_LABELS
-                else "scheduled"
-            )
-            route_value = clean_str(item.get("route"))
-            technician = clean_str(item.get("technician"))
-            slip_url = clean_str(item.get("slip_url"))
-            slip_label = clean_str(item.get("slip_label"))
-            service_type = clean_str(item.get("service_type"))
-            details_json = clean_str(item.get("details_json") or item.get("service_details"))
-            source = clean_str(item.get("source"))
-            support_ticket_ref = clean_str(item.get("support_ticket_ref"))
-            complaint_summary = clean_str(item.get("complaint_summary"))
-            checklist = clean_str(item.get("checklist"))
-            created_at = clean_str(item.get("created_at"))
-            cleaned.append(
-                {
-                    "date": iso_date,
-                    "route": route_value,
-                    "technician": technician,
-                    "status": status_key,
-                    "slip_url": slip_url,
-                    "slip_label": slip_label,
-                    "service_type": service_type,
-                    "details_json": details_json,
-                    "source": source,
-                    "support_ticket_ref": support_ticket_ref,
-                    "complaint_summary": complaint_summary,
-                    "checklist": checklist,
-                    "created_at": created_at,
-                }
-            )
+            visit.position = len(visits)
+            visits.append(visit)
+        self.service_visits = visits
+        # Keep the legacy JSON column as a mirror for exports and older tooling.
         self.service_schedule_json = (
-            json.dumps(cleaned, ensure_ascii=False) if cleaned else None
+            json.dumps([visit.to_json_entry() for visit in visits], ensure_ascii=False)
+            if visits
+            else None
         )
 
     @property
@@ -2097,6 +2016,116 @@ class Lift(db.Model):
         self.timeline_entries_json = json.dumps(cleaned, ensure_ascii=False)
 
 
+class ServiceVisit(db.Model):
+    __tablename__ = "service_visit"
+
+    id = db.Column(db.Integer, primary_key=True)
+    lift_id = db.Column(
+        db.Integer,
+        db.ForeignKey("lift.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    position = db.Column(db.Integer, nullable=False, default=0)
+    visit_date = db.Column(db.Date, nullable=False)
+    status = db.Column(db.String(20), nullable=False, default="scheduled")
+    technician = db.Column(db.String(120), nullable=True, index=True)
+    route = db.Column(db.String(120), nullable=True)
+    service_type = db.Column(db.String(60), nullable=True)
+    slip_url = db.Column(db.String(255), nullable=True)
+    slip_label = db.Column(db.String(255), nullable=True)
+    details_json = db.Column(db.Text, nullable=True)
+    source = db.Column(db.String(40), nullable=True)
+    support_ticket_ref = db.Column(db.String(64), nullable=True, index=True)
+    complaint_summary = db.Column(db.Text, nullable=True)
+    checklist = db.Column(db.String(255), nullable=True)
+    first_time_fix = db.Column(db.Boolean, nullable=True)
+    on_time = db.Column(db.Boolean, nullable=True)
+    travel_minutes = db.Column(db.Float, nullable=True)
+    repair_minutes = db.Column(db.Float, nullable=True)
+    rating = db.Column(db.Float, nullable=True)
+    # ISO timestamp exactly as captured on the schedule entry.
+    created_at = db.Column(db.String(40), nullable=True)
+
+    lift = db.relationship("Lift", back_populates="service_visits")
+
+    __table_args__ = (
+        db.Index("ix_service_visit_date_status", "visit_date", "status"),
+    )
+
+    @classmethod
+    def from_entry(cls, item):
+        """Build a visit from a schedule dict; entries without a valid date are skipped."""
+        raw_date = item.get("date")
+        if isinstance(raw_date, (datetime.datetime, date)):
+            visit_date = _coerce_date(raw_date)
+        else:
+            date_str = clean_str(raw_date)
+            if not date_str:
+                return None
+            try:
+                visit_date = datetime.datetime.strptime(date_str, "%Y-%m-%d").date()
+            except ValueError:
+                return None
+        status_value = clean_str(item.get("status"))
+        status_key = (
+            status_value.lower()
+            if status_value and status_value.lower() in SERVICE_VISIT_STATUS_LABELS
+            else "scheduled"
+        )
+        return cls(
+            visit_date=visit_date,
+            status=status_key,
+            route=clean_str(item.get("route")),
+            technician=clean_str(item.get("technician")),
+            slip_url=clean_str(item.get("slip_url")),
+            slip_label=clean_str(item.get("slip_label")),
+            service_type=clean_str(item.get("service_type")),
+            details_json=clean_str(item.get("details_json") or item.get("service_details")),
+            source=clean_str(item.get("source")),
+            support_ticket_ref=clean_str(item.get("support_ticket_ref")),
+            complaint_summary=clean_str(item.get("complaint_summary")),
+            checklist=clean_str(item.get("checklist")),
+            first_time_fix=_coerce_bool(item.get("first_time_fix")),
+            on_time=_coerce_bool(item.get("on_time") or item.get("on_time_completion")),
+            travel_minutes=_coerce_minutes(
+                item.get("travel_minutes") or item.get("travel_time")
+            ),
+            repair_minutes=_coerce_minutes(
+                item.get("repair_minutes") or item.get("duration_minutes")
+            ),
+            rating=_coerce_float(item.get("rating")),
+            created_at=clean_str(item.get("created_at")),
+        )
+
+    def to_entry(self):
+        return {
+            "date": self.visit_date,
+            "route": self.route or "",
+            "technician": self.technician or "",
+            "status": self.status,
+            "slip_url": self.slip_url or "",
+            "slip_label": self.slip_label or "",
+            "service_type": self.service_type or "",
+            "details_json": self.details_json or "",
+            "source": self.source or "",
+            "support_ticket_ref": self.support_ticket_ref or "",
+            "complaint_summary": self.complaint_summary or "",
+            "checklist": self.checklist or "",
+            "created_at": self.created_at or "",
+            "first_time_fix": self.first_time_fix,
+            "on_time": self.on_time,
+            "travel_minutes": self.travel_minutes,
+            "repair_minutes": self.repair_minutes,
+            "rating": self.rating,
+        }
+
+    def to_json_entry(self):
+        entry = self.to_entry()
+        entry["date"] = self.visit_date.isoformat() if self.visit_date else None
+        return entry
+
+
 class LiftFile(db.Model):
     __tablename__ = "lift_file"
 
@@ -2537,6 +2566,12 @@ class BomTemplate(db.Model):
     is_active = db.Column(db.Boolean, default=True)
     created_at = db.Column(db.DateTime, default=datetime.datetime.utcnow)
     created_by_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=True)
+    updated_at = db.Column(
+        db.DateTime,
+        default=datetime.datetime.utcnow,
+        onupdate=datetime.datetime.utcnow,
+        nullable=True,
+    )
 
     created_by = db.relationship("User")
     inputs = db.relationship(
@@ -3085,6 +3120,8 @@ class InventoryItem(db.Model):
     book_stock = db.Column(db.Float, default=0)
     quarantined_stock = db.Column(db.Float, default=0)
     location = db.Column(db.String(120), nullable=True)
+    # Set on legacy rows folded into another item; they keep their own ledger.
+    merged_into_id = db.Column(db.Integer, db.ForeignKey("inventory_item.id"), nullable=True)
 
 
 class InventoryStock(db.Model):
@@ -3123,6 +3160,41 @@ class StockAdjustment(db.Model):
     created_by = db.relationship("User")
 
 
+class InventoryLedgerEntry(db.Model):
+    """Append-only stock movement with the balances it left behind.
+
+    ``entry_type`` is one of ``grn``, ``challan``, ``adjustment``,
+    ``odoo_snapshot``, ``product_sync``, ``merge`` or ``checkpoint``. A checkpoint row opens each calendar
+    month in which an item moved and carries the balance brought forward.
+    """
+
+    __tablename__ = "inventory_ledger"
+
+    id = db.Column(db.Integer, primary_key=True)
+    inventory_item_id = db.Column(
+        db.Integer,
+        db.ForeignKey("inventory_item.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    posted_at = db.Column(db.DateTime, nullable=False)
+    entry_type = db.Column(db.String(20), nullable=False)
+    physical_delta = db.Column(db.Float, nullable=False, default=0)
+    book_delta = db.Column(db.Float, nullable=False, default=0)
+    physical_balance = db.Column(db.Float, nullable=False, default=0)
+    book_balance = db.Column(db.Float, nullable=False, default=0)
+    reference = db.Column(db.String(255), nullable=True)
+    source_type = db.Column(db.String(40), nullable=True)
+    source_id = db.Column(db.Integer, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.datetime.utcnow)
+
+    inventory_item = db.relationship("InventoryItem")
+
+    __table_args__ = (
+        db.Index("ix_inventory_ledger_item_posted", "inventory_item_id", "posted_at", "id"),
+        db.Index("ix_inventory_ledger_source", "source_type", "source_id"),
+    )
+
+
 class AssetClass(db.Model):
     __tablename__ = "asset_class"
 
@@ -3479,3 +3551,447 @@ class CallRecording(db.Model):
     download_error = db.Column(db.String(255), nullable=True)
 
     created_at = db.Column(db.DateTime, default=datetime.datetime.utcnow)
+
+
+CUSTOMER_SUPPORT_TICKET_STATUSES = ("Open", "In Progress", "Resolved", "Closed")
+
+
+def _canonical_ticket_status(value):
+    cleaned = clean_str(value) or "Open"
+    for status in CUSTOMER_SUPPORT_TICKET_STATUSES:
+        if cleaned.lower() == status.lower():
+            return status
+    return cleaned
+
+
+def _load_json_payload(raw_value):
+    if not raw_value:
+        return {}
+    try:
+        data = json.loads(raw_value)
+    except (TypeError, ValueError):
+        return {}
+    if not isinstance(data, dict):
+        return {}
+    return _decode_special_types(data)
+
+
+def _dump_json_payload(data):
+    return json.dumps(_encode_special_types(data), ensure_ascii=False)
+
+
+def _ensure_datetime(value):
+    if isinstance(value, datetime.datetime):
+        return value
+    if isinstance(value, date):
+        return datetime.datetime.combine(value, datetime.time.min)
+    if isinstance(value, str) and value.strip():
+        try:
+            return datetime.datetime.fromisoformat(value.strip())
+        except ValueError:
+            return None
+    return None
+
+
+def _ensure_date(value):
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    if isinstance(value, str) and value.strip():
+        try:
+            return date.fromisoformat(value.strip()[:10])
+        except ValueError:
+            return None
+    return None
+
+
+def _optional_int(value):
+    try:
+        return int(value) if value not in (None, "") else None
+    except (TypeError, ValueError):
+        return None
+
+
+class SupportTicket(db.Model):
+    """Customer support ticket.
+
+    Frequently filtered fields live in indexed columns; everything else the
+    ticket dict carries (SLA, attachments, linked records, ...) is kept in
+    ``payload_json`` so the dict shape used by the views stays unchanged.
+    """
+
+    __tablename__ = "customer_support_ticket"
+
+    id = db.Column(db.Integer, primary_key=True)
+    ticket_id = db.Column(db.String(32), unique=True, nullable=False, index=True)
+    ticket_number = db.Column(db.Integer, nullable=True, index=True)
+    subject = db.Column(db.String(255), nullable=True)
+    customer = db.Column(db.String(255), nullable=True)
+    contact_name = db.Column(db.String(255), nullable=True)
+    category = db.Column(db.String(120), nullable=True)
+    category_key = db.Column(db.String(120), nullable=True, index=True)
+    channel = db.Column(db.String(60), nullable=True)
+    priority = db.Column(db.String(30), nullable=True)
+    status = db.Column(db.String(30), nullable=False, default="Open", index=True)
+    assignee = db.Column(db.String(255), nullable=True, index=True)
+    assignee_user_id = db.Column(db.Integer, nullable=True, index=True)
+    owner = db.Column(db.String(255), nullable=True)
+    owner_user_id = db.Column(db.Integer, nullable=True)
+    linked_sales_opportunity_id = db.Column(db.Integer, nullable=True, index=True)
+    created_at = db.Column(db.DateTime, default=datetime.datetime.utcnow, index=True)
+    updated_at = db.Column(db.DateTime, default=datetime.datetime.utcnow)
+    payload_json = db.Column(db.Text, nullable=True)
+
+    comments = db.relationship(
+        "SupportTicketComment",
+        back_populates="ticket",
+        cascade="all, delete-orphan",
+        order_by="SupportTicketComment.position",
+    )
+    linked_tasks = db.relationship(
+        "SupportTicketLinkedTask",
+        back_populates="ticket",
+        cascade="all, delete-orphan",
+        order_by="SupportTicketLinkedTask.position",
+    )
+
+    __table_args__ = (
+        db.Index("ix_customer_support_ticket_status_updated", "status", "updated_at"),
+        db.Index(
+            "ix_customer_support_ticket_assignee_status", "assignee_user_id", "status"
+        ),
+    )
+
+    _COLUMN_KEYS = {
+        "id",
+        "subject",
+        "customer",
+        "contact_name",
+        "category",
+        "category_key",
+        "channel",
+        "priority",
+        "status",
+        "assignee",
+        "assignee_user_id",
+        "owner",
+        "owner_user_id",
+        "created_at",
+        "updated_at",
+        "timeline",
+        "linked_tasks",
+    }
+
+    def to_dict(self):
+        ticket = _load_json_payload(self.payload_json)
+        ticket.update(
+            {
+                "id": self.ticket_id,
+                "subject": self.subject,
+                "customer": self.customer,
+                "contact_name": self.contact_name,
+                "category": self.category,
+                "channel": self.channel,
+                "priority": self.priority,
+                "status": self.status,
+                "assignee": self.assignee,
+                "assignee_user_id": self.assignee_user_id,
+                "owner": self.owner,
+                "owner_user_id": self.owner_user_id,
+                "created_at": self.created_at,
+                "updated_at": self.updated_at,
+                "timeline": [comment.to_dict() for comment in self.comments],
+                "linked_tasks": [task.to_dict() for task in self.linked_tasks],
+            }
+        )
+        if self.category_key is not None and "category_key" not in ticket:
+            ticket["category_key"] = self.category_key
+        return ticket
+
+    def apply_dict(self, ticket):
+        """Copy a ticket dict onto this row, replacing comments and linked tasks."""
+        ticket_id = clean_str(ticket.get("id"))
+        self.ticket_id = ticket_id
+        number = None
+        if ticket_id and ticket_id.upper().startswith("CS-"):
+            number = _optional_int(ticket_id[3:])
+        self.ticket_number = number
+        self.subject = clean_str(ticket.get("subject"))
+        self.customer = clean_str(ticket.get("customer"))
+        self.contact_name = clean_str(ticket.get("contact_name"))
+        self.category = clean_str(ticket.get("category"))
+        self.category_key = (
+            (ticket.get("category_key") or ticket.get("category") or "").strip().lower()
+            or None
+        )
+        self.channel = clean_str(ticket.get("channel"))
+        self.priority = clean_str(ticket.get("priority"))
+        self.status = _canonical_ticket_status(ticket.get("status"))
+        self.assignee = clean_str(ticket.get("assignee"))
+        self.assignee_user_id = _optional_int(ticket.get("assignee_user_id"))
+        self.owner = clean_str(ticket.get("owner"))
+        self.owner_user_id = _optional_int(ticket.get("owner_user_id"))
+        linked_opportunity = ticket.get("linked_sales_opportunity") or {}
+        self.linked_sales_opportunity_id = (
+            _optional_int(linked_opportunity.get("id"))
+            if isinstance(linked_opportunity, dict)
+            else None
+        )
+        self.created_at = _ensure_datetime(ticket.get("created_at")) or self.created_at
+        self.updated_at = (
+            _ensure_datetime(ticket.get("updated_at")) or self.created_at or self.updated_at
+        )
+
+        extra = {
+            key: value
+            for key, value in ticket.items()
+            if key not in self._COLUMN_KEYS and not str(key).startswith("_")
+        }
+        if ticket.get("category_key") is not None:
+            extra["category_key"] = ticket.get("category_key")
+        self.payload_json = _dump_json_payload(extra) if extra else None
+
+        self.comments = [
+            SupportTicketComment.from_dict(entry, position=index)
+            for index, entry in enumerate(ticket.get("timeline") or [])
+            if isinstance(entry, dict)
+        ]
+        self.linked_tasks = [
+            SupportTicketLinkedTask.from_dict(task, position=index)
+            for index, task in enumerate(ticket.get("linked_tasks") or [])
+            if isinstance(task, dict)
+        ]
+        return self
+
+
+class SupportTicketComment(db.Model):
+    """Timeline entry (status change, comment or attachment) on a support ticket."""
+
+    __tablename__ = "customer_support_ticket_comment"
+
+    id = db.Column(db.Integer, primary_key=True)
+    ticket_pk = db.Column(
+        db.Integer,
+        db.ForeignKey("customer_support_ticket.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    position = db.Column(db.Integer, nullable=False, default=0)
+    timestamp = db.Column(db.DateTime, nullable=True)
+    entry_type = db.Column(db.String(30), nullable=True)
+    visibility = db.Column(db.String(20), nullable=True)
+    actor = db.Column(db.String(255), nullable=True, index=True)
+    payload_json = db.Column(db.Text, nullable=True)
+
+    ticket = db.relationship("SupportTicket", back_populates="comments")
+
+    def to_dict(self):
+        entry = _load_json_payload(self.payload_json)
+        if self.timestamp is not None:
+            entry["timestamp"] = self.timestamp
+        return entry
+
+    @classmethod
+    def from_dict(cls, entry, *, position=0):
+        return cls(
+            position=position,
+            timestamp=_ensure_datetime(entry.get("timestamp")),
+            entry_type=clean_str(entry.get("type")),
+            visibility=clean_str(entry.get("visibility")),
+            actor=clean_str(entry.get("actor")),
+            payload_json=_dump_json_payload(entry),
+        )
+
+
+class SupportTicketLinkedTask(db.Model):
+    __tablename__ = "customer_support_ticket_task"
+
+    id = db.Column(db.Integer, primary_key=True)
+    ticket_pk = db.Column(
+        db.Integer,
+        db.ForeignKey("customer_support_ticket.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    position = db.Column(db.Integer, nullable=False, default=0)
+    task_ref = db.Column(db.String(64), nullable=True, index=True)
+    title = db.Column(db.String(255), nullable=True)
+    status = db.Column(db.String(30), nullable=True, index=True)
+    assignee = db.Column(db.String(255), nullable=True)
+    assignee_id = db.Column(db.Integer, nullable=True, index=True)
+    related_type = db.Column(db.String(60), nullable=True)
+    due_date = db.Column(db.Date, nullable=True)
+    created_at = db.Column(db.DateTime, nullable=True)
+    payload_json = db.Column(db.Text, nullable=True)
+
+    ticket = db.relationship("SupportTicket", back_populates="linked_tasks")
+
+    def to_dict(self):
+        return _load_json_payload(self.payload_json)
+
+    @classmethod
+    def from_dict(cls, task, *, position=0):
+        return cls(
+            position=position,
+            task_ref=clean_str(task.get("id")),
+            title=clean_str(task.get("title")),
+            status=clean_str(task.get("status")),
+            assignee=clean_str(task.get("assignee")),
+            assignee_id=_optional_int(task.get("assignee_id")),
+            related_type=clean_str(task.get("related_type")),
+            due_date=_ensure_date(task.get("due_date")),
+            created_at=_ensure_datetime(task.get("created_at")),
+            payload_json=_dump_json_payload(task),
+        )
+
+
+class SupportCallLog(db.Model):
+    """Manually logged customer support call (non-SARV)."""
+
+    __tablename__ = "customer_support_call_log"
+
+    id = db.Column(db.Integer, primary_key=True)
+    call_id = db.Column(db.String(64), unique=True, nullable=False, index=True)
+    ticket_id = db.Column(db.String(32), nullable=True, index=True)
+    subject = db.Column(db.String(255), nullable=True)
+    category = db.Column(db.String(120), nullable=True, index=True)
+    status = db.Column(db.String(60), nullable=True, index=True)
+    channel = db.Column(db.String(60), nullable=True)
+    caller = db.Column(db.String(255), nullable=True)
+    handled_by = db.Column(db.String(255), nullable=True, index=True)
+    duration_minutes = db.Column(db.Integer, nullable=True)
+    logged_at = db.Column(db.DateTime, nullable=True, index=True)
+
+    def to_dict(self):
+        return {
+            "call_id": self.call_id,
+            "ticket_id": self.ticket_id,
+            "subject": self.subject,
+            "category": self.category,
+            "status": self.status,
+            "channel": self.channel,
+            "caller": self.caller,
+            "handled_by": self.handled_by,
+            "duration_minutes": self.duration_minutes,
+            "logged_at": self.logged_at,
+        }
+
+    @classmethod
+    def from_dict(cls, call):
+        return cls(
+            call_id=clean_str(call.get("call_id") or call.get("ticket_id")),
+            ticket_id=clean_str(call.get("ticket_id")),
+            subject=clean_str(call.get("subject")),
+            category=clean_str(call.get("category")),
+            status=clean_str(call.get("status")),
+            channel=clean_str(call.get("channel")),
+            caller=clean_str(call.get("caller")),
+            handled_by=clean_str(call.get("handled_by")),
+            duration_minutes=_optional_int(call.get("duration_minutes")),
+            logged_at=_ensure_datetime(call.get("logged_at")),
+        )
+
+
+class SchemaMigration(db.Model):
+    __tablename__ = "schema_migration"
+
+    version = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    name = db.Column(db.String(120), nullable=False)
+    applied_at = db.Column(db.DateTime, default=datetime.datetime.utcnow, nullable=False)
+    duration_ms = db.Column(db.Integer, nullable=True)
+
+
+class ReferenceDataVersion(db.Model):
+    """Change counter per reference table, shared by every worker's cache."""
+
+    __tablename__ = "reference_data_version"
+
+    table_name = db.Column(db.String(80), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.datetime.utcnow, nullable=False)
+
+
+class PushEvent(db.Model):
+    """Event published to browsers over ``/events/stream`` or ``/events/poll``.
+
+    ``channel`` is ``user:<id>`` for per-user events or ``board:<name>`` for
+    shared boards; clients resume from the last ``id`` they saw.
+    """
+
+    __tablename__ = "push_event"
+
+    id = db.Column(db.Integer, primary_key=True)
+    channel = db.Column(db.String(80), nullable=False)
+    event = db.Column(db.String(60), nullable=False)
+    payload_json = db.Column(db.Text, nullable=False, default="{}")
+    created_at = db.Column(db.DateTime, default=datetime.datetime.utcnow, nullable=False, index=True)
+
+    __table_args__ = (
+        db.Index("ix_push_event_channel_id", "channel", "id"),
+        # Never reuse ids after pruning: clients resume from the last id seen.
+        {"sqlite_autoincrement": True},
+    )
+
+
+class BackgroundJob(db.Model):
+    """Unit of deferred work picked up by ``flask worker``.
+
+    ``status`` moves ``queued`` -> ``running`` -> ``succeeded``/``failed``; a
+    failed attempt with retries left goes back to ``queued`` with ``run_after``
+    pushed out by the backoff delay.
+    """
+
+    __tablename__ = "background_job"
+
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(80), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default="queued")
+    payload_json = db.Column(db.Text, nullable=False, default="{}")
+    result_json = db.Column(db.Text, nullable=True)
+    error = db.Column(db.Text, nullable=True)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    max_attempts = db.Column(db.Integer, nullable=False, default=3)
+    progress = db.Column(db.Integer, nullable=False, default=0)
+    progress_message = db.Column(db.String(255), nullable=True)
+    run_after = db.Column(db.DateTime, nullable=False, default=datetime.datetime.utcnow)
+    locked_by = db.Column(db.String(120), nullable=True)
+    locked_at = db.Column(db.DateTime, nullable=True)
+    created_by_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.datetime.utcnow, nullable=False)
+    started_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    created_by = db.relationship("User")
+
+    __table_args__ = (
+        db.Index("ix_background_job_status_run_after", "status", "run_after"),
+    )
+
+    @staticmethod
+    def _load(raw, default):
+        try:
+            loaded = json.loads(raw) if raw else default
+        except (TypeError, ValueError):
+            return default
+        return loaded
+
+    @property
+    def payload(self):
+        return self._load(self.payload_json, {})
+
+    @payload.setter
+    def payload(self, value):
+        self.payload_json = json.dumps(value or {}, default=str)
+
+    @property
+    def result(self):
+        return self._load(self.result_json, None)
+
+    @result.setter
+    def result(self, value):
+        self.result_json = None if value is None else json.dumps(value, default=str)
+
+    @property
+    def is_finished(self):
+        return self.status in {"succeeded", "failed"}
@@ -0,0 +1,141 @@
+"""Keyset ("seek") pagination for the large list pages.
+
+Instead of ``OFFSET`` the next page starts after the sort key of the last row
+shown, so page N costs the same as page 1 however deep the list is. The
+cursor is the last row's sort key values, JSON encoded into a URL-safe token.
+"""
+
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+from typing import Any, List, Optional
+
+from sqlalchemy import Column, and_, false, or_, type_coerce
+from sqlalchemy.sql import visitors
+from sqlalchemy.sql.sqltypes import NullType
+
+DEFAULT_PER_PAGE = 50
+MAX_PER_PAGE = 200
+
+
+@dataclass
+class KeysetPage:
+    items: List[Any]
+    total: int
+    per_page: int
+    next_cursor: Optional[str] = None
+    cursor: Optional[str] = None
+    next_url: Optional[str] = None
+
+    @property
+    def has_more(self):
+        return self.next_cursor is not None
+
+    @property
+    def is_first(self):
+        return not self.cursor
+
+
+def encode_cursor(values):
+    raw = json.dumps(list(values), separators=(",", ":"), default=str).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token, expected_length):
+    """Return the key values in ``token`` or None when it is missing or malformed."""
+
+    if not token:
+        return None
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, binascii.Error, UnicodeError):
+        return None
+    if not isinstance(values, list) or len(values) != expected_length:
+        return None
+    return values
+
+
+def _sort_key(expression):
+    # The raw expression keeps ORDER BY and the seek on the column's index;
+    # NullType keeps SQLite's raw value (dates stay ISO strings) for the cursor.
+    if hasattr(expression, "__clause_element__"):
+        expression = expression.__clause_element__()
+    columns = [element for element in visitors.iterate(expression) if isinstance(element, Column)]
+    nullable = not columns or any(column.nullable for column in columns)
+    return type_coerce(expression, NullType()), nullable
+
+
+def _seek_clause(keys, values):
+    """Rows strictly after ``values`` in the order of ``keys``.
+
+    SQLite sorts NULL first ascending and last descending; only nullable keys
+    get ``IS NULL`` branches. The first key is also bounded on its own so the
+    seek starts inside its index instead of filtering a scan.
+    """
+
+    clauses = []
+    for index, (key, descending, nullable) in enumerate(keys):
+        value = values[index]
+        if value is None:
+            beyond = None if descending else key.isnot(None)
+        else:
+            beyond = key < value if descending else key > value
+            if descending and nullable:
+                beyond = or_(beyond, key.is_(None))
+        if beyond is not None:
+            equal_prefix = [
+                keys[i][0].is_(None) if values[i] is None else keys[i][0] == values[i]
+                for i in range(index)
+            ]
+            clauses.append(and_(*equal_prefix, beyond))
+    if not clauses:
+        return false()
+    seek = or_(*clauses)
+    key, descending, nullable = keys[0]
+    if values[0] is not None and not (descending and nullable):
+        seek = and_(key <= values[0] if descending else key >= values[0], seek)
+    return seek
+
+
+def keyset_paginate(query, order_by, *, tiebreaker, cursor=None, per_page=DEFAULT_PER_PAGE):
+    """Return one ``KeysetPage`` of ``query`` ordered by ``order_by``.
+
+    ``order_by`` is a list of ``(expression, descending)`` pairs; the unique
+    ``tiebreaker`` column (normally the primary key) is appended in the
+    direction of the last sort key so the order is total. The total comes
+    from a single ``COUNT`` over the filtered query.
+    """
+
+    per_page = max(1, min(int(per_page or DEFAULT_PER_PAGE), MAX_PER_PAGE))
+    descending_last = order_by[-1][1] if order_by else False
+    keys = []
+    for expression, descending in [*order_by, (tiebreaker, descending_last)]:
+        key, nullable = _sort_key(expression)
+        keys.append((key, descending, nullable))
+
+    total = query.enable_eagerloads(False).order_by(None).count()
+
+    values = decode_cursor(cursor, len(keys))
+    page_query = query.order_by(None).order_by(
+        *[key.desc() if descending else key.asc() for key, descending, _ in keys]
+    )
+    if values is not None:
+        page_query = page_query.filter(_seek_clause(keys, values))
+    else:
+        cursor = None
+
+    labelled = [key.label(f"_keyset_{index}") for index, (key, _, _) in enumerate(keys)]
+    rows = page_query.add_columns(*labelled).limit(per_page + 1).all()
+    next_cursor = None
+    if len(rows) > per_page:
+        rows = rows[:per_page]
+        next_cursor = encode_cursor(rows[-1][1:])
+    return KeysetPage(
+        items=[row[0] for row in rows],
+        total=total,
+        per_page=per_page,
+        next_cursor=next_cursor,
+        cursor=cursor,
+    )
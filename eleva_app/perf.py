@@ -0,0 +1,434 @@
+"""Request instrumentation: opt-in SQL profiling and always-on route metrics.
+
+Cursor events on every SQLAlchemy engine are timed and fingerprinted while a
+request is being profiled, so routes that issue one lazy load per row show up
+as a single statement repeated many times. ``RequestMetrics`` keeps cheap
+per-endpoint counters and histograms for the Prometheus ``/metrics`` export;
+they live in the serving process, so every series carries a ``pid`` label.
+``QueryRecorder`` captures the statements of a block for tests and benchmarks.
+"""
+
+import bisect
+import heapq
+import itertools
+import os
+import re
+import threading
+import time
+from collections import Counter, deque
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+_STRING_LITERAL_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def statement_fingerprint(statement):
+    """Collapse literals and ``IN (?, ?, ...)`` lists so repeats compare equal."""
+
+    text = _STRING_LITERAL_RE.sub("?", statement or "")
+    text = _NUMBER_LITERAL_RE.sub("?", text)
+    text = _PLACEHOLDER_LIST_RE.sub("(?)", text)
+    return _WHITESPACE_RE.sub(" ", text).strip()
+
+
+class SqlProfiler:
+    """Collects query count, DB time and repeated statements per request.
+
+    Enabled with ``SQL_PROFILING_ENABLED``; thresholds are read from
+    ``SQL_PROFILING_MAX_QUERIES``, ``SQL_PROFILING_MAX_DB_MS`` and
+    ``SQL_PROFILING_REPEAT_THRESHOLD``.
+    """
+
+    def __init__(self, app=None):
+        self._lock = threading.Lock()
+        self._sequence = itertools.count()
+        self._slowest = []
+        self._flagged = deque()
+        self._routes = {}
+        self._listening = False
+        self._g_key = f"_sql_profile_{id(self)}"
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("SQL_PROFILING_ENABLED", False)
+        app.config.setdefault("SQL_PROFILING_MAX_QUERIES", 30)
+        app.config.setdefault("SQL_PROFILING_MAX_DB_MS", 250)
+        app.config.setdefault("SQL_PROFILING_REPEAT_THRESHOLD", 5)
+        app.config.setdefault("SQL_PROFILING_BUFFER_SIZE", 50)
+        app.extensions["sql_profiler"] = self
+        self._app = app
+        self._flagged = deque(maxlen=app.config["SQL_PROFILING_BUFFER_SIZE"])
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+        if not self._listening:
+            event.listen(Engine, "before_cursor_execute", self._before_cursor_execute)
+            event.listen(Engine, "after_cursor_execute", self._after_cursor_execute)
+            self._listening = True
+
+    # ------------------------------------------------------------------
+    # Request and cursor hooks
+
+    def _start_request(self):
+        if not self._app.config.get("SQL_PROFILING_ENABLED") or request.endpoint == "static":
+            return
+        setattr(
+            g,
+            self._g_key,
+            {
+                "started": time.perf_counter(),
+                "query_count": 0,
+                "db_seconds": 0.0,
+                "fingerprints": Counter(),
+                "fingerprint_seconds": Counter(),
+            },
+        )
+
+    def _active_profile(self):
+        if not has_request_context():
+            return None
+        return g.get(self._g_key)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if self._active_profile() is None:
+            return
+        conn.info.setdefault(self._g_key, []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        profile = self._active_profile()
+        started = conn.info.get(self._g_key)
+        if profile is None or not started:
+            return
+        elapsed = time.perf_counter() - started.pop()
+        fingerprint = statement_fingerprint(statement)
+        profile["query_count"] += 1
+        profile["db_seconds"] += elapsed
+        profile["fingerprints"][fingerprint] += 1
+        profile["fingerprint_seconds"][fingerprint] += elapsed
+
+    def _finish_request(self, response):
+        profile = g.pop(self._g_key, None)
+        if profile is None:
+            return response
+        config = self._app.config
+        duration_ms = (time.perf_counter() - profile["started"]) * 1000
+        db_ms = profile["db_seconds"] * 1000
+        repeated = [
+            {
+                "fingerprint": fingerprint,
+                "count": count,
+                "db_ms": round(profile["fingerprint_seconds"][fingerprint] * 1000, 2),
+            }
+            for fingerprint, count in profile["fingerprints"].most_common(5)
+            if count >= config["SQL_PROFILING_REPEAT_THRESHOLD"]
+        ]
+        flags = []
+        if profile["query_count"] > config["SQL_PROFILING_MAX_QUERIES"]:
+            flags.append("query_count")
+        if db_ms > config["SQL_PROFILING_MAX_DB_MS"]:
+            flags.append("db_time")
+        if repeated:
+            flags.append("n_plus_one")
+        route = request.url_rule.rule if request.url_rule else request.path
+        record = {
+            "method": request.method,
+            "route": route,
+            "path": request.full_path.rstrip("?"),
+            "status": response.status_code,
+            "duration_ms": round(duration_ms, 2),
+            "db_ms": round(db_ms, 2),
+            "query_count": profile["query_count"],
+            "repeated": repeated,
+            "flags": flags,
+            "recorded_at": time.time(),
+        }
+        self._record(record)
+        response.headers["Server-Timing"] = (
+            f'db;dur={db_ms:.1f};desc="{profile["query_count"]} queries"'
+        )
+        return response
+
+    # ------------------------------------------------------------------
+    # Aggregates
+
+    def _record(self, record):
+        limit = self._app.config["SQL_PROFILING_BUFFER_SIZE"]
+        key = (record["method"], record["route"])
+        with self._lock:
+            stats = self._routes.setdefault(
+                key,
+                {
+                    "method": record["method"],
+                    "route": record["route"],
+                    "requests": 0,
+                    "flagged": 0,
+                    "total_queries": 0,
+                    "max_queries": 0,
+                    "total_db_ms": 0.0,
+                    "max_duration_ms": 0.0,
+                },
+            )
+            stats["requests"] += 1
+            stats["flagged"] += 1 if record["flags"] else 0
+            stats["total_queries"] += record["query_count"]
+            stats["max_queries"] = max(stats["max_queries"], record["query_count"])
+            stats["total_db_ms"] += record["db_ms"]
+            stats["max_duration_ms"] = max(stats["max_duration_ms"], record["duration_ms"])
+
+            entry = (record["duration_ms"], next(self._sequence), record)
+            if len(self._slowest) < limit:
+                heapq.heappush(self._slowest, entry)
+            else:
+                heapq.heappushpop(self._slowest, entry)
+            if record["flags"]:
+                self._flagged.append(record)
+
+    def snapshot(self):
+        with self._lock:
+            slowest = [record for _, _, record in sorted(self._slowest, reverse=True)]
+            flagged = list(reversed(self._flagged))
+            routes = [dict(stats) for stats in self._routes.values()]
+        for stats in routes:
+            stats["avg_queries"] = round(stats["total_queries"] / stats["requests"], 1)
+            stats["avg_db_ms"] = round(stats["total_db_ms"] / stats["requests"], 2)
+        routes.sort(key=lambda stats: stats["total_db_ms"], reverse=True)
+        return {"slowest": slowest, "flagged": flagged, "routes": routes}
+
+    def reset(self):
+        with self._lock:
+            self._slowest = []
+            self._flagged.clear()
+            self._routes = {}
+
+
+class QueryRecorder:
+    """Record the statements ``engine`` executes while started.
+
+    Use as a context manager, or call ``start``/``stop`` to span a test.
+    ``statements`` keeps the SQL text in execution order and ``row_counts``
+    the matching number of parameter sets (more than one for executemany).
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.statements = []
+        self.row_counts = []
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+    def start(self):
+        event.listen(self.engine, "before_cursor_execute", self._record)
+        return self
+
+    def stop(self):
+        event.remove(self.engine, "before_cursor_execute", self._record)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+        self.row_counts.append(len(parameters) if executemany else 1)
+
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (1, 5, 10, 25, 50, 100, 250, 500)
+RESPONSE_SIZE_BUCKETS = (1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+
+class _Histogram:
+    __slots__ = ("buckets", "counts", "total", "count")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+
+def _escape_label(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels):
+    return "{" + ",".join(f'{name}="{_escape_label(value)}"' for name, value in labels) + "}"
+
+
+def _format_number(value):
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class RequestMetrics:
+    """Per-endpoint latency, status, in-flight, DB query and response size metrics.
+
+    Endpoints are labelled by their Flask endpoint name (``unmatched`` for
+    404s) so label cardinality stays bounded by the number of routes.
+    Counters are kept per process: each series is labelled with the worker's
+    ``pid``, and a scrape only sees the worker that answered it, so scrape
+    every worker (or sum over ``pid``) to cover a multi-process server.
+    """
+
+    def __init__(self, app=None):
+        self._lock = threading.Lock()
+        self._latency = {}
+        self._queries = {}
+        self._sizes = {}
+        self._statuses = Counter()
+        self._in_flight = Counter()
+        self._listening = False
+        self._g_key = f"_request_metrics_{id(self)}"
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("METRICS_TOKEN", "")
+        app.extensions["request_metrics"] = self
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+        app.teardown_request(self._teardown_request)
+        if not self._listening:
+            event.listen(Engine, "after_cursor_execute", self._count_query)
+            self._listening = True
+
+    def _start_request(self):
+        endpoint = request.endpoint or "unmatched"
+        if endpoint == "static":
+            return
+        setattr(
+            g,
+            self._g_key,
+            {"started": time.perf_counter(), "endpoint": endpoint, "queries": 0, "recorded": False},
+        )
+        with self._lock:
+            self._in_flight[endpoint] += 1
+
+    def _count_query(self, conn, cursor, statement, parameters, context, executemany):
+        if not has_request_context():
+            return
+        state = g.get(self._g_key)
+        if state is not None:
+            state["queries"] += 1
+
+    def _finish_request(self, response):
+        state = g.get(self._g_key)
+        if state is None:
+            return response
+        size = response.calculate_content_length() if not response.is_streamed else None
+        self._observe(state, response.status_code, size)
+        return response
+
+    def _teardown_request(self, exc):
+        state = g.pop(self._g_key, None)
+        if state is None:
+            return
+        if not state["recorded"]:
+            self._observe(state, 500, None)
+        with self._lock:
+            self._in_flight[state["endpoint"]] -= 1
+
+    def _observe(self, state, status_code, size):
+        elapsed = time.perf_counter() - state["started"]
+        key = (state["endpoint"], request.method)
+        state["recorded"] = True
+        with self._lock:
+            latency = self._latency.get(key)
+            if latency is None:
+                latency = self._latency[key] = _Histogram(LATENCY_BUCKETS)
+                self._queries[key] = _Histogram(QUERY_COUNT_BUCKETS)
+                self._sizes[key] = _Histogram(RESPONSE_SIZE_BUCKETS)
+            latency.observe(elapsed)
+            self._queries[key].observe(state["queries"])
+            if size is not None:
+                self._sizes[key].observe(size)
+            self._statuses[key + (status_code,)] += 1
+
+    def render_prometheus(self):
+        """Return all metrics in the Prometheus text exposition format."""
+
+        with self._lock:
+            latency = {key: self._copy(hist) for key, hist in self._latency.items()}
+            queries = {key: self._copy(hist) for key, hist in self._queries.items()}
+            sizes = {key: self._copy(hist) for key, hist in self._sizes.items()}
+            statuses = dict(self._statuses)
+            in_flight = dict(self._in_flight)
+
+        process = (("pid", os.getpid()),)
+        lines = []
+        self._render_histogram(
+            lines,
+            "eleva_http_request_duration_seconds",
+            "Request latency in seconds by endpoint.",
+            latency,
+            process,
+        )
+        lines.append("# HELP eleva_http_requests_total Completed requests by endpoint and status code.")
+        lines.append("# TYPE eleva_http_requests_total counter")
+        for (endpoint, method, status), count in sorted(statuses.items()):
+            labels = _format_labels((("endpoint", endpoint), ("method", method), ("status", status)) + process)
+            lines.append(f"eleva_http_requests_total{labels} {count}")
+        lines.append("# HELP eleva_http_requests_in_flight Requests currently being served by endpoint.")
+        lines.append("# TYPE eleva_http_requests_in_flight gauge")
+        for endpoint, count in sorted(in_flight.items()):
+            labels = _format_labels((("endpoint", endpoint),) + process)
+            lines.append(f"eleva_http_requests_in_flight{labels} {count}")
+        self._render_histogram(
+            lines,
+            "eleva_http_request_db_queries",
+            "SQL statements executed per request by endpoint.",
+            queries,
+            process,
+        )
+        self._render_histogram(
+            lines,
+            "eleva_http_response_size_bytes",
+            "Response body size in bytes by endpoint.",
+            sizes,
+            process,
+        )
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _copy(hist):
+        copy = _Histogram(hist.buckets)
+        copy.counts = list(hist.counts)
+        copy.total = hist.total
+        copy.count = hist.count
+        return copy
+
+    @staticmethod
+    def _render_histogram(lines, name, help_text, histograms, process):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} histogram")
+        for (endpoint, method), hist in sorted(histograms.items()):
+            base = (("endpoint", endpoint), ("method", method)) + process
+            cumulative = 0
+            for bound, count in zip(hist.buckets + (float("inf"),), hist.counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _format_number(bound)
+                lines.append(f"{name}_bucket{_format_labels(base + (('le', le),))} {cumulative}")
+            lines.append(f"{name}_sum{_format_labels(base)} {_format_number(hist.total)}")
+            lines.append(f"{name}_count{_format_labels(base)} {hist.count}")
+
+    def reset(self):
+        with self._lock:
+            self._latency = {}
+            self._queries = {}
+            self._sizes = {}
+            self._statuses = Counter()
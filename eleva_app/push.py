@@ -0,0 +1,183 @@
+"""Push channel for notifications and board updates.
+
+``publish(channel, event, data)`` stores a ``push_event`` row in the current
+transaction. When that transaction commits, the in-process ``PushBroker``
+wakes every ``/events/stream`` generator of this worker so it reads the new
+rows at once; rolled back events are never seen. Streams also re-read the
+table every ``PUSH_RECHECK_SECONDS`` and ``/events/poll`` serves the same rows
+as JSON, so an event published by another worker still reaches the browser.
+``PUSH_TRANSPORT=poll`` makes clients poll instead of holding a stream open,
+for deployments whose workers cannot keep long-lived connections.
+
+Channels are ``user:<id>`` (that user's notifications) and ``board:<name>``
+(design, SRT and QC boards, which patch the changed card over HTMX).
+"""
+
+import datetime
+import itertools
+import json
+import threading
+import time
+
+from sqlalchemy import delete, event, func, select
+from sqlalchemy.orm import Session, object_session
+
+from eleva_app import db
+from eleva_app.models import PushEvent
+
+PUSH_RECHECK_SECONDS = 5
+PUSH_POLL_SECONDS = 15
+PUSH_STREAM_MAX_SECONDS = 300
+PUSH_KEEPALIVE_SECONDS = 15
+PUSH_EVENT_RETENTION = datetime.timedelta(days=1)
+
+# Board channels a client may subscribe to, with the module that must be visible.
+BOARD_CHANNELS = {
+    "board:design": "design",
+    "board:srt": "srt",
+    "board:qc": "qc",
+}
+
+_PENDING_KEY = "push_events_pending"
+_PRUNE_EVERY = 200
+_publish_counter = itertools.count(1)
+
+
+def user_channel(user_id):
+    return f"user:{user_id}"
+
+
+class PushBroker:
+    """Wakes waiting streams after a transaction that published events commits."""
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._generation = 0
+
+    @property
+    def generation(self):
+        return self._generation
+
+    def notify(self):
+        with self._condition:
+            self._generation += 1
+            self._condition.notify_all()
+
+    def wait(self, generation, timeout):
+        """Block until a commit newer than ``generation`` or ``timeout``; returns the current generation."""
+
+        with self._condition:
+            if self._generation == generation and timeout > 0:
+                self._condition.wait(timeout)
+            return self._generation
+
+
+broker = PushBroker()
+
+
+def _event_values(channel, event_name, data):
+    return {
+        "channel": channel,
+        "event": event_name,
+        "payload_json": json.dumps(data or {}, default=str),
+        "created_at": datetime.datetime.utcnow(),
+    }
+
+
+def _prune_statement():
+    return delete(PushEvent).where(
+        PushEvent.created_at < datetime.datetime.utcnow() - PUSH_EVENT_RETENTION
+    )
+
+
+def publish(channel, event_name, data=None):
+    """Queue ``event_name`` on ``channel``; delivered once the session commits."""
+
+    db.session.add(PushEvent(**_event_values(channel, event_name, data)))
+    db.session.info[_PENDING_KEY] = True
+    if next(_publish_counter) % _PRUNE_EVERY == 0:
+        db.session.execute(_prune_statement())
+
+
+def publish_from_flush(connection, target, channel, event_name, data=None):
+    """``publish`` for mapper listeners, which run mid-flush on ``connection``."""
+
+    connection.execute(PushEvent.__table__.insert().values(**_event_values(channel, event_name, data)))
+    session = object_session(target)
+    if session is not None:
+        session.info[_PENDING_KEY] = True
+
+
+def _after_commit(session):
+    if session.info.pop(_PENDING_KEY, None):
+        broker.notify()
+
+
+def _after_rollback(session):
+    session.info.pop(_PENDING_KEY, None)
+
+
+def install_push_listeners():
+    for name, listener in (("after_commit", _after_commit), ("after_rollback", _after_rollback)):
+        if not event.contains(Session, name, listener):
+            event.listen(Session, name, listener)
+
+
+def latest_event_id():
+    return db.session.execute(select(func.max(PushEvent.id))).scalar() or 0
+
+
+def events_after(last_id, channels, limit=100):
+    """Events on ``channels`` newer than ``last_id``, oldest first, as dicts."""
+
+    rows = db.session.execute(
+        select(PushEvent)
+        .where(PushEvent.id > last_id, PushEvent.channel.in_(sorted(channels)))
+        .order_by(PushEvent.id)
+        .limit(limit)
+    ).scalars()
+    return [
+        {
+            "id": row.id,
+            "channel": row.channel,
+            "event": row.event,
+            "data": json.loads(row.payload_json or "{}"),
+        }
+        for row in rows
+    ]
+
+
+def format_sse(push_event):
+    return f"id: {push_event['id']}\nevent: {push_event['event']}\ndata: {json.dumps(push_event)}\n\n"
+
+
+def event_stream(app, channels, last_id):
+    """Server-sent event frames for ``channels`` after ``last_id``.
+
+    Each read runs in its own app context, so no database connection is held
+    while waiting. The stream ends after ``PUSH_STREAM_MAX_SECONDS``; the
+    browser reconnects with ``Last-Event-ID`` and continues where it stopped.
+    """
+
+    config = app.config
+    recheck = config.get("PUSH_RECHECK_SECONDS", PUSH_RECHECK_SECONDS)
+    keepalive = config.get("PUSH_KEEPALIVE_SECONDS", PUSH_KEEPALIVE_SECONDS)
+    deadline = time.monotonic() + config.get("PUSH_STREAM_MAX_SECONDS", PUSH_STREAM_MAX_SECONDS)
+    yield f"retry: {int(recheck * 1000)}\n\n"
+    last_frame = time.monotonic()
+    while True:
+        generation = broker.generation
+        with app.app_context():
+            pending = events_after(last_id, channels)
+        for push_event in pending:
+            last_id = push_event["id"]
+            yield format_sse(push_event)
+        now = time.monotonic()
+        if pending:
+            last_frame = now
+        elif now - last_frame >= keepalive:
+            yield ": keepalive\n\n"
+            last_frame = now
+        if now >= deadline:
+            return
+        broker.wait(generation, min(recheck, deadline - now))
@@ -0,0 +1,259 @@
+"""In-process cache for small, rarely changing reference tables.
+
+Dropdown options, procurement stages, service routes and vendors are read on
+almost every service/purchase page but change a few times a month. Each
+cached value records the version of the tables it was built from; versions
+live in ``reference_data_version`` so every worker sees a change made by any
+other. A session hook bumps the version of a tracked table in the same
+transaction as the write (flushes and bulk ``query.update``/``delete``
+alike), and a request re-reads the version row once, so a worker re-queries
+a table only after it actually changed.
+
+The page header (switchable users, a user's latest notifications, section
+guides) goes through the same mechanism with a short ``ttl`` on top, so the
+layout costs the version read instead of four queries per render. The design
+board caches its open tasks the same way, so ``design_task`` and ``project``
+are tracked too, and so does each module of the per-user dashboard; those
+callers use ``lookup``/``store`` to rebuild several stale entries at once.
+
+Cached values are ``ReferenceRow`` snapshots, never ORM instances, so they
+can be shared between threads and sessions safely.
+"""
+
+import copy
+import datetime
+import threading
+import time
+
+from flask import g, has_request_context
+from sqlalchemy import event, inspect, select, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from eleva_app import db
+from eleva_app.models import ReferenceDataVersion
+
+TRACKED_TABLES = (
+    "dropdown_option",
+    "service_dropdown_option",
+    "procurement_stage",
+    "service_route",
+    "vendor",
+    "user",
+    "notification",
+    "section_guide",
+    "design_task",
+    "project",
+    # Dashboard modules (see DASHBOARD_MODULE_TABLES in app.py).
+    "qc_work",
+    "qc_work_dependency",
+    "form_schema",
+    "sales_opportunity_engagement",
+    "sales_opportunity",
+    "sales_task",
+    "sales_client",
+    "customer_support_ticket",
+    "srt_tasks",
+    "service_visit",
+    "lift",
+    "customer",
+)
+
+# Returned by ``ReferenceCache.lookup`` for an entry that must be rebuilt.
+MISSING = object()
+
+_VERSIONS_KEY = "_reference_data_versions"
+_PENDING_KEY = "reference_tables_changed"
+
+
+class ReferenceRow:
+    """Read-only copy of a model row's columns (plus chosen properties)."""
+
+    __slots__ = ("__dict__",)
+
+    def __init__(self, **values):
+        self.__dict__.update(values)
+
+    def __repr__(self):
+        return f"ReferenceRow({self.__dict__!r})"
+
+    def __eq__(self, other):
+        return isinstance(other, ReferenceRow) and other.__dict__ == self.__dict__
+
+    def __hash__(self):
+        return hash(tuple(sorted((key, repr(value)) for key, value in self.__dict__.items())))
+
+
+def snapshot(instances, properties=()):
+    """``ReferenceRow`` copies of ``instances`` with every column and ``properties``."""
+
+    rows = []
+    for instance in instances:
+        mapper = inspect(instance).mapper
+        values = {attr.key: getattr(instance, attr.key) for attr in mapper.column_attrs}
+        values.update({name: getattr(instance, name) for name in properties})
+        rows.append(ReferenceRow(**values))
+    return rows
+
+
+class ReferenceCache:
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._ready_engines = set()
+
+    # -- versions ---------------------------------------------------------
+
+    def _table_ready(self):
+        key = str(db.engine.url)
+        if key in self._ready_engines:
+            return True
+        if inspect(db.engine).has_table(ReferenceDataVersion.__tablename__):
+            self._ready_engines.add(key)
+            return True
+        return False
+
+    def current_versions(self):
+        """All table versions, read once per request (None before the table exists)."""
+
+        if has_request_context() and _VERSIONS_KEY in g:
+            return g.get(_VERSIONS_KEY)
+        versions = None
+        if self._table_ready():
+            try:
+                versions = dict(
+                    db.session.execute(
+                        select(ReferenceDataVersion.table_name, ReferenceDataVersion.version)
+                    ).all()
+                )
+            except SQLAlchemyError:
+                db.session.rollback()
+        if has_request_context():
+            setattr(g, _VERSIONS_KEY, versions)
+        return versions
+
+    # -- lookups ------------------------------------------------------------
+
+    def lookup(self, key, tables, ttl=None):
+        """Return ``(stamp, value)`` for ``key``; ``value`` is ``MISSING`` when stale.
+
+        Pass the stamp to ``store`` with the rebuilt value, so a write that
+        lands while it is being built expires it again.
+        """
+
+        versions = self.current_versions()
+        if versions is None:
+            return None, MISSING
+        stamp = tuple(versions.get(table, 0) for table in tables)
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None or entry[0] != stamp or (ttl is not None and time.monotonic() - entry[1] >= ttl):
+            return stamp, MISSING
+        return stamp, copy.deepcopy(entry[2])
+
+    def store(self, key, stamp, value):
+        """Cache ``value`` built at ``stamp``; returns a copy for the caller."""
+
+        if stamp is None:
+            return value
+        with self._lock:
+            self._entries[key] = (stamp, time.monotonic(), value)
+        return copy.deepcopy(value)
+
+    def get(self, key, tables, loader, ttl=None):
+        """Return ``loader()``'s value for ``key``, reloading when ``tables`` changed.
+
+        ``ttl`` (seconds) additionally expires the value, for data that can
+        also change behind the ORM's back. The caller gets a deep copy, so
+        mutating it cannot leak into the cache.
+        """
+
+        stamp, value = self.lookup(key, tables, ttl)
+        if value is MISSING:
+            value = self.store(key, stamp, loader())
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        if has_request_context():
+            g.pop(_VERSIONS_KEY, None)
+
+    # -- invalidation --------------------------------------------------------
+
+    def _bump(self, session, tables):
+        if not tables or not self._table_ready():
+            return
+        connection = session.connection()
+        now = datetime.datetime.utcnow()
+        table = ReferenceDataVersion.__table__
+        for name in sorted(tables):
+            result = connection.execute(
+                update(table)
+                .where(table.c.table_name == name)
+                .values(version=table.c.version + 1, updated_at=now)
+            )
+            if result.rowcount == 0:
+                connection.execute(table.insert().values(table_name=name, version=1, updated_at=now))
+        session.info.setdefault(_PENDING_KEY, set()).update(tables)
+
+    def touch(self, session, tables):
+        """Bump ``tables`` for writes the hooks cannot see (raw inserts in mapper listeners)."""
+
+        self._bump(session, set(tables).intersection(TRACKED_TABLES))
+
+    def _after_flush(self, session, flush_context):
+        changed = set()
+        for instance in list(session.new) + list(session.deleted):
+            changed.add(getattr(instance, "__tablename__", None))
+        for instance in session.dirty:
+            if session.is_modified(instance, include_collections=False):
+                changed.add(getattr(instance, "__tablename__", None))
+        self._bump(session, changed.intersection(TRACKED_TABLES))
+
+    def _do_orm_execute(self, orm_execute_state):
+        if not (orm_execute_state.is_update or orm_execute_state.is_delete or orm_execute_state.is_insert):
+            return
+        mapper = orm_execute_state.bind_mapper
+        if mapper is None or mapper.local_table.name not in TRACKED_TABLES:
+            return None
+        # Run the statement here so a bulk write that matched nothing (e.g.
+        # "mark all read" with nothing unread) leaves the version alone.
+        result = orm_execute_state.invoke_statement()
+        if getattr(result, "rowcount", -1) != 0:
+            self._bump(orm_execute_state.session, {mapper.local_table.name})
+        return result
+
+    def _after_commit(self, session):
+        if session.info.pop(_PENDING_KEY, None) and has_request_context():
+            # The versions memoised for this request are now out of date.
+            g.pop(_VERSIONS_KEY, None)
+
+    def _after_rollback(self, session):
+        session.info.pop(_PENDING_KEY, None)
+
+    def install(self):
+        """Register the session hooks (idempotent)."""
+
+        for name, listener in (
+            ("after_flush", self._after_flush),
+            ("do_orm_execute", self._do_orm_execute),
+            ("after_commit", self._after_commit),
+            ("after_rollback", self._after_rollback),
+        ):
+            if not event.contains(Session, name, listener):
+                event.listen(Session, name, listener)
+
+
+reference_cache = ReferenceCache()
+
+
+def seed_reference_versions():
+    """Create a version row for every tracked table; returns how many were added."""
+
+    existing = {row[0] for row in db.session.query(ReferenceDataVersion.table_name)}
+    missing = [name for name in TRACKED_TABLES if name not in existing]
+    for name in missing:
+        db.session.add(ReferenceDataVersion(table_name=name, version=0))
+    db.session.commit()
+    return len(missing)
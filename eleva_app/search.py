@@ -0,0 +1,438 @@
+"""Global search over customers, lifts, parts, vendors, opportunities and tickets.
+
+On SQLite the searchable text lives in an FTS5 table (``search_index``) that
+mapper listeners keep in step with every ORM insert, update and delete;
+``flask reindex-search`` rebuilds it after bulk writes that bypass the ORM.
+``global_search`` answers with one ranked query, capped per kind. On other
+databases (or a SQLite build without FTS5) it falls back to the per-table
+``LIKE`` filters the list pages use.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Tuple
+
+from markupsafe import Markup, escape
+from sqlalchemy import event, func, inspect, or_, text
+from sqlalchemy.exc import OperationalError
+
+from eleva_app import db
+from eleva_app.models import Customer, Lift, Product, SalesOpportunity, SupportTicket, Vendor
+
+SEARCH_TABLE = "search_index"
+SEARCH_PER_KIND = 8
+_MAX_TERMS = 8
+_HIGHLIGHT_OPEN = "\x02"
+_HIGHLIGHT_CLOSE = "\x03"
+
+
+@dataclass
+class SearchSource:
+    kind: str
+    code: int
+    label: str
+    model: type
+    module: str
+    title_columns: Tuple[str, ...]
+    subtitle_columns: Tuple[str, ...]
+    body_columns: Tuple[str, ...]
+    url: Callable[[int, str], Tuple[str, dict]]
+
+    @property
+    def columns(self):
+        return self.title_columns + self.subtitle_columns + self.body_columns
+
+    def document(self, values):
+        """``(title, subtitle, body)`` for a mapping of column name to value."""
+
+        def _clean(name):
+            value = values.get(name)
+            return str(value).strip() if value is not None else ""
+
+        title = next((_clean(name) for name in self.title_columns if _clean(name)), "")
+        subtitle = " · ".join(_clean(name) for name in self.subtitle_columns if _clean(name))
+        body = " ".join(_clean(name) for name in self.body_columns if _clean(name))
+        return title, subtitle, body
+
+
+SEARCH_SOURCES = [
+    SearchSource(
+        kind="customer",
+        code=1,
+        label="Customers",
+        model=Customer,
+        module="service",
+        title_columns=("company_name",),
+        subtitle_columns=("customer_code", "city"),
+        body_columns=("contact_person", "phone", "mobile", "email", "gst_no", "route", "notes"),
+        url=lambda record_id, subtitle: ("service_customer_detail", {"customer_id": record_id}),
+    ),
+    SearchSource(
+        kind="lift",
+        code=2,
+        label="Lifts",
+        model=Lift,
+        module="service",
+        title_columns=("lift_code",),
+        subtitle_columns=("customer_code", "city"),
+        body_columns=(
+            "external_lift_id",
+            "site_address_line1",
+            "site_address_line2",
+            "building_villa_number",
+            "lift_brand",
+            "amc_contract_id",
+            "notes",
+            "remarks",
+        ),
+        url=lambda record_id, subtitle: ("service_lift_detail", {"lift_id": record_id}),
+    ),
+    SearchSource(
+        kind="part",
+        code=3,
+        label="Parts",
+        model=Product,
+        module="purchase",
+        title_columns=("name",),
+        subtitle_columns=("sku",),
+        body_columns=("category", "primary_vendor", "specifications", "notes"),
+        url=lambda record_id, subtitle: ("purchase_part_detail", {"product_id": record_id}),
+    ),
+    SearchSource(
+        kind="vendor",
+        code=4,
+        label="Vendors",
+        model=Vendor,
+        module="purchase",
+        title_columns=("display_name", "name"),
+        subtitle_columns=("vendor_code", "city"),
+        body_columns=("name", "legal_name", "contact_person", "phone", "email", "gstin", "activities"),
+        url=lambda record_id, subtitle: ("purchase_vendor_detail", {"vendor_id": record_id}),
+    ),
+    SearchSource(
+        kind="opportunity",
+        code=5,
+        label="Opportunities",
+        model=SalesOpportunity,
+        module="sales",
+        title_columns=("title",),
+        subtitle_columns=("stage", "status"),
+        body_columns=("related_project", "description"),
+        url=lambda record_id, subtitle: ("sales_opportunity_detail", {"opportunity_id": record_id}),
+    ),
+    SearchSource(
+        kind="ticket",
+        code=6,
+        label="Tickets",
+        model=SupportTicket,
+        module="customer_support",
+        title_columns=("subject", "ticket_id"),
+        # The ticket id leads the subtitle because the tickets page is keyed on it.
+        subtitle_columns=("ticket_id", "status"),
+        body_columns=("customer", "contact_name", "category", "assignee"),
+        url=lambda record_id, subtitle: ("customer_support_tasks", {"ticket": subtitle.split(" · ")[0]}),
+    ),
+]
+SEARCH_SOURCES_BY_KIND = {source.kind: source for source in SEARCH_SOURCES}
+_SOURCES_BY_MODEL = {source.model: source for source in SEARCH_SOURCES}
+
+
+@dataclass
+class SearchHit:
+    kind: str
+    record_id: int
+    title: str
+    subtitle: str
+    snippet: Optional[Markup]
+    endpoint: str
+    url_kwargs: dict
+
+
+@dataclass
+class SearchGroup:
+    kind: str
+    label: str
+    hits: List[SearchHit]
+
+
+# ---------------------------------------------------------------------------
+# Index maintenance
+
+_fts_ready = set()
+_KIND_CODE_BITS = 4
+
+
+def document_rowid(source, record_id):
+    # FTS5 cannot index the kind/record_id columns, so deletes look rows up
+    # by a rowid derived from both instead of scanning the whole index.
+    return (record_id << _KIND_CODE_BITS) | source.code
+
+
+def search_index_available(connection):
+    """True when ``connection`` is SQLite and the FTS5 table exists."""
+
+    if connection.dialect.name != "sqlite":
+        return False
+    key = str(connection.engine.url)
+    if key in _fts_ready:
+        return True
+    exists = connection.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+        {"name": SEARCH_TABLE},
+    ).first()
+    if exists:
+        _fts_ready.add(key)
+    return bool(exists)
+
+
+def create_search_index(connection):
+    """Create the FTS5 table; returns False when SQLite was built without FTS5."""
+
+    if connection.dialect.name != "sqlite":
+        return False
+    try:
+        connection.execute(
+            text(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5("
+                "kind UNINDEXED, record_id UNINDEXED, title, subtitle, body, "
+                "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+            )
+        )
+    except OperationalError:
+        return False
+    return True
+
+
+def _write_documents(connection, source, rows):
+    connection.execute(
+        text(
+            # OR REPLACE: a bulk delete may have left a row behind for a reused id.
+            f"INSERT OR REPLACE INTO {SEARCH_TABLE} (rowid, kind, record_id, title, subtitle, body) "
+            "VALUES (:rowid, :kind, :record_id, :title, :subtitle, :body)"
+        ),
+        [
+            dict(
+                zip(("title", "subtitle", "body"), source.document(values)),
+                rowid=document_rowid(source, record_id),
+                kind=source.kind,
+                record_id=record_id,
+            )
+            for record_id, values in rows
+        ],
+    )
+
+
+def _delete_document(connection, source, record_id):
+    connection.execute(
+        text(f"DELETE FROM {SEARCH_TABLE} WHERE rowid = :rowid"),
+        {"rowid": document_rowid(source, record_id)},
+    )
+
+
+def _values_for(source, target):
+    return {name: getattr(target, name, None) for name in source.columns}
+
+
+def _after_insert(mapper, connection, target):
+    source = _SOURCES_BY_MODEL[mapper.class_]
+    if search_index_available(connection):
+        _write_documents(connection, source, [(target.id, _values_for(source, target))])
+
+
+def _after_update(mapper, connection, target):
+    source = _SOURCES_BY_MODEL[mapper.class_]
+    state = inspect(target)
+    if not any(state.attrs[name].history.has_changes() for name in source.columns):
+        return
+    if search_index_available(connection):
+        _write_documents(connection, source, [(target.id, _values_for(source, target))])
+
+
+def _after_delete(mapper, connection, target):
+    source = _SOURCES_BY_MODEL[mapper.class_]
+    if search_index_available(connection):
+        _delete_document(connection, source, target.id)
+
+
+def install_search_listeners():
+    """Keep ``search_index`` current on ORM writes (idempotent)."""
+
+    for source in SEARCH_SOURCES:
+        for name, listener in (
+            ("after_insert", _after_insert),
+            ("after_update", _after_update),
+            ("after_delete", _after_delete),
+        ):
+            if not event.contains(source.model, name, listener):
+                event.listen(source.model, name, listener)
+
+
+def reindex_records(model, ids, *, chunk_size=500):
+    """Rewrite the documents of ``model`` rows ``ids``.
+
+    For bulk ``insert()``/``update()`` statements, which do not fire the
+    mapper listeners above.
+    """
+
+    source = _SOURCES_BY_MODEL.get(model)
+    if source is None or not ids:
+        return
+    connection = db.session.connection()
+    if not search_index_available(connection):
+        return
+    columns = [getattr(model, name) for name in source.columns]
+    ids = sorted(ids)
+    for start in range(0, len(ids), chunk_size):
+        rows = db.session.query(model.id, *columns).filter(model.id.in_(ids[start:start + chunk_size]))
+        _write_documents(
+            connection, source, [(row[0], dict(zip(source.columns, row[1:]))) for row in rows]
+        )
+
+
+def rebuild_search_index(chunk_size=500):
+    """Recreate every document from the source tables; returns counts per kind.
+
+    Returns None when the database cannot hold the FTS5 index.
+    """
+
+    connection = db.session.connection()
+    if not create_search_index(connection):
+        return None
+    connection.execute(text(f"DELETE FROM {SEARCH_TABLE}"))
+    counts = {}
+    for source in SEARCH_SOURCES:
+        columns = [getattr(source.model, name) for name in source.columns]
+        batch, count = [], 0
+        for row in db.session.query(source.model.id, *columns).order_by(source.model.id).yield_per(chunk_size):
+            batch.append((row[0], dict(zip(source.columns, row[1:]))))
+            if len(batch) >= chunk_size:
+                _write_documents(connection, source, batch)
+                count += len(batch)
+                batch = []
+        if batch:
+            _write_documents(connection, source, batch)
+            count += len(batch)
+        counts[source.kind] = count
+    db.session.commit()
+    _fts_ready.add(str(connection.engine.url))
+    return counts
+
+
+# ---------------------------------------------------------------------------
+# Querying
+
+def search_terms(query):
+    return re.findall(r"\w+", query or "", flags=re.UNICODE)[:_MAX_TERMS]
+
+
+def _match_expression(terms):
+    # Each term is quoted (so FTS5 operators in user input are inert) and
+    # prefix-matched so "otis ba" finds "Otis Bangalore".
+    return " ".join('"{}"*'.format(term.replace('"', '""')) for term in terms)
+
+
+def _highlight(snippet):
+    if not snippet:
+        return None
+    marked = str(escape(snippet))
+    return Markup(marked.replace(_HIGHLIGHT_OPEN, "<mark>").replace(_HIGHLIGHT_CLOSE, "</mark>"))
+
+
+def _hit(source, record_id, title, subtitle, snippet=None):
+    endpoint, url_kwargs = source.url(record_id, subtitle or "")
+    return SearchHit(
+        kind=source.kind,
+        record_id=record_id,
+        title=title or f"{source.label} #{record_id}",
+        subtitle=subtitle or "",
+        snippet=_highlight(snippet),
+        endpoint=endpoint,
+        url_kwargs=url_kwargs,
+    )
+
+
+def _fts_search(connection, sources, terms, per_kind):
+    kinds = {f"kind_{index}": source.kind for index, source in enumerate(sources)}
+    # Rows whose source record was removed by a bulk delete (which skips the
+    # mapper listeners) are filtered out here rather than shown as dead links.
+    exists_cases = " ".join(
+        f"WHEN '{source.kind}' THEN EXISTS (SELECT 1 FROM {source.model.__tablename__} "
+        f"WHERE {source.model.__tablename__}.id = {SEARCH_TABLE}.record_id)"
+        for source in sources
+    )
+    # FTS5 auxiliary functions cannot share a SELECT with window functions, so
+    # the ranking is computed first and snippets are taken for the survivors.
+    statement = text(
+        f"""
+        WITH ranked AS (
+            SELECT rowid AS doc, kind, record_id, title, subtitle,
+                   bm25({SEARCH_TABLE}, 0.0, 0.0, 10.0, 4.0, 1.0) AS rank
+            FROM {SEARCH_TABLE}
+            WHERE {SEARCH_TABLE} MATCH :match
+              AND kind IN ({", ".join(f":{name}" for name in kinds)})
+              AND CASE kind {exists_cases} ELSE 0 END
+        ), top AS (
+            SELECT *, row_number() OVER (PARTITION BY kind ORDER BY rank) AS kind_rank FROM ranked
+        )
+        SELECT top.kind, top.record_id, top.title, top.subtitle,
+               snippet({SEARCH_TABLE}, 4, :open, :close, '…', 12) AS snippet
+        FROM top JOIN {SEARCH_TABLE} ON {SEARCH_TABLE}.rowid = top.doc
+        WHERE top.kind_rank <= :per_kind AND {SEARCH_TABLE} MATCH :match
+        ORDER BY top.rank
+        """
+    )
+    rows = connection.execute(
+        statement,
+        {
+            "match": _match_expression(terms),
+            "open": _HIGHLIGHT_OPEN,
+            "close": _HIGHLIGHT_CLOSE,
+            "per_kind": per_kind,
+            **kinds,
+        },
+    )
+    return [
+        _hit(SEARCH_SOURCES_BY_KIND[kind], int(record_id), title, subtitle, snippet)
+        for kind, record_id, title, subtitle, snippet in rows
+    ]
+
+
+def _like_search(sources, terms, per_kind):
+    hits = []
+    for source in sources:
+        columns = [getattr(source.model, name) for name in source.columns]
+        query = db.session.query(source.model.id, *columns)
+        for term in terms:
+            like = f"%{term.lower()}%"
+            query = query.filter(or_(*[func.lower(column).like(like) for column in columns]))
+        title_column = getattr(source.model, source.title_columns[0])
+        for row in query.order_by(title_column.asc(), source.model.id.asc()).limit(per_kind):
+            title, subtitle, _ = source.document(dict(zip(source.columns, row[1:])))
+            hits.append(_hit(source, row[0], title, subtitle))
+    return hits
+
+
+def global_search(query, *, kinds=None, per_kind=SEARCH_PER_KIND):
+    """Search ``query`` across the sources in ``kinds``; returns ``SearchGroup``s.
+
+    Groups are ordered by their best hit (FTS) or by source order (LIKE).
+    """
+
+    terms = search_terms(query)
+    sources = [source for source in SEARCH_SOURCES if kinds is None or source.kind in kinds]
+    if not terms or not sources:
+        return []
+    connection = db.session.connection()
+    if search_index_available(connection):
+        hits = _fts_search(connection, sources, terms, per_kind)
+    else:
+        hits = _like_search(sources, terms, per_kind)
+
+    groups = {}
+    for hit in hits:
+        if hit.kind not in groups:
+            groups[hit.kind] = SearchGroup(
+                kind=hit.kind, label=SEARCH_SOURCES_BY_KIND[hit.kind].label, hits=[]
+            )
+        groups[hit.kind].hits.append(hit)
+    return list(groups.values())
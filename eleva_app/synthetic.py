@@ -0,0 +1,491 @@
+"""Synthetic data at production-like volumes for benchmarking.
+
+Rows are created through the real models (so listeners such as inventory
+sync and service-visit mirroring run) and every record is tagged with
+``SYNTHETIC_PREFIX`` in its code or name so ``purge_synthetic_data`` can
+remove exactly what was generated.
+"""
+
+import datetime
+import random
+
+from eleva_app import db
+from eleva_app.models import (
+    BillOfMaterials,
+    BOMItem,
+    BOMPackage,
+    Customer,
+    DrawingSite,
+    InventoryItem,
+    InventoryLedgerEntry,
+    InventoryReceipt,
+    InventoryReceiptItem,
+    Lift,
+    PartClass,
+    Product,
+    Project,
+    PurchaseOrder,
+    PurchaseOrderItem,
+    SalesClient,
+    SalesOpportunity,
+    ServiceTask,
+    ServiceVisit,
+    SupportCallLog,
+    SupportTicket,
+    User,
+    Vendor,
+)
+
+SYNTHETIC_PREFIX = "SYN"
+
+# Rows generated per unit of ``scale``.
+SYNTHETIC_VOLUMES = {
+    "customers": 40,
+    "lifts_per_customer": 2,
+    "visits_per_lift": 8,
+    "service_tasks": 60,
+    "sales_clients": 30,
+    "opportunities": 60,
+    "tickets": 40,
+    "call_logs": 80,
+    "vendors": 8,
+    "products": 120,
+    "projects": 2,
+    "boms": 10,
+    "packages_per_bom": 2,
+    "items_per_package": 12,
+    "purchase_orders": 30,
+    "items_per_po": 4,
+    "receipts": 15,
+}
+
+_BATCH_SIZE = 500
+_CITIES = [("Goa", "Panaji"), ("Maharashtra", "Mumbai"), ("Maharashtra", "Pune"), ("Karnataka", "Belagavi")]
+_LIFT_TYPES = ["MRL", "Machine Room", "Hydraulic", "Home Lift"]
+_TECHNICIANS = ["Ravi", "Sanjay", "Imran", "Prakash", "Joel", "Anil"]
+_TICKET_STATUSES = ["Open", "In Progress", "Resolved", "Closed"]
+_PO_STATUSES = ["Draft", "Issued", "Partially Received", "Closed"]
+
+
+def _commit_in_batches(rows):
+    for start in range(0, len(rows), _BATCH_SIZE):
+        db.session.add_all(rows[start:start + _BATCH_SIZE])
+        db.session.commit()
+
+
+def seed_synthetic_data(scale=1, *, seed=42, prefix=SYNTHETIC_PREFIX):
+    """Replace previously generated rows with a fresh data set of ``scale`` units.
+
+    Returns a dict of row counts per entity.
+    """
+
+    purge_synthetic_data(prefix)
+    rng = random.Random(seed)
+    today = datetime.date.today()
+    now = datetime.datetime.utcnow()
+    owner = User.query.filter_by(username="admin").first()
+    owner_id = owner.id if owner else None
+    volumes = {key: value * scale for key, value in SYNTHETIC_VOLUMES.items()}
+    volumes["lifts_per_customer"] = SYNTHETIC_VOLUMES["lifts_per_customer"]
+    volumes["visits_per_lift"] = SYNTHETIC_VOLUMES["visits_per_lift"]
+    volumes["packages_per_bom"] = SYNTHETIC_VOLUMES["packages_per_bom"]
+    volumes["items_per_package"] = SYNTHETIC_VOLUMES["items_per_package"]
+    volumes["items_per_po"] = SYNTHETIC_VOLUMES["items_per_po"]
+    counts = {}
+
+    customers = []
+    for index in range(volumes["customers"]):
+        state, city = rng.choice(_CITIES)
+        customers.append(
+            Customer(
+                customer_code=f"{prefix}-C{index:06d}",
+                company_name=f"{prefix} Residency {index}",
+                contact_person=f"Contact {index}",
+                mobile=f"9{rng.randint(100000000, 999999999)}",
+                city=city,
+                state=state,
+                route=city,
+                branch=city,
+            )
+        )
+    _commit_in_batches(customers)
+    counts["customers"] = len(customers)
+
+    lifts = []
+    for customer in customers:
+        for offset in range(volumes["lifts_per_customer"]):
+            lift = Lift(
+                lift_code=f"{customer.customer_code}-L{offset}",
+                customer_code=customer.customer_code,
+                city=customer.city,
+                state=customer.state,
+                route=customer.city[:20],
+                lift_type=rng.choice(_LIFT_TYPES),
+                building_floors=str(rng.randint(2, 14)),
+                capacity_persons=rng.choice([4, 6, 8, 13]),
+                amc_status=rng.choice(["Active", "Expired", "Pending"]),
+                amc_start=today - datetime.timedelta(days=rng.randint(30, 700)),
+                services_per_year=12,
+                status="Active",
+            )
+            schedule = []
+            for visit in range(volumes["visits_per_lift"]):
+                visit_date = today + datetime.timedelta(days=30 * (visit - volumes["visits_per_lift"] // 2) + rng.randint(-5, 5))
+                schedule.append(
+                    {
+                        "date": visit_date,
+                        "status": "completed" if visit_date < today and rng.random() < 0.8 else "scheduled",
+                        "technician": rng.choice(_TECHNICIANS),
+                        "route": customer.city,
+                    }
+                )
+            lift.service_schedule = schedule
+            lifts.append(lift)
+    _commit_in_batches(lifts)
+    counts["lifts"] = len(lifts)
+    counts["service_visits"] = len(lifts) * volumes["visits_per_lift"]
+
+    tasks = [
+        ServiceTask(
+            task_code=f"{prefix}-ST{index:06d}",
+            customer_id=rng.choice(customers).id,
+            lift_id=rng.choice(lifts).id,
+            call_type=rng.choice(["Breakdown", "Preventive", "Installation Support"]),
+            priority=rng.choice(["Low", "Medium", "High"]),
+            owner_user_id=owner_id,
+            status=rng.choice(["Open", "In Progress", "Closed"]),
+            created_at=now - datetime.timedelta(days=rng.randint(0, 120)),
+        )
+        for index in range(volumes["service_tasks"])
+    ]
+    _commit_in_batches(tasks)
+    counts["service_tasks"] = len(tasks)
+
+    clients = [
+        SalesClient(
+            display_name=f"{prefix} Client {index}",
+            company_name=f"{prefix} Developers {index % 50}",
+            phone=f"9{rng.randint(100000000, 999999999)}",
+            owner_id=owner_id,
+            lifecycle_stage=rng.choice(["Lead", "Customer"]),
+        )
+        for index in range(volumes["sales_clients"])
+    ]
+    _commit_in_batches(clients)
+    counts["sales_clients"] = len(clients)
+
+    stages = ["New Enquiry", "Site Visit", "Quote Submission", "Negotiation"]
+    opportunities = [
+        SalesOpportunity(
+            title=f"{prefix} Opportunity {index}",
+            pipeline="lift",
+            stage=rng.choice(stages),
+            amount=rng.randint(4, 40) * 100000,
+            owner_id=owner_id,
+            client_id=rng.choice(clients).id,
+            expected_close_date=today + datetime.timedelta(days=rng.randint(-30, 120)),
+        )
+        for index in range(volumes["opportunities"])
+    ]
+    _commit_in_batches(opportunities)
+    counts["opportunities"] = len(opportunities)
+
+    tickets = []
+    for index in range(volumes["tickets"]):
+        ticket = SupportTicket()
+        created_at = now - datetime.timedelta(hours=rng.randint(1, 24 * 90))
+        ticket.apply_dict(
+            {
+                "id": f"{prefix}-TK{index:06d}",
+                "subject": f"{prefix} lift stuck between floors #{index}",
+                "customer": rng.choice(customers).company_name,
+                "category": rng.choice(["Breakdown", "AMC", "Billing"]),
+                "channel": rng.choice(["phone", "email", "whatsapp"]),
+                "priority": rng.choice(["Low", "Medium", "High"]),
+                "status": rng.choice(_TICKET_STATUSES),
+                "owner_user_id": owner_id,
+                "assignee_user_id": owner_id,
+                "created_at": created_at,
+                "updated_at": created_at,
+                "timeline": [],
+            }
+        )
+        tickets.append(ticket)
+    _commit_in_batches(tickets)
+    counts["tickets"] = len(tickets)
+
+    calls = [
+        SupportCallLog(
+            call_id=f"{prefix}-CALL{index:06d}",
+            ticket_id=rng.choice(tickets).ticket_id,
+            subject="Follow-up call",
+            category="Breakdown",
+            status=rng.choice(["Answered", "Missed"]),
+            channel="phone",
+            caller=f"9{rng.randint(100000000, 999999999)}",
+            handled_by=rng.choice(_TECHNICIANS),
+            duration_minutes=rng.randint(1, 20),
+            logged_at=now - datetime.timedelta(hours=rng.randint(1, 24 * 90)),
+        )
+        for index in range(volumes["call_logs"])
+    ]
+    _commit_in_batches(calls)
+    counts["call_logs"] = len(calls)
+
+    vendors = [Vendor(name=f"{prefix} Vendor {index}") for index in range(volumes["vendors"])]
+    _commit_in_batches(vendors)
+    products = [
+        Product(
+            name=f"{prefix} Part {index}",
+            uom="Nos",
+            primary_vendor=rng.choice(vendors).name,
+            qty_on_hand=rng.randint(0, 200),
+        )
+        for index in range(volumes["products"])
+    ]
+    _commit_in_batches(products)
+    counts["vendors"] = len(vendors)
+    counts["products"] = len(products)
+
+    projects = [Project(name=f"{prefix} Project {index}") for index in range(volumes["projects"])]
+    _commit_in_batches(projects)
+    boms = []
+    bom_items = []
+    for index in range(volumes["boms"]):
+        project = projects[index % len(projects)]
+        site = DrawingSite(client_name=f"{prefix} Site {index}", project_id=project.id)
+        bom = BillOfMaterials(bom_name=f"{prefix} BOM {index}", project_id=project.id, drawing_site=site)
+        db.session.add_all([site, bom])
+        for package_index in range(volumes["packages_per_bom"]):
+            package = BOMPackage(bom=bom, name=f"Lift {package_index + 1}")
+            db.session.add(package)
+            for line in range(volumes["items_per_package"]):
+                part = rng.choice(products)
+                item = BOMItem(
+                    bom=bom,
+                    bom_package=package,
+                    item_code=f"{prefix}-ITEM-{line}",
+                    description=part.name,
+                    quantity_required=rng.randint(1, 20),
+                    suggested_part_id=part.id,
+                )
+                db.session.add(item)
+                bom_items.append(item)
+        boms.append(bom)
+        if index % 20 == 19:
+            db.session.commit()
+    db.session.commit()
+    counts["boms"] = len(boms)
+    counts["bom_items"] = len(bom_items)
+
+    purchase_orders = []
+    for index in range(volumes["purchase_orders"]):
+        bom = rng.choice(boms)
+        po = PurchaseOrder(
+            po_number=f"{prefix}-PO{index:06d}",
+            project_id=bom.project_id,
+            vendor_id=rng.choice(vendors).id,
+            bom_id=bom.id,
+            status=rng.choice(_PO_STATUSES),
+            po_date=today - datetime.timedelta(days=rng.randint(0, 180)),
+            created_by_user_id=owner_id,
+        )
+        for _ in range(volumes["items_per_po"]):
+            part = rng.choice(products)
+            quantity = rng.randint(1, 50)
+            po.items.append(
+                PurchaseOrderItem(
+                    part_id=part.id,
+                    product_id=part.id,
+                    part_name=part.name,
+                    item_code=part.sku,
+                    quantity_ordered=quantity,
+                    unit_price=rng.randint(100, 5000),
+                    total_amount=quantity * 1000,
+                )
+            )
+        purchase_orders.append(po)
+    _commit_in_batches(purchase_orders)
+    counts["purchase_orders"] = len(purchase_orders)
+
+    receipts = []
+    for index in range(volumes["receipts"]):
+        po = rng.choice(purchase_orders)
+        receipt = InventoryReceipt(
+            purchase_order_id=po.id,
+            receipt_number=f"{prefix}-GRN{index:06d}",
+            received_date=today - datetime.timedelta(days=rng.randint(0, 90)),
+            received_by_user_id=owner_id,
+        )
+        for po_item in po.items:
+            receipt.items.append(
+                InventoryReceiptItem(
+                    purchase_order_item_id=po_item.id,
+                    item_code=po_item.item_code or po_item.part_name,
+                    description=po_item.part_name,
+                    quantity_received=max(1, int(po_item.quantity_ordered // 2)),
+                    qc_status="OK",
+                )
+            )
+        receipts.append(receipt)
+    _commit_in_batches(receipts)
+    counts["receipts"] = len(receipts)
+    return counts
+
+
+def purge_synthetic_data(prefix=SYNTHETIC_PREFIX):
+    """Delete every row created by ``seed_synthetic_data`` for ``prefix``."""
+
+    code_like = f"{prefix}-%"
+    name_like = f"{prefix} %"
+
+    def _ids(column, *criteria):
+        return [value for (value,) in db.session.query(column).filter(*criteria)]
+
+    def _delete(model, column, values):
+        for start in range(0, len(values), _BATCH_SIZE):
+            model.query.filter(column.in_(values[start:start + _BATCH_SIZE])).delete(
+                synchronize_session=False
+            )
+
+    receipt_ids = _ids(InventoryReceipt.id, InventoryReceipt.receipt_number.like(code_like))
+    _delete(InventoryReceiptItem, InventoryReceiptItem.inventory_receipt_id, receipt_ids)
+    _delete(InventoryReceipt, InventoryReceipt.id, receipt_ids)
+
+    po_ids = _ids(PurchaseOrder.id, PurchaseOrder.po_number.like(code_like))
+    _delete(PurchaseOrderItem, PurchaseOrderItem.purchase_order_id, po_ids)
+    _delete(PurchaseOrder, PurchaseOrder.id, po_ids)
+
+    bom_ids = _ids(BillOfMaterials.id, BillOfMaterials.bom_name.like(name_like))
+    _delete(BOMItem, BOMItem.bom_id, bom_ids)
+    _delete(BOMPackage, BOMPackage.bom_id, bom_ids)
+    _delete(BillOfMaterials, BillOfMaterials.id, bom_ids)
+    DrawingSite.query.filter(DrawingSite.client_name.like(name_like)).delete(synchronize_session=False)
+    Project.query.filter(Project.name.like(name_like)).delete(synchronize_session=False)
+
+    skus = [sku for sku in _ids(Product.sku, Product.name.like(name_like)) if sku]
+    item_ids = []
+    for start in range(0, len(skus), _BATCH_SIZE):
+        item_ids.extend(
+            _ids(InventoryItem.id, InventoryItem.item_code.in_(skus[start:start + _BATCH_SIZE]))
+        )
+    _delete(InventoryLedgerEntry, InventoryLedgerEntry.inventory_item_id, item_ids)
+    _delete(InventoryItem, InventoryItem.id, item_ids)
+    Product.query.filter(Product.name.like(name_like)).delete(synchronize_session=False)
+    Vendor.query.filter(Vendor.name.like(name_like)).delete(synchronize_session=False)
+
+    for ticket in SupportTicket.query.filter(SupportTicket.ticket_id.like(code_like)):
+        db.session.delete(ticket)
+    SupportCallLog.query.filter(SupportCallLog.call_id.like(code_like)).delete(synchronize_session=False)
+
+    SalesOpportunity.query.filter(SalesOpportunity.title.like(name_like)).delete(synchronize_session=False)
+    SalesClient.query.filter(SalesClient.display_name.like(name_like)).delete(synchronize_session=False)
+
+    ServiceTask.query.filter(ServiceTask.task_code.like(code_like)).delete(synchronize_session=False)
+    lift_ids = _ids(Lift.id, Lift.lift_code.like(code_like))
+    _delete(ServiceVisit, ServiceVisit.lift_id, lift_ids)
+    _delete(Lift, Lift.id, lift_ids)
+    Customer.query.filter(Customer.customer_code.like(code_like)).delete(synchronize_session=False)
+    db.session.commit()
+    db.session.expunge_all()
+
+
+def seed_procurement_project(bom_count, *, prefix=SYNTHETIC_PREFIX):
+    """Create a project with ``bom_count`` BOMs that exercise every linkage mode."""
+    project = Project(name=f"{prefix} Project")
+    vendors = [Vendor(name=f"{prefix} Vendor {index}") for index in range(3)]
+    primary_class_part = Product(name=f"{prefix} Rail", primary_vendor=vendors[1].name)
+    primary_class = PartClass(name=f"{prefix} Rails")
+    fallback_class = PartClass(name=f"{prefix} Brackets")
+    db.session.add_all([project, *vendors, primary_class_part, primary_class, fallback_class])
+    db.session.flush()
+    primary_class.primary_part_id = primary_class_part.id
+    suggested_part = Product(name=f"{prefix} Motor", primary_vendor=vendors[0].name)
+    fallback_parts = [
+        Product(name=f"{prefix} Bracket {index}", part_class_id=fallback_class.id, primary_vendor=vendors[2].name)
+        for index in range(2)
+    ]
+    orphan_part = Product(name=f"{prefix} Orphan")
+    db.session.add_all([suggested_part, *fallback_parts, orphan_part])
+    db.session.flush()
+
+    po_number = 0
+    boms = []
+    for index in range(bom_count):
+        # Odd BOMs only reach the project through their drawing site.
+        site = DrawingSite(client_name=f"{prefix} Site {index}", project_id=project.id)
+        bom = BillOfMaterials(
+            bom_name=f"{prefix} BOM {index}",
+            project_id=project.id if index % 2 == 0 else None,
+            drawing_site=site,
+        )
+        package = BOMPackage(bom=bom, name=f"Lift {index}")
+        items = [
+            BOMItem(bom=bom, bom_package=package, item_code="MOTOR", quantity_required=2, suggested_part_id=suggested_part.id),
+            BOMItem(bom=bom, bom_package=package, item_code="RAIL", quantity_required=10, part_class=primary_class),
+            BOMItem(bom=bom, bom_package=package, item_code="BRACKET", quantity_required=6, part_class=fallback_class),
+            BOMItem(bom=bom, bom_package=package, item_code="ORPHAN", quantity_required=1, suggested_part_id=orphan_part.id),
+            BOMItem(bom=bom, bom_package=package, item_code="LOOSE", quantity_required=3),
+        ]
+        db.session.add_all([site, bom, package, *items])
+        db.session.flush()
+        boms.append(bom)
+
+        po_number += 1
+        line_po = PurchaseOrder(po_number=f"{prefix}-{po_number}", project_id=project.id, vendor_id=vendors[0].id, status="Issued")
+        line_po.items.append(
+            PurchaseOrderItem(part_id=suggested_part.id, quantity_ordered=1 + index % 2, source_bom_line_id=items[0].id)
+        )
+        po_number += 1
+        bom_po = PurchaseOrder(po_number=f"{prefix}-{po_number}", project_id=project.id, vendor_id=vendors[1].id, bom_id=bom.id, status="Draft")
+        bom_po.items.append(PurchaseOrderItem(product_id=primary_class_part.id, quantity_ordered=4 + index))
+        db.session.add_all([line_po, bom_po])
+
+    po_number += 1
+    legacy_po = PurchaseOrder(po_number=f"{prefix}-{po_number}", project_id=project.id, vendor_id=vendors[2].id, status="Closed")
+    legacy_po.items.append(PurchaseOrderItem(part_id=fallback_parts[1].id, quantity_ordered=5))
+    db.session.add(legacy_po)
+    db.session.commit()
+    return project, boms
+
+
+def cleanup_procurement_project(prefix=SYNTHETIC_PREFIX):
+    """Delete the project, BOMs, POs, parts and vendors of ``seed_procurement_project``."""
+
+    projects = Project.query.filter(Project.name.like(f"{prefix} %")).all()
+    project_ids = [project.id for project in projects]
+    sites = DrawingSite.query.filter(DrawingSite.client_name.like(f"{prefix} %")).all()
+    site_ids = [site.id for site in sites]
+    pos = PurchaseOrder.query.filter(PurchaseOrder.po_number.like(f"{prefix}-%")).all()
+    po_ids = [po.id for po in pos]
+    if po_ids:
+        PurchaseOrderItem.query.filter(PurchaseOrderItem.purchase_order_id.in_(po_ids)).delete(synchronize_session=False)
+        PurchaseOrder.query.filter(PurchaseOrder.id.in_(po_ids)).delete(synchronize_session=False)
+    boms = BillOfMaterials.query.filter(BillOfMaterials.bom_name.like(f"{prefix} BOM %")).all()
+    bom_ids = [bom.id for bom in boms]
+    if bom_ids:
+        BOMItem.query.filter(BOMItem.bom_id.in_(bom_ids)).delete(synchronize_session=False)
+        BOMPackage.query.filter(BOMPackage.bom_id.in_(bom_ids)).delete(synchronize_session=False)
+        BillOfMaterials.query.filter(BillOfMaterials.id.in_(bom_ids)).delete(synchronize_session=False)
+    if site_ids:
+        DrawingSite.query.filter(DrawingSite.id.in_(site_ids)).delete(synchronize_session=False)
+    if project_ids:
+        Project.query.filter(Project.id.in_(project_ids)).delete(synchronize_session=False)
+    product_skus = [
+        sku for (sku,) in db.session.query(Product.sku).filter(Product.name.like(f"{prefix} %")) if sku
+    ]
+    if product_skus:
+        item_ids = [
+            item_id
+            for (item_id,) in db.session.query(InventoryItem.id).filter(InventoryItem.item_code.in_(product_skus))
+        ]
+        InventoryLedgerEntry.query.filter(InventoryLedgerEntry.inventory_item_id.in_(item_ids)).delete(
+            synchronize_session=False
+        )
+        InventoryItem.query.filter(InventoryItem.id.in_(item_ids)).delete(synchronize_session=False)
+    Product.query.filter(Product.name.like(f"{prefix} %")).delete(synchronize_session=False)
+    PartClass.query.filter(PartClass.name.like(f"{prefix} %")).delete(synchronize_session=False)
+    Vendor.query.filter(Vendor.name.like(f"{prefix} %")).delete(synchronize_session=False)
+    db.session.commit()
+    # The bulk deletes bypass the identity map; drop it so reused ids load fresh.
+    db.session.expunge_all()
@@ -0,0 +1,412 @@
+"""Row parsing for the customer and AMC lift uploads.
+
+Turning a sheet row into typed values (``stringify_cell``, date and time
+parsing, AMC status/duration normalisation, route and customer matching) is
+pure CPU work that does not touch the database. ``iter_parsed_rows`` runs it
+across a pool of worker processes started from a ``forkserver`` once an
+upload has more than ``UPLOAD_PARALLEL_MIN_ROWS`` rows; smaller uploads, or
+hosts without ``forkserver``, parse inline. The reference lookups a parser
+needs travel in its context object, which each worker receives once when it
+starts.
+
+The upload processors in ``eleva_app.uploads`` keep everything that depends
+on earlier rows or on the database (existing record lookups, duplicate
+checks, writes) in the request process, and raise a row's parse error at
+the same point of the row loop as before, so every row reports the same
+error however it was parsed.
+"""
+
+import itertools
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+# Workers come from a forkserver, never a plain fork of the (threaded) web or
+# job-worker process; see ``_worker_context``.
+UPLOAD_VALIDATION_WORKERS = min(4, os.cpu_count() or 1)
+UPLOAD_PARALLEL_MIN_ROWS = 5000
+UPLOAD_PARSE_CHUNK_SIZE = 1000
+
+
+class UploadRowError(ValueError):
+    """A row the upload reports and skips."""
+
+
+def _row_data(row_values, header_map):
+    return {
+        header: row_values[position] if position < len(row_values) else None
+        for header, position in header_map.items()
+    }
+
+
+@dataclass
+class CustomerRowContext:
+    header_map: Dict[str, int]
+    # Lower-cased route option -> (state, branch).
+    route_lookup: Dict[str, Tuple[str, Optional[str]]]
+
+
+_CUSTOMER_UPDATE_FIELDS = (
+    ("contact_person", "Contact Person"),
+    ("contact_designation", "Contact Designation"),
+    ("phone", "Phone"),
+    ("mobile", "Mobile"),
+    ("mobile2", "Mobile 2"),
+    ("email", "Email"),
+    ("gst_number", "GST Number"),
+    ("office_address_line1", "Office Address Line 1"),
+    ("office_address_line2", "Office Address Line 2"),
+    ("office_country", "Office Country"),
+    ("office_city", "Office City"),
+    ("office_state", "Office State"),
+    ("office_pincode", "Office Pincode"),
+)
+
+
+def parse_customer_row(row_values, context):
+    """Parse one customer upload row; None for a blank row.
+
+    A row error or unexpected exception is returned under ``"error"``.
+    """
+
+    from app import clean_str, stringify_cell
+
+    if not row_values:
+        return None
+    row_data = _row_data(row_values, context.header_map)
+    key_fields = [
+        row_data.get("External Customer ID"),
+        row_data.get("Customer Code"),
+        row_data.get("Company Name"),
+        row_data.get("Contact Person"),
+        row_data.get("Phone"),
+        row_data.get("Mobile"),
+        row_data.get("Email"),
+        row_data.get("GST Number"),
+    ]
+    if not any(clean_str(stringify_cell(value)) for value in key_fields):
+        return None
+
+    try:
+        def cell(label):
+            return clean_str(stringify_cell(row_data.get(label)))
+
+        route_value = cell("Route")
+        branch_value = cell("Branch")
+        route = None
+        if route_value:
+            route = context.route_lookup.get(route_value.lower())
+            if not route:
+                raise UploadRowError(
+                    f"Route '{route_value}' does not match an active service route."
+                )
+
+        updates = []
+        if route:
+            route_value = route[0]
+            updates.append(("route", route[0], "Route"))
+            if route[1]:
+                updates.append(("branch", route[1], "Branch"))
+        if branch_value and not route_value:
+            raise UploadRowError(
+                f"Branch '{branch_value}' cannot be set without selecting a route."
+            )
+        if not branch_value and route and route[1]:
+            branch_value = route[1]
+        for attr, label in _CUSTOMER_UPDATE_FIELDS:
+            updates.append((attr, cell(label), label))
+
+        return {
+            "external_id": cell("External Customer ID"),
+            "customer_code": cell("Customer Code"),
+            "company_name": cell("Company Name"),
+            "country": cell("Country"),
+            "route": route_value,
+            "branch": branch_value,
+            "updates": updates,
+        }
+    except Exception as exc:
+        return {"error": exc}
+
+
+@dataclass
+class LiftRowContext:
+    header_map: Dict[str, int]
+    # Lower-cased customer code / external ID / company name -> customer id.
+    customer_by_code: Dict[str, int]
+    customer_by_external: Dict[str, int]
+    customer_by_name: Dict[str, int]
+    # Lower-cased route option -> route state.
+    route_lookup: Dict[str, str]
+
+
+def parse_lift_row(row_values, context):
+    """Parse one AMC lift upload row; None for a blank row.
+
+    Customer and route errors come back under ``"error"``; errors in the
+    AMC, date and time columns, which the processor reports only after its
+    duplicate checks, come back under ``"late_error"``.
+    """
+
+    from app import (
+        calculate_amc_end_date,
+        clean_str,
+        normalize_amc_duration,
+        normalize_amc_status,
+        parse_excel_date,
+        parse_time_field,
+    )
+
+    if not row_values:
+        return None
+    row_data = _row_data(row_values, context.header_map)
+    key_fields = [
+        row_data.get("Customer External ID"),
+        row_data.get("Customer Code"),
+        row_data.get("Customer Name"),
+        row_data.get("External Lift ID"),
+        row_data.get("Lift Code"),
+        row_data.get("AMC Status"),
+    ]
+    if not any(clean_str(value) for value in key_fields):
+        return None
+
+    try:
+        customer_external_id_value = clean_str(row_data.get("Customer External ID"))
+        customer_code_value = clean_str(row_data.get("Customer Code"))
+        customer_name_value = clean_str(row_data.get("Customer Name"))
+        customer_external_id_key = (
+            customer_external_id_value.lower() if customer_external_id_value else None
+        )
+        customer_code_key = customer_code_value.lower() if customer_code_value else None
+        customer_name_key = customer_name_value.lower() if customer_name_value else None
+
+        customer_id = None
+        if customer_external_id_key and customer_external_id_key in context.customer_by_external:
+            customer_id = context.customer_by_external[customer_external_id_key]
+        if customer_code_key and customer_code_key in context.customer_by_code:
+            customer_id = context.customer_by_code[customer_code_key]
+        if (
+            customer_external_id_key
+            and customer_code_key
+            and customer_external_id_key in context.customer_by_external
+            and customer_code_key in context.customer_by_code
+            and context.customer_by_external[customer_external_id_key]
+            != context.customer_by_code[customer_code_key]
+        ):
+            raise ValueError(
+                f"Customer code '{customer_code_value}' does not match external ID '{customer_external_id_value}'."
+            )
+        if not customer_id and customer_name_key and customer_name_key in context.customer_by_name:
+            customer_id = context.customer_by_name[customer_name_key]
+        if not customer_id:
+            missing_reference = (
+                customer_external_id_value
+                or customer_code_value
+                or customer_name_value
+                or "—"
+            )
+            raise ValueError(
+                f"Customer '{missing_reference}' was not found. Upload customers first or use customer external ID."
+            )
+
+        route_value_raw = clean_str(row_data.get("Route"))
+        route_value = None
+        if route_value_raw:
+            route_value = context.route_lookup.get(route_value_raw.lower())
+            if not route_value:
+                raise ValueError(
+                    f"Route '{route_value_raw}' does not match an active service route."
+                )
+    except Exception as exc:
+        return {"error": exc}
+
+    parsed: Dict[str, Any] = {
+        "customer_id": customer_id,
+        "provided_code": clean_str(row_data.get("Lift Code")),
+        "provided_external": clean_str(row_data.get("External Lift ID")),
+    }
+    try:
+        amc_status_value, status_error = normalize_amc_status(
+            clean_str(row_data.get("AMC Status"))
+        )
+        if status_error:
+            raise ValueError(status_error)
+        if not amc_status_value:
+            raise ValueError("AMC status is required.")
+
+        duration_key, duration_error = normalize_amc_duration(
+            clean_str(row_data.get("AMC Duration"))
+        )
+        if duration_error:
+            raise ValueError(duration_error)
+        if not duration_key:
+            raise ValueError("AMC duration is required.")
+
+        amc_start = parse_excel_date(row_data.get("AMC Start (YYYY-MM-DD)"))
+        if not amc_start:
+            raise ValueError("AMC start date is required.")
+
+        amc_end = parse_excel_date(row_data.get("AMC End (YYYY-MM-DD)"))
+        if not amc_end:
+            amc_end = calculate_amc_end_date(amc_start, duration_key)
+
+        values: Dict[str, Any] = {}
+        preferred_days_source = row_data.get("Preferred Service Days")
+        if preferred_days_source is not None:
+            values["preferred_service_days"] = clean_str(preferred_days_source)
+
+        preferred_date_source = row_data.get("Preferred Service Date")
+        if preferred_date_source not in (None, ""):
+            preferred_date = parse_excel_date(preferred_date_source)
+            if not preferred_date:
+                raise ValueError("Preferred service date must be in a valid date format.")
+            values["preferred_service_date"] = preferred_date
+
+        preferred_time_source = row_data.get("Preferred Service Time")
+        if preferred_time_source not in (None, ""):
+            preferred_time, error = parse_time_field(
+                preferred_time_source,
+                "Preferred service time",
+            )
+            if error:
+                raise ValueError(error)
+            values["preferred_service_time"] = preferred_time
+
+        next_service_due_source = row_data.get("Next Service Due")
+        if next_service_due_source not in (None, ""):
+            next_service_due = parse_excel_date(next_service_due_source)
+            if next_service_due is None:
+                raise ValueError("Next service due must be in a valid date format.")
+            values["next_service_due"] = next_service_due
+    except Exception as exc:
+        parsed["late_error"] = exc
+        return parsed
+
+    try:
+        capacity_persons = int(row_data.get("Capacity (persons)") or 0) or None
+    except (TypeError, ValueError):
+        capacity_persons = None
+    try:
+        capacity_kg = int(row_data.get("Capacity (kg)") or 0) or None
+    except (TypeError, ValueError):
+        capacity_kg = None
+    try:
+        speed_mps = float(row_data.get("Speed (m/s)") or 0) or None
+    except (TypeError, ValueError):
+        speed_mps = None
+
+    if parsed["provided_external"]:
+        values["external_lift_id"] = parsed["provided_external"]
+    for attr, label in (
+        ("building_villa_number", "Building / Villa No."),
+        ("site_address_line1", "Site Address Line 1"),
+        ("site_address_line2", "Site Address Line 2"),
+        ("city", "City"),
+        ("state", "State"),
+        ("pincode", "Pincode"),
+        ("notes", "Notes"),
+    ):
+        value = clean_str(row_data.get(label))
+        if value is not None:
+            values[attr] = value
+    if route_value:
+        values["route"] = route_value
+    lift_type_value = clean_str(row_data.get("Lift Type"))
+    if lift_type_value:
+        values["lift_type"] = lift_type_value
+    if "Lift Brand" in context.header_map:
+        values["lift_brand"] = clean_str(row_data.get("Lift Brand"))
+    if capacity_persons is not None:
+        values["capacity_persons"] = capacity_persons
+    if capacity_kg is not None:
+        values["capacity_kg"] = capacity_kg
+    if speed_mps is not None:
+        values["speed_mps"] = speed_mps
+    values["amc_status"] = amc_status_value
+    values["amc_start"] = amc_start
+    values["amc_duration_key"] = duration_key
+    values["amc_end"] = amc_end
+    parsed["values"] = values
+    return parsed
+
+
+# -- process pool -----------------------------------------------------------
+
+_worker_state: Dict[str, Any] = {}
+
+
+def _init_worker(parse, context):
+    _worker_state["parse"] = parse
+    _worker_state["context"] = context
+
+
+def _parse_chunk(rows):
+    parse = _worker_state["parse"]
+    context = _worker_state["context"]
+    return [parse(row, context) for row in rows]
+
+
+def _worker_context():
+    # Never plain ``fork``: the web and ``flask worker`` processes already run
+    # threads (job worker loops, the recording download pool, dashboard
+    # loaders, the SSE broker), and a child forked from them can inherit a
+    # lock one of those threads held (logging, the SQLAlchemy pool) and hang.
+    # The forkserver is a fresh single-threaded process that forks the
+    # workers instead. It preloads ``app`` (whose helpers the parsers use;
+    # importing it starts no threads) once, so workers start quickly.
+    if "forkserver" not in multiprocessing.get_all_start_methods():
+        return None
+    context = multiprocessing.get_context("forkserver")
+    context.set_forkserver_preload([__name__, "app"])
+    return context
+
+
+def iter_parsed_rows(rows, parse, context, *, workers=None, min_rows=None, chunk_size=None):
+    """Yield ``parse(row, context)`` for every row, in order.
+
+    The first ``min_rows`` rows are buffered; when the upload is at least
+    that long and ``workers`` is above one, the rest of the rows are parsed
+    in ``chunk_size`` batches across that many forkserver processes, with at
+    most two batches per worker in flight. ``parse`` and ``context`` are
+    pickled to each worker, so ``parse`` must be a module-level function.
+    """
+
+    workers = UPLOAD_VALIDATION_WORKERS if workers is None else workers
+    min_rows = UPLOAD_PARALLEL_MIN_ROWS if min_rows is None else min_rows
+    chunk_size = max(1, UPLOAD_PARSE_CHUNK_SIZE if chunk_size is None else chunk_size)
+
+    rows = iter(rows)
+    head = list(itertools.islice(rows, max(1, min_rows)))
+    mp_context = _worker_context() if workers > 1 else None
+    if mp_context is None or len(head) < min_rows:
+        for row in itertools.chain(head, rows):
+            yield parse(row, context)
+        return
+
+    source = itertools.chain(head, rows)
+    pool = ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=mp_context,
+        initializer=_init_worker,
+        initargs=(parse, context),
+    )
+    pending = deque()
+
+    def _submit_next():
+        chunk = list(itertools.islice(source, chunk_size))
+        if chunk:
+            pending.append(pool.submit(_parse_chunk, chunk))
+
+    try:
+        for _ in range(workers * 2):
+            _submit_next()
+        while pending:
+            parsed_rows = pending.popleft().result()
+            _submit_next()
+            yield from parsed_rows
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
@@ -1,18 +1,33 @@
+import codecs
 import csv
+import io
+import json
 import os
+import shutil
+import tempfile
 import time
 import uuid
-from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
-from dataclasses import dataclass, field
-from io import StringIO
+from dataclasses import asdict, dataclass, field
+from datetime import date, datetime
+from datetime import time as dt_time
 from typing import Any, Dict, List, Optional
 
 from flask import current_app, session
-from flask_login import current_user
-from sqlalchemy import func
 
 from eleva_app import db
+from eleva_app.indexing import ci_key
 from eleva_app.models import Customer, Lift, ServiceRoute
+from eleva_app.refcache import reference_cache
+from eleva_app.upload_parsing import (
+    UPLOAD_PARALLEL_MIN_ROWS,
+    UPLOAD_VALIDATION_WORKERS,
+    CustomerRowContext,
+    LiftRowContext,
+    UploadRowError,
+    iter_parsed_rows,
+    parse_customer_row,
+    parse_lift_row,
+)
 
 
 def _get_timeout_env(name: str, default: int) -> int:
@@ -45,6 +60,8 @@ UPLOAD_STAGE_TIMEOUT_SECONDS = _get_timeout_env(
 UPLOAD_TOTAL_TIMEOUT_SECONDS = _get_timeout_env(
     "UPLOAD_TOTAL_TIMEOUT_SECONDS", default=180
 )
+UPLOAD_COMMIT_CHUNK_SIZE = 500
+UPLOAD_READ_CHUNK_SIZE = 64 * 1024
 
 
 class UploadStageTimeoutError(RuntimeError):
@@ -54,22 +71,17 @@ class UploadStageTimeoutError(RuntimeError):
         super().__init__(f"Timed out after {timeout} seconds while {stage}.")
         self.stage = stage
         self.timeout = timeout
-
-
-def _execute_with_timeout(func, *, stage: str, timeout: int = UPLOAD_STAGE_TIMEOUT_SECONDS):
-    """Execute ``func`` enforcing a timeout, raising ``UploadStageTimeoutError`` on delay."""
-
-    executor = ThreadPoolExecutor(max_workers=1)
-    future = executor.submit(func)
-    timed_out = False
-    try:
-        return future.result(timeout=timeout)
-    except FuturesTimeoutError as exc:
-        timed_out = True
-        future.cancel()
-        raise UploadStageTimeoutError(stage, timeout=timeout) from exc
-    finally:
-        executor.shutdown(wait=not timed_out, cancel_futures=True)
+        # Data rows already committed by a chunked upload when the timeout hit.
+        self.committed_rows = 0
+
+    @property
+    def partial_upload_message(self) -> Optional[str]:
+        if not self.committed_rows:
+            return None
+        return (
+            f"Rows 2 to {self.committed_rows + 1} of the sheet were saved before the upload stopped. "
+            "Remove them from the file before uploading the remaining rows."
+        )
 
 
 def _stage_start() -> float:
@@ -81,70 +93,175 @@ def _check_stage_timeout(start_time: float, stage: str, *, timeout: int = UPLOAD
         raise UploadStageTimeoutError(stage, timeout=timeout)
 
 
+def _detect_csv_encoding(handle) -> str:
+    """Return ``"utf-8-sig"`` if the whole binary ``handle`` decodes as UTF-8, else ``"latin-1"``.
+
+    The file is scanned chunk by chunk with an incremental decoder and the
+    handle is rewound afterwards.
+    """
+
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    handle.seek(0)
+    try:
+        while True:
+            chunk = handle.read(UPLOAD_READ_CHUNK_SIZE)
+            if not chunk:
+                decoder.decode(b"", final=True)
+                return "utf-8-sig"
+            decoder.decode(chunk)
+    except UnicodeDecodeError:
+        return "latin-1"
+    finally:
+        handle.seek(0)
+
+
+def _iter_csv_rows(handle, sheet_name=None):
+    encoding = _detect_csv_encoding(handle)
+    text = io.TextIOWrapper(handle, encoding=encoding, newline="")
+    try:
+        yield from csv.reader(text)
+    finally:
+        # Leave the caller's binary handle open.
+        text.detach()
+
+
+def _iter_xlsx_rows(source, sheet_name):
+    from app import _ensure_openpyxl, load_workbook
+
+    _ensure_openpyxl()
+    workbook = load_workbook(source, read_only=True, data_only=True)
+    try:
+        worksheet = (
+            workbook[sheet_name]
+            if sheet_name and sheet_name in workbook.sheetnames
+            else workbook.active
+        )
+        yield from worksheet.iter_rows(values_only=True)
+    finally:
+        workbook.close()
+
+
+def iter_tabular_rows(source, *, filename, sheet_name=None):
+    """Yield the rows of an ``.xlsx`` or ``.csv`` upload one at a time, header row first.
+
+    ``source`` is a file path or a seekable binary stream. Workbooks are opened
+    in openpyxl's read-only mode and CSV files are decoded incrementally, so
+    memory use does not depend on the number of rows. Raises ``ValueError``
+    for other file types.
+    """
+
+    filename = (filename or "").lower()
+    if filename.endswith(".xlsx"):
+        reader = _iter_xlsx_rows
+    elif filename.endswith(".csv"):
+        reader = _iter_csv_rows
+    else:
+        raise ValueError("Unsupported file type")
+
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as handle:
+            yield from reader(handle, sheet_name)
+    else:
+        source.seek(0)
+        yield from reader(source, sheet_name)
+
+
+def open_tabular_rows(source, *, filename, sheet_name=None):
+    """Return ``(header, rows)`` where ``rows`` lazily yields the data rows of the upload."""
+
+    filename = (filename or "").lower()
+    if not filename.endswith((".xlsx", ".csv")):
+        raise ValueError("Unsupported file type")
+    rows = iter_tabular_rows(source, filename=filename, sheet_name=sheet_name)
+    header = next(rows, None)
+    return list(header or []), rows
+
+
+def _read_tabular_rows(source, *, filename, sheet_name=None, stage):
+    timer = _stage_start()
+    header, rows = open_tabular_rows(source, filename=filename, sheet_name=sheet_name)
+    data_rows = []
+    for row in rows:
+        data_rows.append(row)
+        if len(data_rows) % 1000 == 0:
+            _check_stage_timeout(timer, stage)
+    _check_stage_timeout(timer, stage)
+    return header, data_rows
+
+
 def _extract_tabular_upload(upload, *, sheet_name=None):
-    from app import _ensure_openpyxl, _validate_upload_stream, load_workbook
+    from app import _validate_upload_stream
 
     _validate_upload_stream(
         upload,
         allowed_extensions={".xlsx", ".csv"},
         allow_office_processing=True,
     )
-    filename = (upload.filename or "").lower()
-    if filename.endswith(".xlsx"):
-        _ensure_openpyxl()
-        upload.stream.seek(0)
-        workbook = _execute_with_timeout(
-            lambda: load_workbook(upload, data_only=True),
-            stage="reading the uploaded Excel workbook",
+    try:
+        return _read_tabular_rows(
+            upload.stream,
+            filename=upload.filename,
+            sheet_name=sheet_name,
+            stage="reading the uploaded file",
         )
+    finally:
+        upload.stream.seek(0)
+
+
+class _ChunkedCommitter:
+    """Commit an upload's changes every ``UPLOAD_COMMIT_CHUNK_SIZE`` rows.
+
+    The intermediate commits do not expire loaded objects, so the lookup maps
+    an upload builds before its row loop stay usable without a reload query
+    per object. Disabled (a no-op) for previews. ``before_commit`` runs
+    ahead of each chunk's commit. Timeouts checked through ``check_timeout``
+    record how many rows were already committed on the raised error.
+    """
+
+    def __init__(self, *, enabled=True, chunk_size=None, before_commit=None):
+        self.enabled = enabled
+        self.before_commit = before_commit
+        if chunk_size is None:
+            chunk_size = current_app.config.get("UPLOAD_COMMIT_CHUNK_SIZE", UPLOAD_COMMIT_CHUNK_SIZE)
+        self.chunk_size = max(1, int(chunk_size))
+        self.pending_rows = 0
+        self.committed_rows = 0
+
+    def row_done(self):
+        if not self.enabled:
+            return
+        self.pending_rows += 1
+        if self.pending_rows >= self.chunk_size:
+            self.commit()
+
+    def commit(self):
+        if not self.enabled or not self.pending_rows:
+            return
+        if self.before_commit is not None:
+            self.before_commit()
+        session = db.session()
+        expire_on_commit = session.expire_on_commit
+        session.expire_on_commit = False
         try:
-            worksheet = (
-                workbook[sheet_name]
-                if sheet_name and sheet_name in workbook.sheetnames
-                else workbook.active
-            )
-            header = _execute_with_timeout(
-                lambda: next(
-                    worksheet.iter_rows(min_row=1, max_row=1, values_only=True),
-                    [],
-                ),
-                stage="reading header row from the uploaded workbook",
-            )
-            data_rows = _execute_with_timeout(
-                lambda: list(worksheet.iter_rows(min_row=2, values_only=True)),
-                stage="reading data rows from the uploaded workbook",
-            )
+            session.commit()
         finally:
-            workbook.close()
-
-        return header, data_rows
+            session.expire_on_commit = expire_on_commit
+        self.committed_rows += self.pending_rows
+        self.pending_rows = 0
 
-    if filename.endswith(".csv"):
-        upload.stream.seek(0)
-        raw_bytes = _execute_with_timeout(
-            upload.read,
-            stage="reading the uploaded CSV file",
-        )
-        upload.stream.seek(0)
-        def _decode_csv_bytes():
-            try:
-                return raw_bytes.decode("utf-8-sig")
-            except UnicodeDecodeError:
-                return raw_bytes.decode("latin-1")
+    def check_timeout(self, start_time, stage, **kwargs):
+        try:
+            _check_stage_timeout(start_time, stage, **kwargs)
+        except UploadStageTimeoutError as exc:
+            exc.committed_rows = self.committed_rows
+            raise
 
-        text = _execute_with_timeout(
-            _decode_csv_bytes,
-            stage="decoding the uploaded CSV file",
-        )
-        rows = _execute_with_timeout(
-            lambda: list(csv.reader(StringIO(text))),
-            stage="parsing the uploaded CSV file",
-        )
-        header = rows[0] if rows else []
-        data_rows = rows[1:] if len(rows) > 1 else []
-        return header, data_rows
 
-    raise ValueError("Unsupported file type")
+def _parallel_parse_options():
+    return {
+        "workers": current_app.config.get("UPLOAD_VALIDATION_WORKERS", UPLOAD_VALIDATION_WORKERS),
+        "min_rows": current_app.config.get("UPLOAD_PARALLEL_MIN_ROWS", UPLOAD_PARALLEL_MIN_ROWS),
+    }
 
 
 PENDING_UPLOAD_SUBDIR = "pending"
@@ -200,6 +317,7 @@ def _clear_pending_upload(pending_token, *, remove_file=False):
     pending = pending_uploads.pop(pending_token, None)
     session["pending_uploads"] = pending_uploads
     session.modified = True
+    discard_upload_plan(pending_token)
     if remove_file:
         pending_data = pending or {}
         file_path = pending_data.get("path")
@@ -249,65 +367,207 @@ def cleanup_old_pending_uploads(max_age_hours: int = 24) -> int:
 
 
 def _extract_tabular_upload_from_path(file_path, *, sheet_name=None):
-    from app import _ensure_openpyxl, load_workbook
+    return _read_tabular_rows(
+        file_path,
+        filename=file_path,
+        sheet_name=sheet_name,
+        stage="reading the staged upload file",
+    )
 
-    filename = file_path.lower()
-    if filename.endswith(".xlsx"):
-        _ensure_openpyxl()
-        workbook = _execute_with_timeout(
-            lambda: load_workbook(file_path, data_only=True),
-            stage="reading the staged Excel workbook",
-        )
+
+# Tables whose rows an upload plan was validated against; a write to any of
+# them between the dry run and the apply makes the stored plan stale.
+UPLOAD_PLAN_TABLES = ("customer", "lift", "service_route")
+
+
+def _plan_json_default(value):
+    if isinstance(value, datetime):
+        return {"__datetime__": value.isoformat()}
+    if isinstance(value, date):
+        return {"__date__": value.isoformat()}
+    if isinstance(value, dt_time):
+        return {"__time__": value.isoformat()}
+    raise TypeError(f"Cannot store {type(value).__name__} in an upload plan")
+
+
+def _plan_object_hook(obj):
+    if len(obj) == 1:
+        if "__datetime__" in obj:
+            return datetime.fromisoformat(obj["__datetime__"])
+        if "__date__" in obj:
+            return date.fromisoformat(obj["__date__"])
+        if "__time__" in obj:
+            return dt_time.fromisoformat(obj["__time__"])
+    return obj
+
+
+def _upload_plan_path(pending_token):
+    upload_root = current_app.config["UPLOAD_FOLDER"]
+    return os.path.join(upload_root, PENDING_UPLOAD_SUBDIR, f"plan-{pending_token}.jsonl")
+
+
+def _upload_plan_versions():
+    versions = reference_cache.current_versions()
+    if versions is None:
+        return None
+    return {table: versions.get(table, 0) for table in UPLOAD_PLAN_TABLES}
+
+
+def _upload_source_signature(source_path):
+    try:
+        stat = os.stat(source_path)
+    except OSError:
+        return None
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+class UploadPlan:
+    """Create/update operations recorded by an upload's dry run.
+
+    Pass one to ``process_customer_upload_file``/``process_lift_upload_file``
+    as ``plan=`` during the preview and ``save`` it next to the pending file.
+    Merging the upload then replays the operations with
+    ``apply_upload_plan`` instead of parsing and validating the file again.
+    Operations are spooled to a temp file, one JSON line each, so large
+    uploads do not hold the plan in memory.
+    """
+
+    def __init__(self, kind):
+        self.kind = kind
+        self.versions = _upload_plan_versions()
+        self.cacheable = self.versions is not None
+        self._ops = tempfile.TemporaryFile("w+", encoding="utf-8")
+
+    def add(self, op):
+        if op["action"] == "update" and op.get("id") is None:
+            # The target only exists in this session; it cannot be replayed.
+            self.cacheable = False
+            return
+        if not op["values"]:
+            return
+        self._ops.write(json.dumps(op, default=_plan_json_default))
+        self._ops.write("\n")
+
+    def save(self, pending_token, outcome, source_path):
+        """Store the plan for ``pending_token``; returns False when it cannot be reused."""
+
+        signature = _upload_source_signature(source_path)
+        if not self.cacheable or signature is None:
+            self.close()
+            discard_upload_plan(pending_token)
+            return False
+        meta = {
+            "kind": self.kind,
+            "versions": self.versions,
+            "source": signature,
+            "outcome": asdict(outcome),
+        }
+        plan_path = _upload_plan_path(pending_token)
+        temp_path = f"{plan_path}.part"
         try:
-            worksheet = (
-                workbook[sheet_name]
-                if sheet_name and sheet_name in workbook.sheetnames
-                else workbook.active
-            )
-            header = _execute_with_timeout(
-                lambda: next(
-                    worksheet.iter_rows(min_row=1, max_row=1, values_only=True),
-                    [],
-                ),
-                stage="reading header row from the staged workbook",
-            )
-            data_rows = _execute_with_timeout(
-                lambda: list(worksheet.iter_rows(min_row=2, values_only=True)),
-                stage="reading data rows from the staged workbook",
-            )
+            os.makedirs(os.path.dirname(plan_path), exist_ok=True)
+            with open(temp_path, "w", encoding="utf-8") as handle:
+                handle.write(json.dumps(meta, default=_plan_json_default))
+                handle.write("\n")
+                self._ops.seek(0)
+                shutil.copyfileobj(self._ops, handle)
+            os.replace(temp_path, plan_path)
+        except OSError:
+            current_app.logger.warning("Could not store the upload plan for %s", pending_token, exc_info=True)
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            return False
         finally:
-            workbook.close()
-        return header, data_rows
+            self.close()
+        return True
 
-    if filename.endswith(".csv"):
-        def _read_csv_file():
-            with open(file_path, "rb") as fh:
-                return fh.read()
+    def close(self):
+        self._ops.close()
 
-        raw_bytes = _execute_with_timeout(
-            _read_csv_file,
-            stage="reading the staged CSV file",
-        )
 
-        def _decode_bytes():
-            try:
-                return raw_bytes.decode("utf-8-sig")
-            except UnicodeDecodeError:
-                return raw_bytes.decode("latin-1")
+def _read_upload_plan_meta(pending_token, kind, source_path):
+    if not pending_token:
+        return None
+    plan_path = _upload_plan_path(pending_token)
+    try:
+        with open(plan_path, encoding="utf-8") as handle:
+            meta = json.loads(handle.readline(), object_hook=_plan_object_hook)
+    except (OSError, ValueError):
+        return None
+    if (
+        meta.get("kind") != kind
+        or meta.get("source") != _upload_source_signature(source_path)
+        or meta.get("versions") != _upload_plan_versions()
+    ):
+        return None
+    return meta
 
-        text = _execute_with_timeout(
-            _decode_bytes,
-            stage="decoding the staged CSV file",
-        )
-        rows = _execute_with_timeout(
-            lambda: list(csv.reader(StringIO(text))),
-            stage="parsing the staged CSV file",
-        )
-        header = rows[0] if rows else []
-        data_rows = rows[1:] if len(rows) > 1 else []
-        return header, data_rows
 
-    raise ValueError("Unsupported file type")
+def load_upload_plan(pending_token, kind, source_path):
+    """Return the stored dry-run ``UploadOutcome``, or None when there is no current plan."""
+
+    meta = _read_upload_plan_meta(pending_token, kind, source_path)
+    if meta is None:
+        return None
+    return UploadOutcome(**meta["outcome"])
+
+
+def _apply_plan_batch(kind, ops, *, user_id, committer):
+    model = Customer if kind == "customer" else Lift
+    ids = [op["id"] for op in ops if op["action"] == "update"]
+    targets = {}
+    if ids:
+        targets = {item.id: item for item in model.query.filter(model.id.in_(ids))}
+    for op in ops:
+        if op["action"] == "update":
+            target = targets.get(op["id"])
+            if target is None:
+                continue
+        else:
+            target = model()
+            db.session.add(target)
+        if kind == "customer":
+            for attr, value in op["values"].items():
+                setattr(target, attr, value)
+        else:
+            _apply_lift_values(target, op["values"], user_id=user_id)
+        committer.row_done()
+
+
+def apply_upload_plan(pending_token, kind, source_path, *, user_id=None):
+    """Execute the plan stored by the dry run and return its ``UploadOutcome``.
+
+    Returns None without writing anything when the plan is missing or stale
+    (the file or the customer, lift or route tables changed since the dry
+    run); the caller then processes the file with ``apply_changes=True``.
+    """
+
+    meta = _read_upload_plan_meta(pending_token, kind, source_path)
+    if meta is None:
+        return None
+    committer = _ChunkedCommitter()
+    with open(_upload_plan_path(pending_token), encoding="utf-8") as handle:
+        handle.readline()
+        batch = []
+        for line in handle:
+            batch.append(json.loads(line, object_hook=_plan_object_hook))
+            if len(batch) >= committer.chunk_size:
+                _apply_plan_batch(kind, batch, user_id=user_id, committer=committer)
+                batch = []
+        if batch:
+            _apply_plan_batch(kind, batch, user_id=user_id, committer=committer)
+    db.session.commit()
+    discard_upload_plan(pending_token)
+    return UploadOutcome(**meta["outcome"])
+
+
+def discard_upload_plan(pending_token):
+    if not pending_token:
+        return
+    try:
+        os.remove(_upload_plan_path(pending_token))
+    except OSError:
+        pass
 
 
 def _customer_identifier(customer, *, fallback):
@@ -316,7 +576,7 @@ def _customer_identifier(customer, *, fallback):
     return fallback
 
 
-def process_customer_upload_file(file_path, *, apply_changes):
+def process_customer_upload_file(file_path, *, apply_changes, plan=None):
     from app import (
         clean_str,
         format_file_size,
@@ -330,8 +590,8 @@ def process_customer_upload_file(file_path, *, apply_changes):
     from app import CUSTOMER_UPLOAD_TEMPLATE_SHEET_NAME
 
     upload_timer = _stage_start()
-    header_cells, data_rows = _extract_tabular_upload_from_path(
-        file_path, sheet_name=CUSTOMER_UPLOAD_TEMPLATE_SHEET_NAME
+    header_cells, data_rows = open_tabular_rows(
+        file_path, filename=file_path, sheet_name=CUSTOMER_UPLOAD_TEMPLATE_SHEET_NAME
     )
     header_timer = _stage_start()
     header_cells = header_cells or []
@@ -388,91 +648,43 @@ def process_customer_upload_file(file_path, *, apply_changes):
     processed_codes: Dict[str, str] = {}
     processed_external_ids: Dict[str, str] = {}
     generated_codes: set[str] = set()
+    committer = _ChunkedCommitter(enabled=apply_changes)
+
+    parse_context = CustomerRowContext(
+        header_map=header_map,
+        route_lookup={key: (route.state, route.branch) for key, route in route_lookup.items()},
+    )
+    parsed_rows = iter_parsed_rows(
+        data_rows, parse_customer_row, parse_context, **_parallel_parse_options()
+    )
 
-    for row_index, row_values in enumerate(data_rows, start=2):
-        _check_stage_timeout(
+    for row_index, parsed in enumerate(parsed_rows, start=2):
+        committer.check_timeout(
             upload_timer,
             "processing the customer upload",
             timeout=UPLOAD_TOTAL_TIMEOUT_SECONDS,
         )
         row_stage = _stage_start()
         row_stage_label = f"processing row {row_index}"
+        row_op = None
         try:
-            if not row_values:
-                continue
-            row_data: Dict[str, Any] = {}
-            for header, position in header_map.items():
-                value = row_values[position] if position < len(row_values) else None
-                row_data[header] = value
-
-            key_fields = [
-                row_data.get("External Customer ID"),
-                row_data.get("Customer Code"),
-                row_data.get("Company Name"),
-                row_data.get("Contact Person"),
-                row_data.get("Phone"),
-                row_data.get("Mobile"),
-                row_data.get("Email"),
-                row_data.get("GST Number"),
-            ]
-            if not any(clean_str(stringify_cell(value)) for value in key_fields):
+            if parsed is None:
                 continue
 
             outcome.processed_rows += 1
-
-            external_id_value = clean_str(stringify_cell(row_data.get("External Customer ID")))
-            customer_code_value = clean_str(stringify_cell(row_data.get("Customer Code")))
-            company_name_value = clean_str(stringify_cell(row_data.get("Company Name")))
-            contact_person_value = clean_str(stringify_cell(row_data.get("Contact Person")))
-            phone_value = clean_str(stringify_cell(row_data.get("Phone")))
-            mobile_value = clean_str(stringify_cell(row_data.get("Mobile")))
-            email_value = clean_str(stringify_cell(row_data.get("Email")))
-            gst_value = clean_str(stringify_cell(row_data.get("GST Number")))
-            office_address_line1_value = clean_str(
-                stringify_cell(row_data.get("Office Address Line 1"))
-            )
-            office_address_line2_value = clean_str(
-                stringify_cell(row_data.get("Office Address Line 2"))
-            )
-            office_country_value = clean_str(stringify_cell(row_data.get("Office Country")))
-            office_city_value = clean_str(stringify_cell(row_data.get("Office City")))
-            office_state_value = clean_str(stringify_cell(row_data.get("Office State")))
-            office_pincode_value = clean_str(stringify_cell(row_data.get("Office Pincode")))
-            route_value = clean_str(stringify_cell(row_data.get("Route")))
-            branch_value = clean_str(stringify_cell(row_data.get("Branch")))
-            contact_designation_value = clean_str(
-                stringify_cell(row_data.get("Contact Designation"))
-            )
-            mobile2_value = clean_str(stringify_cell(row_data.get("Mobile 2")))
-            account_status_value = clean_str(stringify_cell(row_data.get("Account Status")))
-            address_line1_value = clean_str(stringify_cell(row_data.get("Address Line 1")))
-            address_line2_value = clean_str(stringify_cell(row_data.get("Address Line 2")))
-            city_value = clean_str(stringify_cell(row_data.get("City")))
-            state_value = clean_str(stringify_cell(row_data.get("State")))
-            pincode_value = clean_str(stringify_cell(row_data.get("Pincode")))
-            country_value = clean_str(stringify_cell(row_data.get("Country")))
-            service_type_value = clean_str(stringify_cell(row_data.get("Service Type")))
-            service_mode_value = clean_str(stringify_cell(row_data.get("Service Mode")))
-            billing_frequency_value = clean_str(stringify_cell(row_data.get("Billing Frequency")))
-            contract_value_value = clean_str(stringify_cell(row_data.get("Contract Value")))
-            contract_currency_value = clean_str(stringify_cell(row_data.get("Contract Currency")))
-            amc_start_value = stringify_cell(row_data.get("AMC Start (YYYY-MM-DD)"))
-            amc_end_value = stringify_cell(row_data.get("AMC End (YYYY-MM-DD)"))
-            amc_months_value = stringify_cell(row_data.get("AMC Months"))
-            first_due_value = stringify_cell(row_data.get("First Due Date"))
-            second_due_value = stringify_cell(row_data.get("Second Due Date"))
-            pending_amount_value = stringify_cell(row_data.get("Pending Amount"))
-            notes_value = clean_str(stringify_cell(row_data.get("Notes")))
-
-            route = None
-            if route_value:
-                lookup_key = route_value.lower()
-                route = route_lookup.get(lookup_key)
-                if not route:
-                    outcome.row_errors.append(
-                        f"Row {row_index}: Route '{route_value}' does not match an active service route."
-                    )
+            if "error" in parsed:
+                if isinstance(parsed["error"], UploadRowError):
+                    outcome.row_errors.append(f"Row {row_index}: {parsed['error']}")
                     continue
+                raise parsed["error"]
+
+            external_id_value = parsed["external_id"]
+            customer_code_value = parsed["customer_code"]
+            company_name_value = parsed["company_name"]
+            country_value = parsed["country"]
+            route_value = parsed["route"]
+            branch_value = parsed["branch"]
+            updates = parsed["updates"]
 
             existing_customer = None
             if customer_code_value:
@@ -481,7 +693,9 @@ def process_customer_upload_file(file_path, *, apply_changes):
                     existing_customer = existing_by_code[lookup_code]
                 else:
                     existing_customer = (
-                        Customer.query.filter(func.lower(Customer.customer_code) == lookup_code).first()
+                        Customer.query.autoflush(False)
+                        .filter(ci_key(Customer.customer_code) == lookup_code)
+                        .first()
                     )
                     existing_by_code[lookup_code] = existing_customer
             if not existing_customer and external_id_value:
@@ -490,37 +704,12 @@ def process_customer_upload_file(file_path, *, apply_changes):
                     existing_customer = existing_by_external[lookup_external]
                 else:
                     existing_customer = (
-                        Customer.query.filter(func.lower(Customer.external_customer_id) == lookup_external).first()
+                        Customer.query.autoflush(False)
+                        .filter(ci_key(Customer.external_customer_id) == lookup_external)
+                        .first()
                     )
                     existing_by_external[lookup_external] = existing_customer
 
-            updates = []
-            if route:
-                route_value = route.state
-                updates.append(("route", route.state, "Route"))
-                if route.branch:
-                    updates.append(("branch", route.branch, "Branch"))
-            if branch_value and not route_value:
-                outcome.row_errors.append(
-                    f"Row {row_index}: Branch '{branch_value}' cannot be set without selecting a route."
-                )
-                continue
-            if not branch_value and route and route.branch:
-                branch_value = route.branch
-            updates.append(("contact_person", contact_person_value, "Contact Person"))
-            updates.append(("contact_designation", contact_designation_value, "Contact Designation"))
-            updates.append(("phone", phone_value, "Phone"))
-            updates.append(("mobile", mobile_value, "Mobile"))
-            updates.append(("mobile2", mobile2_value, "Mobile 2"))
-            updates.append(("email", email_value, "Email"))
-            updates.append(("gst_number", gst_value, "GST Number"))
-            updates.append(("office_address_line1", office_address_line1_value, "Office Address Line 1"))
-            updates.append(("office_address_line2", office_address_line2_value, "Office Address Line 2"))
-            updates.append(("office_country", office_country_value, "Office Country"))
-            updates.append(("office_city", office_city_value, "Office City"))
-            updates.append(("office_state", office_state_value, "Office State"))
-            updates.append(("office_pincode", office_pincode_value, "Office Pincode"))
-
             if existing_customer:
                 customer = existing_customer
                 if not customer.customer_code:
@@ -540,6 +729,7 @@ def process_customer_upload_file(file_path, *, apply_changes):
                 outcome.updated_count += 1
 
                 changes = []
+                values: Dict[str, Any] = {}
                 for attr, value, label in updates:
                     if value is None:
                         continue
@@ -550,14 +740,16 @@ def process_customer_upload_file(file_path, *, apply_changes):
                             "from": current,
                             "to": value,
                         })
-                        if apply_changes:
-                            setattr(customer, attr, value)
+                        values[attr] = value
+                if country_value is None and not customer.country:
+                    values["country"] = "India"
+                if values.get("office_country", customer.office_country) is None:
+                    values["office_country"] = "India"
 
                 if apply_changes:
-                    if country_value is None and not customer.country:
-                        customer.country = "India"
-                    if customer.office_country is None:
-                        customer.office_country = "India"
+                    for attr, value in values.items():
+                        setattr(customer, attr, value)
+                row_op = {"action": "update", "id": customer.id, "values": values}
 
                 if changes and len(outcome.updated_items) < 20:
                     outcome.updated_items.append(
@@ -577,7 +769,7 @@ def process_customer_upload_file(file_path, *, apply_changes):
 
                 if customer_code_value:
                     normalized_code = customer_code_value.lower()
-                    if normalized_code in existing_by_code:
+                    if existing_by_code.get(normalized_code) is not None:
                         outcome.row_errors.append(
                             f"Row {row_index}: Customer code '{customer_code_value}' already exists."
                         )
@@ -601,19 +793,13 @@ def process_customer_upload_file(file_path, *, apply_changes):
                 identifier = f"new:{customer_code.lower()}"
                 processed_codes[customer_code.lower()] = identifier
 
+                customer = Customer(
+                    customer_code=customer_code,
+                    company_name=company_name_value,
+                )
                 if apply_changes:
-                    customer = Customer(
-                        customer_code=customer_code,
-                        company_name=company_name_value,
-                    )
                     db.session.add(customer)
-                    existing_by_code[customer_code.lower()] = customer
-                else:
-                    customer = Customer(
-                        customer_code=customer_code,
-                        company_name=company_name_value,
-                    )
-                    existing_by_code[customer_code.lower()] = customer
+                existing_by_code[customer_code.lower()] = customer
 
                 outcome.created_count += 1
                 if len(outcome.created_items) < 20:
@@ -626,14 +812,21 @@ def process_customer_upload_file(file_path, *, apply_changes):
                         }
                     )
 
+                values = {attr: value for attr, value, _ in updates if value is not None}
+                values["country"] = "India"
+                if not values.get("office_country"):
+                    values["office_country"] = "India"
                 if apply_changes:
-                    for attr, value, _ in updates:
-                        if value is not None:
-                            setattr(customer, attr, value)
-                    if not customer.country:
-                        customer.country = "India"
-                    if not customer.office_country:
-                        customer.office_country = "India"
+                    for attr, value in values.items():
+                        setattr(customer, attr, value)
+                row_op = {
+                    "action": "create",
+                    "values": {
+                        "customer_code": customer_code,
+                        "company_name": company_name_value,
+                        **values,
+                    },
+                }
 
             target_identifier = None
             if existing_customer:
@@ -666,6 +859,8 @@ def process_customer_upload_file(file_path, *, apply_changes):
                     )
                     continue
                 processed_external_ids[normalized_external] = target_identifier or conflict_identifier or identifier or normalized_external
+                if row_op is not None:
+                    row_op["values"]["external_customer_id"] = external_id_value
                 if apply_changes and isinstance(customer_ref, Customer):
                     customer_ref.external_customer_id = external_id_value
                     existing_by_external[normalized_external] = customer_ref
@@ -675,14 +870,18 @@ def process_customer_upload_file(file_path, *, apply_changes):
                 processed_external_ids[customer_ref.external_customer_id.lower()] = target_identifier or identifier or f"existing:{id(customer_ref)}"
 
         finally:
-            _check_stage_timeout(row_stage, row_stage_label)
-            _check_stage_timeout(
+            # Changes made before a late row error stay applied, so they are planned too.
+            if plan is not None and row_op is not None:
+                plan.add(row_op)
+            committer.check_timeout(row_stage, row_stage_label)
+            committer.check_timeout(
                 upload_timer,
                 "processing the customer upload",
                 timeout=UPLOAD_TOTAL_TIMEOUT_SECONDS,
             )
+            committer.row_done()
     if apply_changes and (outcome.created_count or outcome.updated_count):
-        _check_stage_timeout(
+        committer.check_timeout(
             upload_timer,
             "saving customer upload changes",
             timeout=UPLOAD_TOTAL_TIMEOUT_SECONDS,
@@ -701,23 +900,22 @@ def _normalize_lookup_key(value):
     return None
 
 
-def process_lift_upload_file(file_path, *, apply_changes):
-    from app import (
-        calculate_amc_end_date,
-        clean_str,
-        normalize_amc_duration,
-        normalize_amc_status,
-        parse_excel_date,
-        parse_time_field,
-        stringify_cell,
-    )
+def _apply_lift_values(lift, values, *, user_id):
+    for attr, value in values.items():
+        setattr(lift, attr, value)
+    lift.last_updated_by = user_id
+    lift.set_capacity_display()
+
+
+def process_lift_upload_file(file_path, *, apply_changes, plan=None, user_id=None):
+    from app import clean_str, stringify_cell
 
     from app import AMC_LIFT_TEMPLATE_SHEET_NAME
 
     row_errors: List[str] = []
     upload_timer = _stage_start()
-    header_cells, data_rows = _extract_tabular_upload_from_path(
-        file_path, sheet_name=AMC_LIFT_TEMPLATE_SHEET_NAME
+    header_cells, data_rows = open_tabular_rows(
+        file_path, filename=file_path, sheet_name=AMC_LIFT_TEMPLATE_SHEET_NAME
     )
     header_timer = _stage_start()
     header_cells = header_cells or []
@@ -780,10 +978,22 @@ def process_lift_upload_file(file_path, *, apply_changes):
     processed_external_ids: set[str] = set()
     generated_codes: set[str] = set()
 
-    lift_brand_present = "Lift Brand" in header_map
+    committer = _ChunkedCommitter(enabled=apply_changes)
+
+    parse_context = LiftRowContext(
+        header_map=header_map,
+        customer_by_code={key: customer.id for key, customer in customer_by_code.items()},
+        customer_by_external={key: customer.id for key, customer in customer_by_external.items()},
+        customer_by_name={key: customer.id for key, customer in customer_by_name.items()},
+        route_lookup={key: route.state for key, route in route_lookup.items()},
+    )
+    customers_by_id = {customer.id: customer for customer in customers}
+    parsed_rows = iter_parsed_rows(
+        data_rows, parse_lift_row, parse_context, **_parallel_parse_options()
+    )
 
-    for row_index, row_values in enumerate(data_rows, start=2):
-        _check_stage_timeout(
+    for row_index, parsed in enumerate(parsed_rows, start=2):
+        committer.check_timeout(
             upload_timer,
             "processing the AMC lift upload",
             timeout=UPLOAD_TOTAL_TIMEOUT_SECONDS,
@@ -791,78 +1001,17 @@ def process_lift_upload_file(file_path, *, apply_changes):
         row_stage = _stage_start()
         row_stage_label = f"processing row {row_index}"
         try:
-            if not row_values:
-                continue
-            row_data: Dict[str, Any] = {}
-            for header, position in header_map.items():
-                value = row_values[position] if position < len(row_values) else None
-                row_data[header] = value
-
-            key_fields = [
-                row_data.get("Customer External ID"),
-                row_data.get("Customer Code"),
-                row_data.get("Customer Name"),
-                row_data.get("External Lift ID"),
-                row_data.get("Lift Code"),
-                row_data.get("AMC Status"),
-            ]
-            if not any(clean_str(value) for value in key_fields):
+            if parsed is None:
                 continue
 
             outcome.processed_rows += 1
-
-            customer_external_id_value = clean_str(row_data.get("Customer External ID"))
-            customer_code_value = clean_str(row_data.get("Customer Code"))
-            customer_name_value = clean_str(row_data.get("Customer Name"))
-            customer_external_id_key = (
-                customer_external_id_value.lower() if customer_external_id_value else None
-            )
-            customer_code_key = customer_code_value.lower() if customer_code_value else None
-            customer_name_key = customer_name_value.lower() if customer_name_value else None
-
-            customer = None
-            if customer_external_id_key and customer_external_id_key in customer_by_external:
-                customer = customer_by_external[customer_external_id_key]
-            if customer_code_key and customer_code_key in customer_by_code:
-                customer = customer_by_code[customer_code_key]
-            if (
-                customer_external_id_key
-                and customer_code_key
-                and customer_external_id_key in customer_by_external
-                and customer_code_key in customer_by_code
-                and customer_by_external[customer_external_id_key].id
-                != customer_by_code[customer_code_key].id
-            ):
-                raise ValueError(
-                    f"Customer code '{customer_code_value}' does not match external ID '{customer_external_id_value}'."
-                )
-            if not customer and customer_name_key and customer_name_key in customer_by_name:
-                customer = customer_by_name[customer_name_key]
-            if not customer:
-                missing_reference = (
-                    customer_external_id_value
-                    or customer_code_value
-                    or customer_name_value
-                    or "—"
-                )
-                raise ValueError(
-                    f"Customer '{missing_reference}' was not found. Upload customers first or use customer external ID."
-                )
-
-            route_value_raw = clean_str(row_data.get("Route"))
-            route_value = None
-            if route_value_raw:
-                lookup_key = route_value_raw.lower()
-                route = route_lookup.get(lookup_key)
-                if not route:
-                    raise ValueError(
-                        f"Route '{route_value_raw}' does not match an active service route."
-                    )
-                route_value = route.state
+            if "error" in parsed:
+                raise parsed["error"]
+            customer = customers_by_id[parsed["customer_id"]]
 
             existing_lift = None
-            provided_code = clean_str(row_data.get("Lift Code"))
-            provided_external = clean_str(row_data.get("External Lift ID"))
+            provided_code = parsed["provided_code"]
+            provided_external = parsed["provided_external"]
 
             if provided_code:
                 lookup_code = provided_code.lower()
@@ -870,7 +1019,9 @@ def process_lift_upload_file(file_path, *, apply_changes):
                     existing_lift = existing_by_code[lookup_code]
                 else:
                     existing_lift = (
-                        Lift.query.filter(func.lower(Lift.lift_code) == lookup_code).first()
+                        Lift.query.autoflush(False)
+                        .filter(ci_key(Lift.lift_code) == lookup_code)
+                        .first()
                     )
                     existing_by_code[lookup_code] = existing_lift
             if not existing_lift and provided_external:
@@ -879,7 +1030,9 @@ def process_lift_upload_file(file_path, *, apply_changes):
                     existing_lift = existing_by_external[lookup_external]
                 else:
                     existing_lift = (
-                        Lift.query.filter(func.lower(Lift.external_lift_id) == lookup_external).first()
+                        Lift.query.autoflush(False)
+                        .filter(ci_key(Lift.external_lift_id) == lookup_external)
+                        .first()
                     )
                     existing_by_external[lookup_external] = existing_lift
 
@@ -905,84 +1058,10 @@ def process_lift_upload_file(file_path, *, apply_changes):
                 display_code = provided_code or (existing_lift.lift_code if existing_lift else None)
                 raise ValueError(f"Lift code '{display_code}' is duplicated in the upload.")
 
-            amc_status_value, status_error = normalize_amc_status(
-                clean_str(row_data.get("AMC Status"))
-            )
-            if status_error:
-                raise ValueError(status_error)
-            if not amc_status_value:
-                raise ValueError("AMC status is required.")
-
-            duration_key, duration_error = normalize_amc_duration(
-                clean_str(row_data.get("AMC Duration"))
-            )
-            if duration_error:
-                raise ValueError(duration_error)
-            if not duration_key:
-                raise ValueError("AMC duration is required.")
-
-            amc_start = parse_excel_date(row_data.get("AMC Start (YYYY-MM-DD)"))
-            if not amc_start:
-                raise ValueError("AMC start date is required.")
-
-            amc_end = parse_excel_date(row_data.get("AMC End (YYYY-MM-DD)"))
-            if not amc_end:
-                amc_end = calculate_amc_end_date(amc_start, duration_key)
-
-            preferred_days_source = row_data.get("Preferred Service Days")
-            preferred_days_display = (
-                clean_str(preferred_days_source) if preferred_days_source is not None else None
-            )
-            preferred_days = preferred_days_display
-
-            preferred_date_source = row_data.get("Preferred Service Date")
-            preferred_date = None
-            if preferred_date_source not in (None, ""):
-                preferred_date = parse_excel_date(preferred_date_source)
-                if not preferred_date:
-                    raise ValueError("Preferred service date must be in a valid date format.")
-
-            preferred_time_source = row_data.get("Preferred Service Time")
-            preferred_time = None
-            if preferred_time_source not in (None, ""):
-                preferred_time, error = parse_time_field(
-                    preferred_time_source,
-                    "Preferred service time",
-                )
-                if error:
-                    raise ValueError(error)
-
-            next_service_due_source = row_data.get("Next Service Due")
-            next_service_due = None
-            if next_service_due_source not in (None, ""):
-                next_service_due = parse_excel_date(next_service_due_source)
-                if next_service_due is None:
-                    raise ValueError("Next service due must be in a valid date format.")
-
-            try:
-                capacity_persons = int(row_data.get("Capacity (persons)") or 0) or None
-            except (TypeError, ValueError):
-                capacity_persons = None
-
-            try:
-                capacity_kg = int(row_data.get("Capacity (kg)") or 0) or None
-            except (TypeError, ValueError):
-                capacity_kg = None
-
-            try:
-                speed_mps = float(row_data.get("Speed (m/s)") or 0) or None
-            except (TypeError, ValueError):
-                speed_mps = None
-
-            lift_type_value = clean_str(row_data.get("Lift Type"))
-            lift_brand_value = clean_str(row_data.get("Lift Brand"))
-            site_address_line1 = clean_str(row_data.get("Site Address Line 1"))
-            site_address_line2 = clean_str(row_data.get("Site Address Line 2"))
-            building_villa_number = clean_str(row_data.get("Building / Villa No."))
-            city_value = clean_str(row_data.get("City"))
-            state_value = clean_str(row_data.get("State"))
-            pincode_value = clean_str(row_data.get("Pincode"))
-            notes_value = clean_str(row_data.get("Notes"))
+            if "late_error" in parsed:
+                raise parsed["late_error"]
+            values: Dict[str, Any] = parsed["values"]
+            amc_status_value = values["amc_status"]
 
             if existing_lift:
                 lift = existing_lift
@@ -1035,61 +1114,21 @@ def process_lift_upload_file(file_path, *, apply_changes):
                         }
                     )
 
+            values["customer_code"] = customer.customer_code
+            if not existing_lift:
+                for attr in ("city", "state", "pincode", "route"):
+                    if attr not in values and getattr(customer, attr):
+                        values[attr] = getattr(customer, attr)
+                values.setdefault("preferred_service_days", None)
+
             if apply_changes:
-                if provided_external:
-                    lift.external_lift_id = provided_external
-                lift.customer_code = customer.customer_code
                 lift.customer = customer
-                if building_villa_number is not None:
-                    lift.building_villa_number = building_villa_number
-                if site_address_line1 is not None:
-                    lift.site_address_line1 = site_address_line1
-                if site_address_line2 is not None:
-                    lift.site_address_line2 = site_address_line2
-                if city_value is not None:
-                    lift.city = city_value
-                elif not existing_lift and not lift.city and customer.city:
-                    lift.city = customer.city
-                if state_value is not None:
-                    lift.state = state_value
-                elif not existing_lift and not lift.state and customer.state:
-                    lift.state = customer.state
-                if pincode_value is not None:
-                    lift.pincode = pincode_value
-                elif not existing_lift and not lift.pincode and customer.pincode:
-                    lift.pincode = customer.pincode
-                if route_value:
-                    lift.route = route_value
-                elif not existing_lift and not lift.route and customer.route:
-                    lift.route = customer.route
-                if lift_type_value:
-                    lift.lift_type = lift_type_value
-                if lift_brand_present:
-                    lift.lift_brand = lift_brand_value
-                if capacity_persons is not None:
-                    lift.capacity_persons = capacity_persons
-                if capacity_kg is not None:
-                    lift.capacity_kg = capacity_kg
-                if speed_mps is not None:
-                    lift.speed_mps = speed_mps
-                lift.amc_status = amc_status_value
-                lift.amc_start = amc_start
-                lift.amc_duration_key = duration_key
-                lift.amc_end = amc_end
-                if preferred_days_display is not None:
-                    lift.preferred_service_days = preferred_days
-                elif not existing_lift:
-                    lift.preferred_service_days = preferred_days
-                if preferred_date_source not in (None, ""):
-                    lift.preferred_service_date = preferred_date
-                if preferred_time_source not in (None, ""):
-                    lift.preferred_service_time = preferred_time
-                if next_service_due is not None:
-                    lift.next_service_due = next_service_due
-                if notes_value is not None:
-                    lift.notes = notes_value
-                lift.last_updated_by = current_user.id
-                lift.set_capacity_display()
+                _apply_lift_values(lift, values, user_id=user_id)
+            if plan is not None:
+                if existing_lift:
+                    plan.add({"action": "update", "id": existing_lift.id, "values": values})
+                else:
+                    plan.add({"action": "create", "values": {"lift_code": lift.lift_code, **values}})
 
             existing_by_code[lift.lift_code.lower()] = lift
             if provided_external:
@@ -1110,12 +1149,13 @@ def process_lift_upload_file(file_path, *, apply_changes):
             row_errors.append(f"Row {row_index}: {exc}")
             continue
         finally:
-            _check_stage_timeout(row_stage, row_stage_label)
-            _check_stage_timeout(
+            committer.check_timeout(row_stage, row_stage_label)
+            committer.check_timeout(
                 upload_timer,
                 "processing the AMC lift upload",
                 timeout=UPLOAD_TOTAL_TIMEOUT_SECONDS,
             )
+            committer.row_done()
     if row_errors:
         if isinstance(outcome.row_errors, list):
             outcome.row_errors.extend(row_errors)
@@ -1123,7 +1163,7 @@ def process_lift_upload_file(file_path, *, apply_changes):
             outcome.row_errors = list(row_errors)
 
     if apply_changes and (outcome.created_count or outcome.updated_count):
-        _check_stage_timeout(
+        committer.check_timeout(
             upload_timer,
             "saving AMC lift upload changes",
             timeout=UPLOAD_TOTAL_TIMEOUT_SECONDS,
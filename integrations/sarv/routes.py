@@ -1,11 +1,18 @@
 import json
 from datetime import datetime
 
-from flask import Blueprint, request
+from flask import Blueprint, current_app, request
 
 from eleva_app import db, csrf
+from eleva_app.jobs import JobFailed, enqueue_job, job_handler
 from eleva_app.models import CallLog, CallRecording
-from integrations.sarv.utils import download_call_recording
+from integrations.sarv.utils import (
+    SARV_DOWNLOAD_ATTEMPTS,
+    SARV_DOWNLOAD_BACKOFF_SECONDS,
+    download_call_recording,
+    is_retryable_download_error,
+    recording_download_pool,
+)
 
 sarv_bp = Blueprint("sarv", __name__)
 
@@ -29,6 +36,61 @@ def _normalize_recordings_payload(recordings):
     return _normalize_recordings_payload(parsed)
 
 
+@job_handler("call_recording_download", title="Call recording download")
+def _download_recording_job(context):
+    recording = db.session.get(CallRecording, context.payload.get("recording_id"))
+    if recording is None:
+        return {"message": "Recording no longer exists."}
+    error = download_call_recording(recording)
+    if error is not None:
+        if is_retryable_download_error(error):
+            raise RuntimeError(recording.download_error or "Recording download failed")
+        raise JobFailed(recording.download_error or "Recording download failed")
+    return {"message": f"Saved {recording.local_file_path or recording.sarv_file_path}."}
+
+
+def _download_recording_with_retry(recording_id, downloader, attempt=1):
+    """Pool task: one download attempt; a retryable failure re-queues it after a backoff."""
+    attempts = current_app.config.get("SARV_DOWNLOAD_ATTEMPTS", SARV_DOWNLOAD_ATTEMPTS)
+    backoff = current_app.config.get("SARV_DOWNLOAD_BACKOFF_SECONDS", SARV_DOWNLOAD_BACKOFF_SECONDS)
+    recording = db.session.get(CallRecording, recording_id)
+    if recording is None:
+        return
+    error = downloader(recording, commit=False)
+    if error is None or not is_retryable_download_error(error) or attempt >= attempts:
+        db.session.commit()
+        return
+    # Still queued: only the last attempt may leave the recording "failed".
+    recording.download_status = "pending"
+    db.session.commit()
+    # Wait on a timer rather than in this pool thread, so other recordings keep moving.
+    recording_download_pool.submit_later(
+        backoff * (2 ** (attempt - 1)),
+        current_app._get_current_object(),
+        _download_recording_with_retry,
+        recording_id,
+        downloader,
+        attempt + 1,
+    )
+
+
+def _queue_recording_downloads(recording_ids):
+    """Hand new recordings to the job worker, or to the bounded download pool without one.
+
+    Either way the webhook answers before any audio is fetched.
+    """
+    if current_app.config.get("JOB_WORKER_ENABLED"):
+        for recording_id in recording_ids:
+            enqueue_job("call_recording_download", {"recording_id": recording_id}, max_attempts=5)
+        return
+    app = current_app._get_current_object()
+    for recording_id in recording_ids:
+        # Bind the downloader now so the task uses the one in effect at queue time.
+        recording_download_pool.submit(
+            app, _download_recording_with_retry, recording_id, download_call_recording
+        )
+
+
 @sarv_bp.route("/sarv/webhook", methods=["GET", "POST"])
 def sarv_webhook():
     if request.method == "GET":
@@ -89,6 +151,7 @@ def sarv_webhook():
     db.session.commit()
 
     recordings = _normalize_recordings_payload(data.get("recordings"))
+    new_recordings = []
     for rec in recordings:
         sarv_path = rec.get("file")
         if not sarv_path:
@@ -111,9 +174,11 @@ def sarv_webhook():
         cr.sarv_time = parse_dt(rtime) if rtime else None
 
         db.session.add(cr)
-        db.session.commit()
+        new_recordings.append(cr)
 
-        download_call_recording(cr)
+    if new_recordings:
+        db.session.commit()
+        _queue_recording_downloads([cr.id for cr in new_recordings])
 
     return "GODBLESSYOU", 200
 
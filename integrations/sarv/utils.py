@@ -1,4 +1,8 @@
+import logging
 import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from urllib.error import HTTPError, URLError
 from urllib.parse import urljoin
 from urllib.request import Request, urlopen
@@ -8,6 +12,18 @@ from flask import current_app
 from eleva_app import db
 from eleva_app.models import CallRecording
 
+logger = logging.getLogger(__name__)
+
+SARV_DOWNLOAD_CONCURRENCY = 2
+SARV_DOWNLOAD_QUEUE_LIMIT = 200
+SARV_DOWNLOAD_ATTEMPTS = 4
+SARV_DOWNLOAD_BACKOFF_SECONDS = 5
+SARV_DOWNLOAD_TIMEOUT_SECONDS = 60
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+_slots_lock = threading.Lock()
+_download_slots = None
+
 
 def _resolve_target_dir(target_dir: str) -> str:
     if os.path.isabs(target_dir):
@@ -15,48 +31,200 @@ def _resolve_target_dir(target_dir: str) -> str:
     return os.path.join(current_app.root_path, target_dir)
 
 
-def download_call_recording(call_recording: CallRecording):
+def _download_slot():
+    """Process-wide cap on simultaneous recording downloads (``SARV_DOWNLOAD_CONCURRENCY``)."""
+
+    global _download_slots
+    with _slots_lock:
+        if _download_slots is None:
+            limit = current_app.config.get("SARV_DOWNLOAD_CONCURRENCY", SARV_DOWNLOAD_CONCURRENCY)
+            _download_slots = threading.BoundedSemaphore(max(1, int(limit)))
+        return _download_slots
+
+
+def is_retryable_download_error(exc) -> bool:
+    """Whether another attempt may succeed (network trouble, 429 or 5xx responses)."""
+
+    if isinstance(exc, HTTPError):
+        return exc.code == 429 or exc.code >= 500
+    return isinstance(exc, (URLError, TimeoutError, ConnectionError))
+
+
+def _stream_to_file(resp, local_path):
+    """Write ``resp`` to ``local_path`` chunk by chunk via a temp file and an atomic rename."""
+
+    fd, temp_path = tempfile.mkstemp(
+        dir=os.path.dirname(local_path), prefix=".", suffix=".part"
+    )
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            while True:
+                chunk = resp.read(DOWNLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                handle.write(chunk)
+        os.replace(temp_path, local_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def download_call_recording(call_recording: CallRecording, *, commit=True):
     """
     Download one SARV recording and save locally under CALL_RECORDINGS_DIR.
     Updates CallRecording.local_file_path and download_status.
+
+    The body is streamed to disk, so memory use does not grow with the file.
+    Returns None on success or the exception that made the attempt fail
+    (see ``is_retryable_download_error``).
     """
 
     base_url = current_app.config.get(
         "SARV_RECORDING_BASE_URL", "https://ctv1.sarv.com"
     )
     token = current_app.config.get("SARV_RECORDING_TOKEN", "")
+    timeout = current_app.config.get("SARV_DOWNLOAD_TIMEOUT_SECONDS", SARV_DOWNLOAD_TIMEOUT_SECONDS)
     target_dir = current_app.config.get("CALL_RECORDINGS_DIR", "static/call_recordings")
     target_dir = _resolve_target_dir(target_dir)
 
-    os.makedirs(target_dir, exist_ok=True)
-
     full_url = urljoin(
         base_url.rstrip("/") + "/", call_recording.sarv_file_path.lstrip("/")
     )
 
     headers = {"Authorization": f"Bearer {token}"} if token else {}
+    filename = os.path.basename(call_recording.sarv_file_path)
+    local_name = f"{call_recording.call_log.sarv_call_id}_{filename}"
+    local_path = os.path.join(target_dir, local_name)
 
     try:
-        request = Request(full_url, headers=headers)
-        with urlopen(request, timeout=60) as resp:
-            if resp.status >= 400:
-                raise HTTPError(full_url, resp.status, resp.reason, resp.headers, None)
+        os.makedirs(target_dir, exist_ok=True)
+        with _download_slot():
+            request = Request(full_url, headers=headers)
+            with urlopen(request, timeout=timeout) as resp:
+                if resp.status >= 400:
+                    raise HTTPError(full_url, resp.status, resp.reason, resp.headers, None)
+                _stream_to_file(resp, local_path)
+    except (HTTPError, URLError, TimeoutError, OSError) as exc:
+        call_recording.download_status = "failed"
+        call_recording.download_error = str(exc)[:250]
+        if commit:
+            db.session.commit()
+        return exc
 
-            filename = os.path.basename(call_recording.sarv_file_path)
-            local_name = f"{call_recording.call_log.sarv_call_id}_{filename}"
-            local_path = os.path.join(target_dir, local_name)
+    rel_path = os.path.relpath(local_path, start="static")
 
-            with open(local_path, "wb") as f:
-                f.write(resp.read())
+    call_recording.local_file_path = rel_path.replace("\\", "/")
+    call_recording.download_status = "success"
+    call_recording.download_error = None
+    if commit:
+        db.session.commit()
+    return None
 
-        rel_path = os.path.relpath(local_path, start="static")
 
-        call_recording.local_file_path = rel_path.replace("\\", "/")
-        call_recording.download_status = "success"
-        call_recording.download_error = None
-        db.session.commit()
-    except (HTTPError, URLError, TimeoutError, OSError) as exc:  # pragma: no cover - network and IO side effects
-        call_recording.download_status = "failed"
-        call_recording.download_error = str(exc)[:250]
-        db.session.commit()
+class RecordingDownloadPool:
+    """Bounded in-process pool for recording downloads when no job worker runs.
+
+    At most ``SARV_DOWNLOAD_QUEUE_LIMIT`` downloads wait or run at once;
+    ``submit`` returns False beyond that and the recording stays ``pending``
+    for the "update records" sweep. Retries are scheduled with
+    ``submit_later`` so a backoff never holds one of the pool threads; a
+    task that schedules its own retry hands its queue slot over to it.
+    """
 
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._executor = None
+        self._pending = None
+        self._futures = set()
+        self._timers = set()
+        self._task = threading.local()
+
+    def _ensure_started(self, app):
+        with self._lock:
+            if self._executor is None:
+                workers = app.config.get("SARV_DOWNLOAD_CONCURRENCY", SARV_DOWNLOAD_CONCURRENCY)
+                limit = app.config.get("SARV_DOWNLOAD_QUEUE_LIMIT", SARV_DOWNLOAD_QUEUE_LIMIT)
+                self._executor = ThreadPoolExecutor(
+                    max_workers=max(1, int(workers)), thread_name_prefix="sarv-download"
+                )
+                self._pending = threading.BoundedSemaphore(max(1, int(limit)))
+
+    def submit(self, app, func, *args):
+        """Run ``func(*args)`` inside an app context on the pool; False when the queue is full."""
+
+        return self.submit_later(0, app, func, *args)
+
+    def submit_later(self, delay, app, func, *args):
+        """Like ``submit``, but hand the task to the pool only after ``delay`` seconds.
+
+        The queue slot is taken now; the wait happens on a timer thread.
+        Called from inside a pool task, the task's own slot moves to the
+        new task instead, so a full queue cannot drop the retry.
+        """
+
+        self._ensure_started(app)
+        if getattr(self._task, "holds_slot", False):
+            self._task.holds_slot = False
+        elif not self._pending.acquire(blocking=False):
+            logger.warning("Recording download queue is full; leaving the recording pending.")
+            return False
+        if delay <= 0:
+            self._dispatch(app, func, args)
+            return True
+
+        def _fire():
+            try:
+                self._dispatch(app, func, args)
+            finally:
+                with self._lock:
+                    self._timers.discard(timer)
+
+        timer = threading.Timer(delay, _fire)
+        timer.daemon = True
+        with self._lock:
+            self._timers.add(timer)
+        timer.start()
+        return True
+
+    def _dispatch(self, app, func, args):
+        def _run():
+            self._task.holds_slot = True
+            try:
+                with app.app_context():
+                    try:
+                        func(*args)
+                    except Exception:
+                        logger.exception("Recording download failed")
+                    finally:
+                        db.session.remove()
+            finally:
+                if self._task.holds_slot:
+                    self._task.holds_slot = False
+                    self._pending.release()
+
+        future = self._executor.submit(_run)
+        with self._lock:
+            self._futures.add(future)
+        future.add_done_callback(self._forget)
+
+    def _forget(self, future):
+        with self._lock:
+            self._futures.discard(future)
+
+    def wait(self, timeout=None):
+        """Block until every submitted or scheduled download has finished (for tests and shutdown)."""
+
+        while True:
+            with self._lock:
+                futures = list(self._futures)
+                timers = list(self._timers)
+            if not futures and not timers:
+                return
+            for timer in timers:
+                timer.join(timeout)
+            for future in futures:
+                future.result(timeout=timeout)
+
+
+recording_download_pool = RecordingDownloadPool()
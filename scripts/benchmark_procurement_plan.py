@@ -0,0 +1,52 @@
+"""Time the project procurement plan on a synthetic multi-BOM project.
+
+Usage: python scripts/benchmark_procurement_plan.py [--boms 50] [--runs 5]
+
+Seeds a throwaway project (names prefixed ``ZBENCH``) into the configured
+database, reports wall time and SQL statement count per run, then removes it.
+"""
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+from app import app, db, ensure_bootstrap, get_project_procurement_plan  # noqa: E402
+from eleva_app.perf import QueryRecorder  # noqa: E402
+from eleva_app.synthetic import cleanup_procurement_project, seed_procurement_project  # noqa: E402
+
+PREFIX = "ZBENCH"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--boms", type=int, default=50)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    with app.app_context():
+        ensure_bootstrap()
+        cleanup_procurement_project(PREFIX)
+        project, _boms = seed_procurement_project(args.boms, prefix=PREFIX)
+        timings = []
+        try:
+            for _ in range(args.runs):
+                db.session.expire_all()
+                with QueryRecorder(db.engine) as counter:
+                    started = time.perf_counter()
+                    plan = get_project_procurement_plan(project.id)
+                    timings.append((time.perf_counter() - started) * 1000)
+        finally:
+            cleanup_procurement_project(PREFIX)
+
+    print(
+        f"{len(plan['bom_entries'])} BOMs: median {statistics.median(timings):.1f} ms, "
+        f"best {min(timings):.1f} ms, {counter.count} SQL statements per run"
+    )
+
+
+if __name__ == "__main__":
+    main()
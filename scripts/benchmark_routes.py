@@ -0,0 +1,216 @@
+"""Time hot routes and service functions against synthetic data at several scales.
+
+Usage: python scripts/benchmark_routes.py [--scales 1,10,100] [--runs 3]
+                                          [--output report.json] [--compare old.json]
+
+Runs against a scratch SQLite database (``instance/benchmark.db`` by default,
+recreated on every run), seeds it with ``flask seed-synthetic`` data for each
+scale and writes a JSON report with median/best wall time and SQL statement
+count per target, both cold (reference cache cleared before each run) and warm.
+``--compare`` prints the change against an earlier report.
+"""
+import argparse
+import datetime
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scales", default="1,10,100", help="Comma separated scale factors.")
+    parser.add_argument("--runs", type=int, default=3, help="Timed runs per target (after one warm-up).")
+    parser.add_argument("--database", default=str(REPO_ROOT / "instance" / "benchmark.db"))
+    parser.add_argument("--output", default=None, help="Report path (default: instance/benchmark-<commit>.json).")
+    parser.add_argument("--compare", default=None, help="Earlier report to compare against.")
+    parser.add_argument("--only", default=None, help="Comma separated target names to run.")
+    return parser.parse_args()
+
+
+ARGS = _parse_args()
+if os.path.exists(ARGS.database):
+    os.remove(ARGS.database)
+os.environ["SQLALCHEMY_DATABASE_URI"] = "sqlite:///" + os.path.abspath(ARGS.database)
+
+from flask_login import login_user  # noqa: E402
+
+from app import (  # noqa: E402
+    _build_task_overview,
+    app,
+    db,
+    ensure_bootstrap,
+    get_bom_procurement_plan,
+    get_project_procurement_plan,
+)
+from eleva_app.models import BillOfMaterials, Project, User  # noqa: E402
+from eleva_app.perf import QueryRecorder  # noqa: E402
+from eleva_app.refcache import reference_cache  # noqa: E402
+from eleva_app.synthetic import SYNTHETIC_PREFIX, seed_synthetic_data  # noqa: E402
+
+# ``/dashboard`` is only the shell; its panels load from /dashboard/section/<name>.
+ROUTE_TARGETS = {
+    "dashboard": "/dashboard",
+    "dashboard_section_my": "/dashboard/section/my",
+    "dashboard_section_created": "/dashboard/section/created",
+    "dashboard_section_team": "/dashboard/section/team",
+    "service_lifts": "/service/lifts",
+    "service_customers": "/service/customers",
+    "sales_clients": "/sales/clients",
+    "sales_opportunities": "/sales/opportunities/lift",
+    "purchase_orders": "/purchase/orders",
+    "store_inventory": "/store/inventory",
+    "customer_support_tasks": "/customer-support/tasks",
+    "customer_support_calls": "/customer-support/calls",
+}
+
+
+def _first_synthetic(model, column):
+    return model.query.filter(column.like(f"{SYNTHETIC_PREFIX} %")).order_by(model.id).first()
+
+
+FUNCTION_TARGETS = {
+    "task_overview": lambda admin: _build_task_overview(admin),
+    "bom_procurement_plan": lambda admin: get_bom_procurement_plan(
+        _first_synthetic(BillOfMaterials, BillOfMaterials.bom_name).id
+    ),
+    "project_procurement_plan": lambda admin: get_project_procurement_plan(
+        _first_synthetic(Project, Project.name).id
+    ),
+}
+
+
+def _timed_runs(call, runs, *, cold):
+    timings = []
+    queries = 0
+    status = None
+    for _ in range(runs):
+        db.session.expire_all()
+        if cold:
+            reference_cache.clear()
+        with QueryRecorder(db.engine) as counter:
+            started = time.perf_counter()
+            status = call()
+            timings.append((time.perf_counter() - started) * 1000)
+        queries = counter.count
+    return timings, queries, status
+
+
+def _measure(call, runs):
+    """Time ``call`` with the reference cache cleared before each run, then warm."""
+
+    call()  # warm-up: template compilation
+    cold_timings, cold_queries, _ = _timed_runs(call, runs, cold=True)
+    timings, queries, status = _timed_runs(call, runs, cold=False)
+    return {
+        "median_ms": round(statistics.median(timings), 2),
+        "best_ms": round(min(timings), 2),
+        "queries": queries,
+        "cold_median_ms": round(statistics.median(cold_timings), 2),
+        "cold_queries": cold_queries,
+        "status": status,
+    }
+
+
+def _admin_client(admin):
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session["_user_id"] = str(admin.id)
+        session["_fresh"] = True
+        session["session_token"] = admin.session_token
+    return client
+
+
+def _run_scale(scale, runs, only):
+    with app.app_context():
+        seeded = seed_synthetic_data(scale)
+        admin = User.query.filter_by(username="admin").first()
+        if not admin.session_token:
+            admin.issue_session_token()
+            db.session.commit()
+        client = _admin_client(admin)
+        results = {}
+        for name, path in ROUTE_TARGETS.items():
+            if only and name not in only:
+                continue
+            results[name] = {"kind": "route", "target": path}
+            results[name].update(_measure(lambda: client.get(path).status_code, runs))
+        with app.test_request_context("/"):
+            login_user(admin)
+            for name, function in FUNCTION_TARGETS.items():
+                if only and name not in only:
+                    continue
+                results[name] = {"kind": "function", "target": name}
+                results[name].update(_measure(lambda: function(admin) and "ok", runs))
+    return {"rows": seeded, "targets": results}
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=REPO_ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _print_comparison(report, baseline):
+    print(f"\nChange against {baseline.get('commit') or 'baseline'}:")
+    for scale, data in report["scales"].items():
+        previous = baseline.get("scales", {}).get(scale, {}).get("targets", {})
+        for name, result in data["targets"].items():
+            before = previous.get(name)
+            if not before:
+                continue
+            ratio = result["median_ms"] / before["median_ms"] if before["median_ms"] else float("inf")
+            print(
+                f"  {scale:>4}x {name:<28} {before['median_ms']:>9.1f} -> {result['median_ms']:>9.1f} ms "
+                f"({ratio:.2f}x)  queries {before['queries']} -> {result['queries']}"
+            )
+
+
+def main():
+    scales = [int(value) for value in ARGS.scales.split(",") if value.strip()]
+    only = {name.strip() for name in ARGS.only.split(",")} if ARGS.only else None
+    with app.app_context():
+        ensure_bootstrap()
+
+    report = {
+        "commit": _git_commit(),
+        "generated_at": datetime.datetime.utcnow().isoformat(timespec="seconds") + "Z",
+        "runs": ARGS.runs,
+        "scales": {},
+    }
+    for scale in scales:
+        started = time.perf_counter()
+        report["scales"][str(scale)] = _run_scale(scale, ARGS.runs, only)
+        print(f"Scale {scale}x finished in {time.perf_counter() - started:.1f}s")
+        for name, result in report["scales"][str(scale)]["targets"].items():
+            print(
+                f"  {name:<28} cold {result['cold_median_ms']:>9.1f} ms {result['cold_queries']:>6} queries  "
+                f"warm {result['median_ms']:>9.1f} ms (best {result['best_ms']:.1f}) "
+                f"{result['queries']:>6} queries  [{result['status']}]"
+            )
+
+    output = ARGS.output or str(REPO_ROOT / "instance" / f"benchmark-{report['commit'] or 'local'}.json")
+    with open(output, "w", encoding="utf-8") as handle:
+        json.dump(report, handle, indent=2, sort_keys=True)
+    print(f"Report written to {output}")
+
+    if ARGS.compare:
+        with open(ARGS.compare, "r", encoding="utf-8") as handle:
+            _print_comparison(report, json.load(handle))
+
+
+if __name__ == "__main__":
+    main()
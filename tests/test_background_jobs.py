@@ -0,0 +1,231 @@
+import datetime
+import io
+import threading
+import time
+import unittest
+
+from app import app, db, ensure_bootstrap
+from eleva_app.jobs import (
+    JOB_HANDLERS,
+    JobFailed,
+    claim_next_job,
+    enqueue_job,
+    job_handler,
+    requeue_stale_jobs,
+    run_job,
+    run_worker,
+)
+from eleva_app.models import BackgroundJob, InventoryItem, Product, User
+
+PREFIX = "ZJOB"
+
+
+class BackgroundJobTests(unittest.TestCase):
+    def setUp(self):
+        app.config["TESTING"] = True
+        self.addCleanup(app.config.__setitem__, "JOB_WORKER_ENABLED", app.config.get("JOB_WORKER_ENABLED", False))
+        app.config["JOB_WORKER_ENABLED"] = True
+        self.calls = []
+        with app.app_context():
+            ensure_bootstrap()
+            self._cleanup()
+
+    def tearDown(self):
+        for kind in [kind for kind in JOB_HANDLERS if kind.startswith("ztest_")]:
+            JOB_HANDLERS.pop(kind)
+        with app.app_context():
+            self._cleanup()
+
+    def _cleanup(self):
+        BackgroundJob.query.filter(
+            BackgroundJob.kind.like("ztest_%") | BackgroundJob.payload_json.like(f"%{PREFIX}%")
+        ).delete(synchronize_session=False)
+        Product.query.filter(Product.name.like(f"{PREFIX}%")).delete(synchronize_session=False)
+        InventoryItem.query.filter(InventoryItem.description.like(f"{PREFIX}%")).delete(synchronize_session=False)
+        db.session.commit()
+
+    def _register(self, kind, func, **options):
+        job_handler(f"ztest_{kind}", **options)(func)
+        return f"ztest_{kind}"
+
+    def _client(self):
+        client = app.test_client()
+        with app.app_context():
+            admin = User.query.filter_by(username="admin").first()
+            if not admin.session_token:
+                admin.issue_session_token()
+                db.session.commit()
+            admin_id, token = admin.id, admin.session_token
+        with client.session_transaction() as session:
+            session["_user_id"] = str(admin_id)
+            session["_fresh"] = True
+            session["session_token"] = token
+        return client
+
+    def test_worker_claims_runs_and_records_progress(self):
+        def handler(context):
+            context.progress(50, "Half way")
+            self.calls.append(context.payload["value"])
+            return {"doubled": context.payload["value"] * 2}
+
+        kind = self._register("double", handler)
+        with app.app_context():
+            job = enqueue_job(kind, {"value": 21})
+            self.assertEqual(job.status, "queued")
+            self.assertEqual(self.calls, [])
+
+            claimed = claim_next_job("test-worker")
+            self.assertEqual(claimed.id, job.id)
+            self.assertEqual((claimed.status, claimed.attempts), ("running", 1))
+            self.assertIsNone(claim_next_job("other-worker"))
+
+            run_job(claimed)
+            job = db.session.get(BackgroundJob, job.id)
+            self.assertEqual(job.status, "succeeded")
+            self.assertEqual(job.result, {"doubled": 42})
+            self.assertEqual((job.progress, job.progress_message), (100, "Half way"))
+
+    def test_failures_retry_with_backoff_then_give_up(self):
+        def flaky(context):
+            if context.attempt < 2:
+                raise ConnectionError("SMTP unavailable")
+            return {"message": "sent"}
+
+        def broken(context):
+            raise JobFailed("Mail server is not configured.")
+
+        flaky_kind = self._register("flaky", flaky)
+        broken_kind = self._register("broken", broken)
+        with app.app_context():
+            job = enqueue_job(flaky_kind)
+            run_job(claim_next_job("test-worker"))
+            job = db.session.get(BackgroundJob, job.id)
+            self.assertEqual((job.status, job.attempts), ("queued", 1))
+            self.assertIn("SMTP unavailable", job.error)
+            self.assertGreater(job.run_after, datetime.datetime.utcnow() + datetime.timedelta(seconds=20))
+            self.assertIsNone(claim_next_job("test-worker"))
+
+            job.run_after = datetime.datetime.utcnow() - datetime.timedelta(seconds=1)
+            db.session.commit()
+            run_job(claim_next_job("test-worker"))
+            job = db.session.get(BackgroundJob, job.id)
+            self.assertEqual((job.status, job.attempts, job.result), ("succeeded", 2, {"message": "sent"}))
+
+            failed = enqueue_job(broken_kind)
+            run_job(claim_next_job("test-worker"))
+            failed = db.session.get(BackgroundJob, failed.id)
+            self.assertEqual((failed.status, failed.attempts), ("failed", 1))
+            self.assertEqual(failed.error, "Mail server is not configured.")
+
+    def test_burst_worker_drains_queue(self):
+        kind = self._register("record", lambda context: self.calls.append(context.payload["n"]))
+        with app.app_context():
+            for number in range(4):
+                enqueue_job(kind, {"n": number})
+        self.assertEqual(run_worker(app, concurrency=2, burst=True), 4)
+        self.assertEqual(sorted(self.calls), [0, 1, 2, 3])
+
+    def test_progress_heartbeat_keeps_a_long_job_locked(self):
+        def long_running(context):
+            context.progress(10, "Still going")
+            self.calls.append(requeue_stale_jobs(timeout_seconds=60))
+
+        kind = self._register("long", long_running)
+        with app.app_context():
+            job = enqueue_job(kind)
+            claimed = claim_next_job("test-worker")
+            claimed.locked_at = datetime.datetime.utcnow() - datetime.timedelta(hours=2)
+            db.session.commit()
+
+            run_job(claimed)
+            self.assertEqual(self.calls, [0])
+            job = db.session.get(BackgroundJob, job.id)
+            self.assertEqual((job.status, job.attempts), ("succeeded", 1))
+
+    def test_running_worker_requeues_jobs_abandoned_after_it_started(self):
+        kind = self._register("record", lambda context: self.calls.append(context.payload["n"]))
+        for key, value in {"JOB_STALE_SWEEP_SECONDS": 0.05, "JOB_LOCK_TIMEOUT_SECONDS": 60}.items():
+            self.addCleanup(app.config.pop, key, None)
+            app.config[key] = value
+        stop = threading.Event()
+        worker = threading.Thread(
+            target=run_worker, args=(app,), kwargs={"concurrency": 1, "poll_interval": 0.02, "stop_event": stop}
+        )
+        worker.start()
+        self.addCleanup(worker.join, 5)
+        self.addCleanup(stop.set)
+        time.sleep(0.1)
+        with app.app_context():
+            # Not due yet, so only the stale-job sweep can hand it to the worker.
+            job = enqueue_job(kind, {"n": 7}, delay_seconds=3600)
+            db.session.execute(
+                BackgroundJob.__table__.update()
+                .where(BackgroundJob.__table__.c.id == job.id)
+                .values(
+                    status="running",
+                    attempts=1,
+                    locked_by="dead-host:1:0",
+                    locked_at=datetime.datetime.utcnow() - datetime.timedelta(hours=2),
+                )
+            )
+            db.session.commit()
+            job_id = job.id
+
+        deadline = time.monotonic() + 5
+        while self.calls != [7] and time.monotonic() < deadline:
+            time.sleep(0.02)
+        stop.set()
+        worker.join(5)
+        self.assertEqual(self.calls, [7])
+        with app.app_context():
+            job = db.session.get(BackgroundJob, job_id)
+            self.assertEqual((job.status, job.attempts), ("succeeded", 2))
+
+    def test_status_partial_polls_until_finished(self):
+        kind = self._register("noop", lambda context: {"message": f"{PREFIX} finished"})
+        with app.app_context():
+            job_id = enqueue_job(kind).id
+        client = self._client()
+
+        response = client.get(f"/jobs/{job_id}/status")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b"hx-trigger=\"every 2s\"", response.data)
+
+        with app.app_context():
+            run_job(claim_next_job("test-worker"))
+        response = client.get(f"/jobs/{job_id}/status")
+        self.assertNotIn(b"hx-trigger", response.data)
+        self.assertIn(f"{PREFIX} finished".encode(), response.data)
+
+    def test_product_upload_runs_inline_without_worker(self):
+        app.config["JOB_WORKER_ENABLED"] = False
+        self.addCleanup(app.config.__setitem__, "WTF_CSRF_ENABLED", app.config.get("WTF_CSRF_ENABLED", True))
+        app.config["WTF_CSRF_ENABLED"] = False
+        csv_body = (
+            "Name,Sales Price,Cost,Unit of Measure,Purchase Unit,Quantity On Hand\n"
+            f"{PREFIX} Bracket,120,80,Nos,Nos,5\n"
+            f"{PREFIX} Bolt,abc,2,Nos,Nos,10\n"
+        )
+        client = self._client()
+        response = client.post(
+            "/products/upload",
+            data={"product_upload_file": (io.BytesIO(csv_body.encode()), f"{PREFIX.lower()}.csv")},
+            content_type="multipart/form-data",
+        )
+        self.assertEqual(response.status_code, 302)
+        self.assertIn("/jobs/", response.headers["Location"])
+
+        page = client.get(response.headers["Location"])
+        self.assertEqual(page.status_code, 200)
+        self.assertIn(b"Product upload summary", page.data)
+        self.assertIn(b"Invalid numeric value in Sales Price", page.data)
+        with app.app_context():
+            self.assertEqual(Product.query.filter(Product.name.like(f"{PREFIX}%")).count(), 1)
+            job = db.session.get(BackgroundJob, int(response.headers["Location"].rsplit("/", 1)[1]))
+            self.assertEqual((job.kind, job.status, job.result["created_count"]), ("products_upload", "succeeded", 1))
+            db.session.delete(job)
+            db.session.commit()
+
+
+if __name__ == "__main__":
+    unittest.main()
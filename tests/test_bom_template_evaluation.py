@@ -0,0 +1,204 @@
+import datetime
+import unittest
+from types import SimpleNamespace
+
+from app import (
+    _bom_template_plan,
+    app,
+    db,
+    ensure_bootstrap,
+    evaluate_bom_template,
+    evaluate_bom_template_batch,
+)
+from eleva_app.models import (
+    BomTemplate,
+    BomTemplateLine,
+    BomTemplateSection,
+    BomTemplateStage,
+    PartClass,
+)
+
+
+def _line(line_id, ref_key, qty_expr, **exprs):
+    return SimpleNamespace(
+        id=line_id,
+        ref_key=ref_key,
+        display_order=line_id,
+        specification_text=ref_key,
+        part_class=None,
+        unit="Nos",
+        qty_expr=qty_expr,
+        include_if_expr=exprs.get("include_if_expr"),
+        override_if_expr=exprs.get("override_if_expr"),
+        override_qty_expr=exprs.get("override_qty_expr"),
+    )
+
+
+def _template(template_id=9001, updated_at=None):
+    inputs = [
+        SimpleNamespace(id=1, input_key="floors", default_value="4", data_type="integer", required=True),
+        SimpleNamespace(id=2, input_key="travel", default_value="12.5", data_type="number", required=False),
+        SimpleNamespace(id=3, input_key="glass", default_value="false", data_type="boolean", required=False),
+    ]
+    core = SimpleNamespace(
+        id=1,
+        section_name="Core",
+        display_order=0,
+        include_if_expr="",
+        lines=[
+            _line(11, "rails", "roundup(travel / 3) * 2"),
+            _line(12, "brackets", "rails * 2 + floors", override_if_expr="floors > 8", override_qty_expr="max(rails, 40)"),
+            _line(13, "doors", "floors", include_if_expr="floors >= 2 and not glass"),
+        ],
+    )
+    glass = SimpleNamespace(
+        id=2,
+        section_name="Glass",
+        display_order=1,
+        include_if_expr="glass",
+        lines=[_line(21, "panels", "floors * 3 / 2")],
+    )
+    stage = SimpleNamespace(id=1, stage_name="Main", display_order=0, sections=[core, glass])
+    return SimpleNamespace(
+        id=template_id,
+        updated_at=updated_at or datetime.datetime(2026, 1, 1),
+        inputs=inputs,
+        stages=[stage],
+    )
+
+
+def _quantities(evaluation):
+    return {line["ref_key"]: line["final_qty"] for line in evaluation["lines"]}
+
+
+class BomTemplateEvaluationTests(unittest.TestCase):
+    def test_arithmetic_and_comparisons_evaluate(self):
+        evaluation = evaluate_bom_template(_template(), {"floors": "10", "travel": "31"})
+
+        self.assertEqual(evaluation["errors"], [])
+        self.assertEqual(
+            _quantities(evaluation),
+            {"rails": 22.0, "brackets": 40.0, "doors": 10.0},
+        )
+
+    def test_batch_matches_single_evaluation(self):
+        template = _template()
+        input_sets = [
+            {"floors": str(floors), "travel": str(floors * 3.2), "glass": glass}
+            for floors in range(1, 12)
+            for glass in ("true", "false")
+        ]
+        input_sets.append({"floors": "", "travel": "x"})
+
+        batch = evaluate_bom_template_batch(template, input_sets)
+
+        self.assertEqual(len(batch), len(input_sets))
+        for input_values, evaluation in zip(input_sets, batch):
+            single = evaluate_bom_template(template, input_values)
+            self.assertEqual(_quantities(evaluation), _quantities(single))
+            self.assertEqual(evaluation["errors"], single["errors"])
+            self.assertEqual(evaluation["section_includes"], single["section_includes"])
+
+    def test_division_by_zero_is_reported_per_input_set(self):
+        template = _template(template_id=9003)
+        template.stages[0].sections[0].lines.append(_line(14, "ratio", "travel / (floors - 2)"))
+
+        batch = evaluate_bom_template_batch(template, [{"floors": "2"}, {"floors": "4"}])
+
+        self.assertEqual(len(batch[0]["expression_errors"]), 1)
+        self.assertEqual(batch[1]["expression_errors"], [])
+        self.assertEqual(_quantities(batch[1])["ratio"], 6.25)
+
+    def test_plan_is_reused_until_updated_at_changes(self):
+        template = _template(template_id=9002)
+        plan = _bom_template_plan(template)
+        self.assertIs(_bom_template_plan(template), plan)
+
+        template.updated_at = datetime.datetime(2026, 1, 2)
+        self.assertIsNot(_bom_template_plan(template), plan)
+
+    def test_new_layouts_replace_the_cached_layouts_dict(self):
+        template = _template(template_id=9003)
+        evaluate_bom_template(template, {"glass": "false"})
+        plan = _bom_template_plan(template)
+        layouts = plan["layouts"]
+
+        evaluate_bom_template(template, {"glass": "true"})
+        self.assertEqual(len(layouts), 1)
+        self.assertEqual(len(plan["layouts"]), 2)
+
+
+class BomTemplateTouchTests(unittest.TestCase):
+    def setUp(self):
+        app.config["TESTING"] = True
+        with app.app_context():
+            ensure_bootstrap()
+            self._cleanup()
+
+    def tearDown(self):
+        with app.app_context():
+            self._cleanup()
+
+    def _cleanup(self):
+        for template in BomTemplate.query.filter_by(name="ZZ Touch Template").all():
+            db.session.delete(template)
+        PartClass.query.filter(PartClass.name.like("ZZ Touch Part Class%")).delete(synchronize_session=False)
+        db.session.commit()
+
+    def test_line_edit_bumps_template_updated_at(self):
+        with app.app_context():
+            part_class = PartClass(name="ZZ Touch Part Class")
+            template = BomTemplate(name="ZZ Touch Template", lift_type="MRL")
+            stage = BomTemplateStage(stage_name="Main", template=template)
+            section = BomTemplateSection(section_name="Core", stage=stage)
+            line = BomTemplateLine(
+                ref_key="rails",
+                part_class=part_class,
+                unit="Nos",
+                qty_expr="2",
+                section=section,
+            )
+            db.session.add_all([part_class, template])
+            db.session.commit()
+            template_id = template.id
+            stamp = template.updated_at
+            self.assertIsNotNone(stamp)
+
+            line.qty_expr = "3"
+            db.session.commit()
+
+            refreshed = db.session.get(BomTemplate, template_id)
+            self.assertGreater(refreshed.updated_at, stamp)
+            self.assertEqual(_quantities(evaluate_bom_template(refreshed)), {"rails": 3.0})
+
+    def test_part_class_rename_bumps_templates_using_it(self):
+        with app.app_context():
+            part_class = PartClass(name="ZZ Touch Part Class")
+            template = BomTemplate(name="ZZ Touch Template", lift_type="MRL")
+            stage = BomTemplateStage(stage_name="Main", template=template)
+            section = BomTemplateSection(section_name="Core", stage=stage)
+            line = BomTemplateLine(
+                ref_key="rails",
+                part_class=part_class,
+                unit="Nos",
+                qty_expr="2",
+                section=section,
+            )
+            db.session.add_all([part_class, template])
+            db.session.commit()
+            template_id, line_id = template.id, line.id
+            stamp = template.updated_at
+            plan = _bom_template_plan(template)
+            self.assertEqual(plan["lines"][line_id]["display_name"], "ZZ Touch Part Class")
+
+            part_class.name = "ZZ Touch Part Class Renamed"
+            db.session.commit()
+
+            refreshed = db.session.get(BomTemplate, template_id)
+            self.assertGreater(refreshed.updated_at, stamp)
+            plan = _bom_template_plan(refreshed)
+            self.assertEqual(plan["lines"][line_id]["display_name"], "ZZ Touch Part Class Renamed")
+
+
+if __name__ == "__main__":
+    unittest.main()
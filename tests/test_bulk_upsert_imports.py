@@ -0,0 +1,220 @@
+import io
+import os
+import shutil
+import tempfile
+import unittest
+from decimal import Decimal
+from unittest import mock
+
+from sqlalchemy.exc import OperationalError
+
+from app import (
+    _import_odoo_purchase_order_lines,
+    _import_products_upload,
+    app,
+    db,
+    ensure_bootstrap,
+)
+from eleva_app import bulk_upsert
+from eleva_app.models import InventoryItem, InventoryLedgerEntry, Product, PurchaseOrderLine, User, Vendor
+from eleva_app.perf import QueryRecorder
+from eleva_app.search import global_search
+
+PREFIX = "ZBULKUP"
+
+PRODUCT_HEADERS = ["Name", "Sales Price", "Cost", "Unit of Measure", "Purchase Unit", "Quantity On Hand"]
+ORDER_HEADERS = [
+    "Order Reference",
+    "Vendor",
+    "Product",
+    "Confirmation Date",
+    "Expected Arrival",
+    "Billing Status",
+    "Buyer",
+    "Priority",
+    "Total",
+]
+
+
+class BulkUpsertImportTests(unittest.TestCase):
+    def setUp(self):
+        app.config["TESTING"] = True
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir, True)
+        self.addCleanup(app.config.__setitem__, "WTF_CSRF_ENABLED", app.config.get("WTF_CSRF_ENABLED"))
+        app.config["WTF_CSRF_ENABLED"] = False
+        self.client = app.test_client()
+        with app.app_context():
+            ensure_bootstrap()
+            self._cleanup()
+            admin = User.query.filter_by(username="admin").first()
+            if not admin.session_token:
+                admin.issue_session_token()
+                db.session.commit()
+            admin_id, token = admin.id, admin.session_token
+        with self.client.session_transaction() as session:
+            session["_user_id"] = str(admin_id)
+            session["_fresh"] = True
+            session["session_token"] = token
+
+    def tearDown(self):
+        with app.app_context():
+            self._cleanup()
+
+    def _cleanup(self):
+        skus = [sku for (sku,) in db.session.query(Product.sku).filter(Product.name.like(f"{PREFIX}%")) if sku]
+        item_ids = [item_id for (item_id,) in db.session.query(InventoryItem.id).filter(InventoryItem.item_code.in_(skus))]
+        InventoryLedgerEntry.query.filter(InventoryLedgerEntry.inventory_item_id.in_(item_ids)).delete(
+            synchronize_session=False
+        )
+        InventoryItem.query.filter(InventoryItem.id.in_(item_ids)).delete(synchronize_session=False)
+        PurchaseOrderLine.query.filter(PurchaseOrderLine.order_ref.like(f"{PREFIX}%")).delete(
+            synchronize_session=False
+        )
+        # Row-by-row deletes so the search index drops the documents too.
+        for model in (Product, Vendor):
+            for record in model.query.filter(model.name.like(f"{PREFIX}%")):
+                db.session.delete(record)
+        db.session.commit()
+
+    def _write_csv(self, name, headers, rows):
+        path = os.path.join(self.tmpdir, name)
+        with open(path, "w", encoding="utf-8", newline="") as handle:
+            for row in [headers] + rows:
+                handle.write(",".join(row) + "\r\n")
+        return path
+
+    def _record_queries(self):
+        recorder = QueryRecorder(db.engine).start()
+        self.addCleanup(recorder.stop)
+        return recorder
+
+    def _written_rows(self, recorder, table_name):
+        return sum(
+            rows
+            for statement, rows in zip(recorder.statements, recorder.row_counts)
+            if statement.startswith((f"INSERT INTO {table_name} ", f"UPDATE {table_name} "))
+        )
+
+    def test_product_import_assigns_skus_syncs_inventory_and_skips_unchanged_rows(self):
+        rows = [[f"{PREFIX} Part {index}", "100", "60", "Nos", "Nos", str(index)] for index in range(5)]
+        rows.append([f"{PREFIX} Part 1", "150", "60", "Nos", "Nos", "1"])
+        rows.append(["", "abc", "", "", "", ""])
+        rows.append([f"{PREFIX} Broken", "abc", "60", "Nos", "Nos", "1"])
+        path = self._write_csv("products.csv", PRODUCT_HEADERS, rows)
+
+        with app.test_request_context():
+            result = _import_products_upload(path)
+            self.assertEqual((result["created_count"], result["updated_count"]), (5, 1))
+            self.assertEqual(len(result["row_errors"]), 2)
+
+            products = Product.query.filter(Product.name.like(f"{PREFIX}%")).order_by(Product.name).all()
+            self.assertEqual(len(products), 5)
+            self.assertEqual(len({product.sku for product in products}), 5)
+            self.assertTrue(all(product.sku.startswith("ELV-") for product in products))
+            self.assertEqual(products[1].sale_price, 150)
+            item = InventoryItem.query.filter_by(item_code=products[3].sku).one()
+            self.assertEqual((item.description, item.current_stock), (products[3].name, 3))
+            hits = {hit.title for group in global_search(f"{PREFIX}", kinds={"part"}) for hit in group.hits}
+            self.assertIn(f"{PREFIX} Part 4", hits)
+
+        rows = [[f"{PREFIX} Part {index}", "150" if index == 1 else "100", "60", "Nos", "Nos", str(index)] for index in range(5)]
+        rows[2][0] = f"{PREFIX} PART 2"
+        rows[4][5] = "9"
+        path = self._write_csv("products-again.csv", PRODUCT_HEADERS, rows)
+        with app.test_request_context():
+            recorder = self._record_queries()
+            result = _import_products_upload(path)
+            self.assertEqual((result["created_count"], result["updated_count"]), (0, 5))
+            # Only the renamed product and the restocked one are written.
+            self.assertEqual(self._written_rows(recorder, "product"), 2)
+            renamed = Product.query.filter(Product.name == f"{PREFIX} PART 2").one()
+            restocked = Product.query.filter(Product.name == f"{PREFIX} Part 4").one()
+            self.assertEqual(InventoryItem.query.filter_by(item_code=restocked.sku).one().current_stock, 9)
+            self.assertEqual(InventoryItem.query.filter_by(item_code=renamed.sku).one().description, renamed.name)
+
+    def test_failed_intermediate_batch_rolls_back_the_whole_import(self):
+        rows = [[f"{PREFIX} Part {index}", "100", "60", "Nos", "Nos", str(index)] for index in range(5)]
+        path = self._write_csv("products.csv", PRODUCT_HEADERS, rows)
+        calls = []
+
+        def _fail_first_batch(model, ids):
+            calls.append(list(ids))
+            raise OperationalError("INSERT INTO search_document", {}, Exception("database is locked"))
+
+        with app.test_request_context():
+            with mock.patch.object(bulk_upsert, "BULK_UPSERT_BATCH_SIZE", 2), mock.patch.object(
+                bulk_upsert, "reindex_records", side_effect=_fail_first_batch
+            ):
+                result = _import_products_upload(path)
+
+            self.assertEqual(result["fatal_error"], "Could not save product records due to a database error.")
+            # Only the first automatic batch was attempted, and it was rolled back.
+            self.assertEqual(len(calls), 1)
+            self.assertEqual(Product.query.filter(Product.name.like(f"{PREFIX}%")).count(), 0)
+
+    def test_vendor_upload_merges_existing_values(self):
+        with app.app_context():
+            db.session.add(
+                Vendor(name=f"{PREFIX} Steelworks", vendor_code=f"{PREFIX}-V1", address="Old address", is_active=False)
+            )
+            db.session.commit()
+        headers = ["Complete Name", "Activities", "City", "Country", "Email", "Phone", "Salesperson"]
+        body = "\r\n".join(
+            ",".join(row)
+            for row in [
+                headers,
+                [f"{PREFIX} steelworks", "", "", "", "sales@example.com", "", ""],
+                [f"{PREFIX} Cables", "", "Pune", "India", "", "98200", ""],
+                [f"{PREFIX} Cables", "", "Pune", "India", "bad-email", "", ""],
+            ]
+        )
+        response = self.client.post(
+            "/purchase/vendors/upload",
+            data={"vendor_upload_file": (io.BytesIO(body.encode("utf-8")), "vendors.csv")},
+            content_type="multipart/form-data",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b"Row 4: Email format is invalid", response.data)
+
+        with app.app_context():
+            vendors = {vendor.name: vendor for vendor in Vendor.query.filter(Vendor.name.like(f"{PREFIX}%"))}
+            self.assertEqual(set(vendors), {f"{PREFIX} steelworks", f"{PREFIX} Cables"})
+            steel = vendors[f"{PREFIX} steelworks"]
+            self.assertEqual((steel.vendor_code, steel.address, steel.is_active), (f"{PREFIX}-V1", "Old address", False))
+            self.assertEqual(steel.email, "sales@example.com")
+            cables = vendors[f"{PREFIX} Cables"]
+            self.assertEqual((cables.address, cables.is_active, cables.status), ("Pune, India", True, "Active"))
+
+    def test_purchase_order_lines_upsert_by_reference_and_touch_vendors(self):
+        with app.app_context():
+            db.session.add(Vendor(name=f"{PREFIX} Motors"))
+            db.session.commit()
+        rows = [
+            [f"{PREFIX}-PO1", f"{PREFIX} motors", "Rope", "2026-02-01", "2026-02-10", "Billed", "Asha", "Normal", "1200.50"],
+            [f"{PREFIX}-PO1", f"{PREFIX} motors", "Sheave", "2026-02-01", "", "", "", "", "80"],
+            [f"{PREFIX}-PO1", f"{PREFIX} motors", "Rope", "2026-02-01", "2026-02-12", "Billed", "Asha", "Normal", "1200.50"],
+            [f"{PREFIX}-PO2", "", "Rope", "someday", "", "", "", "", ""],
+        ]
+        path = self._write_csv("orders.csv", ORDER_HEADERS, rows)
+
+        with app.test_request_context():
+            result = _import_odoo_purchase_order_lines(path)
+            self.assertEqual((result["created_count"], result["updated_count"]), (2, 1))
+            self.assertEqual(result["row_errors"], ["Row 5: Could not parse Confirmation Date; Missing Vendor"])
+            lines = PurchaseOrderLine.query.filter(PurchaseOrderLine.order_ref.like(f"{PREFIX}%")).all()
+            self.assertEqual(len(lines), 2)
+            rope = next(line for line in lines if line.product_name == "Rope")
+            self.assertEqual(rope.total_amount, Decimal("1200.50"))
+            self.assertEqual(rope.expected_arrival.day, 12)
+            self.assertIsNotNone(Vendor.query.filter_by(name=f"{PREFIX} Motors").one().last_used_at)
+
+        with app.test_request_context():
+            recorder = self._record_queries()
+            result = _import_odoo_purchase_order_lines(path)
+            self.assertEqual((result["created_count"], result["updated_count"]), (0, 3))
+            self.assertEqual(self._written_rows(recorder, "purchase_order_line"), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
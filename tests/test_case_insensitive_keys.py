@@ -0,0 +1,74 @@
+import os
+import tempfile
+import textwrap
+import unittest
+from unittest import mock
+
+from sqlalchemy import select
+
+from app import app, db, ensure_bootstrap
+from eleva_app import indexing
+from eleva_app.indexing import advise_indexes, ci_key, ensure_case_insensitive_keys
+from eleva_app.models import InventoryItem, Product
+
+
+class CaseInsensitiveKeyTests(unittest.TestCase):
+    def setUp(self):
+        app.config["TESTING"] = True
+        with app.app_context():
+            ensure_bootstrap()
+
+    def _plan(self, query):
+        statement = query.statement.compile(db.engine, compile_kwargs={"literal_binds": True})
+        rows = db.session.execute(db.text(f"EXPLAIN QUERY PLAN {statement}")).all()
+        return " | ".join(row[-1] for row in rows)
+
+    def test_lookups_and_joins_use_the_expression_indexes(self):
+        with app.app_context():
+            self.assertEqual(ensure_case_insensitive_keys(), [])
+            plan = self._plan(Product.query.filter(ci_key(Product.name) == "bracket"))
+            self.assertIn("ix_product_name_lower", plan)
+
+            plan = self._plan(
+                InventoryItem.query.join(Product, ci_key(Product.sku) == ci_key(InventoryItem.item_code))
+            )
+            # Either side of the join can drive; the other is a lower() index seek.
+            self.assertRegex(plan, r"SEARCH \w+ USING INDEX ix_\w+_lower \(<expr>=\?\)")
+
+    def test_key_column_dialects_compare_the_persisted_key(self):
+        with app.app_context():
+            with mock.patch.object(indexing, "_uses_key_columns", return_value=True):
+                keyed = str(select(Product.id).where(ci_key(Product.name) == "x"))
+                unkeyed = str(select(Product.id).where(ci_key(Product.category) == "x"))
+            self.assertIn("product.name_key =", keyed)
+            self.assertIn("lower(product.category)", unkeyed)
+
+    def test_advisor_flags_unindexed_predicates(self):
+        source = textwrap.dedent(
+            """
+            def handler(term, name):
+                like = f"%{term}%"
+                Department.query.filter(func.lower(Department.name) == name.lower())
+                Product.query.filter(ci_key(Product.name) == name.lower())
+                Customer.query.filter(Customer.company_name.ilike(like))
+            """
+        )
+        handle = tempfile.NamedTemporaryFile("w", suffix=".py", delete=False)
+        self.addCleanup(os.remove, handle.name)
+        with handle:
+            handle.write(source)
+        with app.app_context():
+            findings = {
+                (finding.table, finding.column, finding.kind): finding
+                for finding in advise_indexes([handle.name])
+            }
+        self.assertFalse(findings[("department", "name", "lower")].supported)
+        self.assertTrue(findings[("product", "name", "lower")].supported)
+        contains = findings[("customer", "company_name", "ilike")]
+        self.assertTrue(contains.leading_wildcard)
+        self.assertFalse(contains.supported)
+        self.assertEqual(len(findings[("department", "name", "lower")].locations), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
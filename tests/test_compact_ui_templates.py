@@ -36,7 +36,9 @@ class CompactUiTemplateTests(unittest.TestCase):
         self.assertIn("_process_guides_panel.html", template)
 
     def test_dashboard_summary_box_removed_and_filters_are_compact(self):
-        template = self.read_template("templates/dashboard.html")
+        template = self.read_template("templates/dashboard.html") + self.read_template(
+            "templates/partials/dashboard_workspace.html"
+        )
         self.assertNotIn("Pending Work for", template)
         self.assertNotIn("Only tasks and activities that are still pending", template)
         self.assertIn("data-dashboard-filter-toolbar", template)
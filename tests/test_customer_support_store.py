@@ -0,0 +1,130 @@
+import datetime
+import json
+import os
+import tempfile
+import unittest
+
+import app
+from eleva_app import db
+from eleva_app.models import SupportCallLog, SupportTicket
+
+
+class CustomerSupportStoreTests(unittest.TestCase):
+    def setUp(self):
+        self.app_context = app.app.app_context()
+        self.app_context.push()
+        app.ensure_bootstrap()
+        self._cleanup()
+
+    def tearDown(self):
+        db.session.rollback()
+        self._cleanup()
+        self.app_context.pop()
+
+    def _cleanup(self):
+        for ticket in SupportTicket.query.filter(SupportTicket.ticket_id.like("CS-99%")).all():
+            db.session.delete(ticket)
+        SupportCallLog.query.filter(SupportCallLog.call_id.like("ZCALL-%")).delete(
+            synchronize_session=False
+        )
+        db.session.commit()
+
+    def _ticket(self, ticket_id, **overrides):
+        created_at = datetime.datetime(2026, 5, 1, 9, 30)
+        ticket = {
+            "id": ticket_id,
+            "subject": "Lift stuck at 3rd floor",
+            "customer": "Zeta Towers",
+            "contact_name": "Ravi",
+            "category": "Support – AMC",
+            "category_key": "support-amc",
+            "status": "Open",
+            "priority": "High",
+            "assignee": "Unassigned",
+            "created_at": created_at,
+            "updated_at": created_at,
+            "sla": {"first_response_hours": 2, "resolution_hours": 24},
+            "timeline": [
+                {
+                    "timestamp": created_at,
+                    "type": "status",
+                    "label": "Ticket logged",
+                    "actor": "Support Desk",
+                }
+            ],
+            "linked_tasks": [
+                {"id": "LT-1", "title": "Call back", "status": "Open", "due_date": datetime.date(2026, 5, 2)}
+            ],
+            "linked_sales_opportunity": {"id": 987654, "title": "Upgrade"},
+        }
+        ticket.update(overrides)
+        return ticket
+
+    def test_ticket_round_trips_through_database(self):
+        app._save_customer_support_ticket(self._ticket("CS-99001"))
+
+        loaded = app._get_customer_support_ticket("CS-99001")
+
+        self.assertEqual(loaded["subject"], "Lift stuck at 3rd floor")
+        self.assertEqual(loaded["sla"]["resolution_hours"], 24)
+        self.assertEqual(loaded["timeline"][0]["timestamp"], datetime.datetime(2026, 5, 1, 9, 30))
+        self.assertEqual(loaded["linked_tasks"][0]["due_date"], datetime.date(2026, 5, 2))
+        self.assertTrue(app._ticket_has_open_linked_tasks(loaded))
+        self.assertEqual(app._get_linked_ticket_for_opportunity(987654)["id"], "CS-99001")
+
+    def test_updates_only_touch_the_saved_ticket(self):
+        app._save_customer_support_ticket(self._ticket("CS-99002"))
+        ticket = app._get_customer_support_ticket("CS-99002")
+        ticket["status"] = "resolved"
+        ticket["timeline"].append({"type": "comment", "comment": "Fixed", "actor": "Tech"})
+        app._save_customer_support_ticket(ticket)
+
+        loaded = app._get_customer_support_ticket("CS-99002")
+        self.assertEqual(loaded["status"], "Resolved")
+        self.assertEqual(len(loaded["timeline"]), 2)
+        self.assertEqual(SupportTicket.query.filter_by(ticket_id="CS-99002").count(), 1)
+
+    def test_ticket_id_generation_uses_highest_number(self):
+        app._save_customer_support_ticket(self._ticket("CS-99500"))
+
+        self.assertEqual(app._generate_customer_support_ticket_id(), "CS-99501")
+
+    def test_summary_counts_exclude_other_department(self):
+        before = app._customer_support_summary()["counts"].get("Open", 0)
+        app._save_customer_support_ticket(self._ticket("CS-99003"))
+        app._save_customer_support_ticket(
+            self._ticket("CS-99004", category="Other Department", category_key="other-dept")
+        )
+
+        after = app._customer_support_summary()["counts"].get("Open", 0)
+        self.assertEqual(after, before + 1)
+
+    def test_import_legacy_json_is_idempotent(self):
+        payload = {
+            "tickets": [app._encode_special_types(self._ticket("CS-99005"))],
+            "call_logs": [
+                {
+                    "call_id": "ZCALL-1",
+                    "ticket_id": "CS-99005",
+                    "subject": "Breakdown call",
+                    "category": "Support – AMC",
+                    "status": "Open",
+                    "caller": "Ravi",
+                    "logged_at": {"__type__": "datetime", "value": "2026-05-01T09:00:00"},
+                }
+            ],
+        }
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "customer_support_data.json")
+            with open(path, "w", encoding="utf-8") as fp:
+                json.dump(payload, fp)
+
+            self.assertEqual(app.import_customer_support_json(path), (1, 1))
+            self.assertEqual(app.import_customer_support_json(path), (1, 0))
+
+        records = app._customer_support_filter_calls(status="open", search="breakdown")
+        self.assertEqual([record["call_id"] for record in records], ["ZCALL-1"])
+
+
+if __name__ == "__main__":
+    unittest.main()
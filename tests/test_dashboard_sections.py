@@ -0,0 +1,105 @@
+import datetime
+import unittest
+
+from app import app, db, ensure_bootstrap
+from eleva_app.models import DesignTask, SRTTask, User
+from eleva_app.perf import QueryRecorder
+from eleva_app.refcache import reference_cache
+
+PREFIX = "ZDASH"
+
+
+class DashboardSectionTests(unittest.TestCase):
+    def setUp(self):
+        app.config["TESTING"] = True
+        self.client = app.test_client()
+        with app.app_context():
+            ensure_bootstrap()
+            self._cleanup()
+            user = User(username=f"{PREFIX.lower()}_designer", role="Design", active=True)
+            user.set_password("secret")
+            user.issue_session_token()
+            db.session.add(user)
+            db.session.flush()
+            db.session.add_all(
+                [
+                    DesignTask(
+                        task_type="design",
+                        task_name=f"{PREFIX} lobby drawing",
+                        status="Drawing pending",
+                        assigned_to_user_id=user.id,
+                        due_date=datetime.date.today(),
+                    ),
+                    SRTTask(
+                        summary=f"{PREFIX} shaft check",
+                        status="Scheduled",
+                        assigned_to_id=user.id,
+                    ),
+                ]
+            )
+            db.session.commit()
+            self.user_id, token = user.id, user.session_token
+            reference_cache.clear()
+        with self.client.session_transaction() as session:
+            session["_user_id"] = str(self.user_id)
+            session["_fresh"] = True
+            session["session_token"] = token
+
+    def tearDown(self):
+        with app.app_context():
+            self._cleanup()
+
+    def _cleanup(self):
+        DesignTask.query.filter(DesignTask.task_name.like(f"{PREFIX}%")).delete(synchronize_session=False)
+        SRTTask.query.filter(SRTTask.summary.like(f"{PREFIX}%")).delete(synchronize_session=False)
+        User.query.filter_by(username=f"{PREFIX.lower()}_designer").delete(synchronize_session=False)
+        db.session.commit()
+
+    def _get(self, url):
+        with app.app_context():
+            engine = db.engine
+        with QueryRecorder(engine) as recorder:
+            response = self.client.get(url, headers={"HX-Request": "true"})
+        return response, recorder.statements
+
+    def test_page_shell_loads_panels_over_htmx(self):
+        response = self.client.get("/dashboard")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'hx-get="/dashboard/section/my?mode=dashboard"', response.data)
+        self.assertNotIn(f"{PREFIX} lobby drawing".encode(), response.data)
+
+        response, _ = self._get("/dashboard/section/my")
+        self.assertIn(f"{PREFIX} lobby drawing".encode(), response.data)
+        self.assertIn(f"{PREFIX} shaft check".encode(), response.data)
+        self.assertIn(b'hx-swap-oob="innerHTML:#dashboard-count-my">2<', response.data)
+
+    def test_modules_stay_cached_until_their_tables_change(self):
+        first, _ = self._get("/dashboard/section/my")
+        second, statements = self._get("/dashboard/section/my")
+        self.assertEqual(first.data, second.data)
+        self.assertEqual([sql for sql in statements if "design_task" in sql or "srt_tasks" in sql], [])
+
+        with app.app_context():
+            task = SRTTask.query.filter_by(summary=f"{PREFIX} shaft check").one()
+            task.summary = f"{PREFIX} shaft re-check"
+            db.session.commit()
+
+        response, statements = self._get("/dashboard/section/my")
+        self.assertIn(f"{PREFIX} shaft re-check".encode(), response.data)
+        self.assertTrue(any("FROM srt_tasks" in sql for sql in statements))
+        self.assertFalse(any("FROM design_task" in sql for sql in statements))
+
+    def test_sequential_and_concurrent_loading_agree(self):
+        app.config["DASHBOARD_MODULE_WORKERS"] = 1
+        self.addCleanup(app.config.pop, "DASHBOARD_MODULE_WORKERS")
+        sequential, _ = self._get("/dashboard/section/my")
+
+        app.config["DASHBOARD_MODULE_WORKERS"] = 4
+        with app.app_context():
+            reference_cache.clear()
+        concurrent, _ = self._get("/dashboard/section/my")
+        self.assertEqual(sequential.data, concurrent.data)
+
+
+if __name__ == "__main__":
+    unittest.main()
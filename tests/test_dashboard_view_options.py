@@ -4,7 +4,10 @@ from pathlib import Path
 
 class DashboardViewOptionsTemplateTests(unittest.TestCase):
     def setUp(self):
-        self.template = Path("templates/dashboard.html").read_text(encoding="utf-8")
+        self.template = "".join(
+            Path(path).read_text(encoding="utf-8")
+            for path in ("templates/dashboard.html", "templates/partials/dashboard_workspace.html")
+        )
 
     def test_dashboard_has_table_and_kanban_view_options(self):
         self.assertIn('data-view-mode-value="table"', self.template)
@@ -0,0 +1,80 @@
+import unittest
+
+from app import app, db, ensure_bootstrap
+from eleva_app.models import DesignTask, User
+from eleva_app.perf import QueryRecorder
+from eleva_app.refcache import reference_cache
+
+PREFIX = "ZBOARD"
+
+
+class DesignBoardTests(unittest.TestCase):
+    def setUp(self):
+        app.config["TESTING"] = True
+        self.client = app.test_client()
+        with app.app_context():
+            ensure_bootstrap()
+            self._cleanup()
+            admin = User.query.filter_by(username="admin").first()
+            if not admin.session_token:
+                admin.issue_session_token()
+                db.session.commit()
+            self.admin_id, token = admin.id, admin.session_token
+            for index, status in enumerate(["In progress", "Hold", "BOM pending"] * 10):
+                db.session.add(
+                    DesignTask(
+                        task_type="general" if status != "BOM pending" else "design",
+                        task_name=f"{PREFIX} task {index}",
+                        project_name=f"{PREFIX} tower {index}",
+                        status=status,
+                        assigned_to_user_id=self.admin_id,
+                    )
+                )
+            db.session.commit()
+            reference_cache.clear()
+        with self.client.session_transaction() as session:
+            session["_user_id"] = str(self.admin_id)
+            session["_fresh"] = True
+            session["session_token"] = token
+
+    def tearDown(self):
+        with app.app_context():
+            self._cleanup()
+
+    def _cleanup(self):
+        DesignTask.query.filter(DesignTask.task_name.like(f"{PREFIX}%")).delete(synchronize_session=False)
+        db.session.commit()
+
+    def _get(self, url):
+        with app.app_context():
+            engine = db.engine
+        with QueryRecorder(engine) as recorder:
+            response = self.client.get(url)
+        return response, [sql for sql in recorder.statements if "FROM design_task" in sql]
+
+    def test_board_loads_every_card_in_one_query(self):
+        response, board_queries = self._get("/design/tasks")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(board_queries), 1)
+        self.assertEqual(response.data.count(f">{PREFIX} task ".encode()), 30)
+        self.assertIn(f"{PREFIX} tower 7".encode(), response.data)
+
+        response, board_queries = self._get("/design/tasks")
+        self.assertEqual(board_queries, [])
+        _, board_queries = self._get("/design")
+        self.assertEqual(board_queries, [])
+
+    def test_task_changes_reach_the_cached_board(self):
+        self._get("/design/tasks")
+        with app.app_context():
+            task = DesignTask.query.filter_by(task_name=f"{PREFIX} task 0").one()
+            task.task_name = f"{PREFIX} renamed"
+            db.session.commit()
+
+        response, board_queries = self._get("/design/tasks")
+        self.assertEqual(len(board_queries), 1)
+        self.assertIn(f"{PREFIX} renamed".encode(), response.data)
+
+
+if __name__ == "__main__":
+    unittest.main()
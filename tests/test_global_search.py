@@ -0,0 +1,105 @@
+import unittest
+from unittest import mock
+
+from app import app, db, ensure_bootstrap
+from eleva_app import search
+from eleva_app.models import Customer, Lift, User, Vendor
+from eleva_app.search import global_search, rebuild_search_index
+
+PREFIX = "ZSRCH"
+
+
+class GlobalSearchTests(unittest.TestCase):
+    def setUp(self):
+        app.config["TESTING"] = True
+        with app.app_context():
+            ensure_bootstrap()
+            self._cleanup()
+            customer = Customer(customer_code=f"{PREFIX}-C1", company_name=f"{PREFIX} Zephyrine Towers", city="Pune")
+            db.session.add(customer)
+            db.session.add(Lift(lift_code=f"{PREFIX}-L1", customer_code=customer.customer_code, notes="Zephyrine annex car"))
+            db.session.add(Vendor(name=f"{PREFIX} Quillon Steel", contact_person="Asha"))
+            db.session.commit()
+
+    def tearDown(self):
+        with app.app_context():
+            self._cleanup()
+
+    def _cleanup(self):
+        for model, column in ((Lift, Lift.lift_code), (Customer, Customer.customer_code), (Vendor, Vendor.name)):
+            for record in model.query.filter(column.like(f"{PREFIX}%")):
+                db.session.delete(record)
+        db.session.commit()
+
+    def _hits(self, query, **kwargs):
+        return {
+            (hit.kind, hit.title)
+            for group in global_search(query, **kwargs)
+            for hit in group.hits
+        }
+
+    def test_orm_writes_keep_the_index_current(self):
+        with app.app_context():
+            self.assertEqual(
+                self._hits("zephyr"),
+                {("customer", f"{PREFIX} Zephyrine Towers"), ("lift", f"{PREFIX}-L1")},
+            )
+            groups = global_search("zephyrine")
+            self.assertEqual(groups[0].kind, "customer")
+            lift_hit = next(group for group in groups if group.kind == "lift").hits[0]
+            self.assertIn("<mark>Zephyrine</mark> annex", str(lift_hit.snippet))
+
+            customer = Customer.query.filter_by(customer_code=f"{PREFIX}-C1").one()
+            customer.company_name = f"{PREFIX} Marigold Plaza"
+            db.session.commit()
+            self.assertEqual(self._hits("zephyrine towers"), set())
+            self.assertEqual(self._hits("marigold"), {("customer", f"{PREFIX} Marigold Plaza")})
+
+            db.session.delete(Vendor.query.filter_by(name=f"{PREFIX} Quillon Steel").one())
+            db.session.commit()
+            self.assertEqual(self._hits("quillon"), set())
+
+    def test_bulk_deletes_are_hidden_and_rebuild_drops_them(self):
+        with app.app_context():
+            Lift.query.filter(Lift.lift_code.like(f"{PREFIX}%")).delete(synchronize_session=False)
+            db.session.commit()
+            self.assertEqual(self._hits("zephyrine"), {("customer", f"{PREFIX} Zephyrine Towers")})
+
+            counts = rebuild_search_index()
+            self.assertEqual(counts["customer"], Customer.query.count())
+            self.assertEqual(self._hits("zephyrine", kinds={"lift"}), set())
+
+    def test_like_fallback_matches_the_same_records(self):
+        with app.app_context(), mock.patch.object(search, "search_index_available", return_value=False):
+            self.assertEqual(
+                self._hits("zephyr"),
+                {("customer", f"{PREFIX} Zephyrine Towers"), ("lift", f"{PREFIX}-L1")},
+            )
+            self.assertEqual(self._hits("quillon asha"), {("vendor", f"{PREFIX} Quillon Steel")})
+
+    def test_search_page_and_htmx_partial(self):
+        client = app.test_client()
+        with app.app_context():
+            admin = User.query.filter_by(username="admin").first()
+            if not admin.session_token:
+                admin.issue_session_token()
+                db.session.commit()
+            admin_id, token = admin.id, admin.session_token
+        with client.session_transaction() as session:
+            session["_user_id"] = str(admin_id)
+            session["_fresh"] = True
+            session["session_token"] = token
+
+        page = client.get("/search?q=zephyrine")
+        self.assertEqual(page.status_code, 200)
+        self.assertIn(f"{PREFIX} Zephyrine Towers".encode(), page.data)
+        self.assertIn(b"/service/customers/", page.data)
+
+        partial = client.get("/search?q=quillon&kind=vendor", headers={"HX-Request": "true"})
+        self.assertEqual(partial.status_code, 200)
+        self.assertNotIn(b"<html", partial.data)
+        self.assertIn(f"{PREFIX} Quillon Steel".encode(), partial.data)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,244 @@
+import datetime
+import unittest
+
+from app import (
+    _backfill_inventory_ledger,
+    _post_inventory_ledger,
+    app,
+    db,
+    ensure_bootstrap,
+    inventory_stock_as_of,
+)
+from eleva_app.models import (
+    DeliveryChallan,
+    DeliveryChallanItem,
+    InventoryItem,
+    InventoryLedgerEntry,
+    StockAdjustment,
+    User,
+)
+
+PREFIX = "ZLEDGER"
+
+
+class InventoryLedgerTests(unittest.TestCase):
+    def setUp(self):
+        app.config["TESTING"] = True
+        with app.app_context():
+            ensure_bootstrap()
+            self._cleanup()
+
+    def tearDown(self):
+        with app.app_context():
+            self._cleanup()
+
+    def _cleanup(self):
+        item_ids = [
+            item_id
+            for (item_id,) in db.session.query(InventoryItem.id).filter(
+                InventoryItem.item_code.like(f"{PREFIX}%")
+            )
+        ]
+        if item_ids:
+            InventoryLedgerEntry.query.filter(
+                InventoryLedgerEntry.inventory_item_id.in_(item_ids)
+            ).delete(synchronize_session=False)
+            StockAdjustment.query.filter(
+                StockAdjustment.inventory_item_id.in_(item_ids)
+            ).delete(synchronize_session=False)
+            InventoryItem.query.filter(InventoryItem.id.in_(item_ids)).delete(
+                synchronize_session=False
+            )
+        dispatch_ids = [
+            dispatch_id
+            for (dispatch_id,) in db.session.query(DeliveryChallan.id).filter(
+                DeliveryChallan.dc_number.like(f"{PREFIX}%")
+            )
+        ]
+        if dispatch_ids:
+            DeliveryChallanItem.query.filter(
+                DeliveryChallanItem.delivery_challan_id.in_(dispatch_ids)
+            ).delete(synchronize_session=False)
+            DeliveryChallan.query.filter(DeliveryChallan.id.in_(dispatch_ids)).delete(
+                synchronize_session=False
+            )
+        db.session.commit()
+
+    def _item(self, suffix="A", stock=10):
+        item = InventoryItem(
+            item_code=f"{PREFIX}-{suffix}",
+            description=f"{PREFIX} {suffix}",
+            current_stock=stock,
+            book_stock=stock,
+        )
+        db.session.add(item)
+        db.session.commit()
+        return item
+
+    def _move(self, item, posted_at, physical_delta, book_delta=0):
+        item.current_stock += physical_delta
+        item.book_stock += book_delta
+        _post_inventory_ledger(
+            item,
+            "adjustment",
+            physical_delta=physical_delta,
+            book_delta=book_delta,
+            posted_at=posted_at,
+        )
+        db.session.commit()
+
+    def _client(self):
+        client = app.test_client()
+        with app.app_context():
+            admin = User.query.filter_by(username="admin").first()
+            if not admin.session_token:
+                admin.issue_session_token()
+                db.session.commit()
+            admin_id, token = admin.id, admin.session_token
+        with client.session_transaction() as session:
+            session["_user_id"] = str(admin_id)
+            session["_fresh"] = True
+            session["session_token"] = token
+        return client
+
+    def test_monthly_checkpoints_and_stock_as_of(self):
+        with app.app_context():
+            item = self._item()
+            self._move(item, datetime.datetime(2026, 1, 10, 9), 5)
+            self._move(item, datetime.datetime(2026, 1, 20, 9), -3, -3)
+            self._move(item, datetime.datetime(2026, 3, 2, 9), 4)
+
+            checkpoints = (
+                InventoryLedgerEntry.query.filter_by(
+                    inventory_item_id=item.id, entry_type="checkpoint"
+                )
+                .order_by(InventoryLedgerEntry.posted_at)
+                .all()
+            )
+            self.assertEqual(
+                [(row.posted_at, row.physical_balance) for row in checkpoints],
+                [
+                    (datetime.datetime(2026, 1, 1), 10),
+                    (datetime.datetime(2026, 3, 1), 12),
+                ],
+            )
+
+            self.assertNotIn(item.id, inventory_stock_as_of(datetime.date(2025, 12, 31), [item.id]))
+            self.assertEqual(inventory_stock_as_of(datetime.date(2026, 1, 10), [item.id])[item.id], (15, 10))
+            self.assertEqual(inventory_stock_as_of(datetime.date(2026, 2, 15), [item.id])[item.id], (12, 7))
+            self.assertEqual(inventory_stock_as_of(datetime.date(2026, 3, 31), [item.id])[item.id], (16, 7))
+
+    def test_adjustment_and_challan_post_to_ledger(self):
+        with app.app_context():
+            item = self._item(stock=10)
+            item_id = item.id
+            dispatch = DeliveryChallan(dc_number=f"{PREFIX}-DC1", status="Draft")
+            dispatch.items.append(
+                DeliveryChallanItem(item_code=item.item_code, description=item.description, qty_delivered=4)
+            )
+            db.session.add(dispatch)
+            db.session.commit()
+            dispatch_id = dispatch.id
+
+        client = self._client()
+        self.addCleanup(app.config.__setitem__, "WTF_CSRF_ENABLED", app.config.get("WTF_CSRF_ENABLED", True))
+        app.config["WTF_CSRF_ENABLED"] = False
+        response = client.post(
+            f"/inventory/item/{item_id}/adjust",
+            data={"new_physical_stock": "12", "reason": f"{PREFIX} recount"},
+        )
+        self.assertEqual(response.status_code, 302)
+        response = client.post(
+            f"/store/dispatch/{dispatch_id}/complete",
+            data={"receiver_name": "Site", "receiver_signature": "data:image/png;base64,AAAA"},
+        )
+        self.assertEqual(response.status_code, 302)
+
+        with app.app_context():
+            entries = (
+                InventoryLedgerEntry.query.filter(
+                    InventoryLedgerEntry.inventory_item_id == item_id,
+                    InventoryLedgerEntry.entry_type != "checkpoint",
+                )
+                .order_by(InventoryLedgerEntry.posted_at, InventoryLedgerEntry.id)
+                .all()
+            )
+            self.assertEqual(
+                [(row.entry_type, row.physical_delta, row.physical_balance, row.book_balance) for row in entries],
+                [("adjustment", 2, 12, 10), ("challan", -4, 8, 6)],
+            )
+            self.assertEqual(entries[1].source_id, dispatch_id)
+            self.assertEqual(db.session.get(InventoryItem, item_id).current_stock, 8)
+
+        page = client.get(f"/inventory/item/{item_id}/movements?as_of={datetime.date.today().isoformat()}")
+        self.assertEqual(page.status_code, 200)
+        self.assertIn(b"Delivery Challan", page.data)
+        self.assertIn(f"{PREFIX}-DC1".encode(), page.data)
+
+    def test_backfill_replays_legacy_history(self):
+        with app.app_context():
+            item = self._item(stock=7)
+            db.session.add_all(
+                [
+                    StockAdjustment(
+                        inventory_item_id=item.id,
+                        old_physical_stock=0,
+                        new_physical_stock=10,
+                        old_book_stock=0,
+                        new_book_stock=10,
+                        reason="Opening",
+                        adjustment_type="both",
+                        created_at=datetime.datetime(2025, 11, 3),
+                    ),
+                    DeliveryChallan(
+                        dc_number=f"{PREFIX}-DC2",
+                        is_completed=True,
+                        delivered_at=datetime.datetime(2025, 12, 5),
+                        items=[DeliveryChallanItem(item_code=item.item_code.lower(), qty_delivered=3)],
+                    ),
+                ]
+            )
+            db.session.commit()
+
+            self.assertGreater(_backfill_inventory_ledger(), 0)
+            self.assertEqual(
+                inventory_stock_as_of(datetime.date(2025, 11, 30), [item.id])[item.id], (10, 10)
+            )
+            self.assertEqual(
+                inventory_stock_as_of(datetime.date(2025, 12, 31), [item.id])[item.id], (7, 7)
+            )
+            rows_before = InventoryLedgerEntry.query.filter_by(inventory_item_id=item.id).count()
+            _backfill_inventory_ledger()
+            self.assertEqual(
+                InventoryLedgerEntry.query.filter_by(inventory_item_id=item.id).count(), rows_before
+            )
+
+    def test_backfill_includes_items_that_only_have_merge_rows(self):
+        with app.app_context():
+            item = self._item(stock=9)
+            _post_inventory_ledger(item, "merge", physical_delta=2, book_delta=2, reference="Merged legacy")
+            db.session.add(
+                StockAdjustment(
+                    inventory_item_id=item.id,
+                    old_physical_stock=0,
+                    new_physical_stock=7,
+                    old_book_stock=0,
+                    new_book_stock=7,
+                    reason="Opening",
+                    adjustment_type="both",
+                    created_at=datetime.datetime(2025, 11, 3),
+                )
+            )
+            db.session.commit()
+
+            _backfill_inventory_ledger()
+            self.assertEqual(
+                inventory_stock_as_of(datetime.date(2025, 11, 30), [item.id])[item.id], (7, 7)
+            )
+            self.assertEqual(
+                inventory_stock_as_of(datetime.datetime.utcnow(), [item.id])[item.id], (9, 9)
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,193 @@
+import datetime
+import unittest
+
+from app import (
+    _merge_legacy_inventory_item_keys,
+    _post_inventory_ledger,
+    _sync_inventory_with_products,
+    app,
+    db,
+    ensure_bootstrap,
+    inventory_stock_as_of,
+)
+from eleva_app.models import InventoryItem, InventoryLedgerEntry, Product, User
+from eleva_app.perf import QueryRecorder
+
+PREFIX = "ZINVSYNC"
+
+
+class InventorySyncTests(unittest.TestCase):
+    def setUp(self):
+        app.config["TESTING"] = True
+        with app.app_context():
+            ensure_bootstrap()
+            self._cleanup()
+
+    def tearDown(self):
+        with app.app_context():
+            self._cleanup()
+
+    def _cleanup(self):
+        skus = [
+            sku
+            for (sku,) in db.session.query(Product.sku).filter(Product.name.like(f"{PREFIX}%"))
+            if sku
+        ]
+        items = InventoryItem.query.filter(
+            InventoryItem.item_code.in_(skus)
+            | InventoryItem.item_code.like(f"{PREFIX}%")
+            | InventoryItem.description.like(f"{PREFIX}%")
+        )
+        item_ids = [item.id for item in items]
+        InventoryLedgerEntry.query.filter(InventoryLedgerEntry.inventory_item_id.in_(item_ids)).delete(
+            synchronize_session=False
+        )
+        InventoryItem.query.filter(InventoryItem.id.in_(item_ids)).delete(synchronize_session=False)
+        Product.query.filter(Product.name.like(f"{PREFIX}%")).delete(synchronize_session=False)
+        db.session.commit()
+
+    def _inventory_for(self, product):
+        return InventoryItem.query.filter(
+            InventoryItem.item_code == product.sku
+        ).one()
+
+    def test_new_product_gets_sku_and_inventory_row(self):
+        with app.app_context():
+            product = Product(name=f"{PREFIX} Door Operator", uom="Nos", qty_on_hand=4)
+            db.session.add(product)
+            db.session.commit()
+
+            self.assertTrue(product.sku.startswith("ELV-"))
+            item = self._inventory_for(product)
+            self.assertEqual(item.description, product.name)
+            self.assertEqual(item.unit, "Nos")
+            self.assertEqual(item.current_stock, 4)
+            self.assertEqual(item.book_stock, 4)
+
+    def test_product_edit_refreshes_details_without_clobbering_postings(self):
+        with app.app_context():
+            product = Product(name=f"{PREFIX} Rope", sku=f"{PREFIX}-ROPE", purchase_uom="Mtr", qty_on_hand=10)
+            db.session.add(product)
+            db.session.commit()
+            item = self._inventory_for(product)
+            item.current_stock = 25  # e.g. a GRN receipt
+            db.session.commit()
+
+            product.name = f"{PREFIX} Rope 8mm"
+            db.session.commit()
+            db.session.refresh(item)
+            self.assertEqual(item.description, f"{PREFIX} Rope 8mm")
+            self.assertEqual(item.unit, "Mtr")
+            self.assertEqual(item.current_stock, 25)
+
+            product.qty_on_hand = 12  # Odoo re-import snapshot
+            db.session.commit()
+            db.session.refresh(item)
+            self.assertEqual(item.current_stock, 12)
+
+            # Stock set from the parts master is posted to the ledger, so
+            # as-of reads agree with the item (the GRN above bypassed it).
+            entries = (
+                InventoryLedgerEntry.query.filter_by(inventory_item_id=item.id, entry_type="product_sync")
+                .order_by(InventoryLedgerEntry.id)
+                .all()
+            )
+            self.assertEqual(
+                [(entry.physical_delta, entry.physical_balance, entry.source_id) for entry in entries],
+                [(10, 10, product.id), (-13, 12, product.id)],
+            )
+            self.assertEqual(
+                inventory_stock_as_of(datetime.datetime.utcnow(), [item.id]), {item.id: (12, 10)}
+            )
+
+    def test_rebuild_merges_legacy_name_keyed_rows(self):
+        with app.app_context():
+            product = Product(name=f"{PREFIX} Buffer", sku=f"{PREFIX}-BUF", qty_on_hand=0)
+            db.session.add(product)
+            legacy = InventoryItem(
+                item_code=f"{PREFIX} Buffer", description=f"{PREFIX} Buffer", current_stock=3, book_stock=3
+            )
+            db.session.add(legacy)
+            db.session.flush()
+            _post_inventory_ledger(legacy, "grn", physical_delta=3, book_delta=3, reference=f"{PREFIX} GRN")
+            db.session.commit()
+
+            _sync_inventory_with_products()
+            self.assertTrue(_merge_legacy_inventory_item_keys())
+            db.session.commit()
+
+            rows = InventoryItem.query.filter(
+                InventoryItem.description == f"{PREFIX} Buffer",
+                InventoryItem.merged_into_id.is_(None),
+            ).all()
+            self.assertEqual([row.item_code for row in rows], [f"{PREFIX}-BUF"])
+            self.assertEqual(rows[0].current_stock, 3)
+            retired = db.session.get(InventoryItem, legacy.id)
+            self.assertEqual(retired.merged_into_id, rows[0].id)
+            self.assertEqual(retired.item_code, f"{PREFIX} Buffer (merged #{legacy.id})")
+            self.assertEqual(retired.current_stock, 0)
+            # The retired row keeps its own movements; the stock moves across in a merge pair.
+            self.assertEqual(self._history(legacy.id), [("grn", 3), ("merge", 0)])
+            self.assertEqual(self._history(rows[0].id), [("merge", 3)])
+            self.assertFalse(_merge_legacy_inventory_item_keys())
+
+    def _history(self, item_id):
+        return [
+            (entry.entry_type, entry.physical_balance)
+            for entry in InventoryLedgerEntry.query.filter(
+                InventoryLedgerEntry.inventory_item_id == item_id,
+                InventoryLedgerEntry.entry_type != "checkpoint",
+            ).order_by(InventoryLedgerEntry.id)
+        ]
+
+    def test_stock_before_a_merge_excludes_the_merged_row(self):
+        january = datetime.datetime(2026, 1, 10)
+        february = datetime.datetime(2026, 2, 10)
+        with app.app_context():
+            db.session.add(Product(name=f"{PREFIX} Roller", sku=f"{PREFIX}-ROL", qty_on_hand=0))
+            db.session.flush()
+            canonical = self._inventory_for(Product.query.filter_by(sku=f"{PREFIX}-ROL").one())
+            canonical.current_stock = canonical.book_stock = 5
+            _post_inventory_ledger(canonical, "grn", physical_delta=5, book_delta=5, posted_at=january)
+            legacy = InventoryItem(
+                item_code=f"{PREFIX} Roller", description=f"{PREFIX} Roller", current_stock=3, book_stock=3
+            )
+            db.session.add(legacy)
+            db.session.flush()
+            _post_inventory_ledger(legacy, "grn", physical_delta=3, book_delta=3, posted_at=february)
+            db.session.commit()
+
+            self.assertTrue(_merge_legacy_inventory_item_keys())
+            db.session.commit()
+
+            before_merge = inventory_stock_as_of(datetime.date(2026, 2, 20), [canonical.id, legacy.id])
+            self.assertEqual(before_merge, {canonical.id: (5, 5), legacy.id: (3, 3)})
+            after_merge = inventory_stock_as_of(datetime.datetime.utcnow(), [canonical.id, legacy.id])
+            self.assertEqual(after_merge, {canonical.id: (8, 8), legacy.id: (0, 0)})
+
+    def test_inventory_page_is_read_only(self):
+        with app.app_context():
+            db.session.add(Product(name=f"{PREFIX} Sensor", qty_on_hand=2))
+            db.session.commit()
+
+        client = app.test_client()
+        with app.app_context():
+            admin = User.query.filter_by(username="admin").first()
+            if not admin.session_token:
+                admin.issue_session_token()
+                db.session.commit()
+            admin_id, token = admin.id, admin.session_token
+        with client.session_transaction() as session:
+            session["_user_id"] = str(admin_id)
+            session["_fresh"] = True
+            session["session_token"] = token
+        with app.app_context(), QueryRecorder(db.engine) as recorder:
+            response = client.get("/store/inventory")
+
+        self.assertEqual(response.status_code, 200)
+        verbs = {statement.lstrip().split(None, 1)[0].upper() for statement in recorder.statements}
+        self.assertFalse({"INSERT", "UPDATE", "DELETE"} & verbs)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,130 @@
+import re
+import unittest
+
+from app import _compute_product_forecast_map, _compute_product_forecast_qty, app, db, ensure_bootstrap
+from eleva_app.models import Product, User
+from eleva_app.pagination import decode_cursor, encode_cursor, keyset_paginate
+from eleva_app.perf import QueryRecorder
+
+PREFIX = "ZPAGE"
+
+
+class KeysetPaginationTests(unittest.TestCase):
+    def setUp(self):
+        app.config["TESTING"] = True
+        with app.app_context():
+            ensure_bootstrap()
+            self._cleanup()
+            # Repeated and NULL units exercise the tiebreaker and the NULL handling.
+            for index in range(11):
+                db.session.add(
+                    Product(
+                        name=f"{PREFIX} Part {index:02d}",
+                        uom=None if index % 3 == 0 else f"U{index % 2}",
+                        qty_on_hand=index,
+                    )
+                )
+            db.session.commit()
+
+    def tearDown(self):
+        with app.app_context():
+            self._cleanup()
+
+    def _cleanup(self):
+        Product.query.filter(Product.name.like(f"{PREFIX}%")).delete(synchronize_session=False)
+        db.session.commit()
+
+    def _query(self):
+        return Product.query.filter(Product.name.like(f"{PREFIX}%"))
+
+    def _walk(self, order_by, per_page):
+        seen, cursor, pages = [], None, 0
+        while True:
+            page = keyset_paginate(self._query(), order_by, tiebreaker=Product.id, cursor=cursor, per_page=per_page)
+            self.assertEqual(page.total, 11)
+            seen.extend(product.id for product in page.items)
+            pages += 1
+            if not page.has_more:
+                return seen, pages
+            cursor = page.next_cursor
+
+    def test_pages_cover_every_row_once_in_order(self):
+        with app.app_context():
+            seen, pages = self._walk([(Product.name, False)], per_page=3)
+            expected = [product.id for product in self._query().order_by(Product.name, Product.id)]
+            self.assertEqual(seen, expected)
+            self.assertEqual(pages, 4)
+
+            seen, _ = self._walk([(Product.uom, True)], per_page=4)
+            expected = [
+                product.id
+                for product in self._query().order_by(db.func.coalesce(Product.uom, "").desc(), Product.id.desc())
+            ]
+            self.assertEqual(seen, expected)
+
+    def test_cursor_round_trip_and_bad_cursor_restarts(self):
+        self.assertEqual(decode_cursor(encode_cursor(["Part", None, 7]), 3), ["Part", None, 7])
+        self.assertIsNone(decode_cursor("not-a-cursor!", 2))
+        self.assertIsNone(decode_cursor(encode_cursor([1]), 2))
+        with app.app_context():
+            page = keyset_paginate(self._query(), [(Product.name, False)], tiebreaker=Product.id, cursor="garbage", per_page=5)
+            self.assertTrue(page.is_first)
+            self.assertEqual(len(page.items), 5)
+
+    def test_forecast_map_matches_single_product_forecast(self):
+        with app.app_context():
+            products = self._query().all()
+            forecast = _compute_product_forecast_map(products)
+            self.assertEqual(forecast, {product.id: _compute_product_forecast_qty(product) for product in products})
+
+    def test_htmx_load_more_returns_only_rows(self):
+        client = self._client()
+        first = client.get(f"/purchase/parts?q={PREFIX}&per_page=4")
+        self.assertEqual(first.status_code, 200)
+        self.assertIn(b"11 parts", first.data)
+
+        rows = client.get(self._next_url(first), headers={"HX-Request": "true"})
+        self.assertEqual(rows.status_code, 200)
+        self.assertNotIn(b"<html", rows.data)
+        self.assertEqual(rows.data.count(b"data-product-id="), 4)
+        self.assertIn(b"load-more-row", rows.data)
+
+    def test_next_page_seeks_through_the_sort_index(self):
+        client = self._client()
+        next_url = self._next_url(client.get(f"/purchase/parts?q={PREFIX}&per_page=4"))
+        with app.app_context():
+            engine = db.engine
+        with QueryRecorder(engine) as recorder:
+            client.get(next_url, headers={"HX-Request": "true"})
+        statement = next(sql for sql in recorder.statements if "_keyset_0" in sql)
+        with engine.connect() as connection:
+            plan = " | ".join(
+                row[-1]
+                for row in connection.exec_driver_sql(
+                    f"EXPLAIN QUERY PLAN {statement}", tuple([None] * statement.count("?"))
+                )
+            )
+        self.assertIn("USING INDEX", plan)
+        self.assertNotIn("TEMP B-TREE", plan)
+
+    def _client(self):
+        client = app.test_client()
+        with app.app_context():
+            admin = User.query.filter_by(username="admin").first()
+            if not admin.session_token:
+                admin.issue_session_token()
+                db.session.commit()
+            admin_id, token = admin.id, admin.session_token
+        with client.session_transaction() as session:
+            session["_user_id"] = str(admin_id)
+            session["_fresh"] = True
+            session["session_token"] = token
+        return client
+
+    def _next_url(self, response):
+        match = re.search(r'hx-get="([^"]+cursor=[^"]+)"', response.get_data(as_text=True))
+        return match.group(1).replace("&amp;", "&")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+import unittest
+
+from app import app, db, ensure_bootstrap
+from eleva_app.models import Notification, User
+from eleva_app.perf import QueryRecorder
+from eleva_app.refcache import reference_cache
+
+PREFIX = "ZLAYOUT"
+
+
+class LayoutContextTests(unittest.TestCase):
+    def setUp(self):
+        app.config["TESTING"] = True
+        self.client = app.test_client()
+        with app.app_context():
+            ensure_bootstrap()
+            self._cleanup()
+            admin = User.query.filter_by(username="admin").first()
+            if not admin.session_token:
+                admin.issue_session_token()
+                db.session.commit()
+            self.admin_id, token = admin.id, admin.session_token
+            reference_cache.clear()
+        with self.client.session_transaction() as session:
+            session["_user_id"] = str(self.admin_id)
+            session["_fresh"] = True
+            session["session_token"] = token
+
+    def tearDown(self):
+        with app.app_context():
+            self._cleanup()
+
+    def _cleanup(self):
+        Notification.query.filter(Notification.message.like(f"{PREFIX}%")).delete(synchronize_session=False)
+        db.session.commit()
+
+    def _get(self, url, headers=None):
+        with app.app_context():
+            engine = db.engine
+        with QueryRecorder(engine) as recorder:
+            response = self.client.get(url, headers=headers)
+        return response, recorder.statements
+
+    def test_warm_layout_skips_header_queries(self):
+        self._get("/store/assets")
+        response, statements = self._get("/store/assets")
+        self.assertEqual(response.status_code, 200)
+        header_tables = ("FROM notification", "FROM section_guide", "ORDER BY user.first_name")
+        self.assertEqual([sql for sql in statements if any(name in sql for name in header_tables)], [])
+        self.assertEqual(sum("reference_data_version" in sql for sql in statements), 1)
+
+    def test_writes_show_up_on_the_next_page(self):
+        self._get("/service/customers")
+        with app.app_context():
+            db.session.add(Notification(user_id=self.admin_id, message=f"{PREFIX} PO approved"))
+            admin = db.session.get(User, self.admin_id)
+            original_role = admin.role
+            admin.role = f"{PREFIX} Role"
+            db.session.commit()
+        try:
+            response, _ = self._get("/service/customers")
+            self.assertIn(f"{PREFIX} PO approved".encode(), response.data)
+            self.assertIn(f"{PREFIX} Role".encode(), response.data)
+        finally:
+            with app.app_context():
+                db.session.get(User, self.admin_id).role = original_role
+                db.session.commit()
+
+    def test_htmx_partials_do_not_load_the_header(self):
+        response, statements = self._get("/search?q=zz", headers={"HX-Request": "true"})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn(b"notificationDropdown", response.data)
+        self.assertEqual([sql for sql in statements if "notification" in sql or "reference_data_version" in sql], [])
+
+
+if __name__ == "__main__":
+    unittest.main()
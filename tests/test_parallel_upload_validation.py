@@ -0,0 +1,134 @@
+import os
+import shutil
+import tempfile
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+from unittest import mock
+
+from flask_login import login_user
+
+from app import app, db, ensure_bootstrap
+from eleva_app import upload_parsing
+from eleva_app.models import Customer, Lift, User
+from eleva_app.uploads import process_customer_upload_file, process_lift_upload_file
+
+PREFIX = "ZPARUP"
+
+
+def _double(row, context):
+    return row * context
+
+
+class ParallelUploadValidationTests(unittest.TestCase):
+    def setUp(self):
+        app.config["TESTING"] = True
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir, True)
+        with app.app_context():
+            ensure_bootstrap()
+            self._cleanup()
+            db.session.add(Customer(customer_code=f"{PREFIX}-C1", company_name=f"{PREFIX} Heights"))
+            db.session.add(Lift(lift_code=f"{PREFIX}-L0000", customer_code=f"{PREFIX}-C1"))
+            db.session.commit()
+
+    def tearDown(self):
+        with app.app_context():
+            self._cleanup()
+
+    def _cleanup(self):
+        Lift.query.filter(Lift.lift_code.like(f"{PREFIX}%")).delete(synchronize_session=False)
+        Customer.query.filter(Customer.customer_code.like(f"{PREFIX}%")).delete(synchronize_session=False)
+        db.session.commit()
+
+    def _write_csv(self, name, headers, rows):
+        path = os.path.join(self.tmpdir, name)
+        with open(path, "w", encoding="utf-8", newline="") as handle:
+            for row in [headers] + rows:
+                handle.write(",".join(row) + "\r\n")
+        return path
+
+    def _run_both_ways(self, processor, path):
+        """Process ``path`` inline and across two worker processes; return both outcomes."""
+
+        outcomes = []
+        for workers in (1, 2):
+            overrides = {"UPLOAD_VALIDATION_WORKERS": workers, "UPLOAD_PARALLEL_MIN_ROWS": 10}
+            with mock.patch.dict(app.config, overrides), mock.patch.object(
+                upload_parsing, "UPLOAD_PARSE_CHUNK_SIZE", 7
+            ), mock.patch.object(
+                upload_parsing, "ProcessPoolExecutor", wraps=ProcessPoolExecutor
+            ) as pool, app.test_request_context():
+                login_user(User.query.filter_by(username="admin").first())
+                outcomes.append(processor(path, apply_changes=False))
+                db.session.rollback()
+            self.assertEqual(pool.call_count, workers - 1)
+        return outcomes
+
+    def test_lift_rows_validate_the_same_across_worker_processes(self):
+        from app import AMC_LIFT_TEMPLATE_HEADERS
+
+        column = {header: index for index, header in enumerate(AMC_LIFT_TEMPLATE_HEADERS)}
+        rows = []
+        for index in range(60):
+            row = [""] * len(AMC_LIFT_TEMPLATE_HEADERS)
+            row[column["Lift Code"]] = f"{PREFIX}-L{index:04d}"
+            row[column["Customer Code"]] = f"{PREFIX}-C1"
+            row[column["AMC Status"]] = "Active"
+            row[column["AMC Duration"]] = "1 Year"
+            row[column["AMC Start (YYYY-MM-DD)"]] = "2026-01-01"
+            if index % 11 == 3:
+                row[column["Customer Code"]] = f"{PREFIX}-MISSING"
+            elif index % 11 == 5:
+                row[column["AMC Status"]] = "Sometimes"
+            elif index % 11 == 7:
+                row[column["Lift Code"]] = f"{PREFIX}-L0001"
+                row[column["AMC Status"]] = "Sometimes"
+            elif index % 11 == 9:
+                row[column["Route"]] = "Nowhere"
+            rows.append(row)
+        rows.append([""] * len(AMC_LIFT_TEMPLATE_HEADERS))
+        path = self._write_csv("lifts.csv", AMC_LIFT_TEMPLATE_HEADERS, rows)
+
+        serial, parallel = self._run_both_ways(process_lift_upload_file, path)
+
+        self.assertEqual(parallel.row_errors, serial.row_errors)
+        self.assertEqual(
+            (parallel.processed_rows, parallel.created_count, parallel.updated_count),
+            (serial.processed_rows, serial.created_count, serial.updated_count),
+        )
+        self.assertEqual(parallel.created_items, serial.created_items)
+        self.assertEqual(serial.processed_rows, 60)
+        self.assertEqual(serial.updated_count, 1)
+        # Duplicate codes are reported ahead of the bad status on the same row.
+        self.assertIn(f"Row 9: Lift code '{PREFIX}-L0001' is duplicated in the upload.", serial.row_errors)
+        self.assertTrue(any("was not found" in error for error in serial.row_errors))
+        self.assertTrue(any("Route 'Nowhere'" in error for error in serial.row_errors))
+
+    def test_customer_rows_validate_the_same_across_worker_processes(self):
+        headers = ["Customer Code", "Company Name", "Branch", "Office City"]
+        rows = []
+        for index in range(30):
+            branch = "North" if index % 8 == 4 else ""
+            rows.append([f"{PREFIX}-N{index:03d}", f"{PREFIX} Towers {index}", branch, "Pune"])
+        path = self._write_csv("customers.csv", headers, rows)
+
+        serial, parallel = self._run_both_ways(process_customer_upload_file, path)
+
+        self.assertEqual(parallel.row_errors, serial.row_errors)
+        self.assertEqual(parallel.created_items, serial.created_items)
+        self.assertEqual(serial.created_count, 26)
+        self.assertIn("Row 6: Branch 'North' cannot be set without selecting a route.", serial.row_errors)
+
+    def test_parsed_rows_keep_their_order(self):
+        rows = list(range(50))
+        with mock.patch.object(upload_parsing, "UPLOAD_PARSE_CHUNK_SIZE", 4), mock.patch.object(
+            upload_parsing, "ProcessPoolExecutor", wraps=ProcessPoolExecutor
+        ) as pool:
+            parsed = list(upload_parsing.iter_parsed_rows(rows, _double, 2, workers=3, min_rows=10))
+        self.assertEqual(parsed, [row * 2 for row in rows])
+        # Workers never come from a plain fork of this (threaded) process.
+        self.assertEqual(pool.call_args.kwargs["mp_context"].get_start_method(), "forkserver")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+import unittest
+
+from app import (
+    app,
+    db,
+    ensure_bootstrap,
+    get_bom_procurement_plan,
+    get_project_procurement_plan,
+)
+from eleva_app.perf import QueryRecorder
+from eleva_app.synthetic import cleanup_procurement_project, seed_procurement_project
+
+PREFIX = "ZPP"
+
+
+def _plan_snapshot(plan):
+    groups = [
+        (
+            group["vendor"].name,
+            group["status"],
+            [(line["item"].id, line["ordered_qty"], line["remaining_qty"], line["linkage_mode"]) for line in group["lines"]],
+            [po.id for po in group["related_pos"]],
+        )
+        for group in plan["vendor_groups"]
+    ]
+    return {
+        "project": plan["resolved_project_id"],
+        "summary": plan["summary"],
+        "groups": groups,
+        "unresolved": [line["item"].id for line in plan["unresolved_lines"]],
+        "no_vendor": [line["item"].id for line in plan["no_primary_vendor_lines"]],
+        "over_ordered": [line["item"].id for line in plan["over_order_lines"]],
+    }
+
+
+class ProjectProcurementPlanTests(unittest.TestCase):
+    def setUp(self):
+        app.config["TESTING"] = True
+        with app.app_context():
+            ensure_bootstrap()
+            cleanup_procurement_project(PREFIX)
+
+    def tearDown(self):
+        with app.app_context():
+            cleanup_procurement_project(PREFIX)
+
+    def test_project_plan_matches_per_bom_plans(self):
+        with app.app_context():
+            project, boms = seed_procurement_project(4, prefix=PREFIX)
+
+            plan = get_project_procurement_plan(project.id)
+
+            self.assertEqual(
+                sorted(entry["bom"].id for entry in plan["bom_entries"]),
+                sorted(bom.id for bom in boms),
+            )
+            for entry in plan["bom_entries"]:
+                single = get_bom_procurement_plan(entry["bom"].id)
+                self.assertEqual(_plan_snapshot(entry["plan"]), _plan_snapshot(single))
+
+            first = next(entry["plan"] for entry in plan["bom_entries"] if entry["bom"].id == boms[0].id)
+            lines = {line["item"].item_code: line for group in first["vendor_groups"] for line in group["lines"]}
+            self.assertEqual(lines["MOTOR"]["ordered_qty"], 1.0)
+            self.assertEqual(lines["MOTOR"]["linkage_mode"], "exact_line")
+            self.assertEqual(lines["RAIL"]["ordered_qty"], 4.0)
+            self.assertEqual(lines["RAIL"]["linkage_mode"], "exact_bom")
+            self.assertEqual(lines["BRACKET"]["part"].name, f"{PREFIX} Bracket 1")
+            self.assertEqual(first["summary"]["parts_without_primary_vendor"], 1)
+            self.assertEqual(first["summary"]["parts_unresolved"], 1)
+
+    def test_project_plan_query_count_does_not_grow_with_boms(self):
+        with app.app_context():
+            project, _boms = seed_procurement_project(3, prefix=PREFIX)
+            db.session.expire_all()
+            with QueryRecorder(db.engine) as small:
+                get_project_procurement_plan(project.id)
+            cleanup_procurement_project(PREFIX)
+
+            project, _boms = seed_procurement_project(12, prefix=PREFIX)
+            db.session.expire_all()
+            with QueryRecorder(db.engine) as large:
+                get_project_procurement_plan(project.id)
+
+            self.assertEqual(small.count, large.count)
+
+
+if __name__ == "__main__":
+    unittest.main()
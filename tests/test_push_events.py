@@ -0,0 +1,112 @@
+import unittest
+
+from app import app, db, ensure_bootstrap
+from eleva_app.models import DesignTask, Notification, PushEvent, User
+from eleva_app.push import latest_event_id
+from utils.notifications import create_notification
+
+PREFIX = "ZPUSH"
+
+
+class PushEventTests(unittest.TestCase):
+    def setUp(self):
+        app.config["TESTING"] = True
+        self.csrf_enabled = app.config.get("WTF_CSRF_ENABLED", True)
+        app.config["WTF_CSRF_ENABLED"] = False
+        self.addCleanup(app.config.__setitem__, "WTF_CSRF_ENABLED", self.csrf_enabled)
+        self.client = app.test_client()
+        with app.app_context():
+            ensure_bootstrap()
+            self._cleanup()
+            admin = User.query.filter_by(username="admin").first()
+            if not admin.session_token:
+                admin.issue_session_token()
+                db.session.commit()
+            self.admin_id, token = admin.id, admin.session_token
+            other = User(username=f"{PREFIX.lower()}_other", role="Design", active=True)
+            other.set_password("secret")
+            db.session.add(other)
+            db.session.commit()
+            self.other_user_id = other.id
+            self.cursor = latest_event_id()
+        with self.client.session_transaction() as session:
+            session["_user_id"] = str(self.admin_id)
+            session["_fresh"] = True
+            session["session_token"] = token
+
+    def tearDown(self):
+        with app.app_context():
+            self._cleanup()
+            PushEvent.query.filter(PushEvent.id > self.cursor).delete(synchronize_session=False)
+            db.session.commit()
+
+    def _cleanup(self):
+        Notification.query.filter(Notification.message.like(f"{PREFIX}%")).delete(synchronize_session=False)
+        DesignTask.query.filter(DesignTask.task_name.like(f"{PREFIX}%")).delete(synchronize_session=False)
+        User.query.filter_by(username=f"{PREFIX.lower()}_other").delete(synchronize_session=False)
+        db.session.commit()
+
+    def _poll(self, *channels):
+        query = "&".join([f"after={self.cursor}"] + [f"channel={channel}" for channel in channels])
+        response = self.client.get(f"/events/poll?{query}")
+        self.assertEqual(response.status_code, 200)
+        return response.get_json()["events"]
+
+    def test_notifications_reach_only_their_user_after_commit(self):
+        with app.app_context():
+            create_notification(self.admin_id, f"{PREFIX} rolled back", commit=False)
+            db.session.rollback()
+            create_notification(self.admin_id, f"{PREFIX} for admin")
+            create_notification(self.other_user_id, f"{PREFIX} for someone else")
+
+        events = self._poll()
+        self.assertEqual(
+            [(event["event"], event["data"]["message"]) for event in events],
+            [("notification", f"{PREFIX} for admin")],
+        )
+        menu = self.client.get("/notifications/menu")
+        self.assertIn(b'hx-swap-oob="true"', menu.data)
+        self.assertIn(f"{PREFIX} for admin".encode(), menu.data)
+
+    def test_design_status_change_patches_one_card(self):
+        with app.app_context():
+            task = DesignTask(task_type="general", task_name=f"{PREFIX} lobby", status="In progress")
+            db.session.add(task)
+            db.session.commit()
+            task_id = task.id
+            self.cursor = latest_event_id()
+
+        response = self.client.post(f"/design/tasks/{task_id}/update_status", json={"status": "Hold"})
+        self.assertEqual(response.status_code, 200)
+        events = self._poll("board:design", "board:unknown")
+        self.assertEqual([(event["channel"], event["data"]["id"]) for event in events], [("board:design", task_id)])
+
+        card = self.client.get(f"/design/board/card?id={task_id}")
+        self.assertIn(f'data-push-card="{task_id}"'.encode(), card.data)
+        self.assertIn(b"Hold", card.data)
+        self.assertNotIn(b"<html", card.data)
+
+        with app.app_context():
+            task = db.session.get(DesignTask, task_id)
+            task.task_type, task.status = "design", "Finalized"
+            db.session.commit()
+        self.assertEqual(self.client.get(f"/design/board/card?id={task_id}").data, b"")
+
+    def test_stream_sends_events_after_the_cursor(self):
+        app.config["PUSH_STREAM_MAX_SECONDS"] = 0.2
+        app.config["PUSH_RECHECK_SECONDS"] = 0.05
+        self.addCleanup(app.config.pop, "PUSH_STREAM_MAX_SECONDS")
+        self.addCleanup(app.config.pop, "PUSH_RECHECK_SECONDS")
+        with app.app_context():
+            create_notification(self.admin_id, f"{PREFIX} streamed")
+
+        response = self.client.get("/events/stream", headers={"Last-Event-ID": str(self.cursor)})
+        self.assertEqual(response.mimetype, "text/event-stream")
+        body = response.get_data(as_text=True)
+        self.assertIn("event: notification", body)
+        self.assertIn(f"{PREFIX} streamed", body)
+        self.assertTrue(body.startswith("retry:"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+import unittest
+
+from app import (
+    _get_active_procurement_stages,
+    app,
+    db,
+    ensure_bootstrap,
+    get_service_dropdown_options,
+)
+from eleva_app.models import ProcurementStage, ReferenceDataVersion, ServiceDropdownOption
+from eleva_app.perf import QueryRecorder
+from eleva_app.refcache import ReferenceCache, reference_cache
+
+PREFIX = "ZREF"
+
+
+class ReferenceCacheTests(unittest.TestCase):
+    def setUp(self):
+        app.config["TESTING"] = True
+        with app.app_context():
+            ensure_bootstrap()
+            self._cleanup()
+            db.session.add(ServiceDropdownOption(category="floors", value=f"{PREFIX} G+40", sort_order=9999))
+            db.session.commit()
+            reference_cache.clear()
+
+    def tearDown(self):
+        with app.app_context():
+            self._cleanup()
+
+    def _cleanup(self):
+        ServiceDropdownOption.query.filter(ServiceDropdownOption.value.like(f"{PREFIX}%")).delete(
+            synchronize_session=False
+        )
+        ProcurementStage.query.filter(ProcurementStage.name.like(f"{PREFIX}%")).delete(synchronize_session=False)
+        db.session.commit()
+
+    def _count_queries(self, callback):
+        with QueryRecorder(db.engine) as recorder:
+            result = callback()
+        return result, recorder.statements
+
+    def _version(self, table):
+        return db.session.get(ReferenceDataVersion, table).version
+
+    def test_repeat_lookups_skip_the_table(self):
+        with app.test_request_context():
+            first, statements = self._count_queries(lambda: get_service_dropdown_options("floors"))
+            self.assertTrue(any("service_dropdown_option" in sql for sql in statements))
+            self.assertIn(f"{PREFIX} G+40", [option.value for option in first])
+
+            first[0].value = "mutated"
+            second, statements = self._count_queries(lambda: get_service_dropdown_options("floors"))
+            self.assertEqual(statements, [])
+            self.assertNotIn("mutated", [option.value for option in second])
+
+    def test_writes_bump_the_version_and_reload(self):
+        with app.app_context():
+            before = self._version("service_dropdown_option")
+            option = ServiceDropdownOption.query.filter_by(value=f"{PREFIX} G+40").one()
+            option.is_active = False
+            db.session.commit()
+            self.assertEqual(self._version("service_dropdown_option"), before + 1)
+            self.assertNotIn(f"{PREFIX} G+40", [item.value for item in get_service_dropdown_options("floors")])
+
+            ServiceDropdownOption.query.filter_by(value=f"{PREFIX} G+40").update({"is_active": True})
+            db.session.commit()
+            self.assertEqual(self._version("service_dropdown_option"), before + 2)
+            self.assertIn(f"{PREFIX} G+40", [item.value for item in get_service_dropdown_options("floors")])
+
+            # Rolled back writes leave the version alone.
+            option = ServiceDropdownOption.query.filter_by(value=f"{PREFIX} G+40").one()
+            option.sort_order = 1
+            db.session.flush()
+            db.session.rollback()
+            self.assertEqual(self._version("service_dropdown_option"), before + 2)
+
+    def test_other_workers_see_changes(self):
+        other_worker = ReferenceCache()
+        with app.app_context():
+            loaded = other_worker.get("stages", ("procurement_stage",), _get_active_procurement_stages)
+            self.assertNotIn(f"{PREFIX} Dispatch", [stage.name for stage in loaded])
+
+            db.session.add(ProcurementStage(name=f"{PREFIX} Dispatch", code=f"{PREFIX}-dispatch", sequence=999))
+            db.session.commit()
+            reference_cache.clear()
+            loaded = other_worker.get(
+                "stages",
+                ("procurement_stage",),
+                lambda: [stage.name for stage in _get_active_procurement_stages()],
+            )
+            self.assertIn(f"{PREFIX} Dispatch", loaded)
+
+
+if __name__ == "__main__":
+    unittest.main()
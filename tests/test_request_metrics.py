@@ -0,0 +1,76 @@
+import os
+import unittest
+
+from flask import Flask, abort
+from sqlalchemy import create_engine, text
+
+from app import app
+from eleva_app.perf import RequestMetrics
+
+
+class RequestMetricsTests(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite://")
+        self.app = Flask(__name__)
+        self.metrics = RequestMetrics(self.app)
+
+        @self.app.route("/report")
+        def report():
+            with self.engine.connect() as conn:
+                for _ in range(3):
+                    conn.execute(text("SELECT 1")).scalar()
+            return "x" * 2048
+
+        @self.app.route("/boom")
+        def boom():
+            abort(409)
+
+    def test_histograms_and_counters_are_exported(self):
+        client = self.app.test_client()
+        client.get("/report")
+        client.get("/report")
+        client.get("/boom")
+        client.get("/missing")
+
+        output = self.metrics.render_prometheus()
+        pid = os.getpid()
+
+        self.assertIn("# TYPE eleva_http_request_duration_seconds histogram", output)
+        self.assertIn(f'eleva_http_request_duration_seconds_bucket{{endpoint="report",method="GET",pid="{pid}",le="+Inf"}} 2', output)
+        self.assertIn(f'eleva_http_request_duration_seconds_count{{endpoint="report",method="GET",pid="{pid}"}} 2', output)
+        self.assertIn(f'eleva_http_requests_total{{endpoint="report",method="GET",status="200",pid="{pid}"}} 2', output)
+        self.assertIn(f'eleva_http_requests_total{{endpoint="boom",method="GET",status="409",pid="{pid}"}} 1', output)
+        self.assertIn(f'eleva_http_requests_total{{endpoint="unmatched",method="GET",status="404",pid="{pid}"}} 1', output)
+        self.assertIn(f'eleva_http_requests_in_flight{{endpoint="report",pid="{pid}"}} 0', output)
+        self.assertIn(f'eleva_http_request_db_queries_bucket{{endpoint="report",method="GET",pid="{pid}",le="1"}} 0', output)
+        self.assertIn(f'eleva_http_request_db_queries_bucket{{endpoint="report",method="GET",pid="{pid}",le="5"}} 2', output)
+        self.assertIn(f'eleva_http_request_db_queries_sum{{endpoint="report",method="GET",pid="{pid}"}} 6', output)
+        self.assertIn(f'eleva_http_response_size_bytes_bucket{{endpoint="report",method="GET",pid="{pid}",le="10000"}} 2', output)
+        self.assertIn(f'eleva_http_response_size_bytes_sum{{endpoint="report",method="GET",pid="{pid}"}} 4096', output)
+
+
+class MetricsEndpointTests(unittest.TestCase):
+    def setUp(self):
+        app.config["TESTING"] = True
+        self.addCleanup(app.config.__setitem__, "METRICS_TOKEN", app.config.get("METRICS_TOKEN", ""))
+
+    def test_endpoint_is_hidden_without_a_token(self):
+        app.config["METRICS_TOKEN"] = ""
+        self.assertEqual(app.test_client().get("/metrics").status_code, 404)
+
+    def test_endpoint_requires_matching_bearer_token(self):
+        app.config["METRICS_TOKEN"] = "scrape-secret"
+        client = app.test_client()
+        self.assertEqual(client.get("/metrics").status_code, 401)
+        self.assertEqual(client.get("/metrics?token=scrape-secret").status_code, 401)
+        self.assertEqual(
+            client.get("/metrics", headers={"Authorization": "Bearer wrong"}).status_code, 401
+        )
+        response = client.get("/metrics", headers={"Authorization": "Bearer scrape-secret"})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.content_type.startswith("text/plain"))
+        self.assertIn("eleva_http_requests_total", response.get_data(as_text=True))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -12,8 +12,6 @@ class SarvCallListingTests(unittest.TestCase):
         self.app_context.push()
         app.ensure_bootstrap()
         self.client = app.app.test_client()
-        app.CUSTOMER_SUPPORT_CALL_LOGS.clear()
-        app.CUSTOMER_SUPPORT_TICKETS.clear()
         CallRecording.query.delete()
         CallLog.query.delete()
         db.session.commit()
@@ -23,8 +21,6 @@ class SarvCallListingTests(unittest.TestCase):
         CallRecording.query.delete()
         CallLog.query.delete()
         db.session.commit()
-        app.CUSTOMER_SUPPORT_CALL_LOGS.clear()
-        app.CUSTOMER_SUPPORT_TICKETS.clear()
         self.app_context.pop()
 
     def test_customer_support_calls_include_persisted_sarv_logs(self):
@@ -75,7 +71,7 @@ class SarvCallListingTests(unittest.TestCase):
         from integrations.sarv import routes as sarv_routes
 
         original_downloader = sarv_routes.download_call_recording
-        sarv_routes.download_call_recording = lambda recording: None
+        sarv_routes.download_call_recording = lambda recording, commit=True: None
         try:
             response = self.client.post(
                 "/sarv/webhook",
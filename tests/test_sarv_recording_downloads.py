@@ -0,0 +1,183 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+from app import app, db, ensure_bootstrap
+from eleva_app.models import CallLog, CallRecording
+from integrations.sarv import routes as sarv_routes
+from integrations.sarv.utils import RecordingDownloadPool, download_call_recording, recording_download_pool
+
+PREFIX = "ZSARV"
+AUDIO = bytes(range(256)) * 1200  # ~300 KB, several read chunks
+
+
+class _RecordingServer(BaseHTTPRequestHandler):
+    hits = {}
+    release_slow = threading.Event()
+
+    def do_GET(self):
+        name = os.path.basename(self.path)
+        _RecordingServer.hits[name] = _RecordingServer.hits.get(name, 0) + 1
+        if name == "missing.wav":
+            self.send_error(404)
+            return
+        if name == "flaky.wav" and _RecordingServer.hits[name] == 1:
+            self.send_error(503)
+            return
+        if name == "slow.wav":
+            _RecordingServer.release_slow.wait(10)
+        self.send_response(200)
+        self.send_header("Content-Type", "audio/wav")
+        self.send_header("Content-Length", str(len(AUDIO)))
+        self.end_headers()
+        self.wfile.write(AUDIO)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class SarvRecordingDownloadTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), _RecordingServer)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        app.config["TESTING"] = True
+        self.target_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.target_dir, True)
+        overrides = {
+            "SARV_RECORDING_BASE_URL": f"http://127.0.0.1:{self.server.server_address[1]}",
+            "CALL_RECORDINGS_DIR": self.target_dir,
+            "SARV_DOWNLOAD_BACKOFF_SECONDS": 0.01,
+            "JOB_WORKER_ENABLED": False,
+        }
+        for key, value in overrides.items():
+            self.addCleanup(app.config.__setitem__, key, app.config.get(key))
+            app.config[key] = value
+        _RecordingServer.hits.clear()
+        _RecordingServer.release_slow.clear()
+        self.client = app.test_client()
+        with app.app_context():
+            ensure_bootstrap()
+            self._cleanup()
+
+    def tearDown(self):
+        _RecordingServer.release_slow.set()
+        recording_download_pool.wait(timeout=10)
+        with app.app_context():
+            self._cleanup()
+
+    def _cleanup(self):
+        call_ids = [call.id for call in CallLog.query.filter(CallLog.sarv_call_id.like(f"{PREFIX}%"))]
+        if call_ids:
+            CallRecording.query.filter(CallRecording.call_log_id.in_(call_ids)).delete(synchronize_session=False)
+            CallLog.query.filter(CallLog.id.in_(call_ids)).delete(synchronize_session=False)
+        db.session.commit()
+
+    def _post_call(self, call_id, filename):
+        return self.client.post(
+            "/sarv/webhook",
+            json={"callId": call_id, "recordings": [{"file": f"/recordings/{filename}"}]},
+        )
+
+    def _recording(self, call_id):
+        with app.app_context():
+            call = CallLog.query.filter_by(sarv_call_id=call_id).one()
+            recording = CallRecording.query.filter_by(call_log_id=call.id).one()
+            return recording.download_status, recording.download_error
+
+    def test_download_streams_to_disk_and_renames_atomically(self):
+        with app.app_context():
+            call = CallLog(sarv_call_id=f"{PREFIX}-1")
+            db.session.add(call)
+            db.session.flush()
+            recording = CallRecording(call_log_id=call.id, sarv_file_path="/recordings/ok.wav")
+            db.session.add(recording)
+            db.session.commit()
+
+            self.assertIsNone(download_call_recording(recording))
+            self.assertEqual(recording.download_status, "success")
+
+        self.assertEqual(os.listdir(self.target_dir), [f"{PREFIX}-1_ok.wav"])
+        with open(os.path.join(self.target_dir, f"{PREFIX}-1_ok.wav"), "rb") as handle:
+            self.assertEqual(handle.read(), AUDIO)
+
+    def test_webhook_acknowledges_before_the_download_finishes(self):
+        response = self._post_call(f"{PREFIX}-2", "slow.wav")
+        self.assertEqual(response.get_data(as_text=True), "GODBLESSYOU")
+        self.assertEqual(self._recording(f"{PREFIX}-2")[0], "pending")
+
+        _RecordingServer.release_slow.set()
+        recording_download_pool.wait(timeout=10)
+        self.assertEqual(self._recording(f"{PREFIX}-2")[0], "success")
+
+    def test_server_errors_are_retried_with_backoff(self):
+        self._post_call(f"{PREFIX}-3", "flaky.wav")
+        recording_download_pool.wait(timeout=10)
+
+        self.assertEqual(self._recording(f"{PREFIX}-3")[0], "success")
+        self.assertEqual(_RecordingServer.hits["flaky.wav"], 2)
+
+    def test_backoff_does_not_hold_a_pool_thread(self):
+        pool = RecordingDownloadPool()
+        self.addCleanup(pool.wait, 10)
+        for key, value in {"SARV_DOWNLOAD_CONCURRENCY": 1, "SARV_DOWNLOAD_BACKOFF_SECONDS": 1.0}.items():
+            self.addCleanup(app.config.__setitem__, key, app.config.get(key))
+            app.config[key] = value
+        with mock.patch.object(sarv_routes, "recording_download_pool", pool):
+            self._post_call(f"{PREFIX}-5", "flaky.wav")
+            self._post_call(f"{PREFIX}-6", "ok.wav")
+            deadline = time.monotonic() + 5
+            while self._recording(f"{PREFIX}-6")[0] != "success" and time.monotonic() < deadline:
+                time.sleep(0.02)
+            # The only worker served the second recording while the first waited out its backoff.
+            self.assertEqual(self._recording(f"{PREFIX}-6")[0], "success")
+            self.assertEqual(_RecordingServer.hits["flaky.wav"], 1)
+            pool.wait(timeout=10)
+
+        self.assertEqual(self._recording(f"{PREFIX}-5")[0], "success")
+        self.assertEqual(_RecordingServer.hits["flaky.wav"], 2)
+
+    def test_retry_keeps_its_queue_slot_and_the_recording_pending(self):
+        pool = RecordingDownloadPool()
+        self.addCleanup(pool.wait, 10)
+        for key, value in {"SARV_DOWNLOAD_QUEUE_LIMIT": 1, "SARV_DOWNLOAD_BACKOFF_SECONDS": 0.5}.items():
+            self.addCleanup(app.config.__setitem__, key, app.config.get(key))
+            app.config[key] = value
+        with mock.patch.object(sarv_routes, "recording_download_pool", pool):
+            self._post_call(f"{PREFIX}-7", "flaky.wav")
+            deadline = time.monotonic() + 5
+            while _RecordingServer.hits.get("flaky.wav", 0) < 1 and time.monotonic() < deadline:
+                time.sleep(0.02)
+            time.sleep(0.1)
+            # Between attempts the recording is still queued, not failed.
+            self.assertEqual(self._recording(f"{PREFIX}-7")[0], "pending")
+            pool.wait(timeout=10)
+
+        self.assertEqual(self._recording(f"{PREFIX}-7")[0], "success")
+        self.assertEqual(_RecordingServer.hits["flaky.wav"], 2)
+
+    def test_missing_recordings_fail_without_retry_or_partial_files(self):
+        self._post_call(f"{PREFIX}-4", "missing.wav")
+        recording_download_pool.wait(timeout=10)
+
+        status, error = self._recording(f"{PREFIX}-4")
+        self.assertEqual(status, "failed")
+        self.assertIn("404", error)
+        self.assertEqual(_RecordingServer.hits["missing.wav"], 1)
+        self.assertEqual(os.listdir(self.target_dir), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
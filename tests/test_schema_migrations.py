@@ -0,0 +1,70 @@
+import unittest
+from unittest import mock
+
+import app as app_module
+from app import (
+    LATEST_SCHEMA_VERSION,
+    SCHEMA_MIGRATIONS,
+    app,
+    apply_schema_migrations,
+    db,
+    ensure_bootstrap,
+    get_schema_version,
+    pending_schema_migrations,
+)
+from eleva_app.models import SchemaMigration
+
+
+class SchemaMigrationLedgerTests(unittest.TestCase):
+    def setUp(self):
+        app.config["TESTING"] = True
+        with app.app_context():
+            ensure_bootstrap()
+
+    def test_versions_are_unique_and_ordered(self):
+        versions = [version for version, _, _ in SCHEMA_MIGRATIONS]
+        self.assertEqual(versions, sorted(set(versions)))
+
+    def test_bootstrap_records_every_step(self):
+        with app.app_context():
+            self.assertEqual(get_schema_version(), LATEST_SCHEMA_VERSION)
+            self.assertEqual(pending_schema_migrations(), [])
+
+    def test_reapplying_is_a_no_op(self):
+        with app.app_context():
+            self.assertEqual(apply_schema_migrations(), [])
+
+    def test_step_recorded_by_another_worker_is_rolled_back(self):
+        version, name, _ = SCHEMA_MIGRATIONS[-1]
+        ran = []
+        with app.app_context(), mock.patch.object(
+            app_module,
+            "pending_schema_migrations",
+            return_value=[(version, name, lambda: ran.append(version))],
+        ):
+            self.assertEqual(apply_schema_migrations(), [])
+            self.assertEqual(ran, [version])
+            # The duplicate ledger row was rolled back and the session is usable.
+            self.assertEqual(
+                db.session.query(SchemaMigration).filter_by(version=version).count(), 1
+            )
+
+    def test_bootstrap_fills_a_gap_below_the_latest_version(self):
+        version = next(v for v, name, _ in SCHEMA_MIGRATIONS if name == "background_job_table")
+        with app.app_context():
+            SchemaMigration.query.filter_by(version=version).delete()
+            db.session.commit()
+            self.assertEqual(get_schema_version(), LATEST_SCHEMA_VERSION)
+            with mock.patch.object(app_module, "_bootstrapped", False):
+                ensure_bootstrap()
+            self.assertEqual(pending_schema_migrations(), [])
+
+    def test_db_upgrade_cli_reports_up_to_date(self):
+        runner = app.test_cli_runner()
+        result = runner.invoke(args=["db-upgrade", "--dry-run"])
+        self.assertEqual(result.exit_code, 0)
+        self.assertIn("up to date", result.output)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+import datetime
+import json
+import unittest
+
+from app import app, count_open_service_visits, db, ensure_bootstrap
+from eleva_app.models import Lift, ServiceVisit
+
+
+class ServiceVisitStoreTests(unittest.TestCase):
+    LIFT_CODE = "ZZ-VISIT-TEST"
+
+    def setUp(self):
+        app.config["TESTING"] = True
+        with app.app_context():
+            ensure_bootstrap()
+            self._cleanup()
+
+    def tearDown(self):
+        with app.app_context():
+            self._cleanup()
+
+    def _cleanup(self):
+        lift = Lift.query.filter_by(lift_code=self.LIFT_CODE).first()
+        if lift:
+            db.session.delete(lift)
+            db.session.commit()
+
+    def test_service_schedule_round_trips_through_visit_rows(self):
+        today = datetime.date.today()
+        with app.app_context():
+            lift = Lift(lift_code=self.LIFT_CODE)
+            lift.service_schedule = [
+                {"date": today - datetime.timedelta(days=3), "status": "scheduled"},
+                {"date": today, "status": "scheduled", "technician": "Ravi"},
+                {"date": today + datetime.timedelta(days=4), "status": "completed"},
+                {"date": None, "status": "scheduled"},
+            ]
+            db.session.add(lift)
+            db.session.commit()
+
+            visits = (
+                ServiceVisit.query.filter_by(lift_id=lift.id)
+                .order_by(ServiceVisit.position)
+                .all()
+            )
+            self.assertEqual(len(visits), 3)
+            self.assertEqual(visits[1].technician, "Ravi")
+
+            schedule = lift.service_schedule
+            self.assertEqual([entry["date"] for entry in schedule], [
+                today - datetime.timedelta(days=3),
+                today,
+                today + datetime.timedelta(days=4),
+            ])
+            mirrored = json.loads(lift.service_schedule_json)
+            self.assertEqual(len(mirrored), 3)
+            self.assertEqual(mirrored[1]["date"], today.isoformat())
+
+    def test_open_visit_counts_use_date_windows(self):
+        today = datetime.date.today()
+        with app.app_context():
+            baseline_overdue = count_open_service_visits(end=today)
+            baseline_week = count_open_service_visits(
+                start=today, end=today + datetime.timedelta(days=8)
+            )
+            lift = Lift(lift_code=self.LIFT_CODE)
+            lift.service_schedule = [
+                {"date": today - datetime.timedelta(days=1), "status": "scheduled"},
+                {"date": today + datetime.timedelta(days=2), "status": "scheduled"},
+                {"date": today + datetime.timedelta(days=3), "status": "completed"},
+            ]
+            db.session.add(lift)
+            db.session.commit()
+
+            self.assertEqual(
+                count_open_service_visits(end=today), baseline_overdue + 1
+            )
+            self.assertEqual(
+                count_open_service_visits(
+                    start=today, end=today + datetime.timedelta(days=8)
+                ),
+                baseline_week + 1,
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+
+from flask import Flask
+from sqlalchemy import create_engine, text
+
+from eleva_app.perf import SqlProfiler, statement_fingerprint
+
+
+class StatementFingerprintTests(unittest.TestCase):
+    def test_literals_and_in_lists_collapse(self):
+        self.assertEqual(
+            statement_fingerprint("SELECT * FROM lift WHERE id = 12 AND code = 'A''1'"),
+            statement_fingerprint("SELECT *  FROM lift\n WHERE id = 7 AND code = 'B'"),
+        )
+        self.assertEqual(
+            statement_fingerprint("SELECT * FROM po WHERE id IN (?, ?, ?)"),
+            "SELECT * FROM po WHERE id IN (?)",
+        )
+        self.assertIn("anon_1", statement_fingerprint("SELECT anon_1.id FROM anon_1"))
+
+
+class SqlProfilerTests(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite://")
+        self.app = Flask(__name__)
+        self.app.config.update(
+            SQL_PROFILING_ENABLED=True,
+            SQL_PROFILING_MAX_QUERIES=4,
+            SQL_PROFILING_BUFFER_SIZE=2,
+        )
+        self.profiler = SqlProfiler(self.app)
+
+        @self.app.route("/rows/<int:count>")
+        def rows(count):
+            with self.engine.connect() as conn:
+                for row_id in range(count):
+                    conn.execute(text("SELECT :row_id"), {"row_id": row_id}).scalar()
+            return "ok"
+
+    def test_repeated_statements_are_flagged_per_route(self):
+        client = self.app.test_client()
+        response = client.get("/rows/6")
+        self.assertIn('desc="6 queries"', response.headers["Server-Timing"])
+        client.get("/rows/1")
+        client.get("/rows/2")
+
+        snapshot = self.profiler.snapshot()
+        self.assertEqual(len(snapshot["slowest"]), 2)
+        self.assertEqual([record["path"] for record in snapshot["flagged"]], ["/rows/6"])
+        flagged = snapshot["flagged"][0]
+        self.assertEqual(flagged["query_count"], 6)
+        self.assertEqual(set(flagged["flags"]), {"query_count", "n_plus_one"})
+        self.assertEqual(flagged["repeated"][0]["count"], 6)
+        self.assertEqual(snapshot["routes"][0]["route"], "/rows/<int:count>")
+        self.assertEqual(snapshot["routes"][0]["requests"], 3)
+
+    def test_disabled_profiler_records_nothing(self):
+        self.app.config["SQL_PROFILING_ENABLED"] = False
+        response = self.app.test_client().get("/rows/3")
+        self.assertNotIn("Server-Timing", response.headers)
+        self.assertEqual(self.profiler.snapshot()["routes"], [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+import csv
+import unittest
+from io import BytesIO, StringIO
+
+from openpyxl import load_workbook
+from app import app, db, ensure_bootstrap
+from eleva_app import exports
+from eleva_app.models import Customer, Lift, User
+from eleva_app.perf import QueryRecorder
+
+PREFIX = "ZEXPORT"
+
+
+class StreamingExportTests(unittest.TestCase):
+    def setUp(self):
+        app.config["TESTING"] = True
+        self.client = app.test_client()
+        with app.app_context():
+            ensure_bootstrap()
+            self._cleanup()
+            admin = User.query.filter_by(username="admin").first()
+            if not admin.session_token:
+                admin.issue_session_token()
+                db.session.commit()
+            self.admin_id, token = admin.id, admin.session_token
+            for index in range(25):
+                code = f"{PREFIX}-C{index:02d}"
+                db.session.add(Customer(customer_code=code, company_name=f"{PREFIX} Towers {index:02d}"))
+                db.session.add(Lift(lift_code=f"{PREFIX}-L{index:02d}", customer_code=code, city="Pune"))
+            db.session.commit()
+        with self.client.session_transaction() as session:
+            session["_user_id"] = str(self.admin_id)
+            session["_fresh"] = True
+            session["session_token"] = token
+
+    def tearDown(self):
+        with app.app_context():
+            self._cleanup()
+
+    def _cleanup(self):
+        Lift.query.filter(Lift.lift_code.like(f"{PREFIX}%")).delete(synchronize_session=False)
+        Customer.query.filter(Customer.customer_code.like(f"{PREFIX}%")).delete(synchronize_session=False)
+        db.session.commit()
+
+    def _get(self, url):
+        with app.app_context():
+            engine = db.engine
+        with QueryRecorder(engine) as recorder:
+            response = self.client.get(url)
+            body = response.get_data()
+        return response, body, recorder.statements
+
+    def test_lift_export_streams_a_write_only_workbook_in_batches(self):
+        app.config["EXPORT_BATCH_SIZE"] = 10
+        self.addCleanup(app.config.__setitem__, "EXPORT_BATCH_SIZE", 500)
+
+        response, body, statements = self._get(f"/service/lifts/export?q={PREFIX}")
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("Content-Length", response.headers)
+        self.assertEqual(response.mimetype, exports.XLSX_MIMETYPE)
+        self.assertIn("attachment; filename=\"lifts_export_", response.headers["Content-Disposition"])
+
+        sheet = load_workbook(BytesIO(body), read_only=True).active
+        rows = list(sheet.iter_rows(values_only=True))
+        self.assertEqual(rows[0][1], "Lift Code")
+        self.assertEqual([row[1] for row in rows[1:]], [f"{PREFIX}-L{index:02d}" for index in range(25)])
+        self.assertEqual(rows[1][4], f"{PREFIX} Towers 00")
+        # Customers come from the joined load, not one query per lift.
+        self.assertEqual(len([sql for sql in statements if "FROM customer" in sql]), 0)
+
+    def test_customer_export_falls_back_to_chunked_csv(self):
+        with app.test_request_context():
+            rows = exports.iter_export_rows(
+                Customer.query.filter(Customer.customer_code.like(f"{PREFIX}%")).order_by(Customer.customer_code),
+                lambda customer: [customer.customer_code, customer.company_name],
+                batch_size=5,
+            )
+            response = exports.export_response("customers.xlsx", ["Code", "Name"], rows, fmt="csv")
+            body = response.get_data()
+
+        self.assertIn('filename="customers.csv"', response.headers["Content-Disposition"])
+        self.assertTrue(body.startswith(b"\xef\xbb\xbf"))
+        parsed = list(csv.reader(StringIO(body.decode("utf-8-sig"))))
+        self.assertEqual(parsed[0], ["Code", "Name"])
+        self.assertEqual(len(parsed), 26)
+
+    def test_csv_generator_flushes_in_bounded_chunks(self):
+        rows = ([str(index), "x" * 200] for index in range(2000))
+        chunks = list(exports.iter_csv_chunks(["id", "payload"], rows, bom=False))
+        self.assertGreater(len(chunks), 1)
+        self.assertTrue(all(len(chunk) < exports.EXPORT_CHUNK_SIZE + 1024 for chunk in chunks))
+        self.assertEqual(b"".join(chunks).count(b"\r\n"), 2001)
+
+
+if __name__ == "__main__":
+    unittest.main()
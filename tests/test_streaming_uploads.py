@@ -0,0 +1,135 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from flask_login import login_user
+from openpyxl import Workbook
+from sqlalchemy import event
+
+from app import app, db, ensure_bootstrap
+from eleva_app import uploads
+from eleva_app.models import Customer, Lift, User
+from eleva_app.uploads import UploadStageTimeoutError, iter_tabular_rows, process_lift_upload_file
+
+PREFIX = "ZSTREAMUP"
+
+
+class StreamingUploadTests(unittest.TestCase):
+    def setUp(self):
+        app.config["TESTING"] = True
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir, True)
+        with app.app_context():
+            ensure_bootstrap()
+            self._cleanup()
+            db.session.add(Customer(customer_code=f"{PREFIX}-C1", company_name=f"{PREFIX} Heights"))
+            db.session.commit()
+
+    def tearDown(self):
+        with app.app_context():
+            self._cleanup()
+
+    def _cleanup(self):
+        Lift.query.filter(Lift.lift_code.like(f"{PREFIX}%")).delete(synchronize_session=False)
+        Customer.query.filter(Customer.customer_code.like(f"{PREFIX}%")).delete(synchronize_session=False)
+        db.session.commit()
+
+    def _lift_workbook(self, count):
+        from app import AMC_LIFT_TEMPLATE_HEADERS, AMC_LIFT_TEMPLATE_SHEET_NAME
+
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet(AMC_LIFT_TEMPLATE_SHEET_NAME)
+        sheet.append(AMC_LIFT_TEMPLATE_HEADERS)
+        column = {header: index for index, header in enumerate(AMC_LIFT_TEMPLATE_HEADERS)}
+        for index in range(count):
+            row = [None] * len(AMC_LIFT_TEMPLATE_HEADERS)
+            row[column["Lift Code"]] = f"{PREFIX}-L{index:04d}"
+            row[column["Customer Code"]] = f"{PREFIX}-C1"
+            row[column["AMC Status"]] = "Active"
+            row[column["AMC Duration"]] = "1 Year"
+            row[column["AMC Start (YYYY-MM-DD)"]] = "2026-01-01"
+            sheet.append(row)
+        path = os.path.join(self.tmpdir, "lifts.xlsx")
+        workbook.save(path)
+        return path
+
+    def test_lift_upload_streams_rows_and_commits_in_chunks(self):
+        path = self._lift_workbook(45)
+        app.config["UPLOAD_COMMIT_CHUNK_SIZE"] = 20
+        self.addCleanup(app.config.__setitem__, "UPLOAD_COMMIT_CHUNK_SIZE", 500)
+
+        commits = []
+
+        def _record_commit(session):
+            commits.append(True)
+
+        with app.test_request_context():
+            login_user(User.query.filter_by(username="admin").first())
+            event.listen(db.session, "after_commit", _record_commit)
+            try:
+                outcome = process_lift_upload_file(path, apply_changes=True)
+            finally:
+                event.remove(db.session, "after_commit", _record_commit)
+
+        self.assertEqual(outcome.row_errors, [])
+        self.assertEqual(outcome.created_count, 45)
+        # Two full chunks of 20 plus the final commit for the last 5 rows.
+        self.assertEqual(len(commits), 3)
+        with app.app_context():
+            self.assertEqual(Lift.query.filter(Lift.lift_code.like(f"{PREFIX}%")).count(), 45)
+
+    def test_timeout_reports_the_rows_already_committed(self):
+        path = self._lift_workbook(45)
+        app.config["UPLOAD_COMMIT_CHUNK_SIZE"] = 20
+        self.addCleanup(app.config.__setitem__, "UPLOAD_COMMIT_CHUNK_SIZE", 500)
+        check_stage_timeout = uploads._check_stage_timeout
+        total_checks = []
+
+        def _time_out_on_row_26(start_time, stage, **kwargs):
+            if stage == "processing the AMC lift upload":
+                total_checks.append(stage)
+                # Each row checks the total timeout on entry and on exit.
+                if len(total_checks) == 51:
+                    raise UploadStageTimeoutError(stage)
+            return check_stage_timeout(start_time, stage, **kwargs)
+
+        with app.test_request_context(), mock.patch.object(
+            uploads, "_check_stage_timeout", side_effect=_time_out_on_row_26
+        ):
+            with self.assertRaises(UploadStageTimeoutError) as caught:
+                process_lift_upload_file(path, apply_changes=True)
+            db.session.rollback()
+
+        self.assertEqual(caught.exception.committed_rows, 20)
+        self.assertIn("Rows 2 to 21", caught.exception.partial_upload_message)
+        with app.app_context():
+            self.assertEqual(Lift.query.filter(Lift.lift_code.like(f"{PREFIX}%")).count(), 20)
+
+    def test_csv_rows_are_decoded_incrementally_with_latin1_fallback(self):
+        path = os.path.join(self.tmpdir, "rows.csv")
+        with open(path, "wb") as handle:
+            handle.write(b"\xef\xbb\xbfName,City\r\n")
+            for index in range(3000):
+                handle.write(f"Row {index},Pune\r\n".encode("utf-8"))
+        rows = iter_tabular_rows(path, filename=path)
+        self.assertEqual(next(rows), ["Name", "City"])
+        self.assertEqual(sum(1 for _ in rows), 3000)
+
+        with open(path, "ab") as handle:
+            handle.write(b"Caf\xe9,M\xfcnchen\r\n")
+        last = list(iter_tabular_rows(path, filename=path))[-1]
+        self.assertEqual(last, ["Café", "München"])
+
+    def test_workbook_rows_stream_from_the_selected_sheet(self):
+        path = self._lift_workbook(3)
+        rows = iter_tabular_rows(path, filename=path, sheet_name="AMC Lifts")
+        self.assertEqual(next(rows)[1], "Lift Code")
+        self.assertEqual([row[1] for row in rows], [f"{PREFIX}-L{index:04d}" for index in range(3)])
+        with self.assertRaises(ValueError):
+            uploads.open_tabular_rows(path, filename="lifts.pdf")
+
+
+if __name__ == "__main__":
+    unittest.main()
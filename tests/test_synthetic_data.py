@@ -0,0 +1,51 @@
+import unittest
+
+from app import app, ensure_bootstrap
+from eleva_app.models import BOMItem, Lift, Product, PurchaseOrder, ServiceVisit, SupportTicket
+from eleva_app.synthetic import SYNTHETIC_VOLUMES, purge_synthetic_data, seed_synthetic_data
+
+PREFIX = "ZSYN"
+
+
+class SyntheticDataTests(unittest.TestCase):
+    def setUp(self):
+        app.config["TESTING"] = True
+        with app.app_context():
+            ensure_bootstrap()
+            purge_synthetic_data(PREFIX)
+
+    def tearDown(self):
+        with app.app_context():
+            purge_synthetic_data(PREFIX)
+
+    def test_seed_creates_scaled_volumes_and_purge_removes_them(self):
+        with app.app_context():
+            counts = seed_synthetic_data(1, prefix=PREFIX)
+
+            lift_count = Lift.query.filter(Lift.lift_code.like(f"{PREFIX}%")).count()
+            self.assertEqual(lift_count, counts["lifts"])
+            self.assertEqual(
+                lift_count,
+                SYNTHETIC_VOLUMES["customers"] * SYNTHETIC_VOLUMES["lifts_per_customer"],
+            )
+            visits = (
+                ServiceVisit.query.join(Lift)
+                .filter(Lift.lift_code.like(f"{PREFIX}%"))
+                .count()
+            )
+            self.assertEqual(visits, counts["service_visits"])
+            self.assertEqual(
+                PurchaseOrder.query.filter(PurchaseOrder.po_number.like(f"{PREFIX}%")).count(),
+                SYNTHETIC_VOLUMES["purchase_orders"],
+            )
+            self.assertEqual(counts["bom_items"], BOMItem.query.filter(BOMItem.item_code.like(f"{PREFIX}-%")).count())
+            self.assertTrue(all(product.sku for product in Product.query.filter(Product.name.like(f"{PREFIX}%"))))
+
+            purge_synthetic_data(PREFIX)
+            self.assertEqual(Lift.query.filter(Lift.lift_code.like(f"{PREFIX}%")).count(), 0)
+            self.assertEqual(SupportTicket.query.filter(SupportTicket.ticket_id.like(f"{PREFIX}%")).count(), 0)
+            self.assertEqual(Product.query.filter(Product.name.like(f"{PREFIX}%")).count(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,211 @@
+import io
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import date
+from unittest import mock
+
+from flask_login import login_user
+
+from app import app, db, ensure_bootstrap
+from eleva_app import uploads
+from eleva_app.jobs import enqueue_job, run_worker
+from eleva_app.models import BackgroundJob, Customer, Lift, User
+from eleva_app.uploads import UploadPlan, apply_upload_plan, load_upload_plan, process_lift_upload_file
+
+PREFIX = "ZPLANUP"
+
+
+class UploadPlanCacheTests(unittest.TestCase):
+    def setUp(self):
+        app.config["TESTING"] = True
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir, True)
+        for key, value in {
+            "UPLOAD_FOLDER": self.tmpdir,
+            "JOB_WORKER_ENABLED": False,
+            "WTF_CSRF_ENABLED": False,
+        }.items():
+            self.addCleanup(app.config.__setitem__, key, app.config.get(key))
+            app.config[key] = value
+        self.client = app.test_client()
+        with app.app_context():
+            ensure_bootstrap()
+            self._cleanup()
+            db.session.add(Customer(customer_code=f"{PREFIX}-C0", company_name=f"{PREFIX} Old Name"))
+            db.session.commit()
+            admin = User.query.filter_by(username="admin").first()
+            if not admin.session_token:
+                admin.issue_session_token()
+                db.session.commit()
+            self.admin_id, token = admin.id, admin.session_token
+        with self.client.session_transaction() as session:
+            session["_user_id"] = str(self.admin_id)
+            session["_fresh"] = True
+            session["session_token"] = token
+
+    def tearDown(self):
+        with app.app_context():
+            self._cleanup()
+
+    def _cleanup(self):
+        Lift.query.filter(Lift.lift_code.like(f"{PREFIX}%")).delete(synchronize_session=False)
+        Customer.query.filter(Customer.customer_code.like(f"{PREFIX}%")).delete(synchronize_session=False)
+        db.session.commit()
+
+    def _upload_customers(self):
+        body = "Customer Code,Company Name,Office City\r\n"
+        body += "".join(f"{PREFIX}-C{index},{PREFIX} Towers {index},Nashik\r\n" for index in range(1, 4))
+        response = self.client.post(
+            "/service/customers/upload",
+            data={"customer_upload_file": (io.BytesIO(body.encode("utf-8")), "customers.csv")},
+            content_type="multipart/form-data",
+        )
+        self.assertEqual(response.status_code, 302)
+        return response.headers["Location"].rstrip("/").rsplit("/", 1)[-1]
+
+    def test_review_and_merge_reuse_the_dry_run_plan(self):
+        with mock.patch.object(uploads, "open_tabular_rows", wraps=uploads.open_tabular_rows) as reader:
+            pending_token = self._upload_customers()
+            self.assertTrue(os.path.exists(os.path.join(self.tmpdir, "pending", f"plan-{pending_token}.jsonl")))
+
+            review = self.client.get(f"/service/upload-review/customers/{pending_token}")
+            self.assertEqual(review.status_code, 200)
+            self.client.post(
+                "/service/customers/upload",
+                data={"pending_token": pending_token, "action": "merge"},
+            )
+            self.assertEqual(reader.call_count, 1)
+
+        self.assertEqual(os.listdir(os.path.join(self.tmpdir, "pending")), [])
+        with app.app_context():
+            customers = {
+                customer.customer_code: customer
+                for customer in Customer.query.filter(Customer.customer_code.like(f"{PREFIX}%"))
+            }
+            self.assertEqual(len(customers), 4)
+            self.assertEqual(customers[f"{PREFIX}-C2"].company_name, f"{PREFIX} Towers 2")
+            self.assertEqual(customers[f"{PREFIX}-C2"].office_city, "Nashik")
+            self.assertEqual(customers[f"{PREFIX}-C2"].country, "India")
+
+    def test_reference_data_changes_invalidate_the_plan(self):
+        pending_token = self._upload_customers()
+        with app.app_context():
+            customer = Customer.query.filter_by(customer_code=f"{PREFIX}-C0").one()
+            customer.contact_person = "Changed elsewhere"
+            db.session.commit()
+
+        with mock.patch.object(uploads, "open_tabular_rows", wraps=uploads.open_tabular_rows) as reader:
+            review = self.client.get(f"/service/upload-review/customers/{pending_token}")
+            self.assertEqual(review.status_code, 200)
+            self.assertEqual(reader.call_count, 1)
+            # The review stored a fresh plan, which the merge then executes.
+            self.client.post(
+                "/service/customers/upload",
+                data={"pending_token": pending_token, "action": "merge"},
+            )
+            self.assertEqual(reader.call_count, 1)
+
+        with app.app_context():
+            self.assertEqual(Customer.query.filter(Customer.customer_code.like(f"{PREFIX}%")).count(), 4)
+
+    def test_partial_merge_drops_the_pending_upload(self):
+        pending_token = self._upload_customers()
+        with app.app_context():
+            customer = Customer.query.filter_by(customer_code=f"{PREFIX}-C0").one()
+            customer.contact_person = "Changed elsewhere"
+            db.session.commit()
+        app.config["UPLOAD_COMMIT_CHUNK_SIZE"] = 1
+        self.addCleanup(app.config.__setitem__, "UPLOAD_COMMIT_CHUNK_SIZE", 500)
+        check_stage_timeout = uploads._check_stage_timeout
+        total_checks = []
+
+        def _time_out_leaving_row_3(start_time, stage, **kwargs):
+            if stage == "processing the customer upload":
+                total_checks.append(stage)
+                if len(total_checks) == 4:
+                    raise uploads.UploadStageTimeoutError(stage)
+            return check_stage_timeout(start_time, stage, **kwargs)
+
+        with mock.patch.object(uploads, "_check_stage_timeout", side_effect=_time_out_leaving_row_3):
+            response = self.client.post(
+                "/service/customers/upload",
+                data={"pending_token": pending_token, "action": "merge"},
+                follow_redirects=True,
+            )
+        self.assertIn(b"Rows 2 to 2 of the sheet were saved", response.data)
+        with self.client.session_transaction() as session:
+            self.assertNotIn(pending_token, session.get("pending_uploads", {}))
+        self.assertEqual(os.listdir(os.path.join(self.tmpdir, "pending")), [])
+        with app.app_context():
+            self.assertEqual(Customer.query.filter(Customer.customer_code.like(f"{PREFIX}%")).count(), 2)
+
+    def _write_lift_csv(self, codes):
+        from app import AMC_LIFT_TEMPLATE_HEADERS
+
+        column = {header: index for index, header in enumerate(AMC_LIFT_TEMPLATE_HEADERS)}
+        lines = [",".join(AMC_LIFT_TEMPLATE_HEADERS)]
+        for code in codes:
+            row = [""] * len(AMC_LIFT_TEMPLATE_HEADERS)
+            row[column["Lift Code"]] = f"{PREFIX}-{code}"
+            row[column["Customer Code"]] = f"{PREFIX}-C0"
+            row[column["AMC Status"]] = "Active"
+            row[column["AMC Duration"]] = "1 Year"
+            row[column["AMC Start (YYYY-MM-DD)"]] = "2026-01-01"
+            lines.append(",".join(row))
+        path = os.path.join(self.tmpdir, "lifts.csv")
+        with open(path, "w", encoding="utf-8", newline="") as handle:
+            handle.write("\r\n".join(lines) + "\r\n")
+        return path
+
+    def test_lift_plan_keeps_generated_codes_and_dates(self):
+        path = self._write_lift_csv(("L0", "L1"))
+        with app.app_context():
+            db.session.add(Lift(lift_code=f"{PREFIX}-L0", customer_code=f"{PREFIX}-C0", city="Pune"))
+            db.session.commit()
+
+        with app.test_request_context():
+            login_user(User.query.filter_by(username="admin").first())
+            plan = UploadPlan("lift")
+            preview = process_lift_upload_file(path, apply_changes=False, plan=plan)
+            self.assertTrue(plan.save("lifttoken", preview, path))
+
+        with app.test_request_context():
+            self.assertEqual(load_upload_plan("lifttoken", "lift", path).created_count, 1)
+            self.assertIsNone(load_upload_plan("lifttoken", "customer", path))
+
+            outcome = apply_upload_plan("lifttoken", "lift", path, user_id=self.admin_id)
+            self.assertEqual((outcome.created_count, outcome.updated_count), (1, 1))
+            self.assertIsNone(apply_upload_plan("lifttoken", "lift", path, user_id=self.admin_id))
+
+            for lift in Lift.query.filter(Lift.lift_code.like(f"{PREFIX}%")):
+                self.assertEqual(lift.amc_start, date(2026, 1, 1))
+                self.assertEqual(lift.customer.customer_code, f"{PREFIX}-C0")
+                self.assertEqual(lift.last_updated_by, self.admin_id)
+
+    def test_worker_applies_a_stale_lift_plan_as_the_uploader(self):
+        path = self._write_lift_csv(("L5", "L6"))
+        app.config["JOB_WORKER_ENABLED"] = True
+        with app.app_context():
+            job = enqueue_job(
+                "lift_upload_apply",
+                {"path": path, "plan_token": "missingplan"},
+                user_id=self.admin_id,
+            )
+            job_id = job.id
+        # The worker thread has an app context but no request or logged-in user.
+        run_worker(app, concurrency=1, burst=True)
+
+        with app.app_context():
+            job = db.session.get(BackgroundJob, job_id)
+            self.assertEqual(job.status, "succeeded", job.error)
+            lifts = Lift.query.filter(Lift.lift_code.like(f"{PREFIX}%")).all()
+            self.assertEqual(len(lifts), 2)
+            self.assertEqual({lift.last_updated_by for lift in lifts}, {self.admin_id})
+            db.session.delete(job)
+            db.session.commit()
+
+
+if __name__ == "__main__":
+    unittest.main()
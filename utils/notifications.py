@@ -8,6 +8,7 @@ def create_notification(user_id: int, message: str, link_url: str | None = None,
 
     from eleva_app import db
     from eleva_app.models import Notification
+    from eleva_app.push import publish, user_channel
 
     notif = Notification(
         user_id=user_id,
@@ -15,6 +16,7 @@ def create_notification(user_id: int, message: str, link_url: str | None = None,
         link_url=link_url or "",
     )
     db.session.add(notif)
+    publish(user_channel(user_id), "notification", {"message": notif.message, "link_url": notif.link_url})
     if commit:
         db.session.commit()
     return notif